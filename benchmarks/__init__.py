@@ -0,0 +1,12 @@
+"""Benchmarks of the overhead pydantic-ai adds around model requests.
+
+The benchmarks use [`TestModel`][pydantic_ai.models.test.TestModel] and
+[`FunctionModel`][pydantic_ai.models.function.FunctionModel], which respond instantly, so they run offline and measure
+only the library's own work. Run them with `python -m benchmarks`, or `make benchmark`, which compares the results to
+`benchmarks/baseline.json` and exits with an error if any benchmark got slower.
+
+Benchmarks are registered with [`benchmark`][benchmarks._runner.benchmark] in the modules listed in `MODULES`.
+"""
+
+MODULES = ('agent_run', 'streaming', 'tools', 'history', 'serialization', 'graph')
+"""The modules defining benchmarks, imported to register them."""
@@ -0,0 +1,70 @@
+"""Run the benchmarks and compare them to a baseline, see `python -m benchmarks --help`."""
+
+from __future__ import annotations as _annotations
+
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+from . import MODULES, _runner
+
+BASELINE = Path(__file__).parent / 'baseline.json'
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('-k', dest='filter', help='only run benchmarks whose name contains this')
+    parser.add_argument('--quick', action='store_true', help='run each benchmark briefly, to check they work')
+    parser.add_argument('--output', type=Path, help='write the results to this file as JSON')
+    parser.add_argument('--baseline', type=Path, default=BASELINE, help='results to compare to (default: %(default)s)')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.25,
+        help='how much slower a benchmark must be to count as a regression, widened for noisy benchmarks '
+        '(default: %(default)s)',
+    )
+    args = parser.parse_args(argv)
+
+    for module in MODULES:
+        importlib.import_module(f'{__package__}.{module}')
+    benchmarks = _runner.registered(args.filter)
+    if not benchmarks:
+        parser.error(f'no benchmarks match {args.filter!r}')
+
+    def progress(name: str) -> None:
+        print(f'running {name}', file=sys.stderr)
+
+    timing = _runner.Timing.quick() if args.quick else _runner.Timing()
+    results = _runner.run_sync(benchmarks, timing, progress=progress)
+    print(_runner.format_results(results))
+    if args.output:
+        _runner.dump(results, args.output)
+
+    if args.save_baseline:
+        _runner.dump(results, args.baseline)
+        print(f'\nsaved the baseline to {args.baseline}')
+        return 0
+    if not args.baseline.exists():
+        return 0
+
+    baseline = _runner.load(args.baseline)
+    if args.filter:
+        # benchmarks which weren't run aren't missing
+        baseline['benchmarks'] = {k: v for k, v in baseline['benchmarks'].items() if args.filter in k}
+    comparisons = _runner.compare(results, baseline, threshold=args.threshold)
+    print(f'\ncompared to {args.baseline}:\n')
+    print(_runner.format_comparisons(comparisons))
+    if baseline['meta'] != results['meta']:
+        print('\nthe baseline was recorded in a different environment, timings may not be comparable')
+    regressions = [c.name for c in comparisons if c.status == 'regression']
+    if regressions:
+        print(f'\n{len(regressions)} regression(s): {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
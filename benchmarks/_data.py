@@ -0,0 +1,38 @@
+"""Message histories to benchmark with."""
+
+from __future__ import annotations as _annotations
+
+import random
+
+from pydantic_ai.messages import (
+    BinaryContent,
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+
+def chat_history(turns: int, *, image_size: int = 0, tool_rows: int = 0) -> list[ModelMessage]:
+    """Build a history of `turns` turns, each optionally with an image and a tool call returning a table.
+
+    The history is the same every time for the same arguments, so results are comparable between runs.
+    """
+    rng = random.Random(turns)
+    messages: list[ModelMessage] = []
+    for turn in range(turns):
+        prompt = f'Question {turn}: ' + ' '.join(rng.choice(['alpha', 'beta', 'gamma', 'delta']) for _ in range(30))
+        if image_size:
+            content = [prompt, BinaryContent(rng.randbytes(image_size), media_type='image/png')]
+            messages.append(ModelRequest(parts=[UserPromptPart(content)]))
+        else:
+            messages.append(ModelRequest(parts=[UserPromptPart(prompt)]))
+        if tool_rows:
+            messages.append(ModelResponse(parts=[ToolCallPart('query', {'table': 'orders', 'limit': tool_rows})]))
+            rows = [{'id': i, 'customer': f'customer-{i}', 'total': i * 1.25} for i in range(tool_rows)]
+            messages.append(ModelRequest(parts=[ToolReturnPart('query', rows)]))
+        messages.append(ModelResponse(parts=[TextPart('Answer: ' + prompt[::-1])]))
+    return messages
@@ -0,0 +1,257 @@
+"""Registering, timing and comparing benchmarks."""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+import gc
+import json
+import math
+import platform
+import statistics
+import time
+from collections.abc import Awaitable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Literal, Union
+
+from typing_extensions import TypeAlias
+
+Operation: TypeAlias = Callable[[], Awaitable[Union[int, None]]]
+"""One operation of a benchmark, returning the number of units (e.g. events) it processed, or `None` for one."""
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark."""
+
+    name: str
+    """Unique name, of the form `group.benchmark[parameters]`."""
+    setup: Callable[[], Operation]
+    """Prepares the benchmark and returns the operation to time, so setup isn't included in the timings."""
+    unit: str
+    """What the operation processes, used to report a throughput."""
+
+
+_REGISTRY: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, *, unit: str = 'op') -> Callable[[Callable[[], Operation]], Callable[[], Operation]]:
+    """Register a function which sets up a benchmark and returns the operation to time."""
+
+    def decorator(setup: Callable[[], Operation]) -> Callable[[], Operation]:
+        if name in _REGISTRY:
+            raise ValueError(f'Benchmark {name!r} is already registered')
+        _REGISTRY[name] = Benchmark(name, setup, unit)
+        return setup
+
+    return decorator
+
+
+def registered(filter_: str | None = None) -> list[Benchmark]:
+    """Return the registered benchmarks whose name contains `filter_`, in the order they were registered."""
+    return [b for name, b in _REGISTRY.items() if filter_ is None or filter_ in name]
+
+
+@dataclass
+class Timing:
+    """How long to run each benchmark for."""
+
+    rounds: int = 15
+    """The number of rounds to time, the median of which is reported."""
+    round_time: float = 0.2
+    """The minimum duration of a round in seconds, operations are repeated until it's reached."""
+    warmup: int = 2
+    """The number of operations run before timing, e.g. to build schemas and fill caches."""
+
+    @classmethod
+    def quick(cls) -> Timing:
+        """Much shorter timings, e.g. to check the benchmarks work, which are too noisy to compare."""
+        return cls(rounds=2, round_time=0.005, warmup=1)
+
+
+@dataclass
+class Result:
+    """The timings of a benchmark."""
+
+    time_per_op: float
+    """The median time of an operation, in seconds."""
+    units_per_op: float
+    """The number of units each operation processed."""
+    unit: str
+    stdev: float
+    """The standard deviation of the rounds, as a fraction of the median."""
+    rounds: int
+    """The number of rounds timed."""
+
+    @property
+    def units_per_second(self) -> float:
+        return self.units_per_op / self.time_per_op
+
+    def as_json(self) -> dict[str, Any]:
+        return {
+            'time_per_op_us': _round(self.time_per_op * 1e6),
+            'units_per_second': _round(self.units_per_second),
+            'unit': self.unit,
+            'stdev_pct': round(self.stdev * 100, 1),
+            'rounds': self.rounds,
+        }
+
+
+async def measure(bench: Benchmark, timing: Timing) -> Result:
+    """Time a benchmark, returning the median time of its operation over `timing.rounds` rounds."""
+    operation = bench.setup()
+    units = 1
+    for _ in range(timing.warmup):
+        units = await operation() or 1
+
+    # estimate how many operations fill a round, so each round runs the same number of them
+    start = time.perf_counter()
+    units = await operation() or 1
+    elapsed = time.perf_counter() - start
+    ops_per_round = max(1, int(timing.round_time / max(elapsed, 1e-9)))
+
+    round_times: list[float] = []
+    gc_was_enabled = gc.isenabled()
+    try:
+        for _ in range(timing.rounds):
+            gc.collect()
+            # like timeit, garbage collection is disabled so it doesn't add noise depending on when it runs
+            gc.disable()
+            start = time.perf_counter()
+            for _ in range(ops_per_round):
+                await operation()
+            round_times.append((time.perf_counter() - start) / ops_per_round)
+            if gc_was_enabled:
+                gc.enable()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    median = statistics.median(round_times)
+    stdev = statistics.stdev(round_times) / median if len(round_times) > 1 else 0.0
+    return Result(median, units, bench.unit, stdev, len(round_times))
+
+
+async def run(
+    benchmarks: Iterable[Benchmark], timing: Timing, *, progress: Callable[[str], None] | None = None
+) -> dict[str, Any]:
+    """Run benchmarks, returning their results in the JSON format stored in baselines."""
+    results: dict[str, Any] = {}
+    for bench in benchmarks:
+        if progress:
+            progress(bench.name)
+        results[bench.name] = (await measure(bench, timing)).as_json()
+    return {'meta': environment(), 'benchmarks': dict(sorted(results.items()))}
+
+
+def run_sync(benchmarks: Iterable[Benchmark], timing: Timing, **kwargs: Any) -> dict[str, Any]:
+    return asyncio.run(run(benchmarks, timing, **kwargs))
+
+
+def environment() -> dict[str, str]:
+    """Describe where the benchmarks were run, since results from different machines can't be compared."""
+    from importlib.metadata import version
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'pydantic': version('pydantic'),
+        'pydantic_core': version('pydantic_core'),
+    }
+
+
+Status: TypeAlias = Literal['ok', 'regression', 'improvement', 'new', 'missing']
+
+
+@dataclass
+class Comparison:
+    """How a benchmark's result compares to the baseline."""
+
+    name: str
+    status: Status
+    baseline_us: float | None = None
+    current_us: float | None = None
+    ratio: float | None = field(default=None)
+    """The current time divided by the baseline time, above 1 is slower."""
+    threshold: float | None = None
+    """The threshold the ratio was judged against, wider than requested for noisy benchmarks."""
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], *, threshold: float = 0.25) -> list[Comparison]:
+    """Compare results to a baseline, flagging benchmarks which got slower by more than `threshold`.
+
+    The threshold of a benchmark is widened to twice the standard error of the difference between its two medians,
+    estimated from the stdev and number of rounds of each, so a benchmark whose rounds vary a lot isn't reported as a
+    regression just because of noise.
+
+    Args:
+        results: Results from [`run`][benchmarks._runner.run].
+        baseline: Stored results in the same format.
+        threshold: The fraction by which a benchmark must be slower to be a regression, or faster to be an
+            improvement.
+    """
+    current = results['benchmarks']
+    previous = baseline['benchmarks']
+    comparisons: list[Comparison] = []
+    for name in sorted(current.keys() | previous.keys()):
+        if name not in previous:
+            comparisons.append(Comparison(name, 'new', current_us=current[name]['time_per_op_us']))
+            continue
+        if name not in current:
+            comparisons.append(Comparison(name, 'missing', baseline_us=previous[name]['time_per_op_us']))
+            continue
+        baseline_us = previous[name]['time_per_op_us']
+        current_us = current[name]['time_per_op_us']
+        ratio = current_us / baseline_us
+        limit = max(threshold, 2 * math.hypot(_median_error(previous[name]), _median_error(current[name])))
+        if ratio > 1 + limit:
+            status: Status = 'regression'
+        elif ratio < 1 / (1 + limit):
+            status = 'improvement'
+        else:
+            status = 'ok'
+        comparisons.append(Comparison(name, status, baseline_us, current_us, round(ratio, 3), round(limit, 3)))
+    return comparisons
+
+
+def _median_error(result: dict[str, Any]) -> float:
+    """The standard error of a result's median as a fraction of it, results from before `rounds` was stored had 7."""
+    # the median's standard error is about 1.25 times the mean's, for normally distributed rounds
+    return 1.25 * result['stdev_pct'] / 100 / math.sqrt(result.get('rounds', 7))
+
+
+def format_comparisons(comparisons: list[Comparison]) -> str:
+    """Format comparisons as a table."""
+    lines = [f'{"benchmark":<48} {"baseline":>12} {"current":>12} {"ratio":>7} {"limit":>7}  status']
+    for c in comparisons:
+        baseline = f'{c.baseline_us:.1f}us' if c.baseline_us is not None else '-'
+        current = f'{c.current_us:.1f}us' if c.current_us is not None else '-'
+        ratio = f'{c.ratio:.2f}x' if c.ratio is not None else '-'
+        limit = f'{1 + c.threshold:.2f}x' if c.threshold is not None else '-'
+        lines.append(f'{c.name:<48} {baseline:>12} {current:>12} {ratio:>7} {limit:>7}  {c.status}')
+    return '\n'.join(lines)
+
+
+def format_results(results: dict[str, Any]) -> str:
+    """Format results as a table."""
+    lines = [f'{"benchmark":<48} {"time/op":>12} {"throughput":>20} {"stdev":>7}']
+    for name, result in results['benchmarks'].items():
+        throughput = f'{result["units_per_second"]:,.0f} {result["unit"]}/s'
+        lines.append(f'{name:<48} {result["time_per_op_us"]:>10.1f}us {throughput:>20} {result["stdev_pct"]:>6.1f}%')
+    return '\n'.join(lines)
+
+
+def dump(results: dict[str, Any], path: Path) -> None:
+    """Write results as JSON, with sorted keys so the files diff cleanly."""
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+
+
+def load(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text())
+
+
+def _round(value: float) -> float:
+    """Round to 4 significant figures, more digits are noise."""
+    return float(f'{value:.4g}')
@@ -0,0 +1,44 @@
+"""The overhead of an agent run, with models which respond instantly."""
+
+from __future__ import annotations as _annotations
+
+from pydantic_ai import Agent
+from pydantic_ai.models.test import TestModel
+
+from ._runner import Operation, benchmark
+
+
+def _agent() -> Agent[None, str]:
+    return Agent(TestModel(call_tools=[]), instrument=False)
+
+
+@benchmark('agent.run', unit='run')
+def agent_run() -> Operation:
+    agent = _agent()
+
+    async def operation() -> None:
+        await agent.run('Hello')
+
+    return operation
+
+
+@benchmark('agent.iter', unit='run')
+def agent_iter() -> Operation:
+    agent = _agent()
+
+    async def operation() -> None:
+        async with agent.iter('Hello') as agent_run:
+            async for _node in agent_run:
+                pass
+
+    return operation
+
+
+@benchmark('agent.run[structured]', unit='run')
+def agent_run_structured() -> Operation:
+    agent = Agent(TestModel(call_tools=[]), result_type=tuple[int, str, list[float]], instrument=False)
+
+    async def operation() -> None:
+        await agent.run('Hello')
+
+    return operation
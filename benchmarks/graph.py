@@ -0,0 +1,42 @@
+"""The overhead of each step of a `pydantic_graph` run, with nodes which do no work."""
+
+from __future__ import annotations as _annotations
+
+from dataclasses import dataclass
+
+from pydantic_graph import BaseNode, End, Graph, GraphRunContext
+
+from ._runner import Operation, benchmark
+
+STEPS = 1000
+
+
+@dataclass
+class Counter:
+    count: int = 0
+
+
+@dataclass
+class Increment(BaseNode[Counter, None, int]):
+    async def run(self, ctx: GraphRunContext[Counter]) -> Check:
+        ctx.state.count += 1
+        return Check()
+
+
+@dataclass
+class Check(BaseNode[Counter, None, int]):
+    async def run(self, ctx: GraphRunContext[Counter]) -> Increment | End[int]:
+        if ctx.state.count < STEPS // 2:
+            return Increment()
+        return End(ctx.state.count)
+
+
+@benchmark(f'graph.run[{STEPS}]', unit='step')
+def graph_run() -> Operation:
+    graph = Graph(nodes=(Increment, Check), auto_instrument=False)
+
+    async def operation() -> int:
+        result = await graph.run(Increment(), state=Counter(), infer_name=False)
+        return len(result.history)
+
+    return operation
@@ -0,0 +1,26 @@
+"""How the overhead of a run grows with the length of the message history passed to it."""
+
+from __future__ import annotations as _annotations
+
+from pydantic_ai import Agent
+from pydantic_ai.models.test import TestModel
+
+from ._data import chat_history
+from ._runner import Operation, benchmark
+
+LENGTHS = (10, 100, 1000, 10_000)
+
+
+def _run_with_history(length: int) -> Operation:
+    agent = Agent(TestModel(call_tools=[]), instrument=False)
+    history = chat_history(length // 2)
+
+    async def operation() -> int:
+        await agent.run('And then?', message_history=history)
+        return len(history)
+
+    return operation
+
+
+for _length in LENGTHS:
+    benchmark(f'history.run[{_length}]', unit='message')(lambda length=_length: _run_with_history(length))
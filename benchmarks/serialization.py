@@ -0,0 +1,73 @@
+"""Round trips of message histories through JSON, the binary format and lazy loading."""
+
+from __future__ import annotations as _annotations
+
+from importlib.util import find_spec
+
+from pydantic_ai.messages import LazyModelMessages, ModelMessagesTypeAdapter
+
+from ._data import chat_history
+from ._runner import Operation, benchmark
+
+# the binary format needs the `msgpack` optional group, its benchmarks are reported as missing without it
+has_codec = find_spec('msgpack') is not None
+
+LENGTHS = (10, 1000)
+IMAGES = 20
+IMAGE_SIZE = 100_000
+
+
+def _json_round_trip(turns: int, **kwargs: int) -> Operation:
+    history = chat_history(turns, **kwargs)
+
+    async def operation() -> int:
+        ModelMessagesTypeAdapter.validate_json(ModelMessagesTypeAdapter.dump_json(history))
+        return len(history)
+
+    return operation
+
+
+def _bytes_round_trip(turns: int, **kwargs: int) -> Operation:
+    from pydantic_ai.message_codec import dump_messages_bytes, load_messages_bytes
+
+    history = chat_history(turns, **kwargs)
+
+    async def operation() -> int:
+        load_messages_bytes(dump_messages_bytes(history))
+        return len(history)
+
+    return operation
+
+
+for _turns in LENGTHS:
+    # each turn has a request, a tool call, its return and a response
+    _messages = _turns * 4
+    benchmark(f'serialization.json[{_messages}]', unit='message')(
+        lambda turns=_turns: _json_round_trip(turns, tool_rows=10)
+    )
+    if has_codec:
+        benchmark(f'serialization.bytes[{_messages}]', unit='message')(
+            lambda turns=_turns: _bytes_round_trip(turns, tool_rows=10)
+        )
+
+
+@benchmark(f'serialization.json[{IMAGES}_images]', unit='message')
+def json_images() -> Operation:
+    return _json_round_trip(IMAGES, image_size=IMAGE_SIZE)
+
+
+if has_codec:
+
+    @benchmark(f'serialization.bytes[{IMAGES}_images]', unit='message')
+    def bytes_images() -> Operation:
+        return _bytes_round_trip(IMAGES, image_size=IMAGE_SIZE)
+
+
+@benchmark('serialization.lazy_tail[10000]', unit='message')
+def lazy_tail() -> Operation:
+    data = ModelMessagesTypeAdapter.dump_json(chat_history(5000))
+
+    async def operation() -> int:
+        return len(LazyModelMessages(data)[-6:])
+
+    return operation
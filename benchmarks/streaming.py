@@ -0,0 +1,80 @@
+"""Throughput of streamed responses, from the model's deltas to the text and structured results the caller sees."""
+
+from __future__ import annotations as _annotations
+
+import json
+from collections.abc import AsyncIterator
+
+from typing_extensions import TypedDict
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelMessage
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, DeltaToolCalls, FunctionModel
+
+from ._runner import Operation, benchmark
+
+EVENTS = 1000
+
+
+class Row(TypedDict):
+    id: int
+    name: str
+
+
+def _text_agent(events: int) -> Agent[None, str]:
+    async def stream(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        for i in range(events):
+            yield f'word{i} '
+
+    return Agent(FunctionModel(stream_function=stream), instrument=False)
+
+
+@benchmark(f'streaming.text_deltas[{EVENTS}]', unit='event')
+def text_deltas() -> Operation:
+    agent = _text_agent(EVENTS)
+
+    async def operation() -> int:
+        async with agent.run_stream('Hello') as result:
+            async for _delta in result.stream_text(delta=True, debounce_by=None):
+                pass
+        return EVENTS
+
+    return operation
+
+
+@benchmark(f'streaming.text[{EVENTS}]', unit='event')
+def text() -> Operation:
+    agent = _text_agent(EVENTS)
+
+    async def operation() -> int:
+        async with agent.run_stream('Hello') as result:
+            async for _text in result.stream_text(debounce_by=None):
+                pass
+        return EVENTS
+
+    return operation
+
+
+@benchmark(f'streaming.structured[{EVENTS}]', unit='event')
+def structured() -> Operation:
+    args = json.dumps({'response': [{'id': i, 'name': f'row {i}'} for i in range(EVENTS // 10)]})
+    # the first chunk includes the `response` key, partial results can't be validated without it
+    prefix = len('{"response": [')
+    chunk_size = (len(args) - prefix) // EVENTS + 1
+    chunks = [args[:prefix]] + [args[i : i + chunk_size] for i in range(prefix, len(args), chunk_size)]
+
+    async def stream(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[DeltaToolCalls]:
+        assert info.result_tools
+        yield {0: DeltaToolCall(name=info.result_tools[0].name)}
+        for chunk in chunks:
+            yield {0: DeltaToolCall(json_args=chunk)}
+
+    agent = Agent(FunctionModel(stream_function=stream), result_type=list[Row], instrument=False)
+
+    async def operation() -> int:
+        async with agent.run_stream('Hello') as result:
+            async for _rows in result.stream(debounce_by=None):
+                pass
+        return len(chunks)
+
+    return operation
@@ -0,0 +1,35 @@
+"""Running the tools called in a model response, which run concurrently."""
+
+from __future__ import annotations as _annotations
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from ._runner import Operation, benchmark
+
+FAN_OUT = (1, 10, 100)
+
+
+def _fan_out(calls: int) -> Operation:
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        last = messages[-1]
+        if isinstance(last, ModelRequest) and last.parts[0].part_kind == 'tool-return':
+            return ModelResponse(parts=[TextPart('done')])
+        return ModelResponse(parts=[ToolCallPart('lookup', {'key': i}, f'call-{i}') for i in range(calls)])
+
+    agent = Agent(FunctionModel(respond), instrument=False)
+
+    @agent.tool_plain
+    async def lookup(key: int) -> dict[str, int]:
+        return {'key': key, 'value': key * 2}
+
+    async def operation() -> int:
+        await agent.run('Hello')
+        return calls
+
+    return operation
+
+
+for _calls in FAN_OUT:
+    benchmark(f'tools.fan_out[{_calls}]', unit='call')(lambda calls=_calls: _fan_out(calls))
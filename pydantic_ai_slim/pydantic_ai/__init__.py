@@ -1,6 +1,6 @@
-from importlib.metadata import version
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-from .agent import Agent, CallToolsNode, EndStrategy, ModelRequestNode, UserPromptNode, capture_run_messages
 from .exceptions import (
     AgentRunError,
     FallbackExceptionGroup,
@@ -10,8 +10,13 @@ from .exceptions import (
     UsageLimitExceeded,
     UserError,
 )
-from .messages import AudioUrl, BinaryContent, ImageUrl
-from .tools import RunContext, Tool
+
+if TYPE_CHECKING:
+    from .agent import Agent, CallToolsNode, EndStrategy, ModelRequestNode, UserPromptNode, capture_run_messages
+    from .messages import AudioUrl, BinaryContent, ImageUrl
+    from .tools import RunContext, Tool
+
+    __version__: str
 
 __all__ = (
     '__version__',
@@ -38,4 +43,36 @@ __all__ = (
     'Tool',
     'RunContext',
 )
-__version__ = version('pydantic_ai_slim')
+
+# Submodules are only imported when one of their exports is first used, so that e.g. `import pydantic_ai.exceptions`
+# or the CLI's argument parsing don't pay for importing the agent machinery, pydantic-graph and OpenTelemetry.
+_lazy_imports = {
+    'Agent': '.agent',
+    'EndStrategy': '.agent',
+    'CallToolsNode': '.agent',
+    'ModelRequestNode': '.agent',
+    'UserPromptNode': '.agent',
+    'capture_run_messages': '.agent',
+    'ImageUrl': '.messages',
+    'AudioUrl': '.messages',
+    'BinaryContent': '.messages',
+    'Tool': '.tools',
+    'RunContext': '.tools',
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name == '__version__':
+        from importlib.metadata import version
+
+        value: Any = version('pydantic_ai_slim')
+    elif (module := _lazy_imports.get(name)) is not None:
+        value = getattr(import_module(module, __name__), name)
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -3,13 +3,13 @@ from __future__ import annotations as _annotations
 import asyncio
 import dataclasses
 import json
+import time
 from collections.abc import AsyncIterator, Iterator, Sequence
 from contextlib import asynccontextmanager, contextmanager
 from contextvars import ContextVar
 from dataclasses import field
-from typing import Any, Generic, Literal, Union, cast
+from typing import TYPE_CHECKING, Any, Generic, Literal, Union, cast
 
-from opentelemetry.trace import Span, Tracer
 from typing_extensions import TypeGuard, TypeVar, assert_never
 
 from pydantic_graph import BaseNode, Graph, GraphRunContext
@@ -22,9 +22,9 @@ from . import (
     messages as _messages,
     models,
     result,
+    timings as _timings,
     usage as _usage,
 )
-from .models.instrumented import InstrumentedModel
 from .result import ResultDataT
 from .settings import ModelSettings, merge_model_settings
 from .tools import (
@@ -33,6 +33,9 @@ from .tools import (
     ToolDefinition,
 )
 
+if TYPE_CHECKING:
+    from opentelemetry.trace import Span, Tracer
+
 __all__ = (
     'GraphAgentState',
     'GraphAgentDeps',
@@ -65,6 +68,7 @@ class GraphAgentState:
     usage: _usage.Usage
     retries: int
     run_step: int
+    timings: _timings.RunTimings = dataclasses.field(default_factory=_timings.RunTimings)
 
     def increment_retries(self, max_result_retries: int) -> None:
         self.retries += 1
@@ -139,7 +143,14 @@ class UserPromptNode(AgentNode[DepsT, NodeRunEndT]):
         self, ctx: GraphRunContext[GraphAgentState, GraphAgentDeps[DepsT, NodeRunEndT]]
     ) -> _messages.ModelRequest:
         run_context = build_run_context(ctx)
-        history, next_message = await self._prepare_messages(self.user_prompt, ctx.state.message_history, run_context)
+        timings = ctx.state.timings
+        system_prompts = timings.system_prompts
+        started = time.perf_counter()
+        history, next_message = await self._prepare_messages(
+            self.user_prompt, ctx.state.message_history, run_context, timings
+        )
+        # `_prepare_messages` records the time spent evaluating system prompts separately
+        timings.history += time.perf_counter() - started - (timings.system_prompts - system_prompts)
         ctx.state.message_history = history
         run_context.messages = history
 
@@ -154,6 +165,7 @@ class UserPromptNode(AgentNode[DepsT, NodeRunEndT]):
         user_prompt: str | Sequence[_messages.UserContent],
         message_history: list[_messages.ModelMessage] | None,
         run_context: RunContext[DepsT],
+        timings: _timings.RunTimings,
     ) -> tuple[list[_messages.ModelMessage], _messages.ModelRequest]:
         try:
             ctx_messages = get_captured_run_messages()
@@ -170,10 +182,14 @@ class UserPromptNode(AgentNode[DepsT, NodeRunEndT]):
             # Shallow copy messages
             messages.extend(message_history)
             # Reevaluate any dynamic system prompt parts
+            started = time.perf_counter()
             await self._reevaluate_dynamic_prompts(messages, run_context)
+            timings.system_prompts += time.perf_counter() - started
             return messages, _messages.ModelRequest([_messages.UserPromptPart(user_prompt)])
         else:
+            started = time.perf_counter()
             parts = await self._sys_parts(run_context)
+            timings.system_prompts += time.perf_counter() - started
             parts.append(_messages.UserPromptPart(user_prompt))
             return messages, _messages.ModelRequest(parts)
 
@@ -277,17 +293,21 @@ class ModelRequestNode(AgentNode[DepsT, NodeRunEndT]):
     ) -> AsyncIterator[models.StreamedResponse]:
         assert not self._did_stream, 'stream() should only be called once per node'
 
-        model_settings, model_request_parameters = await self._prepare_request(ctx)
-        async with ctx.deps.model.request_stream(
-            ctx.state.message_history, model_settings, model_request_parameters
-        ) as streamed_response:
-            self._did_stream = True
-            ctx.state.usage.incr(_usage.Usage(), requests=1)
-            yield streamed_response
-            # In case the user didn't manually consume the full stream, ensure it is fully consumed here,
-            # otherwise usage won't be properly counted:
-            async for _ in streamed_response:
-                pass
+        model_settings, model_request_parameters, request_timings = await self._prepare_request(ctx)
+        request_timings.streamed = True
+        started = time.perf_counter()
+        with _timings.recording_request(request_timings):
+            async with ctx.deps.model.request_stream(
+                ctx.state.message_history, model_settings, model_request_parameters
+            ) as streamed_response:
+                self._did_stream = True
+                ctx.state.usage.incr(_usage.Usage(), requests=1)
+                yield streamed_response
+                # In case the user didn't manually consume the full stream, ensure it is fully consumed here,
+                # otherwise usage won't be properly counted:
+                async for _ in streamed_response:
+                    pass
+        _finish_stream_timings(request_timings, started, streamed_response)
         model_response = streamed_response.get()
         request_usage = streamed_response.usage()
 
@@ -300,17 +320,20 @@ class ModelRequestNode(AgentNode[DepsT, NodeRunEndT]):
         if self._result is not None:
             return self._result
 
-        model_settings, model_request_parameters = await self._prepare_request(ctx)
-        model_response, request_usage = await ctx.deps.model.request(
-            ctx.state.message_history, model_settings, model_request_parameters
-        )
+        model_settings, model_request_parameters, request_timings = await self._prepare_request(ctx)
+        started = time.perf_counter()
+        with _timings.recording_request(request_timings):
+            model_response, request_usage = await ctx.deps.model.request(
+                ctx.state.message_history, model_settings, model_request_parameters
+            )
+        request_timings.duration = time.perf_counter() - started
         ctx.state.usage.incr(_usage.Usage(), requests=1)
 
         return self._finish_handling(ctx, model_response, request_usage)
 
     async def _prepare_request(
         self, ctx: GraphRunContext[GraphAgentState, GraphAgentDeps[DepsT, NodeRunEndT]]
-    ) -> tuple[ModelSettings | None, models.ModelRequestParameters]:
+    ) -> tuple[ModelSettings | None, models.ModelRequestParameters, _timings.ModelRequestTimings]:
         ctx.state.message_history.append(self.request)
 
         # Check usage
@@ -320,12 +343,20 @@ class ModelRequestNode(AgentNode[DepsT, NodeRunEndT]):
         # Increment run_step
         ctx.state.run_step += 1
 
+        request_timings = _timings.ModelRequestTimings(
+            run_step=ctx.state.run_step,
+            retry=any(isinstance(part, _messages.RetryPromptPart) for part in self.request.parts),
+        )
+        ctx.state.timings.model_requests.append(request_timings)
+
         model_settings = merge_model_settings(ctx.deps.model_settings, None)
+        started = time.perf_counter()
         with ctx.deps.tracer.start_as_current_span(
             'preparing model request params', attributes=dict(run_step=ctx.state.run_step)
         ):
             model_request_parameters = await _prepare_request_parameters(ctx)
-        return model_settings, model_request_parameters
+        request_timings.prepare = time.perf_counter() - started
+        return model_settings, model_request_parameters, request_timings
 
     def _finish_handling(
         self,
@@ -347,6 +378,16 @@ class ModelRequestNode(AgentNode[DepsT, NodeRunEndT]):
         return self._result
 
 
+def _finish_stream_timings(
+    request_timings: _timings.ModelRequestTimings, started: float, streamed_response: models.StreamedResponse
+) -> None:
+    first_event_at = streamed_response._first_event_at  # pyright: ignore[reportPrivateUsage]
+    completed_at = streamed_response._completed_at  # pyright: ignore[reportPrivateUsage]
+    if first_event_at is not None:
+        request_timings.time_to_first_token = first_event_at - started
+    request_timings.duration = (completed_at or time.perf_counter()) - started
+
+
 @dataclasses.dataclass
 class CallToolsNode(AgentNode[DepsT, NodeRunEndT]):
     """Process a model response, and decide whether to end the run or make a new request."""
@@ -429,6 +470,7 @@ class CallToolsNode(AgentNode[DepsT, NodeRunEndT]):
         parts: list[_messages.ModelRequestPart] = []
         if result_schema is not None:
             for call, result_tool in result_schema.find_tool(tool_calls):
+                started = time.perf_counter()
                 try:
                     result_data = result_tool.validate(call)
                     result_data = await _validate_result(result_data, ctx, call)
@@ -440,6 +482,8 @@ class CallToolsNode(AgentNode[DepsT, NodeRunEndT]):
                 else:
                     final_result = result.FinalResult(result_data, call.tool_name, call.tool_call_id)
                     break
+                finally:
+                    ctx.state.timings.result_validation += time.perf_counter() - started
 
         # Then build the other request parts based on end strategy
         tool_responses: list[_messages.ModelRequestPart] = self._tool_responses
@@ -473,6 +517,8 @@ class CallToolsNode(AgentNode[DepsT, NodeRunEndT]):
         if tool_responses:
             messages.append(_messages.ModelRequest(parts=tool_responses))
 
+        from .models.instrumented import InstrumentedModel
+
         run_span.set_attributes(
             {
                 **usage.opentelemetry_attributes(),
@@ -511,12 +557,15 @@ class CallToolsNode(AgentNode[DepsT, NodeRunEndT]):
         text = '\n\n'.join(texts)
         if allow_text_result(result_schema):
             result_data_input = cast(NodeRunEndT, text)
+            started = time.perf_counter()
             try:
                 result_data = await _validate_result(result_data_input, ctx, None)
             except _result.ToolRetryError as e:
+                ctx.state.timings.result_validation += time.perf_counter() - started
                 ctx.state.increment_retries(ctx.deps.max_result_retries)
                 return ModelRequestNode[DepsT, NodeRunEndT](_messages.ModelRequest(parts=[e.tool_retry]))
             else:
+                ctx.state.timings.result_validation += time.perf_counter() - started
                 # The following cast is safe because we know `str` is an allowed result type
                 return self._handle_final_result(ctx, result.FinalResult(result_data, None, None), [])
         else:
@@ -615,14 +664,37 @@ async def process_function_tools(
     if not calls_to_run:
         return
 
+    async def run_tool(
+        tool: Tool[DepsT], call: _messages.ToolCallPart
+    ) -> _messages.ToolReturnPart | _messages.RetryPromptPart:
+        with ctx.deps.tracer.start_as_current_span(
+            'running tool',
+            attributes={
+                'tool_name': call.tool_name,
+                'tool_call_id': call.tool_call_id or '',
+                'logfire.msg': f'running tool: {call.tool_name}',
+            },
+        ) as span:
+            started = time.perf_counter()
+            result = await tool.run(call, run_context)
+            tool_timings = _timings.ToolCallTimings(
+                tool_name=call.tool_name,
+                tool_call_id=call.tool_call_id,
+                run_step=run_context.run_step,
+                duration=time.perf_counter() - started,
+                retry=isinstance(result, _messages.RetryPromptPart),
+            )
+            ctx.state.timings.tool_calls.append(tool_timings)
+            span.set_attribute('retry', tool_timings.retry)
+            return result
+
     # Run all tool tasks in parallel
     results_by_index: dict[int, _messages.ModelRequestPart] = {}
     tool_names = [call.tool_name for _, call in calls_to_run]
     with ctx.deps.tracer.start_as_current_span(
         'running tools', attributes={'tools': tool_names, 'logfire.msg': f'running tools: {", ".join(tool_names)}'}
     ):
-        # TODO: Should we wrap each individual tool call in a dedicated span?
-        tasks = [asyncio.create_task(tool.run(call, run_context), name=call.tool_name) for tool, call in calls_to_run]
+        tasks = [asyncio.create_task(run_tool(tool, call), name=call.tool_name) for tool, call in calls_to_run]
         pending = tasks
         while pending:
             done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
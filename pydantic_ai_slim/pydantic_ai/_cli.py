@@ -7,7 +7,7 @@ from collections.abc import Sequence
 from datetime import datetime, timezone
 from importlib.metadata import version
 from pathlib import Path
-from typing import cast
+from typing import TYPE_CHECKING, cast
 
 from typing_inspection.introspection import get_literal_values
 
@@ -34,9 +34,11 @@ except ImportError as _import_error:
         "you can use the `cli` optional group — `pip install 'pydantic-ai-slim[cli]'`"
     ) from _import_error
 
-from pydantic_ai.agent import Agent
 from pydantic_ai.messages import ModelMessage, PartDeltaEvent, TextPartDelta
 
+if TYPE_CHECKING:
+    from pydantic_ai.agent import Agent
+
 __version__ = version('pydantic-ai')
 
 
@@ -82,6 +84,9 @@ Special prompt:
     if args.version:
         return 0
 
+    # imported here so `--help` and `--version` don't wait for it
+    from pydantic_ai.agent import Agent
+
     now_utc = datetime.now(timezone.utc)
     tzname = now_utc.astimezone().tzinfo.tzname(now_utc)  # type: ignore
     try:
@@ -161,6 +166,8 @@ async def ask_agent(
     console: Console,
     messages: list[ModelMessage] | None = None,
 ) -> list[ModelMessage]:  # pragma: no cover
+    from pydantic_ai.agent import Agent
+
     status: None | Status = Status('[dim]Working on it…[/dim]', console=console)
     live = Live('', refresh_per_second=15, console=console)
     status.start()
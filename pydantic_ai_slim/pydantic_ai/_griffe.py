@@ -6,9 +6,9 @@ from contextlib import contextmanager
 from inspect import Signature
 from typing import TYPE_CHECKING, Any, Callable, Literal, cast
 
-from griffe import Docstring, DocstringSectionKind, Object as GriffeObject
-
 if TYPE_CHECKING:
+    from griffe import Object as GriffeObject
+
     from .tools import DocstringFormat
 
 DocstringStyle = Literal['google', 'numpy', 'sphinx']
@@ -29,8 +29,11 @@ def doc_descriptions(
     if doc is None:
         return '', {}
 
+    # griffe is slow to import, and only needed once a tool with a docstring is registered
+    from griffe import Docstring, DocstringSectionKind
+
     # see https://github.com/mkdocstrings/griffe/issues/293
-    parent = cast(GriffeObject, sig)
+    parent = cast('GriffeObject', sig)
 
     docstring_style = _infer_docstring_style(doc) if docstring_format == 'auto' else docstring_format
     docstring = Docstring(doc, lineno=1, parser=docstring_style, parent=parent)
@@ -0,0 +1,204 @@
+"""Finding the elements of a JSON array without parsing them.
+
+[`JsonArrayIndex`][pydantic_ai._json_index.JsonArrayIndex] finds where each element of a JSON array of objects or
+arrays starts and ends, so single elements can be validated on their own. Elements are found on demand, from the
+start of the array for positive indexes and from the end for negative ones, so getting the last few elements of a long
+array only scans the end of the buffer.
+
+Scanning relies on JSON's structure: outside strings, the only characters which change the nesting depth are brackets,
+and strings end at the first quote which isn't escaped. Going backwards, a quote is escaped if it's preceded
+(i.e. followed, in the reversed buffer) by an odd number of backslashes.
+"""
+
+from __future__ import annotations as _annotations
+
+import re
+
+__all__ = ('JsonArrayIndex',)
+
+
+def _excluding(characters: bytes) -> bytes:
+    """Build a character class of the bytes not in `characters`.
+
+    Classes of ranges are compiled to a bitmap, which `re` matches several times faster than a negated class.
+    """
+    ranges: list[bytes] = []
+    start = 0
+    for excluded in sorted(characters) + [256]:
+        if start < excluded:
+            ranges.append(re.escape(bytes([start])) + b'-' + re.escape(bytes([excluded - 1])))
+        start = excluded + 1
+    return b'[' + b''.join(ranges) + b']'
+
+
+_STRUCTURE = _excluding(b'"[]{}')
+_STRING = rb'"' + _excluding(b'"\\') + rb'*(?:\\[\x00-\xff]' + _excluding(b'"\\') + rb'*)*"'
+# the deepest nesting matched by the regex, anything deeper is scanned bracket by bracket
+_MAX_REGEX_DEPTH = 8
+_WHITESPACE = b' \t\r\n'
+
+
+def _nested_pattern(string: bytes) -> re.Pattern[bytes]:
+    """Build a regex matching an object or array nested up to `_MAX_REGEX_DEPTH` deep."""
+    value = rb'(?:' + _STRUCTURE + rb'|' + string + rb')*'
+    for _ in range(_MAX_REGEX_DEPTH):
+        value = rb'(?:' + _STRUCTURE + rb'|' + string + rb'|[\[{]' + value + rb'[\]}])*'
+    return re.compile(rb'[\[{]' + value + rb'[\]}]')
+
+
+_NESTED = _nested_pattern(_STRING)
+_TOKEN = re.compile(rb'[\[\]{}"]')
+
+
+def _forward_end(buffer: bytes, start: int) -> int | None:
+    """Return the end of the object or array at `start`, or `None` if it isn't valid."""
+    if match := _NESTED.match(buffer, start):
+        return match.end()
+    # too deeply nested for the regex
+    return _token_end(buffer, start, reverse=False)
+
+
+def _token_end(buffer: bytes, start: int, *, reverse: bool) -> int | None:
+    """Return the end of the object or array at `start`, or `None` if it doesn't end in `buffer`.
+
+    This goes from bracket to bracket, skipping strings, so it's used for values nested too deeply for `_NESTED`, and
+    going backwards, where `buffer` is reversed, and may be cut off in the middle of the value.
+    """
+    opening = b']}' if reverse else b'[{'
+    depth = 0
+    pos = start
+    while match := _TOKEN.search(buffer, pos):
+        pos = match.end()
+        if buffer[match.start()] == 0x22:  # '"'
+            if (string_end := _string_end(buffer, match.start(), reverse=reverse)) is None:
+                return None
+            pos = string_end
+            continue
+        depth += 1 if buffer[match.start()] in opening else -1
+        if depth == 0:
+            return pos
+    return None
+
+
+def _string_end(buffer: bytes, start: int, *, reverse: bool) -> int | None:
+    """Return the end of the string at `start`, or `None` if it doesn't end in `buffer`."""
+    pos = start
+    while (pos := buffer.find(b'"', pos + 1)) != -1:
+        # count the backslashes before the quote, which are after it in the reversed buffer
+        backslash = pos
+        step = 1 if reverse else -1
+        while 0 <= backslash + step < len(buffer) and buffer[backslash + step] == 0x5C:  # backslash
+            backslash += step
+        if reverse and backslash + step == len(buffer):
+            # the backslashes may carry on beyond the reversed window
+            return None
+        if (backslash - pos) % 2 == 0:
+            return pos + 1
+    return None
+
+
+class JsonArrayIndex:
+    """The positions of the elements of a JSON array of objects or arrays, found on demand."""
+
+    def __init__(self, buffer: bytes):
+        self.buffer = buffer
+        start = self._skip_whitespace(0, 1)
+        end = self._skip_whitespace(len(buffer) - 1, -1)
+        if start > end or buffer[start] != 0x5B or buffer[end] != 0x5D:  # '[' and ']'
+            raise ValueError('Expected a JSON array')
+        # the spans of the elements found from the start, and from the end in reverse order
+        self._head: list[tuple[int, int]] = []
+        self._tail: list[tuple[int, int]] = []
+        # where scanning continues from the start, and the position after the last unscanned element from the end
+        self._array_start = start
+        self._head_pos = start + 1
+        self._tail_pos = end
+        self._complete = self._skip_whitespace(start + 1, 1) == end
+
+    def __len__(self) -> int:
+        while not self._complete:
+            self._scan_forward()
+        return len(self._head)
+
+    def span(self, index: int) -> tuple[int, int]:
+        """Return the start and end of the element at `index`, which may be negative.
+
+        Raises:
+            IndexError: If there is no element at `index`.
+            ValueError: If the array isn't valid JSON.
+        """
+        if index >= 0:
+            while index >= len(self._head) and not self._complete:
+                self._scan_forward()
+            if index >= len(self._head):
+                raise IndexError('list index out of range')
+            return self._head[index]
+        elif self._complete:
+            if -index > len(self._head):
+                raise IndexError('list index out of range')
+            return self._head[index]
+        else:
+            while -index > len(self._tail) and not self._complete:
+                self._scan_backward()
+            if self._complete:
+                return self.span(index)
+            return self._tail[-index - 1]
+
+    def _scan_forward(self) -> None:
+        start = self._skip_whitespace(self._head_pos, 1)
+        if self._tail and start == self._tail[-1][0]:
+            # scanning from the start has reached the elements found from the end
+            self._merge()
+            return
+        if self.buffer[start] not in b'[{':
+            raise ValueError(f'Expected a JSON object or array at position {start}')
+        end = _forward_end(self.buffer, start)
+        if end is None:
+            raise ValueError(f'Invalid JSON in the element at position {start}')
+        self._head.append((start, end))
+        pos = self._skip_whitespace(end, 1)
+        if self.buffer[pos] == 0x2C:  # ','
+            self._head_pos = pos + 1
+        elif pos == self._tail_pos and not self._tail:
+            self._complete = True
+        else:
+            raise ValueError(f'Expected "," or "]" at position {pos}')
+
+    def _scan_backward(self) -> None:
+        end = self._skip_whitespace(self._tail_pos - 1, -1) + 1
+        if self._head and end == self._head[-1][1]:
+            # scanning from the end has reached the elements found from the start
+            self._merge()
+            return
+        if self.buffer[end - 1] not in b']}':
+            raise ValueError(f'Expected a JSON object or array ending at position {end - 1}')
+        # reverse a window of the buffer which is likely to contain the element, growing it if it doesn't
+        window = 4096
+        while True:
+            window_start = max(end - window, 0)
+            length = _token_end(self.buffer[window_start:end][::-1], 0, reverse=True)
+            if length is not None:
+                break
+            if window_start == 0:
+                raise ValueError(f'Invalid JSON in the element ending at position {end - 1}')
+            window *= 4
+        start = end - length
+        self._tail.append((start, end))
+        pos = self._skip_whitespace(start - 1, -1)
+        if self.buffer[pos] == 0x2C:  # ','
+            self._tail_pos = pos
+        elif pos == self._array_start:
+            self._merge()
+        else:
+            raise ValueError(f'Expected "," or "[" at position {pos}')
+
+    def _merge(self) -> None:
+        self._head.extend(reversed(self._tail))
+        self._tail = []
+        self._complete = True
+
+    def _skip_whitespace(self, pos: int, step: int) -> int:
+        buffer = self.buffer
+        while 0 <= pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += step
+        return pos
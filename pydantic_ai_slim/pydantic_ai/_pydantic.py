@@ -5,10 +5,13 @@ This module has to use numerous internal Pydantic APIs and is therefore brittle
 
 from __future__ import annotations as _annotations
 
+import hashlib
+from collections.abc import Iterator
 from inspect import Parameter, signature
+from types import CodeType
 from typing import TYPE_CHECKING, Any, Callable, cast
 
-from pydantic import ConfigDict
+from pydantic import VERSION as PYDANTIC_VERSION, ConfigDict
 from pydantic._internal import _decorators, _generate_schema, _typing_extra
 from pydantic._internal._config import ConfigWrapper
 from pydantic.fields import FieldInfo
@@ -88,15 +91,9 @@ def function_schema(  # noqa: C901
         else:
             annotation = type_hints[name]
 
-            if index == 0 and takes_ctx:
-                if not _is_call_ctx(annotation):
-                    errors.append('First parameter of tools that take context must be annotated with RunContext[...]')
-                continue
-            elif not takes_ctx and _is_call_ctx(annotation):
-                errors.append('RunContext annotations can only be used with tools that take context')
-                continue
-            elif index != 0 and _is_call_ctx(annotation):
-                errors.append('RunContext annotations can only be used as the first argument')
+            if (index == 0 and takes_ctx) or _is_call_ctx(annotation):
+                if error := _call_ctx_error(index, annotation, takes_ctx):
+                    errors.append(error)
                 continue
 
         field_name = p.name
@@ -127,10 +124,7 @@ def function_schema(  # noqa: C901
                 var_positional_field = field_name
 
     if errors:
-        from .exceptions import UserError
-
-        error_details = '\n  '.join(errors)
-        raise UserError(f'Error generating schema for {function.__qualname__}:\n  {error_details}')
+        raise _schema_error(function, errors)
 
     core_config = config_wrapper.core_config(None)
     # noinspection PyTypedDict
@@ -172,6 +166,81 @@ def function_schema(  # noqa: C901
     )
 
 
+def check_signature(function: Callable[..., Any], takes_ctx: bool) -> None:
+    """Check where a tool function takes a `RunContext`, without building its schema.
+
+    This catches the same signature errors as [`function_schema`][pydantic_ai._pydantic.function_schema] does, so
+    they're raised when the tool is registered even though its schema is only built when it's first used.
+
+    Raises:
+        UserError: If a `RunContext` parameter is missing or misplaced.
+    """
+    sig = signature(function)
+    type_hints = _typing_extra.get_function_type_hints(function)
+    errors = [
+        error
+        for index, (name, p) in enumerate(sig.parameters.items())
+        if p.annotation is not sig.empty and (error := _call_ctx_error(index, type_hints[name], takes_ctx))
+    ]
+    if errors:
+        raise _schema_error(function, errors)
+
+
+def schema_cache_key(
+    function: Callable[..., Any],
+    takes_ctx: bool,
+    docstring_format: DocstringFormat,
+) -> str | None:
+    """Get a key identifying the schema of a tool function, for caching it between processes.
+
+    The key is a hash of the function's compiled code, docstring, defaults and annotations, so it changes when they're
+    edited, without the cost of reading its source. Classes the parameters are annotated with are identified by their
+    name, docstring and fields; classes those refer to in turn aren't included.
+
+    Returns:
+        The key, or `None` if the function has no code object, e.g. if it's a `functools.partial`.
+    """
+    code: CodeType | None = getattr(function, '__code__', None)
+    if code is None:
+        return None
+    parts = [PYDANTIC_VERSION, str(function.__module__), function.__qualname__, str(takes_ctx), docstring_format]
+    parts += [function.__doc__ or '', repr(getattr(function, '__defaults__', None))]
+    parts += [repr(getattr(function, '__kwdefaults__', None)), *_code_parts(code)]
+    global_ns: dict[str, Any] = getattr(function, '__globals__', {})
+    for name, annotation in getattr(function, '__annotations__', {}).items():
+        # with postponed evaluation annotations are strings, simple names are looked up rather than evaluated
+        if isinstance(annotation, str) and annotation.isidentifier():
+            annotation = global_ns.get(annotation, annotation)
+        parts.append(f'{name}: {_class_parts(annotation) if isinstance(annotation, type) else annotation!r}')
+
+    key = hashlib.sha256()
+    for part in parts:
+        key.update(part.encode())
+        key.update(b'\0')
+    return key.hexdigest()
+
+
+def _code_parts(code: CodeType) -> Iterator[str]:
+    """Parts of a code object which differ when the code is edited, but not between processes."""
+    yield code.co_code.hex()
+    yield repr((code.co_names, code.co_varnames))
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _code_parts(const)
+        elif isinstance(const, frozenset):
+            # the iteration order of sets of strings changes with hash randomization
+            yield repr(sorted(repr(c) for c in const))  # pyright: ignore[reportUnknownVariableType,reportUnknownArgumentType]
+        else:
+            yield repr(const)
+
+
+def _class_parts(cls: type) -> str:
+    fields = getattr(cls, '__pydantic_fields__', None) or getattr(cls, '__dataclass_fields__', None)
+    if fields is None:
+        fields = cls.__dict__.get('__annotations__')
+    return f'{cls.__module__}.{cls.__qualname__} {cls.__doc__!r} {fields!r}'
+
+
 def takes_ctx(function: Callable[..., Any]) -> bool:
     """Check if a function takes a `RunContext` first argument.
 
@@ -223,6 +292,25 @@ def _build_schema(
     return td_schema, None
 
 
+def _call_ctx_error(index: int, annotation: Any, takes_ctx: bool) -> str | None:
+    """Check the parameter at `index` takes a `RunContext` if and only if it should, returning an error if not."""
+    if index == 0 and takes_ctx:
+        if not _is_call_ctx(annotation):
+            return 'First parameter of tools that take context must be annotated with RunContext[...]'
+    elif not takes_ctx and _is_call_ctx(annotation):
+        return 'RunContext annotations can only be used with tools that take context'
+    elif index != 0 and _is_call_ctx(annotation):
+        return 'RunContext annotations can only be used as the first argument'
+    return None
+
+
+def _schema_error(function: Callable[..., Any], errors: list[str]) -> Exception:
+    from .exceptions import UserError
+
+    error_details = '\n  '.join(errors)
+    return UserError(f'Error generating schema for {function.__qualname__}:\n  {error_details}')
+
+
 def _is_call_ctx(annotation: Any) -> bool:
     """Return whether the annotation is the `RunContext` class, parameterized or not."""
     from .tools import RunContext
@@ -2,7 +2,8 @@ from __future__ import annotations as _annotations
 
 import asyncio
 import time
-from collections.abc import AsyncIterable, AsyncIterator, Iterator
+import weakref
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Iterator
 from contextlib import asynccontextmanager, suppress
 from dataclasses import dataclass, is_dataclass
 from datetime import datetime, timezone
@@ -14,6 +15,8 @@ from pydantic import BaseModel
 from pydantic.json_schema import JsonSchemaValue
 from typing_extensions import ParamSpec, TypeAlias, TypeGuard, is_typeddict
 
+from .timings import record_message_mapping
+
 if TYPE_CHECKING:
     from . import messages as _messages
     from .tools import ObjectJsonSchema
@@ -271,3 +274,67 @@ class PeekableAsyncStream(Generic[T]):
         except StopAsyncIteration:
             self._exhausted = True
             raise
+
+
+class MessageMappingCache(Generic[T]):
+    """Memoizes the provider payload a model maps each message to, keyed by the identity of the message.
+
+    Within a run the message history is only appended to, so models can use this to map just the new messages of
+    each request instead of the whole history, which avoids e.g. base64 encoding the same images on every step of a
+    tool loop. An entry is dropped when its message is garbage collected, and ignored if the message's parts have been
+    replaced since it was mapped; parts modified in place aren't detected.
+
+    Cached payloads are shared between requests, so they mustn't be mutated. The time spent mapping messages is
+    reported in [`ModelRequestTimings.message_mapping`][pydantic_ai.timings.ModelRequestTimings.message_mapping].
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, tuple[weakref.ref[Any], tuple[int, ...], T]] = {}
+
+    def get(self, message: _messages.ModelMessage, map_message: Callable[[Any], T]) -> T:
+        """Get the payload for `message`, calling `map_message(message)` if it isn't cached."""
+        key, fingerprint = id(message), self._fingerprint(message)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is message and entry[1] == fingerprint:
+            return entry[2]
+        started = time.perf_counter()
+        mapped = map_message(message)
+        record_message_mapping(started)
+        self._store(message, fingerprint, mapped)
+        return mapped
+
+    async def aget(self, message: _messages.ModelMessage, map_message: Callable[[Any], Awaitable[T]]) -> T:
+        """Like [`get`][pydantic_ai._utils.MessageMappingCache.get], for async mapping functions."""
+        key, fingerprint = id(message), self._fingerprint(message)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is message and entry[1] == fingerprint:
+            return entry[2]
+        started = time.perf_counter()
+        mapped = await map_message(message)
+        record_message_mapping(started)
+        self._store(message, fingerprint, mapped)
+        return mapped
+
+    def discard(self, message: _messages.ModelMessage) -> None:
+        """Forget the payload of `message`, e.g. because it refers to something which has expired."""
+        entry = self._entries.get(id(message))
+        if entry is not None and entry[0]() is message:
+            del self._entries[id(message)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _fingerprint(message: _messages.ModelMessage) -> tuple[int, ...]:
+        return tuple(map(id, message.parts))
+
+    def _store(self, message: _messages.ModelMessage, fingerprint: tuple[int, ...], mapped: T) -> None:
+        key = id(message)
+        entries = self._entries
+
+        def evict(ref: weakref.ref[Any]) -> None:
+            entry = entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del entries[key]
+
+        entries[key] = weakref.ref(message, evict), fingerprint, mapped
@@ -2,13 +2,12 @@ from __future__ import annotations as _annotations
 
 import dataclasses
 import inspect
-from collections.abc import AsyncIterator, Awaitable, Iterator, Sequence
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Iterable, Iterator, Sequence
 from contextlib import AbstractAsyncContextManager, asynccontextmanager, contextmanager
-from copy import deepcopy
+from copy import copy, deepcopy
 from types import FrameType
-from typing import Any, Callable, ClassVar, Generic, cast, final, overload
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Generic, cast, final, overload
 
-from opentelemetry.trace import NoOpTracer, use_span
 from typing_extensions import TypeGuard, TypeVar, deprecated
 
 from pydantic_graph import End, Graph, GraphRun, GraphRunContext
@@ -23,9 +22,10 @@ from . import (
     messages as _messages,
     models,
     result,
+    timings as _timings,
     usage as _usage,
 )
-from .models.instrumented import InstrumentationSettings, InstrumentedModel
+from .batch import BatchErrorMode, BatchInput, BatchRun
 from .result import FinalResult, ResultDataT, StreamedRunResult
 from .settings import ModelSettings, merge_model_settings
 from .tools import (
@@ -40,6 +40,9 @@ from .tools import (
     ToolPrepareFunc,
 )
 
+if TYPE_CHECKING:
+    from .models.instrumented import InstrumentationSettings
+
 # Re-exporting like this improves auto-import behavior in PyCharm
 capture_run_messages = _agent_graph.capture_run_messages
 EndStrategy = _agent_graph.EndStrategy
@@ -60,6 +63,15 @@ __all__ = (
 )
 
 
+def __getattr__(name: str) -> Any:
+    # imported lazily, as it imports OpenTelemetry
+    if name == 'InstrumentationSettings':
+        from .models.instrumented import InstrumentationSettings
+
+        return InstrumentationSettings
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
 T = TypeVar('T')
 S = TypeVar('S')
 NoneType = type(None)
@@ -434,6 +446,10 @@ class Agent(Generic[AgentDepsT, ResultDataT]):
         model_settings = merge_model_settings(self.model_settings, model_settings)
         usage_limits = usage_limits or _usage.UsageLimits()
 
+        from opentelemetry.trace import NoOpTracer, use_span
+
+        from .models.instrumented import InstrumentedModel
+
         if isinstance(model_used, InstrumentedModel):
             tracer = model_used.options.tracer
         else:
@@ -478,7 +494,11 @@ class Agent(Generic[AgentDepsT, ResultDataT]):
             infer_name=False,
             span=use_span(run_span, end_on_exit=True),
         ) as graph_run:
-            yield AgentRun(graph_run)
+            try:
+                yield AgentRun(graph_run)
+            finally:
+                if run_span.is_recording():
+                    run_span.set_attributes(state.timings.opentelemetry_attributes())
 
     @overload
     def run_sync(
@@ -569,6 +589,145 @@ class Agent(Generic[AgentDepsT, ResultDataT]):
             )
         )
 
+    @overload
+    def run_many(
+        self,
+        inputs: Iterable[BatchInput] | AsyncIterable[BatchInput],
+        *,
+        concurrency: int = 10,
+        ordered: bool = False,
+        result_type: None = None,
+        model: models.Model | models.KnownModelName | None = None,
+        deps: AgentDepsT = None,
+        per_item_deps: Callable[[int, BatchInput], AgentDepsT] | None = None,
+        model_settings: ModelSettings | None = None,
+        usage_limits: _usage.UsageLimits | None = None,
+        retries: int = 0,
+        retry_on: Callable[[Exception], bool] | tuple[type[Exception], ...] | None = None,
+        retry_delay: float = 1.0,
+        on_error: BatchErrorMode = 'raise',
+        infer_name: bool = True,
+    ) -> BatchRun[ResultDataT]: ...
+
+    @overload
+    def run_many(
+        self,
+        inputs: Iterable[BatchInput] | AsyncIterable[BatchInput],
+        *,
+        concurrency: int = 10,
+        ordered: bool = False,
+        result_type: type[RunResultDataT],
+        model: models.Model | models.KnownModelName | None = None,
+        deps: AgentDepsT = None,
+        per_item_deps: Callable[[int, BatchInput], AgentDepsT] | None = None,
+        model_settings: ModelSettings | None = None,
+        usage_limits: _usage.UsageLimits | None = None,
+        retries: int = 0,
+        retry_on: Callable[[Exception], bool] | tuple[type[Exception], ...] | None = None,
+        retry_delay: float = 1.0,
+        on_error: BatchErrorMode = 'raise',
+        infer_name: bool = True,
+    ) -> BatchRun[RunResultDataT]: ...
+
+    def run_many(
+        self,
+        inputs: Iterable[BatchInput] | AsyncIterable[BatchInput],
+        *,
+        concurrency: int = 10,
+        ordered: bool = False,
+        result_type: type[RunResultDataT] | None = None,
+        model: models.Model | models.KnownModelName | None = None,
+        deps: AgentDepsT = None,
+        per_item_deps: Callable[[int, BatchInput], AgentDepsT] | None = None,
+        model_settings: ModelSettings | None = None,
+        usage_limits: _usage.UsageLimits | None = None,
+        retries: int = 0,
+        retry_on: Callable[[Exception], bool] | tuple[type[Exception], ...] | None = None,
+        retry_delay: float = 1.0,
+        on_error: BatchErrorMode = 'raise',
+        infer_name: bool = True,
+    ) -> BatchRun[Any]:
+        """Run the agent once for each of many user prompts, with at most `concurrency` runs in flight.
+
+        The runs start when the returned [`BatchRun`][pydantic_ai.batch.BatchRun] is iterated over, which yields a
+        [`BatchItem`][pydantic_ai.batch.BatchItem] for each input as its run finishes, or in the order of the inputs
+        with `ordered=True`. Inputs are taken from `inputs` as runs finish, so it can be a generator too large to hold
+        in memory.
+
+        Example:
+        ```python
+        from pydantic_ai import Agent
+
+        agent = Agent('openai:gpt-4o')
+
+        async def main():
+            countries = ['France', 'Italy', 'the UK']
+            async with agent.run_many(
+                [f'What is the capital of {country}?' for country in countries],
+                concurrency=2,
+                ordered=True,
+            ) as batch:
+                async for item in batch:
+                    print(item.data)
+                    #> Paris
+                    #> Rome
+                    #> London
+            print(batch.completed)
+            #> 3
+        ```
+
+        Args:
+            inputs: The user prompts to run the agent with, a sync or async iterable.
+            concurrency: The maximum number of runs in flight at once.
+            ordered: Whether to yield the results in the order of the inputs rather than as they finish.
+            result_type: Custom result type to use for the runs, `result_type` may only be used if the agent has no
+                result validators since result validators would expect an argument that matches the agent's result type.
+            model: Optional model to use for the runs, required if `model` was not set when creating the agent.
+            deps: Optional dependencies to use for every run.
+            per_item_deps: Optional function called with the index and user prompt of each input to create the
+                dependencies for its run, instead of using `deps`.
+            model_settings: Optional settings to use for this model's request.
+            usage_limits: Optional limits on model request count or token usage, applied to each run separately.
+            retries: The maximum number of times to retry a run which failed.
+            retry_on: A callable or tuple of exceptions deciding which errors are retried, defaults to
+                [`default_retry_condition`][pydantic_ai.models.retrying.default_retry_condition].
+            retry_delay: The upper bound in seconds of the random delay before the first retry, which doubles with
+                each further retry.
+            on_error: Whether to raise the error of a run which failed after its retries, cancelling the runs in
+                flight, or to yield it as part of the run's `BatchItem` and carry on.
+            infer_name: Whether to try to infer the agent name from the call frame if it's not set.
+
+        Returns:
+            The batch run, to iterate over for the results.
+        """
+        if infer_name and self.name is None:
+            self._infer_name(inspect.currentframe())
+        if isinstance(model, str):
+            # resolve the model once rather than for every run
+            model = models.infer_model(model)
+
+        async def run(index: int, user_prompt: BatchInput) -> AgentRunResult[Any]:
+            return await self.run(
+                user_prompt,
+                result_type=result_type,
+                model=model,
+                deps=per_item_deps(index, user_prompt) if per_item_deps is not None else deps,
+                model_settings=model_settings,
+                usage_limits=usage_limits,
+                infer_name=False,
+            )
+
+        return BatchRun(
+            run,
+            inputs,
+            concurrency=concurrency,
+            ordered=ordered,
+            retries=retries,
+            retry_on=retry_on,
+            retry_delay=retry_delay,
+            on_error=on_error,
+        )
+
     @overload
     def run_stream(
         self,
@@ -730,6 +889,7 @@ class Agent(Generic[AgentDepsT, ResultDataT]):
                                 graph_ctx.deps.result_validators,
                                 final_result_details.tool_name,
                                 on_complete,
+                                graph_ctx.state.timings,
                             )
                             break
                 next_node = await agent_run.next(node)
@@ -1109,8 +1269,9 @@ class Agent(Generic[AgentDepsT, ResultDataT]):
     def _register_tool(self, tool: Tool[AgentDepsT]) -> None:
         """Private utility to register a tool instance."""
         if tool.max_retries is None:
-            # noinspection PyTypeChecker
-            tool = dataclasses.replace(tool, max_retries=self._default_retries)
+            # copy rather than `dataclasses.replace`, which would build the tool's schema to get its description
+            tool = copy(tool)
+            tool.max_retries = self._default_retries
 
         if tool.name in self._function_tools:
             raise exceptions.UserError(f'Tool name conflicts with existing tool: {tool.name!r}')
@@ -1150,11 +1311,14 @@ class Agent(Generic[AgentDepsT, ResultDataT]):
         if instrument is None:
             instrument = self._instrument_default
 
-        if instrument and not isinstance(model_, InstrumentedModel):
-            if instrument is True:
-                instrument = InstrumentationSettings()
+        if instrument:
+            from .models.instrumented import InstrumentationSettings, InstrumentedModel
+
+            if not isinstance(model_, InstrumentedModel):
+                if instrument is True:
+                    instrument = InstrumentationSettings()
 
-            model_ = InstrumentedModel(model_, instrument)
+                model_ = InstrumentedModel(model_, instrument)
 
         return model_
 
@@ -1449,6 +1613,10 @@ class AgentRun(Generic[AgentDepsT, ResultDataT]):
         """Get usage statistics for the run so far, including token usage, model requests, and so on."""
         return self._graph_run.state.usage
 
+    def timings(self) -> _timings.RunTimings:
+        """Get the timings of the phases of the run so far, see [`RunTimings`][pydantic_ai.timings.RunTimings]."""
+        return self._graph_run.state.timings
+
     def __repr__(self) -> str:
         result = self._graph_run.result
         result_repr = '<run not finished>' if result is None else repr(result.output)
@@ -1545,6 +1713,55 @@ class AgentRunResult(Generic[ResultDataT]):
             self.new_messages(result_tool_return_content=result_tool_return_content)
         )
 
+    def all_messages_bytes(
+        self, *, result_tool_return_content: str | None = None, compress: bool | int = False
+    ) -> bytes:
+        """Return all messages from [`all_messages`][pydantic_ai.agent.AgentRunResult.all_messages] in the compact binary format.
+
+        See [`message_codec`][pydantic_ai.message_codec] — this requires the `msgpack` package, load the messages
+        again with [`load_messages_bytes`][pydantic_ai.message_codec.load_messages_bytes].
+
+        Args:
+            result_tool_return_content: The return content of the tool call to set in the last message.
+                This provides a convenient way to modify the content of the result tool call if you want to continue
+                the conversation and want to set the response to the result tool call. If `None`, the last message will
+                not be modified.
+            compress: Whether to compress the data with Zstandard, or the compression level to use.
+
+        Returns:
+            Bytes representing the messages.
+        """
+        from .message_codec import dump_messages_bytes
+
+        return dump_messages_bytes(
+            self.all_messages(result_tool_return_content=result_tool_return_content), compress=compress
+        )
+
+    def new_messages_bytes(
+        self, *, result_tool_return_content: str | None = None, compress: bool | int = False
+    ) -> bytes:
+        """Return new messages from [`new_messages`][pydantic_ai.agent.AgentRunResult.new_messages] in the compact binary format.
+
+        Args:
+            result_tool_return_content: The return content of the tool call to set in the last message.
+                This provides a convenient way to modify the content of the result tool call if you want to continue
+                the conversation and want to set the response to the result tool call. If `None`, the last message will
+                not be modified.
+            compress: Whether to compress the data with Zstandard, or the compression level to use.
+
+        Returns:
+            Bytes representing the new messages.
+        """
+        from .message_codec import dump_messages_bytes
+
+        return dump_messages_bytes(
+            self.new_messages(result_tool_return_content=result_tool_return_content), compress=compress
+        )
+
     def usage(self) -> _usage.Usage:
         """Return the usage of the whole run."""
         return self._state.usage
+
+    def timings(self) -> _timings.RunTimings:
+        """Return the timings of the phases of the run, see [`RunTimings`][pydantic_ai.timings.RunTimings]."""
+        return self._state.timings
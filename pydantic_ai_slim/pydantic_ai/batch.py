@@ -0,0 +1,253 @@
+"""Running an agent over many prompts with bounded concurrency.
+
+[`Agent.run_many`][pydantic_ai.Agent.run_many] returns a [`BatchRun`][pydantic_ai.batch.BatchRun], which runs the
+agent for each input with at most `concurrency` runs in flight, retries runs which fail with a transient error, and
+yields a [`BatchItem`][pydantic_ai.batch.BatchItem] for each input as its run finishes.
+"""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+import random
+from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator, Awaitable, Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Generic, Literal, Union
+
+from typing_extensions import TypeAlias
+
+from . import messages as _messages
+from .exceptions import UserError
+from .result import ResultDataT
+from .usage import Usage
+
+if TYPE_CHECKING:
+    from .agent import AgentRunResult
+
+__all__ = 'BatchInput', 'BatchItem', 'BatchRun', 'BatchErrorMode'
+
+
+BatchInput: TypeAlias = Union[str, Sequence[_messages.UserContent]]
+"""A user prompt to run the agent with as part of a batch."""
+
+BatchErrorMode: TypeAlias = Literal['raise', 'collect']
+"""What a [`BatchRun`][pydantic_ai.batch.BatchRun] does when a run fails after its retries.
+
+* `'raise'` — cancel the runs in flight and raise the error from the iterator.
+* `'collect'` — yield a [`BatchItem`][pydantic_ai.batch.BatchItem] with the error set, and carry on.
+"""
+
+
+@dataclass
+class BatchItem(Generic[ResultDataT]):
+    """The outcome of running the agent for one input of a batch."""
+
+    index: int
+    """The position of the input in the batch."""
+    user_prompt: BatchInput
+    """The input the agent was run with."""
+    result: AgentRunResult[ResultDataT] | None = None
+    """The result of the run, `None` if it failed."""
+    error: Exception | None = None
+    """The error the last attempt failed with, `None` if the run succeeded."""
+    attempts: int = 1
+    """The number of times the agent was run for this input."""
+
+    @property
+    def data(self) -> ResultDataT:
+        """The result data of the run, raising the error if it failed."""
+        if self.result is None:
+            assert self.error is not None
+            raise self.error
+        return self.result.data
+
+
+@dataclass(init=False)
+class BatchRun(Generic[ResultDataT]):
+    """Runs an agent over a batch of inputs, see [`Agent.run_many`][pydantic_ai.Agent.run_many].
+
+    Iterate over the batch run to start the runs and get their results; it can only be iterated once. Use it as an
+    async context manager to make sure runs still in flight are cancelled if iteration stops early:
+
+    ```python {test="skip" lint="skip"}
+    async with agent.run_many(prompts, concurrency=20) as batch:
+        async for item in batch:
+            print(item.index, item.data)
+    print(batch.usage)
+    ```
+    """
+
+    concurrency: int
+    ordered: bool
+    retries: int
+    retry_delay: float
+    on_error: BatchErrorMode
+    usage: Usage
+    """The usage of all the runs which have succeeded so far."""
+    completed: int = 0
+    """The number of runs which have succeeded so far."""
+    failed: int = 0
+    """The number of runs which have failed so far, after their retries."""
+    retried: int = 0
+    """The number of runs which have been retried so far."""
+
+    _run: Callable[[int, BatchInput], Awaitable[AgentRunResult[ResultDataT]]] = field(repr=False)
+    _inputs: Iterable[BatchInput] | AsyncIterable[BatchInput] = field(repr=False)
+    _retry_on: Callable[[Exception], bool] = field(repr=False)
+    _iterator: AsyncGenerator[BatchItem[ResultDataT], None] | None = field(default=None, repr=False)
+
+    def __init__(
+        self,
+        run: Callable[[int, BatchInput], Awaitable[AgentRunResult[ResultDataT]]],
+        inputs: Iterable[BatchInput] | AsyncIterable[BatchInput],
+        *,
+        concurrency: int = 10,
+        ordered: bool = False,
+        retries: int = 0,
+        retry_on: Callable[[Exception], bool] | tuple[type[Exception], ...] | None = None,
+        retry_delay: float = 1.0,
+        on_error: BatchErrorMode = 'raise',
+    ):
+        """Create a batch run, normally done with [`Agent.run_many`][pydantic_ai.Agent.run_many].
+
+        Args:
+            run: Runs the agent for the input at an index.
+            inputs: The inputs to run the agent with.
+            concurrency: The maximum number of runs in flight at once.
+            ordered: Whether to yield the items in the order of the inputs rather than as they finish. Items which
+                finish early are held back until those before them have finished, and no input more than
+                `2 * concurrency` places after the earliest one not yet yielded is started.
+            retries: The maximum number of times to retry a run which failed.
+            retry_on: A callable or tuple of exceptions deciding which errors are retried, defaults to
+                [`default_retry_condition`][pydantic_ai.models.retrying.default_retry_condition].
+            retry_delay: The upper bound in seconds of the random delay before the first retry, which doubles with
+                each further retry up to 30 seconds.
+            on_error: What to do when a run fails after its retries, see
+                [`BatchErrorMode`][pydantic_ai.batch.BatchErrorMode].
+        """
+        if isinstance(inputs, str):
+            raise UserError('`inputs` must be an iterable of prompts, not a single prompt')
+        if concurrency < 1:
+            raise UserError('`concurrency` must be at least 1')
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.on_error = on_error
+        self.usage = Usage()
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self._run = run
+        self._inputs = inputs
+        if retry_on is None:
+            from .models.retrying import default_retry_condition
+
+            self._retry_on = default_retry_condition
+        elif isinstance(retry_on, tuple):
+            exception_types: tuple[type[Exception], ...] = retry_on
+            self._retry_on = lambda exc: isinstance(exc, exception_types)
+        else:
+            self._retry_on = retry_on
+        self._iterator = None
+
+    def __aiter__(self) -> AsyncIterator[BatchItem[ResultDataT]]:
+        if self._iterator is not None:
+            raise UserError('A batch run can only be iterated once')
+        self._iterator = self._iterate()
+        return self._iterator
+
+    async def __aenter__(self) -> BatchRun[ResultDataT]:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop iterating, cancelling the runs in flight."""
+        if self._iterator is not None:
+            await self._iterator.aclose()
+
+    async def _iterate(self) -> AsyncGenerator[BatchItem[ResultDataT], None]:
+        inputs = _enumerate(self._inputs)
+        inputs_lock = asyncio.Lock()
+        # bounding the queue holds the workers back when the items aren't consumed as fast as they're produced;
+        # a worker puts `None` when it runs out of inputs, or the error if iterating over the inputs raised one
+        finished: asyncio.Queue[BatchItem[ResultDataT] | Exception | None] = asyncio.Queue(maxsize=self.concurrency)
+        # when ordered, a slot is taken for each input and only given back once its item is yielded, so a slow run
+        # can't make the items held back behind it pile up without limit
+        window = asyncio.Semaphore(2 * self.concurrency) if self.ordered else None
+
+        async def worker() -> None:
+            try:
+                while True:
+                    if window is not None:
+                        await window.acquire()
+                    async with inputs_lock:
+                        try:
+                            index, user_prompt = await inputs.__anext__()
+                        except StopAsyncIteration:
+                            if window is not None:
+                                window.release()
+                            break
+                    await finished.put(await self._run_item(index, user_prompt))
+            except Exception as exc:
+                await finished.put(exc)
+            else:
+                await finished.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        held_back: dict[int, BatchItem[ResultDataT]] = {}
+        next_index = 0
+        running = len(workers)
+        try:
+            while running:
+                item = await finished.get()
+                if item is None:
+                    running -= 1
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+                if item.error is not None and self.on_error == 'raise':
+                    raise item.error
+                if not self.ordered:
+                    yield item
+                    continue
+                held_back[item.index] = item
+                while next_index in held_back:
+                    assert window is not None
+                    window.release()
+                    yield held_back.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _run_item(self, index: int, user_prompt: BatchInput) -> BatchItem[ResultDataT]:
+        attempt = 0
+        while True:
+            try:
+                result = await self._run(index, user_prompt)
+            except Exception as exc:
+                if attempt < self.retries and self._retry_on(exc):
+                    # "full jitter", so the retries of runs which failed together are spread out
+                    await asyncio.sleep(random.uniform(0, min(30.0, self.retry_delay * 2**attempt)))
+                    attempt += 1
+                    self.retried += 1
+                    continue
+                self.failed += 1
+                return BatchItem(index, user_prompt, error=exc, attempts=attempt + 1)
+            self.completed += 1
+            self.usage.incr(result.usage())
+            return BatchItem(index, user_prompt, result=result, attempts=attempt + 1)
+
+
+async def _enumerate(inputs: Iterable[BatchInput] | AsyncIterable[BatchInput]) -> AsyncIterator[tuple[int, BatchInput]]:
+    if isinstance(inputs, AsyncIterable):
+        index = 0
+        async for user_prompt in inputs:
+            yield index, user_prompt
+            index += 1
+    else:
+        for index, user_prompt in enumerate(inputs):
+            yield index, user_prompt
@@ -2,6 +2,8 @@ from __future__ import annotations as _annotations
 
 import json
 import sys
+from collections.abc import Mapping
+from typing import Any
 
 if sys.version_info < (3, 11):
     from exceptiongroup import ExceptionGroup
@@ -100,16 +102,30 @@ class ModelHTTPError(AgentRunError):
     body: object | None
     """The body of the response, if available."""
 
+    headers: Mapping[str, str] | None
+    """The headers of the response, if available, e.g. to read `Retry-After` from."""
+
     message: str
     """The error message with the status code and response body, if available."""
 
-    def __init__(self, status_code: int, model_name: str, body: object | None = None):
+    def __init__(
+        self,
+        status_code: int,
+        model_name: str,
+        body: object | None = None,
+        headers: Mapping[str, str] | None = None,
+    ):
         self.status_code = status_code
         self.model_name = model_name
         self.body = body
+        self.headers = headers
         message = f'status_code: {status_code}, model_name: {model_name}, body: {body}'
         super().__init__(message)
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # `args` only holds the message, so the default would call `__init__` without the required arguments
+        return type(self), (self.status_code, self.model_name, self.body, self.headers)
+
 
 class FallbackExceptionGroup(ExceptionGroup):
     """A group of exceptions that can be raised when all fallback models fail."""
@@ -0,0 +1,174 @@
+"""A compact binary format for message histories.
+
+[`ModelMessagesTypeAdapter`][pydantic_ai.messages.ModelMessagesTypeAdapter] serializes messages to JSON, which encodes
+binary content like images and audio as base64, making it a third bigger. This module serializes messages with
+[MessagePack](https://msgpack.org/) instead, which stores bytes as they are, and is quicker to write and read, so it's
+better suited to storing long histories which are loaded again for every run. The data can also be compressed with
+[Zstandard](https://facebook.github.io/zstd/).
+
+The data starts with a header giving the format version and whether it's compressed, so data written by older versions
+of this module can still be read.
+
+```python {test="skip" lint="skip"}
+from pydantic_ai.message_codec import load_messages_bytes
+
+result = agent.run_sync('Describe this image', ...)
+data = result.all_messages_bytes(compress=True)
+...
+result = agent.run_sync('Is it taken at night?', message_history=load_messages_bytes(data))
+```
+"""
+
+from __future__ import annotations as _annotations
+
+from collections.abc import Callable
+from dataclasses import fields
+from functools import cache
+from typing import Any, cast
+
+import pydantic_core
+
+from .messages import ModelMessage, ModelMessagesTypeAdapter, UserPromptPart
+
+try:
+    import msgpack
+except ImportError as _import_error:
+    raise ImportError(
+        'Please install `msgpack` to serialize messages to bytes, '
+        "you can use the `msgpack` optional group — `pip install 'pydantic-ai-slim[msgpack]'`"
+    ) from _import_error
+
+__all__ = 'FORMAT_VERSION', 'dump_messages_bytes', 'load_messages_bytes'
+
+
+FORMAT_VERSION = 1
+"""The version of the format written by [`dump_messages_bytes`][pydantic_ai.message_codec.dump_messages_bytes]."""
+
+_MAGIC = b'PAIM'
+_FLAG_ZSTD = 0x01
+_HEADER_SIZE = len(_MAGIC) + 2
+# msgpack only supports 64 bit integers, larger ones are stored as their decimal digits in this extension type
+_EXT_BIG_INT = 1
+_MIN_INT = -(2**63)
+_MAX_INT = 2**64 - 1
+
+
+def dump_messages_bytes(messages: list[ModelMessage], *, compress: bool | int = False) -> bytes:
+    """Serialize messages to the binary format.
+
+    Args:
+        messages: The messages to serialize.
+        compress: Whether to compress the data with Zstandard, or the compression level to use, which requires the
+            `zstandard` package. Compression is worth it for histories with long text, less so for ones with
+            already compressed binary content like images.
+
+    Returns:
+        The serialized messages.
+    """
+    data = [_message_dict(message) for message in messages]
+    try:
+        payload = _packb(data, default=_default)
+    except OverflowError:
+        # only walk the data looking for integers msgpack can't store when there are some
+        payload = _packb(_encode_big_ints(data), default=_default_big_ints)
+    flags = 0
+    if compress:
+        level = 3 if compress is True else compress
+        payload = _zstandard().ZstdCompressor(level=level).compress(payload)
+        flags |= _FLAG_ZSTD
+    return _MAGIC + bytes((FORMAT_VERSION, flags)) + payload
+
+
+def load_messages_bytes(data: bytes) -> list[ModelMessage]:
+    """Deserialize and validate messages serialized with [`dump_messages_bytes`][pydantic_ai.message_codec.dump_messages_bytes].
+
+    Args:
+        data: The serialized messages.
+
+    Returns:
+        The messages.
+
+    Raises:
+        ValueError: If the data isn't in the binary format, or was written by a newer version of it.
+    """
+    if data[: len(_MAGIC)] != _MAGIC or len(data) < _HEADER_SIZE:
+        raise ValueError('Data is not a binary message history')
+    version, flags = data[len(_MAGIC)], data[len(_MAGIC) + 1]
+    if version > FORMAT_VERSION:
+        raise ValueError(f'Binary message history has format version {version}, newer than {FORMAT_VERSION}')
+    payload = memoryview(data)[_HEADER_SIZE:]
+    if flags & _FLAG_ZSTD:
+        payload = _zstandard().ZstdDecompressor().decompress(payload)
+    return ModelMessagesTypeAdapter.validate_python(_unpackb(payload))
+
+
+def _packb(data: Any, default: Callable[[Any], Any]) -> bytes:
+    # msgpack has no type annotations, `packb` only returns `None` when writing to a stream
+    return cast(bytes, msgpack.packb(data, datetime=True, default=default))  # pyright: ignore[reportUnknownMemberType]
+
+
+def _unpackb(payload: bytes | memoryview) -> Any:
+    unpackb = cast(Callable[..., Any], msgpack.unpackb)
+    return unpackb(payload, timestamp=3, strict_map_key=False, ext_hook=_ext_hook)
+
+
+def _message_dict(message: ModelMessage) -> dict[str, Any]:
+    # messages and their parts are converted to dicts here rather than with `ModelMessagesTypeAdapter.dump_python`,
+    # whose union serializers are slow for binary content; everything else is left to msgpack
+    data = _dataclass_dict(message)
+    data['parts'] = [_part_dict(part) for part in message.parts]
+    return data
+
+
+def _part_dict(part: Any) -> dict[str, Any]:
+    data = _dataclass_dict(part)
+    if isinstance(part, UserPromptPart) and not isinstance(part.content, str):
+        data['content'] = [item if isinstance(item, str) else _dataclass_dict(item) for item in part.content]
+    return data
+
+
+def _dataclass_dict(value: Any) -> dict[str, Any]:
+    return {name: getattr(value, name) for name in _field_names(value.__class__)}
+
+
+@cache
+def _field_names(cls: type[Any]) -> tuple[str, ...]:
+    return tuple(f.name for f in fields(cls))
+
+
+def _default(value: Any) -> Any:
+    """Convert values msgpack doesn't support, like models in tool return content, as they'd be converted to JSON."""
+    return pydantic_core.to_jsonable_python(value, bytes_mode='base64')
+
+
+def _default_big_ints(value: Any) -> Any:
+    return _encode_big_ints(_default(value))
+
+
+def _encode_big_ints(value: Any) -> Any:
+    """Replace integers outside the 64 bit range msgpack supports in tool arguments and content."""
+    if isinstance(value, int) and not _MIN_INT <= value <= _MAX_INT:
+        return msgpack.ExtType(_EXT_BIG_INT, str(value).encode())
+    elif isinstance(value, dict):
+        return {k: _encode_big_ints(v) for k, v in value.items()}  # pyright: ignore[reportUnknownVariableType]
+    elif isinstance(value, (list, tuple)):
+        return [_encode_big_ints(v) for v in value]  # pyright: ignore[reportUnknownVariableType]
+    else:
+        return value
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_BIG_INT:
+        return int(data)
+    return msgpack.ExtType(code, data)
+
+
+def _zstandard():  # the return type is inferred as the module itself, so its classes are type checked
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            'Please install `zstandard` to compress serialized messages, '
+            "you can use the `zstd` optional group — `pip install 'pydantic-ai-slim[zstd]'`"
+        ) from e
+    return zstandard
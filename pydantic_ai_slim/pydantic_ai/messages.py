@@ -4,16 +4,25 @@ import uuid
 from collections.abc import Sequence
 from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import Annotated, Any, Literal, Union, cast, overload
+from typing import TYPE_CHECKING, Annotated, Any, Literal, Union, cast, overload
 
 import pydantic
 import pydantic_core
-from opentelemetry._events import Event
 from typing_extensions import TypeAlias
 
 from ._utils import now_utc as _now_utc
 from .exceptions import UnexpectedModelBehavior
 
+if TYPE_CHECKING:
+    from opentelemetry._events import Event
+
+
+def _otel_event(name: str, body: dict[str, Any]) -> Event:
+    # OpenTelemetry is imported lazily, as it's slow to import and only needed when instrumenting
+    from opentelemetry._events import Event
+
+    return Event(name, body=body)
+
 
 @dataclass
 class SystemPromptPart:
@@ -35,7 +44,7 @@ class SystemPromptPart:
     """Part type identifier, this is available on all parts as a discriminator."""
 
     def otel_event(self) -> Event:
-        return Event('gen_ai.system.message', body={'content': self.content, 'role': 'system'})
+        return _otel_event('gen_ai.system.message', body={'content': self.content, 'role': 'system'})
 
 
 @dataclass
@@ -148,7 +157,7 @@ class UserPromptPart:
         else:
             # TODO figure out what to record for images and audio
             content = [part if isinstance(part, str) else {'kind': part.kind} for part in self.content]
-        return Event('gen_ai.user.message', body={'content': content, 'role': 'user'})
+        return _otel_event('gen_ai.user.message', body={'content': content, 'role': 'user'})
 
 
 tool_return_ta: pydantic.TypeAdapter[Any] = pydantic.TypeAdapter(Any, config=pydantic.ConfigDict(defer_build=True))
@@ -189,7 +198,7 @@ class ToolReturnPart:
             return {'return_value': tool_return_ta.dump_python(self.content, mode='json')}
 
     def otel_event(self) -> Event:
-        return Event(
+        return _otel_event(
             'gen_ai.tool.message',
             body={'content': self.content, 'role': 'tool', 'id': self.tool_call_id, 'name': self.tool_name},
         )
@@ -244,9 +253,9 @@ class RetryPromptPart:
 
     def otel_event(self) -> Event:
         if self.tool_name is None:
-            return Event('gen_ai.user.message', body={'content': self.model_response(), 'role': 'user'})
+            return _otel_event('gen_ai.user.message', body={'content': self.model_response(), 'role': 'user'})
         else:
-            return Event(
+            return _otel_event(
                 'gen_ai.tool.message',
                 body={
                     'content': self.model_response(),
@@ -367,7 +376,7 @@ class ModelResponse:
 
         def new_event_body():
             new_body: dict[str, Any] = {'role': 'assistant'}
-            ev = Event('gen_ai.assistant.message', body=new_body)
+            ev = _otel_event('gen_ai.assistant.message', body=new_body)
             result.append(ev)
             return new_body
 
@@ -400,6 +409,92 @@ ModelMessagesTypeAdapter = pydantic.TypeAdapter(
 )
 """Pydantic [`TypeAdapter`][pydantic.type_adapter.TypeAdapter] for (de)serializing messages."""
 
+_model_message_ta = pydantic.TypeAdapter(
+    ModelMessage, config=pydantic.ConfigDict(defer_build=True, ser_json_bytes='base64')
+)
+
+
+class LazyModelMessages(Sequence[ModelMessage]):
+    """A message history loaded from JSON, whose messages are only validated when they're accessed.
+
+    [`ModelMessagesTypeAdapter.validate_json`][pydantic_ai.messages.ModelMessagesTypeAdapter] builds every message
+    and part of a history, even if only the last few messages are needed. This finds where each message starts and
+    ends in the JSON instead, without parsing it, and validates a message the first time it's accessed. Messages are
+    found from the start of the history for positive indexes, and from the end for negative ones, so getting the last
+    few messages of a long conversation only looks at the end of the JSON:
+
+    ```python {test="skip" lint="skip"}
+    history = LazyModelMessages(stored_json)
+    recent = history[-6:]  # only the last 6 messages are validated
+    result = agent.run_sync('And then?', message_history=recent)
+    ```
+
+    Getting the length or iterating over the whole history scans all of the JSON, but still only validates the
+    messages as they're accessed. Slicing returns a list of messages.
+    """
+
+    def __init__(self, data: bytes | bytearray | str):
+        """Index a message history serialized as a JSON array, e.g. by [`ModelMessagesTypeAdapter`][pydantic_ai.messages.ModelMessagesTypeAdapter].
+
+        Args:
+            data: The JSON of the history.
+
+        Raises:
+            ValueError: If the data isn't a JSON array.
+        """
+        from ._json_index import JsonArrayIndex
+
+        self._index = JsonArrayIndex(data.encode() if isinstance(data, str) else bytes(data))
+        self._messages: dict[int, ModelMessage] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @overload
+    def __getitem__(self, index: int) -> ModelMessage: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[ModelMessage]: ...
+
+    def __getitem__(self, index: int | slice) -> ModelMessage | list[ModelMessage]:
+        if isinstance(index, slice):
+            return [self[i] for i in self._slice_indexes(index)]
+        start, _ = self._index.span(index)
+        if (message := self._messages.get(start)) is None:
+            message = self._messages[start] = _model_message_ta.validate_json(self.message_json(index))
+        return message
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self._index.buffer)} bytes, {len(self._messages)} validated)'
+
+    def message_json(self, index: int) -> bytes:
+        """Return the JSON of the message at `index` without validating it, e.g. to forward it unchanged.
+
+        Raises:
+            IndexError: If there is no message at `index`.
+        """
+        start, end = self._index.span(index)
+        return bytes(self._index.buffer[start:end])
+
+    def _slice_indexes(self, index: slice) -> range:
+        start, stop, step = index.start, index.stop, index.step
+        if step in (None, 1):
+            # the common `history[-n:]` and `history[:n]` slices don't need the length of the history
+            if start is not None and start < 0 and (stop is None or stop < 0):
+                start = -self._count_up_to(-start, from_end=True)
+                return range(start, stop if stop is not None else 0)
+            if stop is not None and stop >= 0 and (start is None or start >= 0):
+                return range(start or 0, min(stop, self._count_up_to(stop)))
+        return range(*index.indices(len(self)))
+
+    def _count_up_to(self, count: int, *, from_end: bool = False) -> int:
+        """Count the messages from the start or end of the history, up to `count`."""
+        try:
+            self._index.span(-count if from_end else count - 1)
+        except IndexError:
+            return len(self)
+        return count
+
 
 @dataclass
 class TextPartDelta:
@@ -6,6 +6,7 @@ specific LLM being used.
 
 from __future__ import annotations as _annotations
 
+import time
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterator, Iterator
 from contextlib import asynccontextmanager, contextmanager
@@ -14,7 +15,6 @@ from datetime import datetime
 from functools import cache
 from typing import TYPE_CHECKING
 
-import httpx
 from typing_extensions import Literal
 
 from .._parts_manager import ModelResponsePartsManager
@@ -24,6 +24,8 @@ from ..settings import ModelSettings
 from ..usage import Usage
 
 if TYPE_CHECKING:
+    import httpx
+
     from ..tools import ToolDefinition
 
 
@@ -279,13 +281,23 @@ class StreamedResponse(ABC):
     _parts_manager: ModelResponsePartsManager = field(default_factory=ModelResponsePartsManager, init=False)
     _event_iterator: AsyncIterator[ModelResponseStreamEvent] | None = field(default=None, init=False)
     _usage: Usage = field(default_factory=Usage, init=False)
+    _first_event_at: float | None = field(default=None, init=False)
+    _completed_at: float | None = field(default=None, init=False)
 
     def __aiter__(self) -> AsyncIterator[ModelResponseStreamEvent]:
         """Stream the response as an async iterable of [`ModelResponseStreamEvent`][pydantic_ai.messages.ModelResponseStreamEvent]s."""
         if self._event_iterator is None:
-            self._event_iterator = self._get_event_iterator()
+            self._event_iterator = self._timed_event_iterator()
         return self._event_iterator
 
+    async def _timed_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        """Record when the first event arrives and when the stream ends, as `time.perf_counter()` values."""
+        async for event in self._get_event_iterator():
+            if self._first_event_at is None:
+                self._first_event_at = time.perf_counter()
+            yield event
+        self._completed_at = time.perf_counter()
+
     @abstractmethod
     async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
         """Return an async iterator of [`ModelResponseStreamEvent`][pydantic_ai.messages.ModelResponseStreamEvent]s.
@@ -424,7 +436,7 @@ def infer_model(model: Model | KnownModelName) -> Model:
         raise UserError(f'Unknown model: {model}')
 
 
-def cached_async_http_client(timeout: int = 600, connect: int = 5) -> httpx.AsyncClient:
+def cached_async_http_client(timeout: int = 600, connect: int = 5, *, base_url: str | None = None) -> httpx.AsyncClient:
     """Cached HTTPX async client so multiple agents and calls can share the same client.
 
     There are good reasons why in production you should use a `httpx.AsyncClient` as an async context manager as
@@ -433,7 +445,16 @@ def cached_async_http_client(timeout: int = 600, connect: int = 5) -> httpx.Asyn
 
     The default timeouts match those of OpenAI,
     see <https://github.com/openai/openai-python/blob/v1.54.4/src/openai/_constants.py#L9>.
+
+    If an [`HTTPClientPool`][pydantic_ai.models.http_pool.HTTPClientPool] has been installed with
+    [`set_http_client_pool`][pydantic_ai.models.http_pool.set_http_client_pool], its client for `base_url` is returned
+    instead, configured by the pool's settings rather than `timeout` and `connect`.
     """
+    from .http_pool import get_http_client_pool
+
+    if (pool := get_http_client_pool()) is not None:
+        return pool.get_client(base_url)
+
     client = _cached_async_http_client(timeout=timeout, connect=connect)
     if client.is_closed:
         # This happens if the context manager is used, so we need to create a new client.
@@ -444,6 +465,8 @@ def cached_async_http_client(timeout: int = 600, connect: int = 5) -> httpx.Asyn
 
 @cache
 def _cached_async_http_client(timeout: int = 600, connect: int = 5) -> httpx.AsyncClient:
+    import httpx
+
     return httpx.AsyncClient(
         timeout=httpx.Timeout(timeout=timeout, connect=connect),
         headers={'User-Agent': get_user_agent()},
@@ -1,7 +1,5 @@
 from __future__ import annotations as _annotations
 
-import base64
-import io
 from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
@@ -38,9 +36,11 @@ from . import (
     cached_async_http_client,
     check_allow_model_requests,
 )
+from .batch import BatchModel, BatchRequest, BatchResult
+from .media import get_media_store, get_url_cache
 
 try:
-    from anthropic import NOT_GIVEN, APIStatusError, AsyncAnthropic, AsyncStream
+    from anthropic import NOT_GIVEN, APIStatusError, AsyncAnthropic, AsyncStream, NotGiven
     from anthropic.types import (
         ContentBlock,
         ImageBlockParam,
@@ -112,6 +112,7 @@ class AnthropicModel(Model):
 
     _model_name: AnthropicModelName = field(repr=False)
     _system: str | None = field(default='anthropic', repr=False)
+    _message_cache: _utils.MessageMappingCache[tuple[str, MessageParam]] = field(repr=False, compare=False)
 
     def __init__(
         self,
@@ -134,6 +135,7 @@ class AnthropicModel(Model):
             http_client: An existing `httpx.AsyncClient` to use for making HTTP requests.
         """
         self._model_name = model_name
+        self._message_cache = _utils.MessageMappingCache()
         if anthropic_client is not None:
             assert http_client is None, 'Cannot provide both `anthropic_client` and `http_client`'
             assert api_key is None, 'Cannot provide both `anthropic_client` and `api_key`'
@@ -141,7 +143,9 @@ class AnthropicModel(Model):
         elif http_client is not None:
             self.client = AsyncAnthropic(api_key=api_key, http_client=http_client)
         else:
-            self.client = AsyncAnthropic(api_key=api_key, http_client=cached_async_http_client())
+            self.client = AsyncAnthropic(
+                api_key=api_key, http_client=cached_async_http_client(base_url='https://api.anthropic.com')
+            )
 
     @property
     def base_url(self) -> str:
@@ -210,6 +214,27 @@ class AnthropicModel(Model):
         model_settings: AnthropicModelSettings,
         model_request_parameters: ModelRequestParameters,
     ) -> AnthropicMessage | AsyncStream[RawMessageStreamEvent]:
+        params = await self._messages_params(messages, model_settings, model_request_parameters)
+        try:
+            return await self.client.messages.create(
+                **params,
+                stream=stream,
+                timeout=model_settings.get('timeout', NOT_GIVEN),
+            )
+        except APIStatusError as e:
+            if (status_code := e.status_code) >= 400:
+                raise ModelHTTPError(
+                    status_code=status_code, model_name=self.model_name, body=e.body, headers=e.response.headers
+                ) from e
+            raise
+
+    async def _messages_params(
+        self,
+        messages: list[ModelMessage],
+        model_settings: AnthropicModelSettings,
+        model_request_parameters: ModelRequestParameters,
+    ) -> dict[str, Any]:
+        """Build the parameters of a messages request, apart from those controlling how it's sent."""
         # standalone function to make it easier to override
         tools = self._get_tools(model_request_parameters)
         tool_choice: ToolChoiceParam | None
@@ -227,24 +252,17 @@ class AnthropicModel(Model):
 
         system_prompt, anthropic_messages = await self._map_message(messages)
 
-        try:
-            return await self.client.messages.create(
-                max_tokens=model_settings.get('max_tokens', 1024),
-                system=system_prompt or NOT_GIVEN,
-                messages=anthropic_messages,
-                model=self._model_name,
-                tools=tools or NOT_GIVEN,
-                tool_choice=tool_choice or NOT_GIVEN,
-                stream=stream,
-                temperature=model_settings.get('temperature', NOT_GIVEN),
-                top_p=model_settings.get('top_p', NOT_GIVEN),
-                timeout=model_settings.get('timeout', NOT_GIVEN),
-                metadata=model_settings.get('anthropic_metadata', NOT_GIVEN),
-            )
-        except APIStatusError as e:
-            if (status_code := e.status_code) >= 400:
-                raise ModelHTTPError(status_code=status_code, model_name=self.model_name, body=e.body) from e
-            raise
+        return dict(
+            max_tokens=model_settings.get('max_tokens', 1024),
+            system=system_prompt or NOT_GIVEN,
+            messages=anthropic_messages,
+            model=self._model_name,
+            tools=tools or NOT_GIVEN,
+            tool_choice=tool_choice or NOT_GIVEN,
+            temperature=model_settings.get('temperature', NOT_GIVEN),
+            top_p=model_settings.get('top_p', NOT_GIVEN),
+            metadata=model_settings.get('anthropic_metadata', NOT_GIVEN),
+        )
 
     def _process_response(self, response: AnthropicMessage) -> ModelResponse:
         """Process a non-streamed response, and prepare a message to return."""
@@ -287,98 +305,97 @@ class AnthropicModel(Model):
         system_prompt: str = ''
         anthropic_messages: list[MessageParam] = []
         for m in messages:
-            if isinstance(m, ModelRequest):
-                user_content_params: list[ToolResultBlockParam | TextBlockParam | ImageBlockParam] = []
-                for request_part in m.parts:
-                    if isinstance(request_part, SystemPromptPart):
-                        system_prompt += request_part.content
-                    elif isinstance(request_part, UserPromptPart):
-                        async for content in self._map_user_prompt(request_part):
-                            user_content_params.append(content)
-                    elif isinstance(request_part, ToolReturnPart):
-                        tool_result_block_param = ToolResultBlockParam(
+            message_system_prompt, message_param = await self._message_cache.aget(m, self._map_model_message)
+            system_prompt += message_system_prompt
+            anthropic_messages.append(message_param)
+        return system_prompt, anthropic_messages
+
+    async def _map_model_message(self, m: ModelMessage) -> tuple[str, MessageParam]:
+        """Map a single message to its system prompt and a `MessageParam`."""
+        system_prompt: str = ''
+        if isinstance(m, ModelRequest):
+            user_content_params: list[ToolResultBlockParam | TextBlockParam | ImageBlockParam] = []
+            for request_part in m.parts:
+                if isinstance(request_part, SystemPromptPart):
+                    system_prompt += request_part.content
+                elif isinstance(request_part, UserPromptPart):
+                    async for content in self._map_user_prompt(request_part):
+                        user_content_params.append(content)
+                elif isinstance(request_part, ToolReturnPart):
+                    tool_result_block_param = ToolResultBlockParam(
+                        tool_use_id=_guard_tool_call_id(t=request_part, model_source='Anthropic'),
+                        type='tool_result',
+                        content=request_part.model_response_str(),
+                        is_error=False,
+                    )
+                    user_content_params.append(tool_result_block_param)
+                elif isinstance(request_part, RetryPromptPart):
+                    if request_part.tool_name is None:
+                        retry_param = TextBlockParam(type='text', text=request_part.model_response())
+                    else:
+                        retry_param = ToolResultBlockParam(
                             tool_use_id=_guard_tool_call_id(t=request_part, model_source='Anthropic'),
                             type='tool_result',
-                            content=request_part.model_response_str(),
-                            is_error=False,
-                        )
-                        user_content_params.append(tool_result_block_param)
-                    elif isinstance(request_part, RetryPromptPart):
-                        if request_part.tool_name is None:
-                            retry_param = TextBlockParam(type='text', text=request_part.model_response())
-                        else:
-                            retry_param = ToolResultBlockParam(
-                                tool_use_id=_guard_tool_call_id(t=request_part, model_source='Anthropic'),
-                                type='tool_result',
-                                content=request_part.model_response(),
-                                is_error=True,
-                            )
-                        user_content_params.append(retry_param)
-                anthropic_messages.append(MessageParam(role='user', content=user_content_params))
-            elif isinstance(m, ModelResponse):
-                assistant_content_params: list[TextBlockParam | ToolUseBlockParam] = []
-                for response_part in m.parts:
-                    if isinstance(response_part, TextPart):
-                        assistant_content_params.append(TextBlockParam(text=response_part.content, type='text'))
-                    else:
-                        tool_use_block_param = ToolUseBlockParam(
-                            id=_guard_tool_call_id(t=response_part, model_source='Anthropic'),
-                            type='tool_use',
-                            name=response_part.tool_name,
-                            input=response_part.args_as_dict(),
+                            content=request_part.model_response(),
+                            is_error=True,
                         )
-                        assistant_content_params.append(tool_use_block_param)
-                anthropic_messages.append(MessageParam(role='assistant', content=assistant_content_params))
-            else:
-                assert_never(m)
-        return system_prompt, anthropic_messages
+                    user_content_params.append(retry_param)
+            return system_prompt, MessageParam(role='user', content=user_content_params)
+        elif isinstance(m, ModelResponse):
+            assistant_content_params: list[TextBlockParam | ToolUseBlockParam] = []
+            for response_part in m.parts:
+                if isinstance(response_part, TextPart):
+                    assistant_content_params.append(TextBlockParam(text=response_part.content, type='text'))
+                else:
+                    tool_use_block_param = ToolUseBlockParam(
+                        id=_guard_tool_call_id(t=response_part, model_source='Anthropic'),
+                        type='tool_use',
+                        name=response_part.tool_name,
+                        input=response_part.args_as_dict(),
+                    )
+                    assistant_content_params.append(tool_use_block_param)
+            return system_prompt, MessageParam(role='assistant', content=assistant_content_params)
+        else:
+            assert_never(m)
 
     @staticmethod
     async def _map_user_prompt(part: UserPromptPart) -> AsyncGenerator[ImageBlockParam | TextBlockParam]:
         if isinstance(part.content, str):
             yield TextBlockParam(text=part.content, type='text')
         else:
+            await get_url_cache().prefetch(item.url for item in part.content if isinstance(item, ImageUrl))
             for item in part.content:
                 if isinstance(item, str):
                     yield TextBlockParam(text=item, type='text')
                 elif isinstance(item, BinaryContent):
                     if item.is_image:
                         yield ImageBlockParam(
-                            source={'data': io.BytesIO(item.data), 'media_type': item.media_type, 'type': 'base64'},  # type: ignore
+                            source={
+                                'data': get_media_store().base64(item),
+                                'media_type': item.media_type,  # type: ignore
+                                'type': 'base64',
+                            },
                             type='image',
                         )
                     else:
                         raise RuntimeError('Only images are supported for binary content')
                 elif isinstance(item, ImageUrl):
+                    downloaded = await get_url_cache().fetch(item.url)
                     try:
-                        response = await cached_async_http_client().get(item.url)
-                        response.raise_for_status()
-                        yield ImageBlockParam(
-                            source={
-                                'data': io.BytesIO(response.content),
-                                'media_type': item.media_type,
-                                'type': 'base64',
-                            },
-                            type='image',
-                        )
+                        media_type = item.media_type
                     except ValueError:
-                        # Download the file if can't find the mime type.
-                        client = cached_async_http_client()
-                        response = await client.get(item.url, follow_redirects=True)
-                        response.raise_for_status()
-                        base64_encoded = base64.b64encode(response.content).decode('utf-8')
-                        if (mime_type := response.headers['Content-Type']) in (
-                            'image/jpeg',
-                            'image/png',
-                            'image/gif',
-                            'image/webp',
-                        ):
-                            yield ImageBlockParam(
-                                source={'data': base64_encoded, 'media_type': mime_type, 'type': 'base64'},
-                                type='image',
-                            )
-                        else:  # pragma: no cover
-                            raise RuntimeError(f'Unsupported image type: {mime_type}')
+                        # Use the media type reported by the server if it can't be inferred from the URL.
+                        media_type = downloaded.media_type
+                        if media_type not in ('image/jpeg', 'image/png', 'image/gif', 'image/webp'):  # pragma: no cover
+                            raise RuntimeError(f'Unsupported image type: {media_type}')
+                    yield ImageBlockParam(
+                        source={
+                            'data': get_media_store().base64(downloaded),
+                            'media_type': media_type,  # type: ignore
+                            'type': 'base64',
+                        },
+                        type='image',
+                    )
                 else:
                     raise RuntimeError(f'Unsupported content type: {type(item)}')
 
@@ -391,6 +408,91 @@ class AnthropicModel(Model):
         }
 
 
+@dataclass(init=False)
+class AnthropicBatchModel(BatchModel):
+    """A model which sends requests through Anthropic's [Message Batches API](https://docs.anthropic.com/en/docs/build-with-claude/batch-processing).
+
+    Requests are mapped by the wrapped [`AnthropicModel`][pydantic_ai.models.anthropic.AnthropicModel] and sent with
+    its client, see [`BatchModel`][pydantic_ai.models.batch.BatchModel] for how they're batched.
+
+    Apart from `__init__`, all methods are private or match those of the base class.
+    """
+
+    model: AnthropicModel
+
+    def __init__(
+        self,
+        model: AnthropicModel | AnthropicModelName,
+        *,
+        max_batch_size: int = 1000,
+        max_wait: float = 5.0,
+        poll_interval: float = 30.0,
+    ):
+        """Initialize an Anthropic batch model.
+
+        Args:
+            model: The Anthropic model, or the name of one, to send requests for.
+            max_batch_size: The number of waiting requests which are submitted as a batch straight away, at most
+                100,000 for Anthropic.
+            max_wait: How long in seconds to wait for more requests after the first one before submitting a batch.
+            poll_interval: How long in seconds to wait between checks of whether a submitted batch has finished.
+        """
+        super().__init__(max_batch_size=max_batch_size, max_wait=max_wait, poll_interval=poll_interval)
+        self.model = model if isinstance(model, AnthropicModel) else AnthropicModel(model)
+
+    @property
+    def model_name(self) -> AnthropicModelName:
+        """The model name."""
+        return self.model.model_name
+
+    @property
+    def system(self) -> str | None:
+        """The system / model provider."""
+        return self.model.system
+
+    @property
+    def base_url(self) -> str:
+        return self.model.base_url
+
+    async def build_request_body(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> dict[str, Any]:
+        params = await self.model._messages_params(  # pyright: ignore[reportPrivateUsage]
+            messages, cast(AnthropicModelSettings, model_settings or {}), model_request_parameters
+        )
+        return {key: value for key, value in params.items() if not isinstance(value, NotGiven)}
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        batch = await self.model.client.messages.batches.create(
+            requests=[{'custom_id': r.custom_id, 'params': cast(Any, r.body)} for r in requests]
+        )
+        return batch.id
+
+    async def batch_finished(self, batch_id: str) -> bool:
+        batch = await self.model.client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == 'ended'
+
+    async def batch_results(self, batch_id: str) -> dict[str, BatchResult]:
+        results: dict[str, BatchResult] = {}
+        async for entry in await self.model.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == 'succeeded':
+                results[entry.custom_id] = (
+                    self.model._process_response(result.message),  # pyright: ignore[reportPrivateUsage]
+                    _map_usage(result.message),
+                )
+            elif result.type == 'errored':
+                results[entry.custom_id] = UnexpectedModelBehavior(
+                    'Batch request failed', result.error.model_dump_json(exclude_none=True)
+                )
+            else:
+                results[entry.custom_id] = UnexpectedModelBehavior(f'Batch request {result.type}')
+        return results
+
+
 def _map_usage(message: AnthropicMessage | RawMessageStreamEvent) -> usage.Usage:
     if isinstance(message, AnthropicMessage):
         response_usage = message.usage
@@ -0,0 +1,185 @@
+"""Sending model requests through a provider's batch API.
+
+Batch APIs, like [OpenAI's Batch API](https://platform.openai.com/docs/guides/batch) and
+[Anthropic's Message Batches](https://docs.anthropic.com/en/docs/build-with-claude/batch-processing), process requests
+asynchronously, typically within 24 hours, at a lower price and with higher rate limits than the regular endpoints.
+
+A [`BatchModel`][pydantic_ai.models.batch.BatchModel] collects the requests of many concurrent agent runs, submits them
+as one batch when `max_batch_size` requests are waiting or `max_wait` seconds after the first one, polls the batch
+until it has finished, and returns each run's response from its `request` call. Agent code doesn't change, it just
+waits much longer for each response, so batch models are suited to offline workloads like
+[`Agent.run_many`][pydantic_ai.Agent.run_many].
+
+See [`OpenAIBatchModel`][pydantic_ai.models.openai.OpenAIBatchModel] and
+[`AnthropicBatchModel`][pydantic_ai.models.anthropic.AnthropicBatchModel].
+"""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+from abc import abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Union
+from uuid import uuid4
+
+from typing_extensions import TypeAlias
+
+from ..exceptions import UnexpectedModelBehavior
+from ..messages import ModelMessage, ModelResponse
+from ..settings import ModelSettings
+from ..usage import Usage
+from . import Model, ModelRequestParameters, StreamedResponse, check_allow_model_requests
+
+__all__ = 'BatchModel', 'BatchRequest', 'BatchResult'
+
+
+@dataclass
+class BatchRequest:
+    """A request waiting to be sent as part of a batch."""
+
+    custom_id: str
+    """Identifies the request within the batch, and its result in the batch's results."""
+    body: dict[str, Any]
+    """The provider's request body, as it would be sent to the regular endpoint."""
+    future: asyncio.Future[tuple[ModelResponse, Usage]] = field(repr=False)
+
+
+BatchResult: TypeAlias = Union[tuple[ModelResponse, Usage], Exception]
+"""The outcome of a request in a batch, its response and usage, or the error it failed with."""
+
+
+@dataclass(init=False)
+class BatchModel(Model):
+    """Base class for models which send requests through a provider's batch API.
+
+    Subclasses build the request body and implement submitting, polling and reading the results of a batch.
+
+    Streamed requests aren't supported, since batch APIs only return complete responses.
+    """
+
+    max_batch_size: int
+    max_wait: float
+    poll_interval: float
+
+    _pending: list[BatchRequest] = field(repr=False)
+    _flush_handle: asyncio.TimerHandle | None = field(repr=False)
+    _batches: set[asyncio.Task[None]] = field(repr=False)
+
+    def __init__(self, *, max_batch_size: int = 1000, max_wait: float = 5.0, poll_interval: float = 30.0):
+        """Initialize the batching state.
+
+        Args:
+            max_batch_size: The number of waiting requests which are submitted as a batch straight away.
+            max_wait: How long in seconds to wait for more requests after the first one before submitting a batch.
+            poll_interval: How long in seconds to wait between checks of whether a submitted batch has finished.
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self._pending = []
+        self._flush_handle = None
+        self._batches = set()
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        check_allow_model_requests()
+        body = await self.build_request_body(messages, model_settings, model_request_parameters)
+        loop = asyncio.get_running_loop()
+        request = BatchRequest(uuid4().hex, body, loop.create_future())
+        self._pending.append(request)
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self.flush)
+
+        try:
+            return await request.future
+        except asyncio.CancelledError:
+            # a request which hasn't been submitted yet is dropped, the result of one which has is ignored
+            if request in self._pending:
+                self._pending.remove(request)
+            raise
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        raise NotImplementedError(f'Streamed requests are not supported by {self.__class__.__name__}')
+        yield  # pragma: no cover
+
+    def flush(self) -> None:
+        """Submit the waiting requests as a batch now, rather than waiting for more."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        requests, self._pending = self._pending, []
+        if requests:
+            task = asyncio.create_task(self._run_batch(requests))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    @abstractmethod
+    async def build_request_body(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> dict[str, Any]:
+        """Build the body of a request, as it would be sent to the provider's regular endpoint."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        """Submit requests as a batch, returning the batch's ID."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def batch_finished(self, batch_id: str) -> bool:
+        """Check whether a batch has finished processing.
+
+        Raises:
+            UnexpectedModelBehavior: If the batch failed as a whole.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def batch_results(self, batch_id: str) -> dict[str, BatchResult]:
+        """Get the results of a finished batch, keyed by the `custom_id` of each request."""
+        raise NotImplementedError()
+
+    async def _run_batch(self, requests: list[BatchRequest]) -> None:
+        try:
+            batch_id = await self.submit_batch(requests)
+            while not await self.batch_finished(batch_id):
+                await asyncio.sleep(self.poll_interval)
+            results = await self.batch_results(batch_id)
+        except Exception as exc:
+            results = {request.custom_id: exc for request in requests}
+        except asyncio.CancelledError:
+            # the runs waiting for the batch would otherwise wait forever
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(UnexpectedModelBehavior('Batch was cancelled before it finished'))
+            raise
+
+        for request in requests:
+            if request.future.done():
+                continue
+            result = results.get(request.custom_id)
+            if result is None:
+                request.future.set_exception(
+                    UnexpectedModelBehavior(f'Batch finished without a result for request {request.custom_id!r}')
+                )
+            elif isinstance(result, Exception):
+                request.future.set_exception(result)
+            else:
+                request.future.set_result(result)
@@ -0,0 +1,400 @@
+"""Request-level response caching for models.
+
+[`CachedModel`][pydantic_ai.models.cached.CachedModel] wraps another model and stores each
+[`ModelResponse`][pydantic_ai.messages.ModelResponse] and [`Usage`][pydantic_ai.usage.Usage] under a hash of the
+canonical request (messages, model settings and request parameters), so identical requests are answered from the
+cache without calling the wrapped model.
+"""
+
+from __future__ import annotations as _annotations
+
+import copy
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import pydantic_core
+from pydantic import TypeAdapter
+
+from .. import _utils
+from .._parts_manager import ModelResponsePartsManager
+from ..messages import (
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelResponse,
+    ModelResponseStreamEvent,
+    TextPart,
+)
+from ..settings import ModelSettings
+from ..usage import Usage
+from . import KnownModelName, Model, ModelRequestParameters, StreamedResponse
+from .wrapper import WrapperModel
+
+# Settings which change how a request is made, but not what the model is asked.
+_IGNORED_SETTINGS = frozenset({'timeout'})
+
+
+def request_cache_key(
+    model: Model,
+    messages: list[ModelMessage],
+    model_settings: ModelSettings | None,
+    model_request_parameters: ModelRequestParameters,
+) -> str:
+    """Compute a stable hash identifying a model request.
+
+    Messages are serialized in JSON mode with timestamps removed and tool call arguments normalized to objects, so two
+    requests which only differ by when they were made, or by how the model formatted its tool call arguments, share a
+    key. Settings which don't affect the response (currently only `timeout`) are ignored.
+
+    Args:
+        model: The model the request is made to, its `system` and `model_name` form part of the key.
+        messages: The message history sent to the model.
+        model_settings: The model settings for the request.
+        model_request_parameters: The tool definitions and result configuration for the request.
+
+    Returns:
+        A hex encoded SHA-256 digest.
+    """
+    settings = {k: v for k, v in (model_settings or {}).items() if k not in _IGNORED_SETTINGS}
+    payload = {
+        'system': model.system,
+        'model_name': model.model_name,
+        'messages': _canonical(ModelMessagesTypeAdapter.dump_python(messages, mode='json')),
+        'settings': pydantic_core.to_jsonable_python(settings),
+        'parameters': asdict(model_request_parameters),
+    }
+    serialized = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def _canonical(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Drop the timestamps of serialized messages and their parts, and parse JSON tool call arguments.
+
+    Only the message and part level `timestamp` fields are dropped, tool arguments and return values are kept as they
+    are even if they contain a `timestamp` key.
+    """
+    canonical: list[dict[str, Any]] = []
+    for message in messages:
+        message = {k: v for k, v in message.items() if k != 'timestamp'}
+        parts: list[dict[str, Any]] = []
+        for part in message['parts']:
+            part = {k: v for k, v in part.items() if k != 'timestamp'}
+            if part.get('part_kind') == 'tool-call' and isinstance(part.get('args'), str):
+                try:
+                    part['args'] = json.loads(part['args'])
+                except ValueError:
+                    pass
+            parts.append(part)
+        message['parts'] = parts
+        canonical.append(message)
+    return canonical
+
+
+class ResponseCache(ABC):
+    """Abstract storage backend for [`CachedModel`][pydantic_ai.models.cached.CachedModel].
+
+    Implement this to store responses somewhere else, e.g. redis or a shared database.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> tuple[ModelResponse, Usage] | None:
+        """Return the response and usage stored under `key`, or `None` if there is no live entry."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def set(self, key: str, response: ModelResponse, usage: Usage) -> None:
+        """Store a response and usage under `key`."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove all entries from the cache."""
+        raise NotImplementedError()
+
+
+@dataclass(init=False)
+class InMemoryResponseCache(ResponseCache):
+    """A least-recently-used response cache held in process memory."""
+
+    max_size: int | None
+    ttl: float | None
+    _entries: OrderedDict[str, tuple[float | None, ModelResponse, Usage]] = field(repr=False)
+
+    def __init__(self, max_size: int | None = 1024, ttl: float | None = None):
+        """Initialize an in-memory response cache.
+
+        Args:
+            max_size: The maximum number of entries to keep, the least recently used entry is evicted first.
+                `None` means no limit.
+            ttl: Time in seconds after which an entry expires, `None` means entries never expire.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    async def get(self, key: str) -> tuple[ModelResponse, Usage] | None:
+        try:
+            expires_at, response, usage = self._entries[key]
+        except KeyError:
+            return None
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(response), copy.deepcopy(usage)
+
+    async def set(self, key: str, response: ModelResponse, usage: Usage) -> None:
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        self._entries[key] = expires_at, copy.deepcopy(response), copy.deepcopy(usage)
+        self._entries.move_to_end(key)
+        if self.max_size is not None:
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache_entry_ta = TypeAdapter(tuple[ModelResponse, Usage], config={'defer_build': True, 'ser_json_bytes': 'base64'})
+
+
+@dataclass(init=False)
+class SQLiteResponseCache(ResponseCache):
+    """A least-recently-used response cache persisted to an SQLite database.
+
+    Database access happens in a worker thread so the event loop isn't blocked.
+    """
+
+    path: Path | str
+    max_size: int | None
+    ttl: float | None
+    _conn: sqlite3.Connection = field(repr=False)
+    _lock: threading.Lock = field(repr=False)
+
+    def __init__(self, path: Path | str, *, max_size: int | None = None, ttl: float | None = None):
+        """Initialize an SQLite response cache.
+
+        Args:
+            path: Path to the database file, created if it doesn't exist. Use `':memory:'` for a temporary database.
+            max_size: The maximum number of entries to keep, the least recently used entry is evicted first.
+                `None` means no limit.
+            ttl: Time in seconds after which an entry expires, `None` means entries never expire.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, entry BLOB NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+
+    async def get(self, key: str) -> tuple[ModelResponse, Usage] | None:
+        data = await _utils.run_in_executor(self._get, key)
+        if data is None:
+            return None
+        return _cache_entry_ta.validate_json(data)
+
+    async def set(self, key: str, response: ModelResponse, usage: Usage) -> None:
+        data = _cache_entry_ta.dump_json((response, usage))
+        await _utils.run_in_executor(self._set, key, data)
+
+    async def clear(self) -> None:
+        await _utils.run_in_executor(self._execute, 'DELETE FROM responses')
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _get(self, key: str) -> bytes | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT entry, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            data, created_at = row
+            if self.ttl is not None and created_at + self.ttl <= now:
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            return data
+
+    def _set(self, key: str, data: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, entry, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, data, now, now),
+            )
+            if self.ttl is not None:
+                self._conn.execute('DELETE FROM responses WHERE created_at <= ?', (now - self.ttl,))
+            if self.max_size is not None:
+                self._conn.execute(
+                    'DELETE FROM responses WHERE key NOT IN '
+                    '(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT ?)',
+                    (self.max_size,),
+                )
+
+    def _execute(self, sql: str) -> None:
+        with self._lock:
+            self._conn.execute(sql)
+
+
+@dataclass(init=False)
+class CachedModel(WrapperModel):
+    """A model which answers repeated identical requests from a cache.
+
+    Requests are keyed with [`request_cache_key`][pydantic_ai.models.cached.request_cache_key]. On a hit, the stored
+    response and usage are returned without calling the wrapped model, with the response timestamp set to the time of
+    the hit; streamed requests replay the stored parts through a
+    [`CachedStreamedResponse`][pydantic_ai.models.cached.CachedStreamedResponse].
+
+    Streamed responses are only stored once the stream has been consumed to the end without error.
+    """
+
+    cache: ResponseCache
+    hits: int
+    misses: int
+
+    def __init__(self, wrapped: Model | KnownModelName, cache: ResponseCache | None = None):
+        """Initialize a cached model instance.
+
+        Args:
+            wrapped: The name or instance of the model whose responses should be cached.
+            cache: The cache backend to use, defaults to a new
+                [`InMemoryResponseCache`][pydantic_ai.models.cached.InMemoryResponseCache].
+        """
+        super().__init__(wrapped)
+        self.cache = cache if cache is not None else InMemoryResponseCache()
+        self.hits = 0
+        self.misses = 0
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        key = request_cache_key(self.wrapped, messages, model_settings, model_request_parameters)
+        if cached := await self._lookup(key):
+            return cached
+
+        response, usage = await self.wrapped.request(messages, model_settings, model_request_parameters)
+        await self.cache.set(key, response, usage)
+        return response, usage
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        key = request_cache_key(self.wrapped, messages, model_settings, model_request_parameters)
+        if cached := await self._lookup(key):
+            response, usage = cached
+            yield CachedStreamedResponse(
+                _model_name=response.model_name or self.model_name, _response=response, _cached_usage=usage
+            )
+            return
+
+        async with self.wrapped.request_stream(messages, model_settings, model_request_parameters) as stream:
+            yield stream
+            # make sure the whole response is stored, even if the caller stopped reading after the final result
+            async for _ in stream:
+                pass
+            await self.cache.set(key, stream.get(), stream.usage())
+
+    async def _lookup(self, key: str) -> tuple[ModelResponse, Usage] | None:
+        cached = await self.cache.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        response, usage = cached
+        return replace(response, timestamp=_utils.now_utc()), usage
+
+
+@dataclass
+class CachedStreamedResponse(StreamedResponse):
+    """A streamed response which replays a stored `ModelResponse`.
+
+    Text is emitted word by word and tool call arguments in small chunks, so consumers see the same kind of deltas
+    they would from a live model. The stored usage is reported once the stream is exhausted.
+    """
+
+    _model_name: str
+    _response: ModelResponse
+    _cached_usage: Usage = field(default_factory=Usage)
+    _timestamp: datetime = field(default_factory=_utils.now_utc, init=False)
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        for event in replay_response_events(self._parts_manager, self._response):
+            yield event
+        self._usage = copy.copy(self._cached_usage)
+
+    @property
+    def model_name(self) -> str:
+        """Get the model name of the response."""
+        return self._model_name
+
+    @property
+    def timestamp(self) -> datetime:
+        """Get the timestamp of the response."""
+        return self._timestamp
+
+
+_word_re = re.compile(r'\s*\S+\s*|\s+')
+_ARGS_CHUNK_SIZE = 16
+
+
+def replay_response_events(
+    parts_manager: ModelResponsePartsManager, response: ModelResponse
+) -> Iterator[ModelResponseStreamEvent]:
+    """Feed the parts of a complete response into a parts manager as a sequence of deltas.
+
+    Args:
+        parts_manager: The parts manager of the streamed response being replayed into.
+        response: The response to replay.
+
+    Yields:
+        The stream events generated by the parts manager.
+    """
+    for i, part in enumerate(response.parts):
+        if isinstance(part, TextPart):
+            for word in _word_re.findall(part.content) or ['']:
+                yield parts_manager.handle_text_delta(vendor_part_id=i, content=word)
+        elif isinstance(part.args, str) and part.args:
+            args = part.args
+            first, rest = args[:_ARGS_CHUNK_SIZE], args[_ARGS_CHUNK_SIZE:]
+            event = parts_manager.handle_tool_call_delta(
+                vendor_part_id=i, tool_name=part.tool_name, args=first, tool_call_id=part.tool_call_id
+            )
+            if event is not None:
+                yield event
+            for start in range(0, len(rest), _ARGS_CHUNK_SIZE):
+                event = parts_manager.handle_tool_call_delta(
+                    vendor_part_id=i, tool_name=None, args=rest[start : start + _ARGS_CHUNK_SIZE], tool_call_id=None
+                )
+                if event is not None:
+                    yield event
+        else:
+            yield parts_manager.handle_tool_call_part(
+                vendor_part_id=i, tool_name=part.tool_name, args=part.args, tool_call_id=part.tool_call_id
+            )
@@ -0,0 +1,115 @@
+"""Circuit breakers to stop sending requests to a model which keeps failing.
+
+A [`CircuitBreaker`][pydantic_ai.models.circuit_breaker.CircuitBreaker] tracks the outcome of recent requests to one
+model. While the error rate is low the circuit is *closed* and requests go through. Once too many requests fail it
+*opens* and requests are refused without being sent, until `reset_timeout` has passed and the circuit is *half-open*,
+letting a few probe requests through to find out whether the model has recovered.
+"""
+
+from __future__ import annotations as _annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Literal
+
+CircuitState = Literal['closed', 'open', 'half-open']
+"""The state of a [`CircuitBreaker`][pydantic_ai.models.circuit_breaker.CircuitBreaker]."""
+
+
+@dataclass
+class CircuitBreaker:
+    """Tracks failures of a model and decides whether requests should be sent to it.
+
+    Call [`acquire`][pydantic_ai.models.circuit_breaker.CircuitBreaker.acquire] before each request, and then exactly
+    one of [`record_success`][pydantic_ai.models.circuit_breaker.CircuitBreaker.record_success],
+    [`record_failure`][pydantic_ai.models.circuit_breaker.CircuitBreaker.record_failure] or
+    [`release`][pydantic_ai.models.circuit_breaker.CircuitBreaker.release] once it is over. Keep a single instance per
+    model for the lifetime of the process, so the state is shared by all agent runs.
+    """
+
+    failure_rate: float = 0.5
+    """The fraction of recent requests which have to fail to open the circuit."""
+    min_requests: int = 5
+    """How many requests have to be recorded before the failure rate is considered."""
+    window: int = 20
+    """How many recent requests the failure rate is calculated over."""
+    reset_timeout: float = 30.0
+    """How long in seconds the circuit stays open before probe requests are let through."""
+    half_open_requests: int = 1
+    """How many probe requests may be in flight at once while the circuit is half-open."""
+
+    opened: int = field(default=0, init=False)
+    """The number of times the circuit has opened."""
+    _state: CircuitState = field(default='closed', init=False, repr=False)
+    _outcomes: deque[bool] = field(init=False, repr=False)
+    _opened_at: float = field(default=0.0, init=False, repr=False)
+    _probes: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self._outcomes = deque(maxlen=self.window)
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state, an open circuit becomes half-open once `reset_timeout` has passed."""
+        if self._state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = 'half-open'
+            self._probes = 0
+        return self._state
+
+    @property
+    def available(self) -> bool:
+        """Whether [`acquire`][pydantic_ai.models.circuit_breaker.CircuitBreaker.acquire] would let a request through."""
+        state = self.state
+        return state == 'closed' or (state == 'half-open' and self._probes < self.half_open_requests)
+
+    @property
+    def retry_at(self) -> float | None:
+        """The `time.monotonic()` value at which an open circuit becomes half-open, `None` if it isn't open."""
+        return self._opened_at + self.reset_timeout if self.state == 'open' else None
+
+    def acquire(self) -> bool:
+        """Ask to send a request, returning whether it may be sent.
+
+        In the half-open state this reserves one of the probe requests.
+        """
+        if not self.available:
+            return False
+        if self._state == 'half-open':
+            self._probes += 1
+        return True
+
+    def record_success(self) -> None:
+        """Record that a request succeeded, which closes a half-open circuit."""
+        if self._state == 'half-open':
+            self._state = 'closed'
+            self._outcomes.clear()
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """Record that a request failed, which opens the circuit if the failure rate is too high."""
+        if self._state == 'half-open':
+            self._open()
+            return
+        self._outcomes.append(False)
+        if self._state == 'closed' and len(self._outcomes) >= self.min_requests:
+            failures = self._outcomes.count(False)
+            if failures / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def release(self) -> None:
+        """Record that a request ended without an outcome, e.g. because it was cancelled."""
+        if self._state == 'half-open' and self._probes > 0:
+            self._probes -= 1
+
+    def reset(self) -> None:
+        """Close the circuit and forget all recorded requests."""
+        self._state = 'closed'
+        self._outcomes.clear()
+        self._probes = 0
+
+    def _open(self) -> None:
+        self._state = 'open'
+        self._opened_at = time.monotonic()
+        self._probes = 0
+        self.opened += 1
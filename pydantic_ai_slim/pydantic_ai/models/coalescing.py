@@ -0,0 +1,256 @@
+"""Request coalescing (single-flight) for models.
+
+[`CoalescingModel`][pydantic_ai.models.coalescing.CoalescingModel] makes sure identical requests which are in flight at
+the same time only reach the wrapped model once: the first caller starts the request, and everyone else who asks the
+same thing before it completes shares its result.
+"""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+import copy
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Generic, TypeVar
+
+from .. import _utils
+from ..messages import (
+    ModelMessage,
+    ModelResponse,
+    ModelResponsePart,
+    ModelResponseStreamEvent,
+    PartDeltaEvent,
+    PartStartEvent,
+)
+from ..settings import ModelSettings
+from ..usage import Usage
+from . import KnownModelName, Model, ModelRequestParameters, StreamedResponse
+from .cached import request_cache_key
+from .wrapper import WrapperModel
+
+_T = TypeVar('_T')
+
+
+@dataclass
+class _Flight(Generic[_T]):
+    """A shared task and the number of callers waiting on it."""
+
+    task: asyncio.Task[_T]
+    forget: Callable[[], None]
+    """Removes the flight from the requests in flight, so later callers start a new one."""
+    waiters: int = 0
+
+    def leave(self) -> None:
+        self.waiters -= 1
+        if self.waiters == 0 and not self.task.done():
+            # nobody is interested in the result any more, and callers arriving before the task has finished
+            # cancelling mustn't join it
+            self.forget()
+            self.task.cancel()
+
+
+@dataclass(init=False)
+class CoalescingModel(WrapperModel):
+    """A model which shares the result of identical concurrent requests.
+
+    Requests are identified with [`request_cache_key`][pydantic_ai.models.cached.request_cache_key]. The wrapped model
+    is called from a task shared by all callers of the same request, so a caller being cancelled doesn't affect the
+    others; the task is only cancelled once every caller has gone. Each caller gets its own copy of the response and
+    the usage of the shared request.
+
+    Streamed requests are shared through a broadcast buffer: every caller, however late it joins, receives the full
+    sequence of events from the start.
+
+    Nothing is kept once a request completes, combine with [`CachedModel`][pydantic_ai.models.cached.CachedModel] to
+    also reuse responses after that.
+    """
+
+    coalesced: int
+    """The number of requests which were answered by joining a request already in flight."""
+
+    _requests: dict[str, _Flight[tuple[ModelResponse, Usage]]] = field(repr=False)
+    _streams: dict[str, _Flight[None]] = field(repr=False)
+    _broadcasts: dict[str, _StreamBroadcast] = field(repr=False)
+
+    def __init__(self, wrapped: Model | KnownModelName):
+        """Initialize a coalescing model instance.
+
+        Args:
+            wrapped: The name or instance of the model whose requests should be coalesced.
+        """
+        super().__init__(wrapped)
+        self.coalesced = 0
+        self._requests = {}
+        self._streams = {}
+        self._broadcasts = {}
+
+    @property
+    def in_flight(self) -> int:
+        """The number of distinct requests currently being made to the wrapped model."""
+        return len(self._requests) + len(self._streams)
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        key = request_cache_key(self.wrapped, messages, model_settings, model_request_parameters)
+        flight = self._requests.get(key)
+        if flight is None:
+            task = asyncio.create_task(self.wrapped.request(messages, model_settings, model_request_parameters))
+
+            def forget() -> None:
+                if self._requests.get(key) is flight:
+                    del self._requests[key]
+
+            flight = self._requests[key] = _Flight(task, forget)
+            task.add_done_callback(lambda _: forget())
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            response, usage = await asyncio.shield(flight.task)
+        finally:
+            flight.leave()
+        return copy.deepcopy(response), copy.deepcopy(usage)
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        key = request_cache_key(self.wrapped, messages, model_settings, model_request_parameters)
+        flight = self._streams.get(key)
+        if flight is None:
+            broadcast = self._broadcasts[key] = _StreamBroadcast()
+            task = asyncio.create_task(broadcast.run(self.wrapped, messages, model_settings, model_request_parameters))
+
+            def forget_stream() -> None:
+                if self._streams.get(key) is flight:
+                    del self._streams[key]
+                    del self._broadcasts[key]
+
+            flight = self._streams[key] = _Flight(task, forget_stream)
+            task.add_done_callback(lambda _: forget_stream())
+        else:
+            broadcast = self._broadcasts[key]
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            await broadcast.wait_opened()
+            yield _BroadcastStreamedResponse(broadcast)
+        finally:
+            flight.leave()
+
+
+@dataclass
+class _StreamBroadcast:
+    """Events from a single streamed response, recorded so any number of subscribers can replay them.
+
+    Only the events and usage are recorded as the response streams, subscribers build the parts from the events they
+    replay, so recording stays linear in the length of the response. The final parts are recorded once it's complete.
+    """
+
+    events: list[tuple[ModelResponseStreamEvent, Usage]] = field(default_factory=list)
+    parts: list[ModelResponsePart] | None = None
+    model_name: str = ''
+    timestamp: datetime = field(default_factory=_utils.now_utc)
+    opened: bool = False
+    done: bool = False
+    error: BaseException | None = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    async def run(
+        self,
+        model: Model,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> None:
+        try:
+            async with model.request_stream(messages, model_settings, model_request_parameters) as stream:
+                self.model_name = stream.model_name
+                self.timestamp = stream.timestamp
+                self.opened = True
+                self._notify()
+                async for event in stream:
+                    self.events.append((event, copy.copy(stream.usage())))
+                    self._notify()
+                self.parts = stream.get().parts
+        except BaseException as e:
+            self.error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self.done = True
+            self._notify()
+
+    async def wait_opened(self) -> None:
+        while not self.opened and not self.done:
+            await self.wait()
+        if not self.opened:
+            assert self.error is not None
+            raise self.error
+
+    async def wait(self) -> None:
+        await self._changed.wait()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+@dataclass
+class _BroadcastStreamedResponse(StreamedResponse):
+    """A streamed response which replays the events recorded by a `_StreamBroadcast`."""
+
+    _broadcast: _StreamBroadcast
+    _parts: dict[int, ModelResponsePart] = field(default_factory=dict, init=False)
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        broadcast = self._broadcast
+        position = 0
+        while True:
+            while position < len(broadcast.events):
+                event, self._usage = broadcast.events[position]
+                position += 1
+                self._apply(event)
+                yield event
+            if broadcast.done:
+                if broadcast.error is not None:
+                    raise broadcast.error
+                if broadcast.parts is not None:
+                    self._parts = dict(enumerate(broadcast.parts))
+                return
+            await broadcast.wait()
+
+    def _apply(self, event: ModelResponseStreamEvent) -> None:
+        """Update the parts with an event, the events are shared by all subscribers so the parts are replaced."""
+        if isinstance(event, PartStartEvent):
+            self._parts[event.index] = event.part
+        elif isinstance(event, PartDeltaEvent):  # pragma: no branch
+            self._parts[event.index] = event.delta.apply(self._parts[event.index])
+
+    def get(self) -> ModelResponse:
+        parts = [self._parts[index] for index in sorted(self._parts)]
+        return ModelResponse(parts=parts, model_name=self.model_name, timestamp=self.timestamp)
+
+    def usage(self) -> Usage:
+        return copy.copy(self._usage)
+
+    @property
+    def model_name(self) -> str:
+        """Get the model name of the response."""
+        return self._broadcast.model_name
+
+    @property
+    def timestamp(self) -> datetime:
+        """Get the timestamp of the response."""
+        return self._broadcast.timestamp
@@ -1,12 +1,14 @@
 from __future__ import annotations as _annotations
 
-from collections.abc import AsyncIterator
+import asyncio
+from collections.abc import AsyncIterator, Iterator
 from contextlib import AsyncExitStack, asynccontextmanager
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Callable
 
 from ..exceptions import FallbackExceptionGroup, ModelHTTPError
 from . import KnownModelName, Model, ModelRequestParameters, StreamedResponse, infer_model
+from .circuit_breaker import CircuitBreaker
 
 if TYPE_CHECKING:
     from ..messages import ModelMessage, ModelResponse
@@ -19,18 +21,28 @@ class FallbackModel(Model):
     """A model that uses one or more fallback models upon failure.
 
     Apart from `__init__`, all methods are private or match those of the base class.
+
+    With `circuit_breaker_factory` set, each model gets a
+    [`CircuitBreaker`][pydantic_ai.models.circuit_breaker.CircuitBreaker] counting the errors which trigger a fallback.
+    Models whose circuit is open are skipped without being sent the request, unless no other model is left to try.
+    Once a circuit is half-open, a copy of the next request is sent to the model in the background as a probe, while
+    the request itself carries on with the next model; a successful probe closes the circuit again.
     """
 
     models: list[Model]
+    circuit_breakers: list[CircuitBreaker] | None
+    """The circuit breaker of each model, in the same order as `models`, if enabled."""
 
     _model_name: str = field(repr=False)
     _fallback_on: Callable[[Exception], bool]
+    _probes: set[asyncio.Task[None]] = field(repr=False)
 
     def __init__(
         self,
         default_model: Model | KnownModelName,
         *fallback_models: Model | KnownModelName,
         fallback_on: Callable[[Exception], bool] | tuple[type[Exception], ...] = (ModelHTTPError,),
+        circuit_breaker_factory: Callable[[], CircuitBreaker] | None = None,
     ):
         """Initialize a fallback model instance.
 
@@ -38,8 +50,15 @@ class FallbackModel(Model):
             default_model: The name or instance of the default model to use.
             fallback_models: The names or instances of the fallback models to use upon failure.
             fallback_on: A callable or tuple of exceptions that should trigger a fallback.
+            circuit_breaker_factory: Creates the circuit breaker for each model, e.g.
+                [`CircuitBreaker`][pydantic_ai.models.circuit_breaker.CircuitBreaker] itself for the default
+                thresholds. `None` disables circuit breaking.
         """
         self.models = [infer_model(default_model), *[infer_model(m) for m in fallback_models]]
+        self.circuit_breakers = (
+            [circuit_breaker_factory() for _ in self.models] if circuit_breaker_factory is not None else None
+        )
+        self._probes = set()
         self._model_name = f'FallBackModel[{", ".join(model.model_name for model in self.models)}]'
 
         if isinstance(fallback_on, tuple):
@@ -59,14 +78,17 @@ class FallbackModel(Model):
         """
         exceptions: list[Exception] = []
 
-        for model in self.models:
+        for model, breaker in self._candidates(messages, model_settings, model_request_parameters):
             try:
-                return await model.request(messages, model_settings, model_request_parameters)
+                response = await model.request(messages, model_settings, model_request_parameters)
             except Exception as exc:
+                self._record(breaker, exc)
                 if self._fallback_on(exc):
                     exceptions.append(exc)
                     continue
                 raise exc
+            self._record(breaker)
+            return response
 
         raise FallbackExceptionGroup('All models from FallbackModel failed', exceptions)
 
@@ -80,17 +102,19 @@ class FallbackModel(Model):
         """Try each model in sequence until one succeeds."""
         exceptions: list[Exception] = []
 
-        for model in self.models:
+        for model, breaker in self._candidates(messages, model_settings, model_request_parameters):
             async with AsyncExitStack() as stack:
                 try:
                     response = await stack.enter_async_context(
                         model.request_stream(messages, model_settings, model_request_parameters)
                     )
                 except Exception as exc:
+                    self._record(breaker, exc)
                     if self._fallback_on(exc):
                         exceptions.append(exc)
                         continue
                     raise exc
+                self._record(breaker)
                 yield response
                 return
 
@@ -110,6 +134,82 @@ class FallbackModel(Model):
     def base_url(self) -> str | None:
         return self.models[0].base_url
 
+    def _candidates(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> Iterator[tuple[Model, CircuitBreaker | None]]:
+        """Yield the models to try in order, with their circuit breaker.
+
+        Models whose circuit is open are skipped, and half-open ones are probed in the background instead. If no
+        circuit is closed, the half-open models are tried directly as their probe. Once those are used up, the models
+        which were skipped are tried anyway as a last resort, the one whose circuit will be probed soonest first.
+        """
+        if self.circuit_breakers is None:
+            for model in self.models:
+                yield model, None
+            return
+
+        candidates = list(zip(self.models, self.circuit_breakers))
+        skipped: list[tuple[Model, CircuitBreaker]] = []
+        if any(breaker.state == 'closed' for _, breaker in candidates):
+            for model, breaker in candidates:
+                if breaker.state == 'closed':
+                    yield model, breaker
+                elif breaker.acquire():
+                    self._probe(model, breaker, messages, model_settings, model_request_parameters)
+                else:
+                    skipped.append((model, breaker))
+        else:
+            for model, breaker in candidates:
+                if breaker.acquire():
+                    yield model, breaker
+                else:
+                    skipped.append((model, breaker))
+
+        # circuits which are half-open with all their probes in flight come last, as they have no `retry_at`
+        skipped.sort(key=lambda mb: float('inf') if mb[1].retry_at is None else mb[1].retry_at)
+        yield from skipped
+
+    def _probe(
+        self,
+        model: Model,
+        breaker: CircuitBreaker,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> None:
+        """Send a copy of the request to a model with a half-open circuit, without waiting for the response."""
+        # the agent appends to the message history once the request is answered, possibly before the probe is sent
+        messages = list(messages)
+
+        async def probe() -> None:
+            try:
+                await model.request(messages, model_settings, model_request_parameters)
+            except BaseException as exc:
+                self._record(breaker, exc)
+                if not isinstance(exc, Exception):
+                    raise
+            else:
+                self._record(breaker)
+
+        task = asyncio.create_task(probe())
+        # keep a reference so the task isn't garbage collected before it's done
+        self._probes.add(task)
+        task.add_done_callback(self._probes.discard)
+
+    def _record(self, breaker: CircuitBreaker | None, exc: BaseException | None = None) -> None:
+        """Record the outcome of a request on the model's circuit breaker."""
+        if breaker is None:
+            return
+        if exc is None:
+            breaker.record_success()
+        elif isinstance(exc, Exception) and self._fallback_on(exc):
+            breaker.record_failure()
+        else:
+            breaker.release()
+
 
 def _default_fallback_condition_factory(exceptions: tuple[type[Exception], ...]) -> Callable[[Exception], bool]:
     """Create a default fallback condition for the given exceptions."""
@@ -1,6 +1,7 @@
 from __future__ import annotations as _annotations
 
-import base64
+import asyncio
+import hashlib
 import os
 import re
 from collections.abc import AsyncIterator, Sequence
@@ -12,8 +13,8 @@ from typing import Annotated, Any, Literal, Protocol, Union, cast, overload
 from uuid import uuid4
 
 import pydantic
-from httpx import USE_CLIENT_DEFAULT, AsyncClient as AsyncHTTPClient, Response as HTTPResponse
-from typing_extensions import NotRequired, TypedDict, assert_never, deprecated
+from httpx import URL, USE_CLIENT_DEFAULT, AsyncClient as AsyncHTTPClient, Response as HTTPResponse
+from typing_extensions import NotRequired, TypeAlias, TypedDict, assert_never, deprecated
 
 from pydantic_ai.providers import Provider, infer_provider
 
@@ -44,6 +45,7 @@ from . import (
     check_allow_model_requests,
     get_user_agent,
 )
+from .media import MediaStore, UploadedFile, get_media_store, get_url_cache
 
 LatestGeminiModelNames = Literal[
     'gemini-1.5-flash',
@@ -91,6 +93,9 @@ class GeminiModel(Model):
     _auth: AuthProtocol | None = field(repr=False)
     _url: str | None = field(repr=False)
     _system: str | None = field(default='google-gla', repr=False)
+    _message_cache: _utils.MessageMappingCache[_MappedMessage] = field(repr=False, compare=False)
+    _media_store: MediaStore = field(repr=False, compare=False)
+    _file_upload_threshold: int | None = field(default=None, repr=False)
 
     @overload
     def __init__(
@@ -98,6 +103,8 @@ class GeminiModel(Model):
         model_name: GeminiModelName,
         *,
         provider: Literal['google-gla', 'google-vertex'] | Provider[AsyncHTTPClient] = 'google-gla',
+        media_store: MediaStore | None = None,
+        file_upload_threshold: int | None = None,
     ) -> None: ...
 
     @deprecated('Use the `provider` argument instead of the `api_key`, `http_client`, and `url_template` arguments.')
@@ -110,6 +117,8 @@ class GeminiModel(Model):
         api_key: str | None = None,
         http_client: AsyncHTTPClient | None = None,
         url_template: str = 'https://generativelanguage.googleapis.com/v1beta/models/{model}:',
+        media_store: MediaStore | None = None,
+        file_upload_threshold: int | None = None,
     ) -> None: ...
 
     def __init__(
@@ -120,6 +129,8 @@ class GeminiModel(Model):
         api_key: str | None = None,
         http_client: AsyncHTTPClient | None = None,
         url_template: str = 'https://generativelanguage.googleapis.com/v1beta/models/{model}:',
+        media_store: MediaStore | None = None,
+        file_upload_threshold: int | None = None,
     ):
         """Initialize a Gemini model.
 
@@ -132,8 +143,17 @@ class GeminiModel(Model):
             url_template: The URL template to use for making requests, you shouldn't need to change this,
                 docs [here](https://ai.google.dev/gemini-api/docs/quickstart?lang=rest#make-first-request),
                 `model` is substituted with the model name, and `function` is added to the end of the URL.
+            media_store: The store caching the encoded and uploaded forms of binary content, defaults to the
+                [shared store][pydantic_ai.models.media.get_media_store].
+            file_upload_threshold: Binary content larger than this many bytes is uploaded once with the
+                [File API](https://ai.google.dev/gemini-api/docs/files) and referenced afterwards, instead of being
+                sent inline with every request. `None` always sends it inline. Only supported by the `google-gla`
+                provider; uploaded files are kept by Google for 48 hours.
         """
         self._model_name = model_name
+        self._message_cache = _utils.MessageMappingCache()
+        self._media_store = media_store or get_media_store()
+        self._file_upload_threshold = file_upload_threshold
         self._provider = provider
 
         if provider is not None:
@@ -150,9 +170,9 @@ class GeminiModel(Model):
                     api_key = env_api_key
                 else:
                     raise UserError('API key must be provided or set in the GEMINI_API_KEY environment variable')
-            self.client = http_client or cached_async_http_client()
-            self._auth = ApiKeyAuth(api_key)
             self._url = url_template.format(model=model_name)
+            self.client = http_client or cached_async_http_client(base_url=self._url)
+            self._auth = ApiKeyAuth(api_key)
 
     @property
     def auth(self) -> AuthProtocol:
@@ -275,7 +295,9 @@ class GeminiModel(Model):
             if (status_code := r.status_code) != 200:
                 await r.aread()
                 if status_code >= 400:
-                    raise ModelHTTPError(status_code=status_code, model_name=self.model_name, body=r.text)
+                    raise ModelHTTPError(
+                        status_code=status_code, model_name=self.model_name, body=r.text, headers=r.headers
+                    )
                 raise UnexpectedModelBehavior(f'Unexpected response from gemini {status_code}', r.text)
             yield r
 
@@ -313,75 +335,169 @@ class GeminiModel(Model):
 
         return GeminiStreamedResponse(_model_name=self._model_name, _content=content, _stream=aiter_bytes)
 
-    @classmethod
     async def _message_to_gemini_content(
-        cls, messages: list[ModelMessage]
+        self, messages: list[ModelMessage]
     ) -> tuple[list[_GeminiTextPart], list[_GeminiContent]]:
         sys_prompt_parts: list[_GeminiTextPart] = []
         contents: list[_GeminiContent] = []
         for m in messages:
-            if isinstance(m, ModelRequest):
-                message_parts: list[_GeminiPartUnion] = []
-
-                for part in m.parts:
-                    if isinstance(part, SystemPromptPart):
-                        sys_prompt_parts.append(_GeminiTextPart(text=part.content))
-                    elif isinstance(part, UserPromptPart):
-                        message_parts.extend(await cls._map_user_prompt(part))
-                    elif isinstance(part, ToolReturnPart):
-                        message_parts.append(_response_part_from_response(part.tool_name, part.model_response_object()))
-                    elif isinstance(part, RetryPromptPart):
-                        if part.tool_name is None:
-                            message_parts.append(_GeminiTextPart(text=part.model_response()))
-                        else:
-                            response = {'call_error': part.model_response()}
-                            message_parts.append(_response_part_from_response(part.tool_name, response))
-                    else:
-                        assert_never(part)
+            message_sys_prompt_parts, content, uploads = await self._message_cache.aget(m, self._map_message)
+            if any(self._media_store.is_expiring(f) for f in uploads):
+                self._message_cache.discard(m)
+                message_sys_prompt_parts, content, uploads = await self._message_cache.aget(m, self._map_message)
+            sys_prompt_parts.extend(message_sys_prompt_parts)
+            if content is not None:
+                contents.append(content)
+        return sys_prompt_parts, contents
 
-                if message_parts:
-                    contents.append(_GeminiContent(role='user', parts=message_parts))
-            elif isinstance(m, ModelResponse):
-                contents.append(_content_model_response(m))
-            else:
-                assert_never(m)
+    async def _map_message(self, m: ModelMessage) -> _MappedMessage:
+        """Map a message to its system prompt parts, its content, if any, and the files it refers to."""
+        sys_prompt_parts: list[_GeminiTextPart] = []
+        uploads: list[UploadedFile] = []
+        if isinstance(m, ModelRequest):
+            message_parts: list[_GeminiPartUnion] = []
+
+            for part in m.parts:
+                if isinstance(part, SystemPromptPart):
+                    sys_prompt_parts.append(_GeminiTextPart(text=part.content))
+                elif isinstance(part, UserPromptPart):
+                    message_parts.extend(await self._map_user_prompt(part, uploads))
+                elif isinstance(part, ToolReturnPart):
+                    message_parts.append(_response_part_from_response(part.tool_name, part.model_response_object()))
+                elif isinstance(part, RetryPromptPart):
+                    if part.tool_name is None:
+                        message_parts.append(_GeminiTextPart(text=part.model_response()))
+                    else:
+                        response = {'call_error': part.model_response()}
+                        message_parts.append(_response_part_from_response(part.tool_name, response))
+                else:
+                    assert_never(part)
 
-        return sys_prompt_parts, contents
+            content = _GeminiContent(role='user', parts=message_parts) if message_parts else None
+            return sys_prompt_parts, content, uploads
+        elif isinstance(m, ModelResponse):
+            return sys_prompt_parts, _content_model_response(m), uploads
+        else:
+            assert_never(m)
 
-    @staticmethod
-    async def _map_user_prompt(part: UserPromptPart) -> list[_GeminiPartUnion]:
+    async def _map_user_prompt(self, part: UserPromptPart, uploads: list[UploadedFile]) -> list[_GeminiPartUnion]:
         if isinstance(part.content, str):
             return [{'text': part.content}]
         else:
             content: list[_GeminiPartUnion] = []
+            await get_url_cache().prefetch(
+                item.url for item in part.content if isinstance(item, (AudioUrl, ImageUrl)) and _needs_download(item)
+            )
             for item in part.content:
                 if isinstance(item, str):
                     content.append({'text': item})
                 elif isinstance(item, BinaryContent):
-                    base64_encoded = base64.b64encode(item.data).decode('utf-8')
-                    content.append(
-                        _GeminiInlineDataPart(inline_data={'data': base64_encoded, 'mime_type': item.media_type})
-                    )
-                elif isinstance(item, (AudioUrl, ImageUrl)):
-                    try:
+                    if self._should_upload(item):
+                        uploaded = await self._media_store.upload(item, await self._upload_namespace(), self._upload)
+                        uploads.append(uploaded)
                         content.append(
-                            _GeminiFileDataPart(file_data={'file_uri': item.url, 'mime_type': item.media_type})
+                            _GeminiFileDataPart(file_data={'file_uri': uploaded.uri, 'mime_type': uploaded.mime_type})
+                        )
+                    else:
+                        base64_encoded = self._media_store.base64(item)
+                        content.append(
+                            _GeminiInlineDataPart(inline_data={'data': base64_encoded, 'mime_type': item.media_type})
                         )
-                    except ValueError:
+                elif isinstance(item, (AudioUrl, ImageUrl)):
+                    if _needs_download(item):
                         # Download the file if can't find the mime type.
-                        client = cached_async_http_client()
-                        response = await client.get(item.url, follow_redirects=True)
-                        response.raise_for_status()
-                        base64_encoded = base64.b64encode(response.content).decode('utf-8')
+                        downloaded = await get_url_cache().fetch(item.url)
+                        base64_encoded = self._media_store.base64(downloaded)
                         content.append(
                             _GeminiInlineDataPart(
-                                inline_data={'data': base64_encoded, 'mime_type': response.headers['Content-Type']}
+                                inline_data={'data': base64_encoded, 'mime_type': downloaded.media_type}
                             )
                         )
+                    else:
+                        content.append(
+                            _GeminiFileDataPart(file_data={'file_uri': item.url, 'mime_type': item.media_type})
+                        )
                 else:
                     assert_never(item)
         return content
 
+    def _should_upload(self, item: BinaryContent) -> bool:
+        return (
+            self._file_upload_threshold is not None
+            and self._system == 'google-gla'
+            and len(item.data) > self._file_upload_threshold
+        )
+
+    async def _file_api_headers(self) -> dict[str, str]:
+        headers = {'User-Agent': get_user_agent()}
+        if self._provider is None:  # pragma: no cover
+            headers.update(await self.auth.headers())
+        return headers
+
+    async def _upload_namespace(self) -> str:
+        """Identify the project files are uploaded to, by the API key, as files can only be used by their project."""
+        headers = {**self.client.headers, **(await self._file_api_headers())}
+        api_key = headers.get('x-goog-api-key') or headers.get('X-Goog-Api-Key') or ''
+        return f'{self._system}:{hashlib.sha256(api_key.encode()).hexdigest()}'
+
+    async def _upload(self, item: BinaryContent) -> UploadedFile:
+        """Upload binary content with the resumable upload protocol of the File API.
+
+        See <https://ai.google.dev/api/files#method:-media.upload>.
+        """
+        base_url = URL(self.base_url)
+        headers = await self._file_api_headers()
+        start = await self.client.post(
+            str(base_url.copy_with(path='/upload/v1beta/files', query=None)),
+            headers={
+                **headers,
+                'X-Goog-Upload-Protocol': 'resumable',
+                'X-Goog-Upload-Command': 'start',
+                'X-Goog-Upload-Header-Content-Length': str(len(item.data)),
+                'X-Goog-Upload-Header-Content-Type': item.media_type,
+            },
+            json={'file': {'display_name': MediaStore.digest(item)}},
+        )
+        self._check_file_api_response(start)
+        response = await self.client.post(
+            start.headers['X-Goog-Upload-URL'],
+            headers={**headers, 'X-Goog-Upload-Offset': '0', 'X-Goog-Upload-Command': 'upload, finalize'},
+            content=item.data,
+        )
+        self._check_file_api_response(response)
+        file = _gemini_file_response_ta.validate_json(response.content)['file']
+
+        # audio and video are processed before they can be used
+        while file.get('state') == 'PROCESSING':
+            await asyncio.sleep(1)
+            response = await self.client.get(
+                str(base_url.copy_with(path=f'/v1beta/{file["name"]}', query=None)), headers=headers
+            )
+            self._check_file_api_response(response)
+            file = _gemini_file_ta.validate_json(response.content)
+        if file.get('state') == 'FAILED':
+            raise UnexpectedModelBehavior('Gemini failed to process the uploaded file', str(file))
+
+        return UploadedFile(uri=file['uri'], mime_type=file['mime_type'], expires_at=file.get('expiration_time'))
+
+    def _check_file_api_response(self, response: HTTPResponse) -> None:
+        if response.status_code >= 400:
+            raise ModelHTTPError(
+                status_code=response.status_code,
+                model_name=self.model_name,
+                body=response.text,
+                headers=response.headers,
+            )
+
+
+def _needs_download(item: AudioUrl | ImageUrl) -> bool:
+    """Whether the media type can't be inferred from the URL, so it has to be downloaded and sent inline."""
+    try:
+        item.media_type
+    except ValueError:
+        return True
+    return False
+
 
 class AuthProtocol(Protocol):
     """Abstract definition for Gemini authentication."""
@@ -556,6 +672,10 @@ class _GeminiContent(TypedDict):
     parts: list[_GeminiPartUnion]
 
 
+_MappedMessage: TypeAlias = 'tuple[list[_GeminiTextPart], _GeminiContent | None, list[UploadedFile]]'
+"""A message's system prompt parts, its content, and the uploaded files the content refers to."""
+
+
 def _content_model_response(m: ModelResponse) -> _GeminiContent:
     parts: list[_GeminiPartUnion] = []
     for item in m.parts:
@@ -595,6 +715,24 @@ class _GeminiFileDataPart(TypedDict):
     file_data: Annotated[_GeminiFileData, pydantic.Field(alias='fileData')]
 
 
+class _GeminiFile(TypedDict):
+    """See <https://ai.google.dev/api/files#File>."""
+
+    name: str
+    uri: str
+    mime_type: Annotated[str, pydantic.Field(alias='mimeType')]
+    expiration_time: NotRequired[Annotated[datetime, pydantic.Field(alias='expirationTime')]]
+    state: NotRequired[Literal['STATE_UNSPECIFIED', 'PROCESSING', 'ACTIVE', 'FAILED']]
+
+
+class _GeminiFileResponse(TypedDict):
+    file: _GeminiFile
+
+
+_gemini_file_ta = pydantic.TypeAdapter(_GeminiFile)
+_gemini_file_response_ta = pydantic.TypeAdapter(_GeminiFileResponse)
+
+
 class _GeminiFunctionCallPart(TypedDict):
     function_call: Annotated[_GeminiFunctionCall, pydantic.Field(alias='functionCall')]
 
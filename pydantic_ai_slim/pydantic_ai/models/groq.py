@@ -92,6 +92,7 @@ class GroqModel(Model):
 
     _model_name: GroqModelName = field(repr=False)
     _system: str | None = field(default='groq', repr=False)
+    _message_cache: _utils.MessageMappingCache[list[chat.ChatCompletionMessageParam]] = field(repr=False, compare=False)
 
     def __init__(
         self,
@@ -114,6 +115,7 @@ class GroqModel(Model):
             http_client: An existing `httpx.AsyncClient` to use for making HTTP requests.
         """
         self._model_name = model_name
+        self._message_cache = _utils.MessageMappingCache()
         if groq_client is not None:
             assert http_client is None, 'Cannot provide both `groq_client` and `http_client`'
             assert api_key is None, 'Cannot provide both `groq_client` and `api_key`'
@@ -121,7 +123,9 @@ class GroqModel(Model):
         elif http_client is not None:
             self.client = AsyncGroq(api_key=api_key, http_client=http_client)
         else:
-            self.client = AsyncGroq(api_key=api_key, http_client=cached_async_http_client())
+            self.client = AsyncGroq(
+                api_key=api_key, http_client=cached_async_http_client(base_url='https://api.groq.com')
+            )
 
     @property
     def base_url(self) -> str:
@@ -199,7 +203,7 @@ class GroqModel(Model):
         else:
             tool_choice = 'auto'
 
-        groq_messages = list(chain(*(self._map_message(m) for m in messages)))
+        groq_messages = list(chain(*(self._message_cache.get(m, self._map_message_params) for m in messages)))
 
         try:
             return await self.client.chat.completions.create(
@@ -221,7 +225,9 @@ class GroqModel(Model):
             )
         except APIStatusError as e:
             if (status_code := e.status_code) >= 400:
-                raise ModelHTTPError(status_code=status_code, model_name=self.model_name, body=e.body) from e
+                raise ModelHTTPError(
+                    status_code=status_code, model_name=self.model_name, body=e.body, headers=e.response.headers
+                ) from e
             raise
 
     def _process_response(self, response: chat.ChatCompletion) -> ModelResponse:
@@ -255,6 +261,9 @@ class GroqModel(Model):
             tools += [self._map_tool_definition(r) for r in model_request_parameters.result_tools]
         return tools
 
+    def _map_message_params(self, message: ModelMessage) -> list[chat.ChatCompletionMessageParam]:
+        return list(self._map_message(message))
+
     def _map_message(self, message: ModelMessage) -> Iterable[chat.ChatCompletionMessageParam]:
         """Just maps a `pydantic_ai.Message` to a `groq.types.ChatCompletionMessageParam`."""
         if isinstance(message, ModelRequest):
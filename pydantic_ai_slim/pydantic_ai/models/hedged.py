@@ -0,0 +1,279 @@
+"""Hedged requests across models, to cut tail latency.
+
+[`HedgedModel`][pydantic_ai.models.hedged.HedgedModel] sends a request to the primary model and, if no response has
+arrived after a delay, sends the same request to the next model too. Whichever answers first is used and the others
+are cancelled.
+"""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, TypeVar
+
+from ..exceptions import FallbackExceptionGroup, ModelHTTPError
+from ..messages import ModelMessage, ModelResponse, ModelResponseStreamEvent
+from ..settings import ModelSettings
+from ..usage import Usage
+from . import KnownModelName, Model, ModelRequestParameters, StreamedResponse, infer_model
+from .fallback import _default_fallback_condition_factory  # pyright: ignore[reportPrivateUsage]
+
+_T = TypeVar('_T')
+
+
+@dataclass(init=False)
+class HedgedModel(Model):
+    """A model which races a backup model against a slow primary model.
+
+    The request is sent to the first model straight away. Each time `delay` passes without a response, or a model
+    fails with an error matching `hedge_on`, the request is also sent to the next model. The first successful response
+    wins, and the requests still running are cancelled.
+
+    The delay is static until `min_samples` latencies of the primary model have been observed, after which it adapts
+    to the `quantile` of the recent latencies, so only the slowest requests are hedged.
+
+    For streamed requests the first model to start streaming wins, for most models that means the first to send a
+    token.
+
+    The usage returned is that of the winning model, with the number of requests increased by the number of losing
+    requests, since they have usually been billed at least for their prompt.
+    """
+
+    models: list[Model]
+    delay: float
+    quantile: float | None
+    min_samples: int
+    hedged: int
+    """The number of requests which were sent to more than one model."""
+    wins: dict[str, int]
+    """The number of requests won by each model, by model name."""
+
+    _model_name: str = field(repr=False)
+    _hedge_on: Callable[[Exception], bool] = field(repr=False)
+    _latencies: deque[float] = field(repr=False)
+
+    def __init__(
+        self,
+        primary_model: Model | KnownModelName,
+        *hedge_models: Model | KnownModelName,
+        delay: float = 2.0,
+        quantile: float | None = 0.95,
+        min_samples: int = 20,
+        window: int = 200,
+        hedge_on: Callable[[Exception], bool] | tuple[type[Exception], ...] = (ModelHTTPError,),
+    ):
+        """Initialize a hedged model instance.
+
+        Args:
+            primary_model: The name or instance of the model to send every request to first.
+            hedge_models: The names or instances of the models to send slow requests to, in order.
+            delay: The time in seconds to wait for a response before hedging, until enough latencies have been seen.
+            quantile: The quantile of the primary model's recent latencies to use as the delay, e.g. `0.95` to hedge
+                the slowest 5% of requests. `None` means always use `delay`.
+            min_samples: How many latencies to observe before adapting the delay.
+            window: How many recent latencies to use for the quantile.
+            hedge_on: A callable or tuple of exceptions which should trigger the next model immediately, other errors
+                are raised straight away.
+        """
+        if not hedge_models:
+            raise ValueError('At least one hedge model is required.')
+        self.models = [infer_model(primary_model), *[infer_model(m) for m in hedge_models]]
+        self._model_name = f'HedgedModel[{", ".join(model.model_name for model in self.models)}]'
+        self.delay = delay
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.hedged = 0
+        self.wins = {}
+        self._latencies = deque(maxlen=window)
+
+        if isinstance(hedge_on, tuple):
+            self._hedge_on = _default_fallback_condition_factory(hedge_on)
+        else:
+            self._hedge_on = hedge_on
+
+    @property
+    def current_delay(self) -> float:
+        """The time in seconds the next request will wait for the primary model before hedging."""
+        if self.quantile is None or len(self._latencies) < self.min_samples:
+            return self.delay
+        latencies = sorted(self._latencies)
+        return latencies[round(self.quantile * (len(latencies) - 1))]
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        """Send the request to each model in turn, until one of them responds."""
+
+        def start(model: Model) -> tuple[asyncio.Task[Any], Awaitable[tuple[ModelResponse, Usage]]]:
+            task = asyncio.create_task(model.request(messages, model_settings, model_request_parameters))
+            return task, task
+
+        _, (response, usage), started = await self._race(start)
+        if started > 1:
+            usage = usage + Usage(requests=started - 1)
+        return response, usage
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        """Open a stream with each model in turn, and use the one which starts streaming first."""
+        contenders: dict[asyncio.Task[Any], _StreamContender] = {}
+
+        def start(model: Model) -> tuple[asyncio.Task[Any], Awaitable[StreamedResponse]]:
+            contender = _StreamContender()
+            task = asyncio.create_task(contender.run(model, messages, model_settings, model_request_parameters))
+            contenders[task] = contender
+            return task, contender.wait_ready(task)
+
+        winner, stream, started = await self._race(start, keep_winner=True)
+        try:
+            yield _HedgedStreamedResponse(stream, started - 1) if started > 1 else stream
+        finally:
+            contenders[winner].release.set()
+            await winner
+
+    @property
+    def model_name(self) -> str:
+        """The model name."""
+        return self._model_name
+
+    @property
+    def system(self) -> str | None:
+        return None
+
+    @property
+    def base_url(self) -> str | None:
+        return self.models[0].base_url
+
+    async def _race(
+        self,
+        start: Callable[[Model], tuple[asyncio.Task[Any], Awaitable[_T]]],
+        *,
+        keep_winner: bool = False,
+    ) -> tuple[asyncio.Task[Any], _T, int]:
+        """Start models one after another until one of them produces a result.
+
+        Args:
+            start: Starts the request to a model in a task, returning the task and an awaitable for its result.
+            keep_winner: Whether to leave the winning task running, for streams which stay open.
+
+        Returns:
+            The winning task, its result and the number of models which were started.
+        """
+        remaining = iter(self.models)
+        pending: dict[asyncio.Future[_T], tuple[asyncio.Task[Any], Model]] = {}
+        running: list[asyncio.Task[Any]] = []
+        exceptions: list[Exception] = []
+        started_at = time.monotonic()
+
+        def launch() -> bool:
+            model = next(remaining, None)
+            if model is None:
+                return False
+            task, result = start(model)
+            running.append(task)
+            pending[asyncio.ensure_future(result)] = task, model
+            return True
+
+        launch()
+        winner: asyncio.Task[Any] | None = None
+        try:
+            while pending:
+                timeout = self.current_delay if len(running) < len(self.models) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if len(running) == 1:
+                        self.hedged += 1
+                    launch()
+                    continue
+
+                for future in done:
+                    task, model = pending.pop(future)
+                    if (exc := future.exception()) is None:
+                        if model is self.models[0] or not running[0].done():
+                            # a primary which lost is recorded as at least as slow as the winner, so the quantile
+                            # isn't skewed towards the requests which weren't hedged
+                            self._latencies.append(time.monotonic() - started_at)
+                        self.wins[model.model_name] = self.wins.get(model.model_name, 0) + 1
+                        winner = task
+                        return task, future.result(), len(running)
+                    assert isinstance(exc, Exception)
+                    if not self._hedge_on(exc):
+                        raise exc
+                    exceptions.append(exc)
+                    # the next model is started straight away, even if others are still running
+                    launch()
+        finally:
+            losers = [task for task in running if task is not winner or not keep_winner]
+            for task in losers:
+                task.cancel()
+            await asyncio.gather(*losers, return_exceptions=True)
+            for future in pending:
+                future.cancel()
+
+        raise FallbackExceptionGroup('All models from HedgedModel failed', exceptions)
+
+
+class _StreamContender:
+    """Holds a model's stream open in its own task, until it is released or cancelled."""
+
+    def __init__(self) -> None:
+        self.ready: asyncio.Future[StreamedResponse] = asyncio.get_running_loop().create_future()
+        self.release = asyncio.Event()
+
+    async def run(
+        self,
+        model: Model,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> None:
+        async with model.request_stream(messages, model_settings, model_request_parameters) as stream:
+            self.ready.set_result(stream)
+            await self.release.wait()
+
+    async def wait_ready(self, task: asyncio.Task[None]) -> StreamedResponse:
+        """Wait until the stream is open, or raise the error the task failed with."""
+        await asyncio.wait([self.ready, task], return_when=asyncio.FIRST_COMPLETED)
+        if self.ready.done():
+            return self.ready.result()
+        task.result()
+        raise RuntimeError('Stream closed before it was opened')  # pragma: no cover
+
+
+@dataclass
+class _HedgedStreamedResponse(StreamedResponse):
+    """Wraps the winning stream, to count the requests of the models which lost."""
+
+    _wrapped: StreamedResponse
+    _lost_requests: int
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        async for event in self._wrapped:
+            yield event
+
+    def get(self) -> ModelResponse:
+        return self._wrapped.get()
+
+    def usage(self) -> Usage:
+        return self._wrapped.usage() + Usage(requests=self._lost_requests)
+
+    @property
+    def model_name(self) -> str:
+        return self._wrapped.model_name
+
+    @property
+    def timestamp(self) -> datetime:
+        return self._wrapped.timestamp
@@ -0,0 +1,328 @@
+"""HTTP connection pools for model providers.
+
+By default every provider shares the single client returned by
+[`cached_async_http_client`][pydantic_ai.models.cached_async_http_client], with `httpx`'s default limit of 100
+connections. With many concurrent streams that limit becomes a hidden queue, and one slow provider can hold connections
+the others need.
+
+An [`HTTPClientPool`][pydantic_ai.models.http_pool.HTTPClientPool] instead creates a client per origin (scheme, host and
+port), each with its own connection limits, timeouts and optionally HTTP/2 and DNS caching, and reports how saturated
+each pool is as OpenTelemetry metrics. Install one with
+[`set_http_client_pool`][pydantic_ai.models.http_pool.set_http_client_pool] before creating models, and close it on
+shutdown.
+"""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+import ipaddress
+import socket
+import time
+from collections.abc import AsyncIterator, Mapping
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import TYPE_CHECKING, Callable
+
+import httpx
+
+if TYPE_CHECKING:
+    from opentelemetry.metrics import Counter, MeterProvider, UpDownCounter
+
+
+@dataclass
+class HTTPPoolSettings:
+    """Connection pool and timeout settings for the client of one origin."""
+
+    max_connections: int | None = 100
+    """The maximum number of concurrent connections, further requests wait for a free one. `None` means no limit."""
+    max_keepalive_connections: int | None = 20
+    """The maximum number of idle connections kept open for reuse."""
+    keepalive_expiry: float | None = 5.0
+    """How long in seconds an idle connection is kept open."""
+    http2: bool = False
+    """Whether to use HTTP/2 where the server supports it, multiplexing requests over fewer connections.
+
+    Requires the `h2` package, install it with `pip install 'httpx[http2]'`.
+    """
+    connect_timeout: float | None = 5.0
+    """The timeout in seconds for establishing a connection."""
+    read_timeout: float | None = 600.0
+    """The timeout in seconds between chunks of the response, and for sending the request."""
+    pool_timeout: float | None = 600.0
+    """The timeout in seconds for waiting for a free connection when the pool is saturated."""
+    dns_cache_ttl: float | None = None
+    """How long in seconds to cache DNS lookups for, `None` disables caching and resolves with every new connection."""
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        """The timeouts as an `httpx.Timeout`."""
+        return httpx.Timeout(
+            connect=self.connect_timeout, read=self.read_timeout, write=self.read_timeout, pool=self.pool_timeout
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        """The connection limits as an `httpx.Limits`."""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+@dataclass
+class HTTPPoolStats:
+    """Counters describing the requests made through the client of one origin."""
+
+    max_connections: int | None
+    """The connection limit of the pool."""
+    requests: int = 0
+    """The number of requests sent."""
+    in_flight: int = 0
+    """The number of requests whose response hasn't been closed yet, including streams being read."""
+    peak_in_flight: int = 0
+    """The highest number of requests in flight at once."""
+    saturated_requests: int = 0
+    """The number of requests sent while every connection was already in use, which had to queue for one.
+
+    With HTTP/2 this overestimates, since requests can share a connection.
+    """
+
+    @property
+    def saturation(self) -> float:
+        """The fraction of the connection limit currently in use, above `1` requests are queueing."""
+        return self.in_flight / self.max_connections if self.max_connections else 0.0
+
+
+class DNSCache:
+    """Caches the addresses hostnames resolve to for `ttl` seconds."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[tuple[str, int], tuple[str, float]] = {}
+
+    async def resolve(self, host: str, port: int) -> str:
+        """Return an address for `host`, looking it up if it isn't cached or the entry has expired."""
+        key = host, port
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        address = str(infos[0][4][0])
+        self._entries[key] = address, now + self.ttl
+        return address
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class _PoolTransport(httpx.AsyncBaseTransport):
+    """Wraps a transport to count requests in flight and, optionally, resolve hostnames through a `DNSCache`."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        origin: str,
+        stats: HTTPPoolStats,
+        active_requests: UpDownCounter,
+        saturated_requests: Counter,
+        dns_cache: DNSCache | None = None,
+    ):
+        self._transport = transport
+        self._stats = stats
+        self._attributes = {'server.address': origin}
+        self._active_requests = active_requests
+        self._saturated_requests = saturated_requests
+        self._dns_cache = dns_cache
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._dns_cache is not None:
+            await self._resolve(request)
+
+        stats = self._stats
+        if stats.max_connections is not None and stats.in_flight >= stats.max_connections:
+            stats.saturated_requests += 1
+            self._saturated_requests.add(1, self._attributes)
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        self._active_requests.add(1, self._attributes)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._finished()
+            raise
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        response.stream = _TrackedStream(response.stream, self._finished)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    async def _resolve(self, request: httpx.Request) -> None:
+        """Point the request at a cached address, keeping the hostname for the `Host` header and TLS."""
+        assert self._dns_cache is not None
+        host = request.url.host
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            address = await self._dns_cache.resolve(
+                host, request.url.port or (443 if request.url.scheme == 'https' else 80)
+            )
+            request.url = request.url.copy_with(host=address)
+            request.extensions = {**request.extensions, 'sni_hostname': host}
+
+    def _finished(self) -> None:
+        self._stats.in_flight -= 1
+        self._active_requests.add(-1, self._attributes)
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close: Callable[[], None] | None = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
+@dataclass(init=False)
+class HTTPClientPool:
+    """Creates and owns an `httpx.AsyncClient` per origin.
+
+    Use it as an async context manager, or call [`aclose`][pydantic_ai.models.http_pool.HTTPClientPool.aclose] on
+    shutdown, to close all connections.
+    """
+
+    settings: HTTPPoolSettings
+    """The settings used for origins without an override."""
+    overrides: dict[str, HTTPPoolSettings]
+    """Settings for specific origins, e.g. `{'https://api.openai.com': HTTPPoolSettings(max_connections=500)}`."""
+
+    _clients: dict[str, httpx.AsyncClient] = field(repr=False)
+    _stats: dict[str, HTTPPoolStats] = field(repr=False)
+    _active_requests: UpDownCounter = field(repr=False)
+    _saturated_requests: Counter = field(repr=False)
+
+    def __init__(
+        self,
+        settings: HTTPPoolSettings | None = None,
+        *,
+        overrides: Mapping[str, HTTPPoolSettings] | None = None,
+        meter_provider: MeterProvider | None = None,
+    ):
+        """Create a pool of HTTP clients.
+
+        Args:
+            settings: The default settings for each origin's client.
+            overrides: Settings for specific origins, keyed by base URL; only the scheme, host and port are used.
+            meter_provider: The OpenTelemetry meter provider to report metrics to.
+                If not provided, the global meter provider is used.
+                Calling `logfire.configure()` sets the global meter provider, so most users don't need this.
+        """
+        self.settings = settings or HTTPPoolSettings()
+        self.overrides = {_origin(url): s for url, s in (overrides or {}).items()}
+        self._clients = {}
+        self._stats = {}
+
+        # imported here so OpenTelemetry is only loaded when a pool is actually created
+        from opentelemetry.metrics import get_meter_provider
+
+        from .. import __version__
+
+        meter = (meter_provider or get_meter_provider()).get_meter('pydantic-ai', __version__)
+        self._active_requests = meter.create_up_down_counter(
+            'http.client.active_requests',
+            unit='{request}',
+            description='Requests in flight through a pydantic-ai HTTP connection pool, including open streams.',
+        )
+        self._saturated_requests = meter.create_counter(
+            'pydantic_ai.http_pool.saturated_requests',
+            unit='{request}',
+            description='Requests sent while every connection of the pool was already in use.',
+        )
+
+    def get_client(self, base_url: str | None = None) -> httpx.AsyncClient:
+        """Get the client for the origin of `base_url`, creating it if needed.
+
+        Args:
+            base_url: The URL requests will be sent to, `None` for a shared client used for any other URL, e.g. to
+                download media.
+        """
+        origin = _origin(base_url) if base_url else 'default'
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = self._clients[origin] = self._create_client(origin)
+        return client
+
+    @property
+    def stats(self) -> dict[str, HTTPPoolStats]:
+        """The statistics of each client, by origin."""
+        return dict(self._stats)
+
+    async def aclose(self) -> None:
+        """Close every client and its connections."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(client.aclose() for client in clients))
+
+    async def __aenter__(self) -> HTTPClientPool:
+        return self
+
+    async def __aexit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None
+    ) -> None:
+        await self.aclose()
+
+    def _create_client(self, origin: str) -> httpx.AsyncClient:
+        from . import get_user_agent
+
+        settings = self.overrides.get(origin, self.settings)
+        stats = self._stats.setdefault(origin, HTTPPoolStats(settings.max_connections))
+        stats.max_connections = settings.max_connections
+        transport = _PoolTransport(
+            httpx.AsyncHTTPTransport(limits=settings.limits, http2=settings.http2),
+            origin,
+            stats,
+            self._active_requests,
+            self._saturated_requests,
+            DNSCache(settings.dns_cache_ttl) if settings.dns_cache_ttl else None,
+        )
+        return httpx.AsyncClient(
+            transport=transport, timeout=settings.timeout, headers={'User-Agent': get_user_agent()}
+        )
+
+
+def _origin(url: str) -> str:
+    parsed = httpx.URL(url)
+    port = f':{parsed.port}' if parsed.port is not None else ''
+    return f'{parsed.scheme}://{parsed.host}{port}'
+
+
+_http_client_pool: HTTPClientPool | None = None
+
+
+def get_http_client_pool() -> HTTPClientPool | None:
+    """Get the pool installed with [`set_http_client_pool`][pydantic_ai.models.http_pool.set_http_client_pool]."""
+    return _http_client_pool
+
+
+def set_http_client_pool(pool: HTTPClientPool | None) -> None:
+    """Make models and providers created from now on get their HTTP client from `pool`.
+
+    This affects every model and provider which would otherwise use
+    [`cached_async_http_client`][pydantic_ai.models.cached_async_http_client], i.e. those not given an explicit client.
+    Pass `None` to go back to the single shared client.
+    """
+    global _http_client_pool
+    _http_client_pool = pool
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
+import atexit
 import json
-from collections.abc import AsyncIterator, Iterator, Mapping
+import logging
+import queue
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator, Mapping, Sequence
 from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass, field
+from functools import partial
 from typing import Any, Callable, Literal
 from urllib.parse import urlparse
 
 from opentelemetry._events import Event, EventLogger, EventLoggerProvider, get_event_logger_provider
-from opentelemetry.trace import Span, Tracer, TracerProvider, get_tracer_provider
+from opentelemetry.trace import Span, Tracer, TracerProvider, get_tracer_provider, use_span
 from opentelemetry.util.types import AttributeValue
 from pydantic import TypeAdapter
 
 from ..messages import (
+    BinaryContent,
     ModelMessage,
     ModelRequest,
     ModelResponse,
@@ -41,7 +49,9 @@ MODEL_SETTING_ATTRIBUTES: tuple[
     'frequency_penalty',
 )
 
-ANY_ADAPTER = TypeAdapter[Any](Any)
+ANY_ADAPTER = TypeAdapter[Any](Any, config={'defer_build': True})
+
+_logger = logging.getLogger(__name__)
 
 
 @dataclass(init=False)
@@ -58,6 +68,10 @@ class InstrumentationSettings:
     tracer: Tracer = field(repr=False)
     event_logger: EventLogger = field(repr=False)
     event_mode: Literal['attributes', 'logs'] = 'attributes'
+    messages: Literal['all', 'new'] = 'all'
+    max_content_length: int | None = None
+    full_payload_sample_rate: float = 0.0
+    background_serialization: bool = False
 
     def __init__(
         self,
@@ -65,6 +79,10 @@ class InstrumentationSettings:
         event_mode: Literal['attributes', 'logs'] = 'attributes',
         tracer_provider: TracerProvider | None = None,
         event_logger_provider: EventLoggerProvider | None = None,
+        messages: Literal['all', 'new'] = 'all',
+        max_content_length: int | None = None,
+        full_payload_sample_rate: float = 0.0,
+        background_serialization: bool = False,
     ):
         """Create instrumentation options.
 
@@ -78,6 +96,20 @@ class InstrumentationSettings:
                 If not provided, the global event logger provider is used.
                 Calling `logfire.configure()` sets the global event logger provider, so most users don't need this.
                 This is only used if `event_mode='logs'`.
+            messages: Which messages each model request emits events for. If `'all'`, the whole message history
+                is emitted on every request, so a run serializes its history once per step. If `'new'`, only the
+                messages since the last model response in the history are emitted, i.e. those added since the
+                previous request of the run; `gen_ai.message.index` is still the index in the whole history.
+            max_content_length: If set, strings in event bodies longer than this many characters are truncated, and
+                binary content like images is left out.
+            full_payload_sample_rate: The fraction of requests, from `0` to `1`, which emit the whole message
+                history without truncation regardless of `messages` and `max_content_length`. Whether a request
+                emitted its full payload is recorded in its span's `pydantic_ai.full_payload` attribute.
+            background_serialization: If `True`, events are built, serialized and emitted in a background thread
+                rather than while the model request is completing. The span's end time is still the time the request
+                completed, but the span is only exported once its events have been added, call
+                [`flush_background_serialization`][pydantic_ai.models.instrumented.flush_background_serialization]
+                to wait for that.
         """
         from pydantic_ai import __version__
 
@@ -86,6 +118,14 @@ class InstrumentationSettings:
         self.tracer = tracer_provider.get_tracer('pydantic-ai', __version__)
         self.event_logger = event_logger_provider.get_event_logger('pydantic-ai', __version__)
         self.event_mode = event_mode
+        self.messages = messages
+        self.max_content_length = max_content_length
+        self.full_payload_sample_rate = full_payload_sample_rate
+        self.background_serialization = background_serialization
+
+    def sample_full_payload(self) -> bool:
+        """Decide whether a request should emit its full payload, see `full_payload_sample_rate`."""
+        return random.random() < self.full_payload_sample_rate
 
 
 @dataclass
@@ -110,7 +150,7 @@ class InstrumentedModel(WrapperModel):
     ) -> tuple[ModelResponse, Usage]:
         with self._instrument(messages, model_settings) as finish:
             response, usage = await super().request(messages, model_settings, model_request_parameters)
-            finish(response, usage)
+            finish(response, usage, None)
             return response, usage
 
     @asynccontextmanager
@@ -122,6 +162,7 @@ class InstrumentedModel(WrapperModel):
     ) -> AsyncIterator[StreamedResponse]:
         with self._instrument(messages, model_settings) as finish:
             response_stream: StreamedResponse | None = None
+            started = time.perf_counter()
             try:
                 async with super().request_stream(
                     messages, model_settings, model_request_parameters
@@ -129,14 +170,19 @@ class InstrumentedModel(WrapperModel):
                     yield response_stream
             finally:
                 if response_stream:
-                    finish(response_stream.get(), response_stream.usage())
+                    first_event_at = response_stream._first_event_at  # pyright: ignore[reportPrivateUsage]
+                    finish(
+                        response_stream.get(),
+                        response_stream.usage(),
+                        None if first_event_at is None else first_event_at - started,
+                    )
 
     @contextmanager
     def _instrument(
         self,
         messages: list[ModelMessage],
         model_settings: ModelSettings | None,
-    ) -> Iterator[Callable[[ModelResponse, Usage], None]]:
+    ) -> Iterator[Callable[[ModelResponse, Usage, float | None], None]]:
         operation = 'chat'
         model_name = self.model_name
         span_name = f'{operation} {model_name}'
@@ -165,35 +211,82 @@ class InstrumentedModel(WrapperModel):
                 if isinstance(value := model_settings.get(key), (float, int)):
                     attributes[f'gen_ai.request.{key}'] = value
 
-        with self.options.tracer.start_as_current_span(span_name, attributes=attributes) as span:
-
-            def finish(response: ModelResponse, usage: Usage):
-                if not span.is_recording():
-                    return
-
-                events = self.messages_to_otel_events(messages)
-                for event in self.messages_to_otel_events([response]):
-                    events.append(
-                        Event(
-                            'gen_ai.choice',
-                            body={
-                                # TODO finish_reason
-                                'index': 0,
-                                'message': event.body,
-                            },
-                        )
+        options = self.options
+        # emitting events is deferred to the background worker when `options.background_serialization` is set
+        emit: Callable[[], None] | None = None
+        span: Span | None = None
+        try:
+            with options.tracer.start_as_current_span(span_name, attributes=attributes, end_on_exit=False) as span:
+
+                def finish(response: ModelResponse, usage: Usage, time_to_first_token: float | None):
+                    nonlocal emit
+                    assert span is not None
+                    if not span.is_recording():
+                        return
+
+                    span.set_attributes(
+                        {
+                            # TODO finish_reason (https://github.com/open-telemetry/semantic-conventions/issues/1277), id
+                            #  https://github.com/pydantic/pydantic-ai/issues/886
+                            'gen_ai.response.model': response.model_name or model_name,
+                            **usage.opentelemetry_attributes(),
+                        }
                     )
-                span.set_attributes(
-                    {
-                        # TODO finish_reason (https://github.com/open-telemetry/semantic-conventions/issues/1277), id
-                        #  https://github.com/pydantic/pydantic-ai/issues/886
-                        'gen_ai.response.model': response.model_name or model_name,
-                        **usage.opentelemetry_attributes(),
-                    }
-                )
-                self._emit_events(system, span, events)
+                    if time_to_first_token is not None:
+                        span.set_attribute('pydantic_ai.timings.time_to_first_token', time_to_first_token)
+
+                    full_payload = True
+                    if options.messages == 'new' or options.max_content_length is not None:
+                        full_payload = options.sample_full_payload()
+                        span.set_attribute('pydantic_ai.full_payload', full_payload)
+                    start = 0 if full_payload or options.messages == 'all' else _new_messages_start(messages)
+                    # copy the messages, the history may be appended to before the events are built
+                    emit = partial(
+                        self._emit_request_events,
+                        system,
+                        span,
+                        messages[start:],
+                        response,
+                        index_offset=start,
+                        max_content_length=None if full_payload else options.max_content_length,
+                    )
+                    if not options.background_serialization:
+                        emit()
+                        emit = None
+
+                yield finish
+        finally:
+            if span is not None:
+                if emit is None:
+                    span.end()
+                else:
+                    _background_worker.submit(partial(_end_span, span, emit, time.time_ns()))
 
-            yield finish
+    def _emit_request_events(
+        self,
+        system: str,
+        span: Span,
+        messages: list[ModelMessage],
+        response: ModelResponse,
+        *,
+        index_offset: int,
+        max_content_length: int | None,
+    ) -> None:
+        events = self.messages_to_otel_events(
+            messages, index_offset=index_offset, max_content_length=max_content_length
+        )
+        for event in self.messages_to_otel_events([response], max_content_length=max_content_length):
+            events.append(
+                Event(
+                    'gen_ai.choice',
+                    body={
+                        # TODO finish_reason
+                        'index': 0,
+                        'message': event.body,
+                    },
+                )
+            )
+        self._emit_events(system, span, events)
 
     def _emit_events(self, system: str, span: Span, events: list[Event]) -> None:
         for event in events:
@@ -226,9 +319,19 @@ class InstrumentedModel(WrapperModel):
         return {**body, **(event.attributes or {})}
 
     @staticmethod
-    def messages_to_otel_events(messages: list[ModelMessage]) -> list[Event]:
+    def messages_to_otel_events(
+        messages: Sequence[ModelMessage], *, index_offset: int = 0, max_content_length: int | None = None
+    ) -> list[Event]:
+        """Convert messages to OpenTelemetry events.
+
+        Args:
+            messages: The messages to convert.
+            index_offset: The index of the first message in the history, used for `gen_ai.message.index`.
+            max_content_length: If set, strings in event bodies longer than this many characters are truncated, and
+                binary content is left out.
+        """
         result: list[Event] = []
-        for message_index, message in enumerate(messages):
+        for message_index, message in enumerate(messages, start=index_offset):
             message_events: list[Event] = []
             if isinstance(message, ModelRequest):
                 for part in message.parts:
@@ -243,6 +346,9 @@ class InstrumentedModel(WrapperModel):
                 }
             result.extend(message_events)
         for event in result:
+            if max_content_length is not None:
+                # truncate before serializing, so long strings and binary data aren't serialized only to be cut off
+                event.body = _truncate(event.body, max_content_length)
             event.body = InstrumentedModel.serialize_any(event.body)
         return result
 
@@ -255,3 +361,79 @@ class InstrumentedModel(WrapperModel):
                 return str(value)
             except Exception as e:
                 return f'Unable to serialize: {e}'
+
+
+def _new_messages_start(messages: list[ModelMessage]) -> int:
+    """The index of the first message after the last model response, whose events were emitted by the previous request."""
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], ModelResponse):
+            return index + 1
+    return 0
+
+
+def _truncate(value: Any, max_length: int) -> Any:
+    if isinstance(value, str):
+        if len(value) > max_length:
+            return f'{value[:max_length]}... ({len(value) - max_length} characters truncated)'
+        return value
+    elif isinstance(value, dict):
+        return {k: _truncate(v, max_length) for k, v in value.items()}  # pyright: ignore[reportUnknownVariableType]
+    elif isinstance(value, (list, tuple)):
+        return [_truncate(v, max_length) for v in value]  # pyright: ignore[reportUnknownVariableType]
+    elif isinstance(value, BinaryContent):
+        return f'({len(value.data)} bytes of {value.media_type} omitted)'
+    elif isinstance(value, (bytes, bytearray)):
+        return f'({len(value)} bytes omitted)'
+    elif value is None or isinstance(value, (int, float)):
+        return value
+    else:
+        # e.g. a model returned by a tool, whose strings are truncated once it's been serialized
+        return _truncate(InstrumentedModel.serialize_any(value), max_length)
+
+
+def _end_span(span: Span, emit: Callable[[], None], end_time: int) -> None:
+    # events emitted as logs take their trace context from the current span
+    with use_span(span, end_on_exit=False):
+        try:
+            emit()
+        finally:
+            span.end(end_time=end_time)
+
+
+class _BackgroundWorker:
+    """A daemon thread running jobs in the order they're submitted."""
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[Callable[[], None]] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, job: Callable[[], None]) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='pydantic-ai-instrumentation', daemon=True)
+                self._thread.start()
+                # registered after the OpenTelemetry providers, so it runs before they're shut down
+                atexit.register(self.flush)
+        self._queue.put(job)
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                job()
+            except Exception:
+                _logger.exception('Error emitting the events of a model request in the background')
+            finally:
+                self._queue.task_done()
+
+
+_background_worker = _BackgroundWorker()
+
+
+def flush_background_serialization() -> None:
+    """Wait for the events of requests made with `background_serialization=True` to be emitted, and their spans ended."""
+    _background_worker.flush()
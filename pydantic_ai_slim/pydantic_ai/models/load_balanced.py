@@ -0,0 +1,204 @@
+"""Load balancing requests across equivalent models.
+
+[`LoadBalancedModel`][pydantic_ai.models.load_balanced.LoadBalancedModel] spreads requests over several models which
+are interchangeable, e.g. the same model behind two providers or proxies, preferring the endpoints which are currently
+fastest and least busy and avoiding those which keep failing.
+"""
+
+from __future__ import annotations as _annotations
+
+import random
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable
+
+from . import KnownModelName, Model, ModelRequestParameters, StreamedResponse, infer_model
+from .circuit_breaker import CircuitBreaker
+from .retrying import default_retry_condition
+
+if TYPE_CHECKING:
+    from ..messages import ModelMessage, ModelResponse
+    from ..settings import ModelSettings
+    from ..usage import Usage
+
+
+@dataclass
+class EndpointStats:
+    """Counters describing the requests sent to one endpoint of a `LoadBalancedModel`."""
+
+    requests: int = 0
+    """The number of requests sent to the endpoint."""
+    failures: int = 0
+    """The number of those requests which failed with an error counted against the endpoint's health."""
+    in_flight: int = 0
+    """The number of requests to the endpoint which haven't finished yet."""
+    ewma_latency: float | None = None
+    """The exponentially weighted moving average of the latency in seconds, `None` until a request has succeeded.
+
+    For streamed requests this is the time until the stream started.
+    """
+
+
+@dataclass
+class Endpoint:
+    """One of the models a [`LoadBalancedModel`][pydantic_ai.models.load_balanced.LoadBalancedModel] sends requests to."""
+
+    model: Model
+    weight: float
+    """The static weight of the endpoint, e.g. `2.0` to send it twice as many requests as an equally fast endpoint."""
+    circuit_breaker: CircuitBreaker
+    stats: EndpointStats = field(default_factory=EndpointStats)
+
+
+@dataclass(init=False)
+class LoadBalancedModel(Model):
+    """A model which spreads requests across equivalent models.
+
+    Each request is sent to a single endpoint, picked at random with a probability proportional to its weight divided by
+    its expected cost: the EWMA of its latency times one more than the number of requests it has in flight. Fast, idle
+    endpoints therefore get most of the traffic, while slower ones still get enough to keep their latency up to date.
+
+    Every endpoint has a [`CircuitBreaker`][pydantic_ai.models.circuit_breaker.CircuitBreaker]; endpoints whose circuit
+    is open are skipped until they are probed again. If every circuit is open, the endpoint which will be probed soonest
+    is used, so requests are never refused outright.
+
+    Errors are raised to the caller, combine with [`FallbackModel`][pydantic_ai.models.fallback.FallbackModel] or
+    [`RetryingModel`][pydantic_ai.models.retrying.RetryingModel] to try again.
+    """
+
+    endpoints: list[Endpoint]
+    ewma_alpha: float
+
+    _model_name: str = field(repr=False)
+    _failure_on: Callable[[Exception], bool] = field(repr=False)
+
+    def __init__(
+        self,
+        *models: Model | KnownModelName,
+        weights: Sequence[float] | None = None,
+        ewma_alpha: float = 0.3,
+        circuit_breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+        failure_on: Callable[[Exception], bool] | tuple[type[Exception], ...] = default_retry_condition,
+    ):
+        """Initialize a load balanced model instance.
+
+        Args:
+            models: The names or instances of the equivalent models to balance requests across.
+            weights: Optional static weights for the models, in the same order, all `1.0` by default.
+            ewma_alpha: The weight of the newest latency in the moving average, between `0` and `1`.
+            circuit_breaker_factory: Creates the circuit breaker for each endpoint.
+            failure_on: A callable or tuple of exceptions deciding which errors count against an endpoint's health,
+                defaults to [`default_retry_condition`][pydantic_ai.models.retrying.default_retry_condition] so that
+                errors caused by the request itself, like a `400`, don't.
+        """
+        if not models:
+            raise ValueError('At least one model is required.')
+        if weights is not None and len(weights) != len(models):
+            raise ValueError('`weights` must have one weight per model.')
+        self.endpoints = [
+            Endpoint(infer_model(model), weight, circuit_breaker_factory())
+            for model, weight in zip(models, weights or [1.0] * len(models))
+        ]
+        self.ewma_alpha = ewma_alpha
+        self._model_name = f'LoadBalancedModel[{", ".join(e.model.model_name for e in self.endpoints)}]'
+
+        if isinstance(failure_on, tuple):
+            exception_types = failure_on
+            self._failure_on = lambda exc: isinstance(exc, exception_types)
+        else:
+            self._failure_on = failure_on
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        """Send the request to the endpoint with the best expected latency."""
+        endpoint = self.select_endpoint()
+        started_at = self._start(endpoint)
+        try:
+            result = await endpoint.model.request(messages, model_settings, model_request_parameters)
+        except BaseException as exc:
+            self._finish(endpoint, exc)
+            raise
+        self._finish(endpoint, latency=time.monotonic() - started_at)
+        return result
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        """Open a stream with the endpoint with the best expected latency."""
+        endpoint = self.select_endpoint()
+        started_at = self._start(endpoint)
+        latency: float | None = None
+        try:
+            async with endpoint.model.request_stream(messages, model_settings, model_request_parameters) as stream:
+                latency = time.monotonic() - started_at
+                yield stream
+        except BaseException as exc:
+            self._finish(endpoint, exc, latency=latency)
+            raise
+        self._finish(endpoint, latency=latency)
+
+    def select_endpoint(self) -> Endpoint:
+        """Pick the endpoint for the next request.
+
+        Endpoints which haven't completed a request yet are assumed to be as fast as the fastest known endpoint, so
+        they are tried early on.
+        """
+        candidates = [e for e in self.endpoints if e.circuit_breaker.available]
+        if not candidates:
+            return min(self.endpoints, key=lambda e: e.circuit_breaker.retry_at or 0.0)
+
+        known = [e.stats.ewma_latency for e in candidates if e.stats.ewma_latency is not None]
+        default_latency = min(known, default=1.0)
+        weights = [
+            e.weight / (max(e.stats.ewma_latency or default_latency, 1e-3) * (e.stats.in_flight + 1))
+            for e in candidates
+        ]
+        return random.choices(candidates, weights=weights)[0]
+
+    @property
+    def model_name(self) -> str:
+        """The model name."""
+        return self._model_name
+
+    @property
+    def system(self) -> str | None:
+        """The system of the first model, all models are expected to be equivalent."""
+        return self.endpoints[0].model.system
+
+    @property
+    def base_url(self) -> str | None:
+        return self.endpoints[0].model.base_url
+
+    def _start(self, endpoint: Endpoint) -> float:
+        endpoint.circuit_breaker.acquire()
+        endpoint.stats.requests += 1
+        endpoint.stats.in_flight += 1
+        return time.monotonic()
+
+    def _finish(self, endpoint: Endpoint, exc: BaseException | None = None, *, latency: float | None = None) -> None:
+        """Record the outcome of a request to `endpoint`."""
+        stats = endpoint.stats
+        stats.in_flight -= 1
+        if latency is not None:
+            if stats.ewma_latency is None:
+                stats.ewma_latency = latency
+            else:
+                stats.ewma_latency += self.ewma_alpha * (latency - stats.ewma_latency)
+
+        if exc is None:
+            endpoint.circuit_breaker.record_success()
+        elif isinstance(exc, Exception) and self._failure_on(exc):
+            stats.failures += 1
+            endpoint.circuit_breaker.record_failure()
+        else:
+            endpoint.circuit_breaker.release()
@@ -0,0 +1,322 @@
+"""Caching of media sent to models.
+
+A [`BinaryContent`][pydantic_ai.messages.BinaryContent] in the message history is sent to the model again with every
+request of the conversation. A [`MediaStore`][pydantic_ai.models.media.MediaStore] keys binary content by the SHA-256
+hash of its data, so each image or audio clip is only base64 encoded once, and where the provider supports file
+references, only uploaded once and referred to afterwards.
+
+Models which can't pass an [`ImageUrl`][pydantic_ai.messages.ImageUrl] or [`AudioUrl`][pydantic_ai.messages.AudioUrl]
+to the provider download it instead, through a [`URLCache`][pydantic_ai.models.media.URLCache] which keeps the
+content, revalidating it with the server after a while, and downloads the URLs of a prompt concurrently.
+"""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+import base64
+import hashlib
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Awaitable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+import httpx
+
+from .._utils import now_utc
+from ..messages import BinaryContent
+
+
+@dataclass
+class UploadedFile:
+    """A reference to binary content uploaded to a provider."""
+
+    uri: str
+    """The URI to send to the provider instead of the data."""
+    mime_type: str
+    """The media type of the uploaded data."""
+    expires_at: datetime | None = None
+    """When the provider deletes the file, `None` if it's kept until it's deleted explicitly."""
+
+
+class MediaStore:
+    """Caches the encoded and uploaded forms of binary content, keyed by the hash of the data.
+
+    Base64 encodings are kept in a least recently used cache bounded by `max_encoded_bytes`. Upload references are
+    small, so all of them are kept until they expire.
+    """
+
+    def __init__(self, max_encoded_bytes: int = 256 * 1024 * 1024, expiry_margin: timedelta = timedelta(minutes=5)):
+        """Create a media store.
+
+        Args:
+            max_encoded_bytes: The maximum total size of the cached base64 encodings.
+            expiry_margin: Uploaded files which expire within this margin are uploaded again rather than reused, so
+                they don't expire while a request is in flight.
+        """
+        self.max_encoded_bytes = max_encoded_bytes
+        self.expiry_margin = expiry_margin
+        self._encoded: OrderedDict[str, str] = OrderedDict()
+        self._encoded_bytes = 0
+        self._uploaded: dict[tuple[str, str], UploadedFile] = {}
+        self._uploading: dict[tuple[str, str], asyncio.Future[UploadedFile]] = {}
+
+    @staticmethod
+    def digest(content: BinaryContent) -> str:
+        """The SHA-256 hash of the content's data, which identifies it in the store.
+
+        The hash is remembered for as long as the content object exists, so the same content in the message history
+        is only hashed once rather than on every request.
+        """
+        key = id(content)
+        entry = _digests.get(key)
+        if entry is not None and entry[0]() is content and entry[1] is content.data:
+            return entry[2]
+        digest = hashlib.sha256(content.data).hexdigest()
+
+        def evict(ref: weakref.ref[Any]) -> None:
+            entry = _digests.get(key)
+            if entry is not None and entry[0] is ref:
+                del _digests[key]
+
+        # the data is compared by identity, in case it's been replaced since the content was hashed
+        _digests[key] = weakref.ref(content, evict), content.data, digest
+        return digest
+
+    def base64(self, content: BinaryContent) -> str:
+        """Get the base64 encoding of the content's data, encoding it if it isn't cached."""
+        key = self.digest(content)
+        encoded = self._encoded.get(key)
+        if encoded is not None:
+            self._encoded.move_to_end(key)
+            return encoded
+
+        encoded = base64.b64encode(content.data).decode('utf-8')
+        if len(encoded) <= self.max_encoded_bytes:
+            self._encoded[key] = encoded
+            self._encoded_bytes += len(encoded)
+            while self._encoded_bytes > self.max_encoded_bytes:
+                _, evicted = self._encoded.popitem(last=False)
+                self._encoded_bytes -= len(evicted)
+        return encoded
+
+    async def upload(
+        self,
+        content: BinaryContent,
+        namespace: str,
+        upload: Callable[[BinaryContent], Awaitable[UploadedFile]],
+    ) -> UploadedFile:
+        """Get a reference to the content uploaded with `upload`, uploading it if needed.
+
+        Concurrent calls for the same content share a single upload.
+
+        Args:
+            content: The content to upload.
+            namespace: Identifies where the file is uploaded to, e.g. the provider and account, since references from
+                one don't work with another.
+            upload: Uploads the content and returns the reference to it.
+        """
+        key = namespace, self.digest(content)
+        uploaded = self._uploaded.get(key)
+        if uploaded is not None:
+            if not self.is_expiring(uploaded):
+                return uploaded
+            del self._uploaded[key]
+
+        if (pending := self._uploading.get(key)) is not None:
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future[UploadedFile] = asyncio.get_running_loop().create_future()
+        self._uploading[key] = future
+        try:
+            uploaded = await upload(content)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # mark the exception as retrieved, it's raised here and to any waiters
+            future.exception()
+            raise
+        else:
+            self._uploaded[key] = uploaded
+            future.set_result(uploaded)
+            return uploaded
+        finally:
+            del self._uploading[key]
+
+    def is_expiring(self, file: UploadedFile) -> bool:
+        """Whether `file` expires within `expiry_margin`, so it should be uploaded again rather than used."""
+        return file.expires_at is not None and file.expires_at - self.expiry_margin <= now_utc()
+
+    def clear(self) -> None:
+        """Forget every cached encoding and upload, the uploaded files themselves aren't deleted."""
+        self._encoded.clear()
+        self._encoded_bytes = 0
+        self._uploaded.clear()
+
+
+_digests: dict[int, tuple[weakref.ref[BinaryContent], bytes, str]] = {}
+"""The digest of each `BinaryContent` hashed so far, keyed by its `id`, with the data it was computed from."""
+
+_default_media_store = MediaStore()
+
+
+def get_media_store() -> MediaStore:
+    """Get the media store shared by models which weren't given one."""
+    return _default_media_store
+
+
+@dataclass
+class _CachedURL:
+    content: BinaryContent
+    etag: str | None
+    last_modified: str | None
+    validated_at: float
+
+
+class URLCache:
+    """Caches the content downloaded from URLs, in a least recently used cache bounded by `max_bytes`.
+
+    Content younger than `revalidate_after` seconds is used as is. Older content is revalidated with a conditional
+    request using its `ETag` or `Last-Modified` header, and only downloaded again if it has changed, or if the server
+    sent neither header. Downloads larger than `max_download_bytes` are aborted.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        revalidate_after: float = 300.0,
+        http_client: httpx.AsyncClient | None = None,
+        max_download_bytes: int | None = 100 * 1024 * 1024,
+    ):
+        """Create a URL cache.
+
+        Args:
+            max_bytes: The maximum total size of the cached content.
+            revalidate_after: How long in seconds content is used before it's revalidated with the server.
+            http_client: The client to download with, defaults to
+                [`cached_async_http_client`][pydantic_ai.models.cached_async_http_client] at the time of the download.
+            max_download_bytes: The maximum size of the content of a single URL, `None` means no limit.
+        """
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.http_client = http_client
+        self.max_download_bytes = max_download_bytes
+        self._entries: OrderedDict[str, _CachedURL] = OrderedDict()
+        self._size = 0
+        self._fetching: dict[str, asyncio.Future[BinaryContent]] = {}
+
+    async def fetch(self, url: str) -> BinaryContent:
+        """Get the content of `url` and its media type from the `Content-Type` header.
+
+        Concurrent calls for the same URL share a single download.
+
+        Raises:
+            httpx.HTTPStatusError: If the server responds with an error.
+            ValueError: If the content is larger than `max_download_bytes`.
+        """
+        if (pending := self._fetching.get(url)) is not None:
+            return await asyncio.shield(pending)
+
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+            if time.monotonic() - entry.validated_at < self.revalidate_after:
+                return entry.content
+
+        future: asyncio.Future[BinaryContent] = asyncio.get_running_loop().create_future()
+        self._fetching[url] = future
+        try:
+            content = await self._download(url, entry)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # mark the exception as retrieved, it's raised here and to any waiters
+            future.exception()
+            raise
+        else:
+            future.set_result(content)
+            return content
+        finally:
+            del self._fetching[url]
+
+    async def prefetch(self, urls: Iterable[str]) -> None:
+        """Download the URLs which aren't cached concurrently, so the following calls to `fetch` are cache hits.
+
+        Raises:
+            httpx.HTTPStatusError: If the server responds to any URL with an error.
+        """
+        await asyncio.gather(*(self.fetch(url) for url in dict.fromkeys(urls)))
+
+    def clear(self) -> None:
+        """Forget all cached content."""
+        self._entries.clear()
+        self._size = 0
+
+    async def _download(self, url: str, entry: _CachedURL | None) -> BinaryContent:
+        from . import cached_async_http_client
+
+        headers: dict[str, str] = {}
+        if entry is not None:
+            if entry.etag is not None:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified is not None:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        client = self.http_client or cached_async_http_client()
+        async with client.stream('GET', url, headers=headers, follow_redirects=True) as response:
+            if entry is not None and response.status_code == 304:
+                entry.validated_at = time.monotonic()
+                return entry.content
+            response.raise_for_status()
+            data = await self._read(url, response)
+
+        media_type = response.headers.get('Content-Type', 'application/octet-stream').split(';')[0].strip()
+        content = BinaryContent(data=data, media_type=media_type)
+        self._store(
+            url,
+            _CachedURL(content, response.headers.get('ETag'), response.headers.get('Last-Modified'), time.monotonic()),
+        )
+        return content
+
+    async def _read(self, url: str, response: httpx.Response) -> bytes:
+        """Read the body of a streamed response, aborting as soon as it's larger than `max_download_bytes`."""
+        limit = self.max_download_bytes
+        if limit is None:
+            return await response.aread()
+        too_large = f'Content of {url} is larger than the limit of {limit} bytes'
+        content_length = response.headers.get('Content-Length')
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            raise ValueError(too_large)
+        chunks: list[bytes] = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > limit:
+                raise ValueError(too_large)
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def _store(self, url: str, entry: _CachedURL) -> None:
+        if (previous := self._entries.pop(url, None)) is not None:
+            self._size -= len(previous.content.data)
+        if len(entry.content.data) > self.max_bytes:
+            return
+        self._entries[url] = entry
+        self._size += len(entry.content.data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.content.data)
+
+
+_default_url_cache = URLCache()
+
+
+def get_url_cache() -> URLCache:
+    """Get the URL cache models download remote media through."""
+    return _default_url_cache
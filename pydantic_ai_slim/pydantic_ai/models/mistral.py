@@ -110,6 +110,7 @@ class MistralModel(Model):
 
     _model_name: MistralModelName = field(repr=False)
     _system: str | None = field(default='mistral', repr=False)
+    _message_cache: _utils.MessageMappingCache[list[MistralMessages]] = field(repr=False, compare=False)
 
     def __init__(
         self,
@@ -130,6 +131,7 @@ class MistralModel(Model):
             json_mode_schema_prompt: The prompt to show when the model expects a JSON object as input.
         """
         self._model_name = model_name
+        self._message_cache = _utils.MessageMappingCache()
         self.json_mode_schema_prompt = json_mode_schema_prompt
 
         if client is not None:
@@ -138,7 +140,9 @@ class MistralModel(Model):
             self.client = client
         else:
             api_key = os.getenv('MISTRAL_API_KEY') if api_key is None else api_key
-            self.client = Mistral(api_key=api_key, async_client=http_client or cached_async_http_client())
+            self.client = Mistral(
+                api_key=api_key, async_client=http_client or cached_async_http_client(base_url='https://api.mistral.ai')
+            )
 
     @property
     def base_url(self) -> str:
@@ -192,7 +196,7 @@ class MistralModel(Model):
         try:
             response = await self.client.chat.complete_async(
                 model=str(self._model_name),
-                messages=list(chain(*(self._map_message(m) for m in messages))),
+                messages=self._map_messages(messages),
                 n=1,
                 tools=self._map_function_and_result_tools_definition(model_request_parameters) or UNSET,
                 tool_choice=self._get_tool_choice(model_request_parameters),
@@ -205,7 +209,10 @@ class MistralModel(Model):
             )
         except SDKError as e:
             if (status_code := e.status_code) >= 400:
-                raise ModelHTTPError(status_code=status_code, model_name=self.model_name, body=e.body) from e
+                headers = e.raw_response.headers if e.raw_response is not None else None
+                raise ModelHTTPError(
+                    status_code=status_code, model_name=self.model_name, body=e.body, headers=headers
+                ) from e
             raise
 
         assert response, 'A unexpected empty response from Mistral.'
@@ -219,7 +226,7 @@ class MistralModel(Model):
     ) -> MistralEventStreamAsync[MistralCompletionEvent]:
         """Create a streaming completion request to the Mistral model."""
         response: MistralEventStreamAsync[MistralCompletionEvent] | None
-        mistral_messages = list(chain(*(self._map_message(m) for m in messages)))
+        mistral_messages = self._map_messages(messages)
 
         if (
             model_request_parameters.result_tools
@@ -456,6 +463,10 @@ class MistralModel(Model):
             else:
                 assert_never(part)
 
+    def _map_messages(self, messages: list[ModelMessage]) -> list[MistralMessages]:
+        """Map the messages, reusing the mapping of messages seen in previous requests."""
+        return list(chain(*(self._message_cache.get(m, lambda m: list(self._map_message(m))) for m in messages)))
+
     @classmethod
     def _map_message(cls, message: ModelMessage) -> Iterable[MistralMessages]:
         """Just maps a `pydantic_ai.Message` to a `MistralMessage`."""
@@ -0,0 +1,442 @@
+"""An in-process mock of the OpenAI chat completions API, for testing the real OpenAI model offline.
+
+[`TestModel`][pydantic_ai.models.test.TestModel] and [`FunctionModel`][pydantic_ai.models.function.FunctionModel]
+replace the model, so they don't exercise [`OpenAIModel`][pydantic_ai.models.openai.OpenAIModel]'s message mapping,
+the OpenAI SDK, the HTTP client or server-sent event parsing. [`MockOpenAI`][pydantic_ai.models.mock_openai.MockOpenAI]
+is an [ASGI](https://asgi.readthedocs.io/) app implementing `POST /v1/chat/completions` with scripted responses,
+including streamed chunks, tool calls, usage, delays and errors, so performance and resilience tests of the whole
+OpenAI path can run offline.
+
+```python {test="skip"}
+from pydantic_ai import Agent
+from pydantic_ai.models.mock_openai import MockOpenAI, MockResponse, MockToolCall
+from pydantic_ai.models.openai import OpenAIModel
+
+mock = MockOpenAI(
+    [
+        MockResponse(tool_calls=[MockToolCall('get_weather', {'city': 'London'})]),
+        MockResponse('It is sunny in London.', chunk_delay=0.01),
+    ]
+)
+agent = Agent(OpenAIModel('gpt-4o', provider=mock.provider()))
+
+@agent.tool_plain
+def get_weather(city: str) -> str:
+    return 'sunny'
+
+result = agent.run_sync('What is the weather in London?')
+print(result.data)
+#> It is sunny in London.
+print(mock.requests[1]['messages'][-1])
+#> {'role': 'tool', 'tool_call_id': 'call_0', 'content': 'sunny'}
+```
+"""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Iterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Union
+
+import httpx
+from typing_extensions import TypeAlias
+
+from ..providers.openai import OpenAIProvider
+
+try:
+    from openai import AsyncOpenAI
+except ImportError as _import_error:  # pragma: no cover
+    raise ImportError(
+        'Please install `openai` to use the OpenAI mock, '
+        "you can use the `openai` optional group — `pip install 'pydantic-ai-slim[openai]'`"
+    ) from _import_error
+
+__all__ = 'MockOpenAI', 'MockResponse', 'MockToolCall', 'MockError', 'MockResult', 'MockResponder'
+
+
+@dataclass
+class MockToolCall:
+    """A tool call in a mock response."""
+
+    name: str
+    """The name of the tool to call."""
+    arguments: dict[str, Any] | str = field(default_factory=dict)
+    """The arguments, as a dict or a JSON string, which may be invalid to test retries."""
+    id: str | None = None
+    """The tool call ID, defaults to `call_<index>`."""
+
+
+@dataclass
+class MockResponse:
+    """A successful chat completion, streamed if the request asks for it."""
+
+    text: str | Sequence[str] | None = None
+    """The text of the response. A sequence of strings is streamed one string per chunk."""
+    tool_calls: Sequence[MockToolCall] = ()
+    """Tool calls in the response."""
+    prompt_tokens: int | None = None
+    """Prompt tokens in the usage, defaults to the number of words in the request's messages."""
+    completion_tokens: int | None = None
+    """Completion tokens in the usage, defaults to the number of words in the text and tool call arguments."""
+    finish_reason: str | None = None
+    """Defaults to `'tool_calls'` if there are tool calls, otherwise `'stop'`."""
+    delay: float = 0.0
+    """Seconds to wait before responding, i.e. the time to the first byte."""
+    chunk_delay: float = 0.0
+    """Seconds to wait between streamed chunks."""
+    chunk_size: int = 8
+    """The number of characters of text or tool call arguments in each streamed chunk."""
+    fail_after: int | None = None
+    """Drop the connection after streaming this many chunks, to test failures mid-stream."""
+
+
+@dataclass
+class MockError:
+    """An error response, in the format of the OpenAI API."""
+
+    status_code: int = 500
+    """The HTTP status. The OpenAI SDK retries 408, 409, 429 and 5xx errors, see `max_retries` of
+    [`provider`][pydantic_ai.models.mock_openai.MockOpenAI.provider]."""
+    message: str = 'The server had an error while processing your request.'
+    type: str = 'server_error'
+    headers: dict[str, str] = field(default_factory=dict)
+    """Response headers, e.g. `{'retry-after-ms': '10'}` to control how long the SDK waits before retrying."""
+    delay: float = 0.0
+    """Seconds to wait before responding."""
+
+
+MockResult: TypeAlias = Union[MockResponse, MockError]
+MockResponder: TypeAlias = Callable[[dict[str, Any]], Union[MockResult, Awaitable[MockResult]]]
+"""A function returning the response to a request, given the request's JSON body."""
+
+
+class _Disconnect(Exception):
+    pass
+
+
+class MockOpenAI:
+    """An ASGI app mocking the OpenAI chat completions API.
+
+    Use [`provider`][pydantic_ai.models.mock_openai.MockOpenAI.provider] to send requests to it in-process, or
+    [`serve`][pydantic_ai.models.mock_openai.MockOpenAI.serve] to serve it over HTTP on a local port, which also
+    exercises the HTTP client's connection pool.
+    """
+
+    def __init__(self, responses: Sequence[MockResult] | MockResponder | None = None):
+        """Create a mock of the OpenAI API.
+
+        Args:
+            responses: The responses to requests, either a sequence used in order, or a function (sync or async)
+                called with the JSON body of each request. Requests after the sequence is used up get a 400 error.
+                Defaults to echoing the last user message.
+        """
+        self.requests: list[dict[str, Any]] = []
+        """The JSON bodies of the requests received, in order."""
+        if responses is None:
+            self._responder: MockResponder = _echo
+        elif callable(responses):
+            self._responder = responses
+        else:
+            self._responder = _sequence_responder(responses)
+
+    def provider(self, *, max_retries: int = 2) -> OpenAIProvider:
+        """Create an OpenAI provider sending requests to this mock in-process, without opening sockets.
+
+        Args:
+            max_retries: How many times the OpenAI SDK retries failed requests, it waits between retries unless the
+                error has a `retry-after-ms` header.
+        """
+        http_client = httpx.AsyncClient(transport=_StreamingASGITransport(self))
+        client = AsyncOpenAI(
+            base_url='http://mock-openai/v1', api_key='mock', http_client=http_client, max_retries=max_retries
+        )
+        return OpenAIProvider(openai_client=client)
+
+    @asynccontextmanager
+    async def serve(self, host: str = '127.0.0.1', port: int = 0) -> AsyncIterator[str]:
+        """Serve the mock over HTTP with `uvicorn` in a background thread, yielding its base URL.
+
+        ```python {test="skip" lint="skip"}
+        async with mock.serve() as base_url:
+            model = OpenAIModel('gpt-4o', provider=OpenAIProvider(base_url=base_url, api_key='mock'))
+        ```
+
+        Args:
+            host: The host to listen on.
+            port: The port to listen on, defaults to a free port.
+        """
+        try:
+            import uvicorn
+        except ImportError as e:  # pragma: no cover
+            raise ImportError(
+                'Please install `uvicorn` to serve the OpenAI mock over HTTP, or use `MockOpenAI.provider()`'
+            ) from e
+
+        with socket.socket() as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((host, port))
+            server = uvicorn.Server(uvicorn.Config(self, log_level='warning', lifespan='off', ws='none'))
+            thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True)
+            thread.start()
+            try:
+                while not server.started:
+                    if not thread.is_alive():
+                        raise RuntimeError('The OpenAI mock server failed to start')
+                    await asyncio.sleep(0.01)
+                yield f'http://{host}:{sock.getsockname()[1]}/v1'
+            finally:
+                server.should_exit = True
+                await asyncio.get_running_loop().run_in_executor(None, thread.join)
+
+    async def __call__(self, scope: dict[str, Any], receive: Callable[[], Awaitable[Any]], send: _Send) -> None:
+        assert scope['type'] == 'http', 'Only HTTP requests are supported'
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+        if scope['method'] != 'POST' or not scope['path'].endswith('/chat/completions'):
+            error = MockError(404, f'Unknown request: {scope["method"]} {scope["path"]}', 'invalid_request_error')
+            return await _send_error(send, error)
+
+        request = json.loads(body)
+        self.requests.append(request)
+        result = self._responder(request)
+        if not isinstance(result, (MockResponse, MockError)):
+            result = await result
+        if result.delay:
+            await asyncio.sleep(result.delay)
+        if isinstance(result, MockError):
+            await _send_error(send, result)
+        elif request.get('stream'):
+            include_usage = (request.get('stream_options') or {}).get('include_usage', False)
+            await _send_stream(send, result, request, include_usage)
+        else:
+            await _send_json(send, 200, _completion(result, request))
+
+
+_Send: TypeAlias = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+def _echo(request: dict[str, Any]) -> MockResponse:
+    user_messages = [m for m in request['messages'] if m['role'] == 'user']
+    if not user_messages:
+        return MockResponse('echo: ')
+    content = user_messages[-1]['content']
+    if not isinstance(content, str):
+        content = ''.join(item.get('text', '') for item in content)
+    return MockResponse(f'echo: {content}')
+
+
+def _sequence_responder(responses: Sequence[MockResult]) -> MockResponder:
+    remaining = iter(responses)
+
+    def respond(request: dict[str, Any]) -> MockResult:
+        try:
+            return next(remaining)
+        except StopIteration:
+            return MockError(400, f'MockOpenAI has no more responses, it was given {len(responses)}', 'mock_error')
+
+    return respond
+
+
+async def _send_json(send: _Send, status: int, body: Any, headers: dict[str, str] | None = None) -> None:
+    raw_headers = [(b'content-type', b'application/json')]
+    raw_headers += [(k.encode(), v.encode()) for k, v in (headers or {}).items()]
+    await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+    await send({'type': 'http.response.body', 'body': json.dumps(body).encode()})
+
+
+async def _send_error(send: _Send, error: MockError) -> None:
+    body = {'error': {'message': error.message, 'type': error.type, 'param': None, 'code': None}}
+    await _send_json(send, error.status_code, body, error.headers)
+
+
+def _arguments(tool_call: MockToolCall) -> str:
+    return tool_call.arguments if isinstance(tool_call.arguments, str) else json.dumps(tool_call.arguments)
+
+
+def _text(response: MockResponse) -> str | None:
+    return response.text if response.text is None or isinstance(response.text, str) else ''.join(response.text)
+
+
+def _usage(response: MockResponse, request: dict[str, Any]) -> dict[str, int]:
+    prompt_tokens = response.prompt_tokens
+    if prompt_tokens is None:
+        prompt_tokens = sum(len(json.dumps(m.get('content') or '').split()) for m in request['messages'])
+    completion_tokens = response.completion_tokens
+    if completion_tokens is None:
+        outputs = [_text(response) or ''] + [_arguments(call) for call in response.tool_calls]
+        completion_tokens = sum(len(output.split()) for output in outputs)
+    return {
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'total_tokens': prompt_tokens + completion_tokens,
+    }
+
+
+def _finish_reason(response: MockResponse) -> str:
+    return response.finish_reason or ('tool_calls' if response.tool_calls else 'stop')
+
+
+def _tool_call_id(tool_call: MockToolCall, index: int) -> str:
+    return tool_call.id or f'call_{index}'
+
+
+def _completion(response: MockResponse, request: dict[str, Any]) -> dict[str, Any]:
+    message: dict[str, Any] = {'role': 'assistant', 'content': _text(response)}
+    if response.tool_calls:
+        message['tool_calls'] = [
+            {
+                'id': _tool_call_id(call, index),
+                'type': 'function',
+                'function': {'name': call.name, 'arguments': _arguments(call)},
+            }
+            for index, call in enumerate(response.tool_calls)
+        ]
+    return {
+        'id': 'chatcmpl-mock',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': request['model'],
+        'choices': [{'index': 0, 'message': message, 'finish_reason': _finish_reason(response)}],
+        'usage': _usage(response, request),
+    }
+
+
+def _split(text: str, size: int) -> Iterator[str]:
+    for start in range(0, len(text), size):
+        yield text[start : start + size]
+
+
+def _stream_deltas(response: MockResponse) -> Iterator[dict[str, Any]]:
+    yield {'role': 'assistant', 'content': ''}
+    if response.text is not None:
+        pieces = _split(response.text, response.chunk_size) if isinstance(response.text, str) else response.text
+        for piece in pieces:
+            yield {'content': piece}
+    for index, call in enumerate(response.tool_calls):
+        function = {'name': call.name, 'arguments': ''}
+        yield {
+            'tool_calls': [{'index': index, 'id': _tool_call_id(call, index), 'type': 'function', 'function': function}]
+        }
+        for piece in _split(_arguments(call), response.chunk_size):
+            yield {'tool_calls': [{'index': index, 'function': {'arguments': piece}}]}
+
+
+async def _send_stream(send: _Send, response: MockResponse, request: dict[str, Any], include_usage: bool) -> None:
+    created = int(time.time())
+
+    def event(choices: list[dict[str, Any]], **extra: Any) -> dict[str, Any]:
+        data = {
+            'id': 'chatcmpl-mock',
+            'object': 'chat.completion.chunk',
+            'created': created,
+            'model': request['model'],
+            'choices': choices,
+            **extra,
+        }
+        return {
+            'type': 'http.response.body',
+            'body': b'data: ' + json.dumps(data).encode() + b'\n\n',
+            'more_body': True,
+        }
+
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'text/event-stream')]})
+    chunks = [event([{'index': 0, 'delta': delta, 'finish_reason': None}]) for delta in _stream_deltas(response)]
+    chunks.append(event([{'index': 0, 'delta': {}, 'finish_reason': _finish_reason(response)}]))
+    if include_usage:
+        chunks.append(event([], usage=_usage(response, request)))
+    for sent, chunk in enumerate(chunks):
+        if sent == response.fail_after:
+            raise _Disconnect()
+        if sent and response.chunk_delay:
+            await asyncio.sleep(response.chunk_delay)
+        await send(chunk)
+    await send({'type': 'http.response.body', 'body': b'data: [DONE]\n\n'})
+
+
+class _StreamingASGITransport(httpx.AsyncBaseTransport):
+    """Like `httpx.ASGITransport`, but streams the response body as the app sends it.
+
+    `httpx.ASGITransport` waits for the whole response before returning it, so the time to the first chunk would be
+    the time to the last, and failures mid-stream would fail the request before any chunk is read.
+    """
+
+    def __init__(self, app: MockOpenAI):
+        self.app = app
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': request.method,
+            'scheme': request.url.scheme,
+            'path': request.url.path,
+            'raw_path': request.url.raw_path.split(b'?')[0],
+            'query_string': request.url.query,
+            'root_path': '',
+            'headers': [(key.lower(), value) for key, value in request.headers.raw],
+            'server': (request.url.host, request.url.port),
+            'client': ('127.0.0.1', 0),
+        }
+        loop = asyncio.get_running_loop()
+        started: asyncio.Future[dict[str, Any]] = loop.create_future()
+        chunks: asyncio.Queue[bytes | BaseException | None] = asyncio.Queue()
+        request_sent = False
+
+        async def receive() -> dict[str, Any]:
+            nonlocal request_sent
+            if request_sent:
+                # the mock reads the request once, a real server would only report a disconnect
+                await loop.create_future()
+            request_sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message: dict[str, Any]) -> None:
+            if message['type'] == 'http.response.start':
+                started.set_result(message)
+            elif message['type'] == 'http.response.body':
+                await chunks.put(message.get('body', b''))
+                if not message.get('more_body', False):
+                    await chunks.put(None)
+
+        async def run() -> None:
+            try:
+                await self.app(scope, receive, send)
+            except BaseException as e:
+                if not started.done():
+                    started.set_exception(e)
+                else:
+                    await chunks.put(e)
+                if not isinstance(e, Exception):
+                    raise
+
+        task = asyncio.create_task(run())
+        start = await started
+        return httpx.Response(start['status'], headers=start['headers'], stream=_QueueStream(chunks, task))
+
+
+class _QueueStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: asyncio.Queue[bytes | BaseException | None], task: asyncio.Task[None]):
+        self.chunks = chunks
+        self.task = task
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while (chunk := await self.chunks.get()) is not None:
+            if isinstance(chunk, BaseException):
+                raise httpx.RemoteProtocolError('peer closed connection without sending complete message body')
+            yield chunk
+
+    async def aclose(self) -> None:
+        self.task.cancel()
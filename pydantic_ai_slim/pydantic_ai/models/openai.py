@@ -1,12 +1,12 @@
 from __future__ import annotations as _annotations
 
-import base64
+import json
 import os
 from collections.abc import AsyncIterable, AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Literal, Union, cast, overload
+from typing import Any, Literal, Union, cast, overload
 
 from httpx import AsyncClient as AsyncHTTPClient
 from typing_extensions import assert_never, deprecated
@@ -40,9 +40,11 @@ from . import (
     cached_async_http_client,
     check_allow_model_requests,
 )
+from .batch import BatchModel, BatchRequest, BatchResult
+from .media import get_media_store, get_url_cache
 
 try:
-    from openai import NOT_GIVEN, APIStatusError, AsyncOpenAI, AsyncStream
+    from openai import NOT_GIVEN, APIStatusError, AsyncOpenAI, AsyncStream, NotGiven
     from openai.types import ChatModel, chat
     from openai.types.chat import (
         ChatCompletionChunk,
@@ -99,6 +101,7 @@ class OpenAIModel(Model):
 
     _model_name: OpenAIModelName = field(repr=False)
     _system: str | None = field(repr=False)
+    _message_cache: _utils.MessageMappingCache[list[chat.ChatCompletionMessageParam]] = field(repr=False, compare=False)
 
     @overload
     def __init__(
@@ -158,6 +161,7 @@ class OpenAIModel(Model):
                 customize the `base_url` and `api_key` to use a different provider.
         """
         self._model_name = model_name
+        self._message_cache = _utils.MessageMappingCache()
 
         if provider is not None:
             if isinstance(provider, str):
@@ -183,7 +187,11 @@ class OpenAIModel(Model):
             elif http_client is not None:
                 self.client = AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
             else:
-                self.client = AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=cached_async_http_client())
+                self.client = AsyncOpenAI(
+                    base_url=base_url,
+                    api_key=api_key,
+                    http_client=cached_async_http_client(base_url=base_url or 'https://api.openai.com/v1'),
+                )
         self.system_prompt_role = system_prompt_role
         self._system = system
 
@@ -254,6 +262,28 @@ class OpenAIModel(Model):
         model_settings: OpenAIModelSettings,
         model_request_parameters: ModelRequestParameters,
     ) -> chat.ChatCompletion | AsyncStream[ChatCompletionChunk]:
+        params = await self._completions_params(messages, model_settings, model_request_parameters)
+        try:
+            return await self.client.chat.completions.create(
+                **params,
+                stream=stream,
+                stream_options={'include_usage': True} if stream else NOT_GIVEN,
+                timeout=model_settings.get('timeout', NOT_GIVEN),
+            )
+        except APIStatusError as e:
+            if (status_code := e.status_code) >= 400:
+                raise ModelHTTPError(
+                    status_code=status_code, model_name=self.model_name, body=e.body, headers=e.response.headers
+                ) from e
+            raise
+
+    async def _completions_params(
+        self,
+        messages: list[ModelMessage],
+        model_settings: OpenAIModelSettings,
+        model_request_parameters: ModelRequestParameters,
+    ) -> dict[str, Any]:
+        """Build the parameters of a chat completion request, apart from those controlling how it's sent."""
         tools = self._get_tools(model_request_parameters)
 
         # standalone function to make it easier to override
@@ -266,33 +296,24 @@ class OpenAIModel(Model):
 
         openai_messages: list[chat.ChatCompletionMessageParam] = []
         for m in messages:
-            async for msg in self._map_message(m):
-                openai_messages.append(msg)
-
-        try:
-            return await self.client.chat.completions.create(
-                model=self._model_name,
-                messages=openai_messages,
-                n=1,
-                parallel_tool_calls=model_settings.get('parallel_tool_calls', NOT_GIVEN),
-                tools=tools or NOT_GIVEN,
-                tool_choice=tool_choice or NOT_GIVEN,
-                stream=stream,
-                stream_options={'include_usage': True} if stream else NOT_GIVEN,
-                max_tokens=model_settings.get('max_tokens', NOT_GIVEN),
-                temperature=model_settings.get('temperature', NOT_GIVEN),
-                top_p=model_settings.get('top_p', NOT_GIVEN),
-                timeout=model_settings.get('timeout', NOT_GIVEN),
-                seed=model_settings.get('seed', NOT_GIVEN),
-                presence_penalty=model_settings.get('presence_penalty', NOT_GIVEN),
-                frequency_penalty=model_settings.get('frequency_penalty', NOT_GIVEN),
-                logit_bias=model_settings.get('logit_bias', NOT_GIVEN),
-                reasoning_effort=model_settings.get('openai_reasoning_effort', NOT_GIVEN),
-            )
-        except APIStatusError as e:
-            if (status_code := e.status_code) >= 400:
-                raise ModelHTTPError(status_code=status_code, model_name=self.model_name, body=e.body) from e
-            raise
+            openai_messages.extend(await self._message_cache.aget(m, self._map_message_params))
+
+        return dict(
+            model=self._model_name,
+            messages=openai_messages,
+            n=1,
+            parallel_tool_calls=model_settings.get('parallel_tool_calls', NOT_GIVEN),
+            tools=tools or NOT_GIVEN,
+            tool_choice=tool_choice or NOT_GIVEN,
+            max_tokens=model_settings.get('max_tokens', NOT_GIVEN),
+            temperature=model_settings.get('temperature', NOT_GIVEN),
+            top_p=model_settings.get('top_p', NOT_GIVEN),
+            seed=model_settings.get('seed', NOT_GIVEN),
+            presence_penalty=model_settings.get('presence_penalty', NOT_GIVEN),
+            frequency_penalty=model_settings.get('frequency_penalty', NOT_GIVEN),
+            logit_bias=model_settings.get('logit_bias', NOT_GIVEN),
+            reasoning_effort=model_settings.get('openai_reasoning_effort', NOT_GIVEN),
+        )
 
     def _process_response(self, response: chat.ChatCompletion) -> ModelResponse:
         """Process a non-streamed response, and prepare a message to return."""
@@ -351,6 +372,9 @@ class OpenAIModel(Model):
         else:
             assert_never(message)
 
+    async def _map_message_params(self, message: ModelMessage) -> list[chat.ChatCompletionMessageParam]:
+        return [item async for item in self._map_message(message)]
+
     @staticmethod
     def _map_tool_call(t: ToolCallPart) -> chat.ChatCompletionMessageToolCallParam:
         return chat.ChatCompletionMessageToolCallParam(
@@ -406,6 +430,7 @@ class OpenAIModel(Model):
             content = part.content
         else:
             content = []
+            await get_url_cache().prefetch(item.url for item in part.content if isinstance(item, AudioUrl))
             for item in part.content:
                 if isinstance(item, str):
                     content.append(ChatCompletionContentPartTextParam(text=item, type='text'))
@@ -413,7 +438,7 @@ class OpenAIModel(Model):
                     image_url = ImageURL(url=item.url)
                     content.append(ChatCompletionContentPartImageParam(image_url=image_url, type='image_url'))
                 elif isinstance(item, BinaryContent):
-                    base64_encoded = base64.b64encode(item.data).decode('utf-8')
+                    base64_encoded = get_media_store().base64(item)
                     if item.is_image:
                         image_url = ImageURL(url=f'data:{item.media_type};base64,{base64_encoded}')
                         content.append(ChatCompletionContentPartImageParam(image_url=image_url, type='image_url'))
@@ -423,11 +448,9 @@ class OpenAIModel(Model):
                     else:  # pragma: no cover
                         raise RuntimeError(f'Unsupported binary content type: {item.media_type}')
                 elif isinstance(item, AudioUrl):  # pragma: no cover
-                    client = cached_async_http_client()
-                    response = await client.get(item.url)
-                    response.raise_for_status()
-                    base64_encoded = base64.b64encode(response.content).decode('utf-8')
-                    audio = InputAudio(data=base64_encoded, format=response.headers.get('content-type'))
+                    downloaded = await get_url_cache().fetch(item.url)
+                    base64_encoded = get_media_store().base64(downloaded)
+                    audio = InputAudio(data=base64_encoded, format=downloaded.media_type)  # type: ignore
                     content.append(ChatCompletionContentPartInputAudioParam(input_audio=audio, type='input_audio'))
                 else:
                     assert_never(item)
@@ -477,6 +500,113 @@ class OpenAIStreamedResponse(StreamedResponse):
         return self._timestamp
 
 
+@dataclass(init=False)
+class OpenAIBatchModel(BatchModel):
+    """A model which sends requests through the [OpenAI Batch API](https://platform.openai.com/docs/guides/batch).
+
+    Requests are mapped by the wrapped [`OpenAIModel`][pydantic_ai.models.openai.OpenAIModel] and sent with its
+    client, see [`BatchModel`][pydantic_ai.models.batch.BatchModel] for how they're batched.
+
+    Apart from `__init__`, all methods are private or match those of the base class.
+    """
+
+    model: OpenAIModel
+    completion_window: Literal['24h']
+
+    def __init__(
+        self,
+        model: OpenAIModel | OpenAIModelName,
+        *,
+        completion_window: Literal['24h'] = '24h',
+        max_batch_size: int = 1000,
+        max_wait: float = 5.0,
+        poll_interval: float = 30.0,
+    ):
+        """Initialize an OpenAI batch model.
+
+        Args:
+            model: The OpenAI model, or the name of one, to send requests for.
+            completion_window: The time frame within which the batch should be processed.
+            max_batch_size: The number of waiting requests which are submitted as a batch straight away, at most
+                50,000 for OpenAI.
+            max_wait: How long in seconds to wait for more requests after the first one before submitting a batch.
+            poll_interval: How long in seconds to wait between checks of whether a submitted batch has finished.
+        """
+        super().__init__(max_batch_size=max_batch_size, max_wait=max_wait, poll_interval=poll_interval)
+        self.model = model if isinstance(model, OpenAIModel) else OpenAIModel(model)
+        self.completion_window = completion_window
+
+    @property
+    def model_name(self) -> OpenAIModelName:
+        """The model name."""
+        return self.model.model_name
+
+    @property
+    def system(self) -> str | None:
+        """The system / model provider."""
+        return self.model.system
+
+    @property
+    def base_url(self) -> str:
+        return self.model.base_url
+
+    async def build_request_body(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> dict[str, Any]:
+        params = await self.model._completions_params(  # pyright: ignore[reportPrivateUsage]
+            messages, cast(OpenAIModelSettings, model_settings or {}), model_request_parameters
+        )
+        return {key: value for key, value in params.items() if not isinstance(value, NotGiven)}
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        lines = [
+            json.dumps({'custom_id': r.custom_id, 'method': 'POST', 'url': '/v1/chat/completions', 'body': r.body})
+            for r in requests
+        ]
+        input_file = await self.model.client.files.create(
+            file=('batch.jsonl', '\n'.join(lines).encode()), purpose='batch'
+        )
+        batch = await self.model.client.batches.create(
+            input_file_id=input_file.id, endpoint='/v1/chat/completions', completion_window=self.completion_window
+        )
+        return batch.id
+
+    async def batch_finished(self, batch_id: str) -> bool:
+        batch = await self.model.client.batches.retrieve(batch_id)
+        if batch.status == 'failed':
+            errors = batch.errors and batch.errors.model_dump_json(exclude_none=True)
+            raise UnexpectedModelBehavior(f'Batch {batch_id} failed', errors)
+        return batch.status in ('completed', 'expired', 'cancelled')
+
+    async def batch_results(self, batch_id: str) -> dict[str, BatchResult]:
+        batch = await self.model.client.batches.retrieve(batch_id)
+        results: dict[str, BatchResult] = {}
+        # requests which failed are in the error file, the rest in the output file
+        for file_id in batch.output_file_id, batch.error_file_id:
+            if file_id is None:
+                continue
+            content = await self.model.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    results[entry['custom_id']] = self._map_batch_result(entry)
+        return results
+
+    def _map_batch_result(self, entry: dict[str, Any]) -> BatchResult:
+        response = entry.get('response')
+        if response is None:
+            return UnexpectedModelBehavior('Batch request failed', json.dumps(entry.get('error')))
+        elif response['status_code'] >= 400:
+            return ModelHTTPError(
+                status_code=response['status_code'], model_name=self.model_name, body=response['body']
+            )
+        completion = chat.ChatCompletion.model_validate(response['body'])
+        return self.model._process_response(completion), _map_usage(completion)  # pyright: ignore[reportPrivateUsage]
+
+
 def _map_usage(response: chat.ChatCompletion | ChatCompletionChunk) -> usage.Usage:
     response_usage = response.usage
     if response_usage is None:
@@ -0,0 +1,303 @@
+"""Client-side rate limiting for models.
+
+[`RateLimitedModel`][pydantic_ai.models.rate_limited.RateLimitedModel] holds requests back before they reach the
+wrapped model, so a provider's requests-per-minute and tokens-per-minute limits are respected without relying on
+`429` responses, and higher priority requests are sent first when the limits are reached.
+"""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Union, cast
+
+from ..messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    RetryPromptPart,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+from ..settings import ModelSettings
+from ..usage import Usage
+from . import KnownModelName, Model, ModelRequestParameters, StreamedResponse
+from .wrapper import WrapperModel
+
+
+class RateLimitedModelSettings(ModelSettings, total=False):
+    """Settings used for a request through a [`RateLimitedModel`][pydantic_ai.models.rate_limited.RateLimitedModel]."""
+
+    rate_limit_priority: int
+    """The priority of the request when it has to wait for capacity, lower values are sent first. Defaults to `0`.
+
+    For example, give interactive traffic priority `0` and batch jobs priority `10` so users never queue behind them.
+    """
+
+
+TokenEstimator = Callable[[list[ModelMessage], Union[ModelSettings, None]], int]
+"""A function which estimates the number of tokens a request will use, counted against `tokens_per_minute`."""
+
+
+@dataclass
+class TokenBucket:
+    """A token bucket which holds at most `capacity` tokens and refills continuously at `refill_rate` per second.
+
+    The level can go negative when more tokens were used than reserved, in which case that debt is paid back by the
+    refill before any more are handed out.
+    """
+
+    capacity: float
+    refill_rate: float
+    level: float = field(init=False)
+    _updated_at: float = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.level = self.capacity
+        self._updated_at = time.monotonic()
+
+    @classmethod
+    def per_minute(cls, limit: float) -> TokenBucket:
+        """Create a bucket allowing `limit` per minute, with bursts of up to a full minute's allowance."""
+        return cls(capacity=limit, refill_rate=limit / 60)
+
+    def delay(self, amount: float) -> float:
+        """How long to wait, in seconds, until `amount` can be taken from the bucket.
+
+        Amounts larger than the capacity only wait for the bucket to be full, so they can't block forever.
+        """
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(missing / self.refill_rate, 0.0)
+
+    def take(self, amount: float) -> None:
+        """Remove `amount` from the bucket, negative amounts give tokens back."""
+        self._refill()
+        self.level = min(self.level - amount, self.capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.level + (now - self._updated_at) * self.refill_rate, self.capacity)
+        self._updated_at = now
+
+
+@dataclass
+class RateLimitStats:
+    """Counters describing how requests through a `RateLimitedModel` have been scheduled."""
+
+    requests: int = 0
+    """The number of requests let through to the wrapped model."""
+    delayed_requests: int = 0
+    """The number of those requests which had to wait for capacity."""
+    total_wait: float = 0.0
+    """The total time in seconds requests spent waiting for capacity."""
+    max_wait: float = 0.0
+    """The longest time in seconds a single request waited for capacity."""
+    estimated_tokens: int = 0
+    """The tokens reserved from the estimates made before each request."""
+    actual_tokens: int = 0
+    """The tokens the wrapped model reported using for requests whose usage was reconciled."""
+
+    @property
+    def mean_wait(self) -> float:
+        """The mean time in seconds each request spent waiting for capacity."""
+        return self.total_wait / self.requests if self.requests else 0.0
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    sequence: int
+    tokens: int = field(compare=False)
+    future: asyncio.Future[None] = field(compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+@dataclass(init=False)
+class RateLimitedModel(WrapperModel):
+    """A model which limits the rate of requests and tokens sent to the wrapped model.
+
+    Each request reserves one request from the `requests_per_minute` bucket and an estimate of its tokens from the
+    `tokens_per_minute` bucket before it is sent. Once the response arrives the reservation is reconciled with the
+    actual [`Usage`][pydantic_ai.usage.Usage], so a poor estimate only affects the following requests. Requests which
+    can't be sent immediately wait in a priority queue, ordered by the `rate_limit_priority` of their
+    [`RateLimitedModelSettings`][pydantic_ai.models.rate_limited.RateLimitedModelSettings] and then by arrival.
+
+    Share a single instance between all agents using the same provider account, so they draw from the same limits.
+    """
+
+    requests_per_minute: float | None
+    tokens_per_minute: float | None
+    stats: RateLimitStats
+    _request_bucket: TokenBucket | None = field(repr=False)
+    _token_bucket: TokenBucket | None = field(repr=False)
+    _estimate_tokens: TokenEstimator = field(repr=False)
+    _queue: list[_Waiter] = field(repr=False)
+    _sequence: itertools.count[int] = field(repr=False)
+    _timer: asyncio.TimerHandle | None = field(repr=False)
+
+    def __init__(
+        self,
+        wrapped: Model | KnownModelName,
+        *,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        estimate_tokens: TokenEstimator | None = None,
+    ):
+        """Initialize a rate limited model instance.
+
+        Args:
+            wrapped: The name or instance of the model to rate limit.
+            requests_per_minute: The maximum number of requests per minute, `None` means no limit.
+            tokens_per_minute: The maximum number of tokens (prompt and completion) per minute, `None` means no limit.
+            estimate_tokens: A function estimating the tokens a request will use, defaults to
+                [`estimate_request_tokens`][pydantic_ai.models.rate_limited.estimate_request_tokens].
+        """
+        super().__init__(wrapped)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.stats = RateLimitStats()
+        self._request_bucket = TokenBucket.per_minute(requests_per_minute) if requests_per_minute else None
+        self._token_bucket = TokenBucket.per_minute(tokens_per_minute) if tokens_per_minute else None
+        self._estimate_tokens = estimate_tokens or estimate_request_tokens
+        self._queue = []
+        self._sequence = itertools.count()
+        self._timer = None
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of requests currently waiting for capacity."""
+        return sum(not waiter.cancelled for waiter in self._queue)
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        estimated = await self._acquire(messages, model_settings)
+        response, usage = await self.wrapped.request(messages, model_settings, model_request_parameters)
+        self._reconcile(estimated, usage)
+        return response, usage
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        estimated = await self._acquire(messages, model_settings)
+        async with self.wrapped.request_stream(messages, model_settings, model_request_parameters) as stream:
+            yield stream
+        self._reconcile(estimated, stream.usage())
+
+    async def _acquire(self, messages: list[ModelMessage], model_settings: ModelSettings | None) -> int:
+        """Wait until the request can be sent, and return the number of tokens reserved for it."""
+        tokens = self._estimate_tokens(messages, model_settings) if self._token_bucket else 0
+        if self._request_bucket is None and self._token_bucket is None:
+            self.stats.requests += 1
+            return tokens
+
+        priority = cast(RateLimitedModelSettings, model_settings or {}).get('rate_limit_priority', 0)
+        waiter = _Waiter(priority, next(self._sequence), tokens, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, waiter)
+        enqueued_at = time.monotonic()
+        self._dispatch()
+        delayed = not waiter.future.done()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # capacity was granted just as we were cancelled, give it back
+                self._release(tokens)
+            waiter.cancelled = True
+            self._dispatch()
+            raise
+
+        self.stats.requests += 1
+        self.stats.estimated_tokens += tokens
+        if delayed:
+            wait = time.monotonic() - enqueued_at
+            self.stats.delayed_requests += 1
+            self.stats.total_wait += wait
+            self.stats.max_wait = max(self.stats.max_wait, wait)
+        return tokens
+
+    def _dispatch(self) -> None:
+        """Grant capacity to waiters in priority order until the first one which has to wait."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._queue:
+            waiter = self._queue[0]
+            if waiter.cancelled:
+                heapq.heappop(self._queue)
+                continue
+
+            delay = max(
+                self._request_bucket.delay(1) if self._request_bucket else 0.0,
+                self._token_bucket.delay(waiter.tokens) if self._token_bucket else 0.0,
+            )
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            if self._request_bucket:
+                self._request_bucket.take(1)
+            if self._token_bucket:
+                self._token_bucket.take(waiter.tokens)
+            waiter.future.set_result(None)
+
+    def _release(self, tokens: int) -> None:
+        if self._request_bucket:
+            self._request_bucket.take(-1)
+        if self._token_bucket:
+            self._token_bucket.take(-tokens)
+
+    def _reconcile(self, estimated: int, usage: Usage) -> None:
+        """Correct the token bucket for the difference between the estimated and actual tokens used."""
+        if self._token_bucket is None or not usage.total_tokens:
+            return
+        self.stats.actual_tokens += usage.total_tokens
+        self._token_bucket.take(usage.total_tokens - estimated)
+        if usage.total_tokens < estimated:
+            # tokens were given back, waiters may be able to go now
+            self._dispatch()
+
+
+def estimate_request_tokens(messages: list[ModelMessage], model_settings: ModelSettings | None) -> int:
+    """Roughly estimate the tokens a request will use, assuming four characters per token.
+
+    The prompt is estimated from the text of all messages, and the completion from the `max_tokens` setting if set.
+    """
+    chars = 0
+    for message in messages:
+        for part in message.parts:
+            if isinstance(part, (SystemPromptPart, TextPart)):
+                chars += len(part.content)
+            elif isinstance(part, UserPromptPart):
+                if isinstance(part.content, str):
+                    chars += len(part.content)
+                else:
+                    # count media as a flat ~250 tokens, providers vary too much to do better here
+                    chars += sum(len(item) if isinstance(item, str) else 1_000 for item in part.content)
+            elif isinstance(part, ToolReturnPart):
+                chars += len(part.model_response_str())
+            elif isinstance(part, RetryPromptPart):
+                chars += len(part.model_response())
+            elif isinstance(part, ToolCallPart):
+                chars += len(part.tool_name) + len(part.args_as_json_str())
+        # allow for the per-message overhead of the chat format
+        chars += 16 if isinstance(message, ModelRequest) else 8
+    return chars // 4 + (model_settings or {}).get('max_tokens', 0)
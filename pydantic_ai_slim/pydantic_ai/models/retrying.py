@@ -0,0 +1,240 @@
+"""Retrying transient model errors with backoff.
+
+[`RetryingModel`][pydantic_ai.models.retrying.RetryingModel] calls the wrapped model again when a request fails with
+a transient error, such as a `429` or `5xx` response or a timeout, waiting with jittered exponential backoff, or for as
+long as the provider asked in a `Retry-After` header.
+"""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+import random
+from collections.abc import AsyncIterator, Mapping
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Callable
+
+import httpx
+
+from ..exceptions import ModelHTTPError
+from . import KnownModelName, Model, ModelRequestParameters, StreamedResponse
+from .wrapper import WrapperModel
+
+if TYPE_CHECKING:
+    from ..messages import ModelMessage, ModelResponse
+    from ..settings import ModelSettings
+    from ..usage import Usage
+
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+"""HTTP status codes which are retried by default."""
+
+
+def default_retry_condition(exc: Exception) -> bool:
+    """Whether an error is transient and the request worth retrying.
+
+    This is true for a [`ModelHTTPError`][pydantic_ai.exceptions.ModelHTTPError] with one of the
+    [`RETRYABLE_STATUS_CODES`][pydantic_ai.models.retrying.RETRYABLE_STATUS_CODES], and for errors caused by an
+    `httpx` timeout or connection error, even when the provider SDK wraps them in its own exception type.
+    """
+    if isinstance(exc, ModelHTTPError):
+        return exc.status_code in RETRYABLE_STATUS_CODES
+    cause: BaseException | None = exc
+    while cause is not None:
+        if isinstance(cause, httpx.TransportError):
+            return True
+        cause = cause.__cause__
+    return False
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> float | None:
+    """Get the number of seconds a provider asked clients to wait from response headers.
+
+    Both the standard `Retry-After` header, in seconds or as an HTTP date, and the millisecond `retry-after-ms` header
+    used by some providers are supported.
+
+    Returns:
+        The delay in seconds, or `None` if the headers don't specify one.
+    """
+    lower_headers = {k.lower(): v for k, v in headers.items()}
+    if (retry_after_ms := lower_headers.get('retry-after-ms')) is not None:
+        try:
+            return max(float(retry_after_ms) / 1000, 0.0)
+        except ValueError:
+            pass
+    if (retry_after := lower_headers.get('retry-after')) is not None:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        return max((retry_at - datetime.now(tz=timezone.utc)).total_seconds(), 0.0)
+    return None
+
+
+@dataclass
+class RetryBudget:
+    """Limits retries to a fraction of requests, so retries can't multiply the load on a struggling provider.
+
+    Every request deposits `ratio` into the budget, up to `max_balance`, and every retry withdraws one. Retries are
+    refused while the balance is below one. Share an instance between models to give them a common budget.
+    """
+
+    ratio: float = 0.2
+    """The number of retries allowed per request in the long run."""
+    max_balance: float = 10.0
+    """The most retries that can be saved up, which is also the starting balance."""
+    balance: float = field(init=False)
+
+    def __post_init__(self):
+        self.balance = self.max_balance
+
+    def deposit(self) -> None:
+        """Record a request."""
+        self.balance = min(self.balance + self.ratio, self.max_balance)
+
+    def withdraw(self) -> bool:
+        """Try to take one retry from the budget, returning whether it was allowed."""
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
+
+
+@dataclass(init=False)
+class RetryingModel(WrapperModel):
+    """A model which retries transient failures of the wrapped model.
+
+    Apart from `__init__` and [`retry_delay`][pydantic_ai.models.retrying.RetryingModel.retry_delay], which can be
+    overridden to change the backoff, all methods are private or match those of the base class.
+
+    Streamed requests are only retried if the error happens before the stream is returned, which for most models
+    includes waiting for the first chunk of the response; once events have been handed out the error is raised.
+
+    If the wrapped model uses a provider SDK with its own retries, like `AsyncOpenAI(max_retries=...)`, consider
+    disabling them so the two don't multiply.
+    """
+
+    max_retries: int
+    initial_delay: float
+    max_delay: float
+    multiplier: float
+    max_retry_after: float
+    budget: RetryBudget | None
+    retries: int
+    """The number of retries made so far."""
+
+    _retry_on: Callable[[Exception], bool] = field(repr=False)
+
+    def __init__(
+        self,
+        wrapped: Model | KnownModelName,
+        *,
+        max_retries: int = 3,
+        initial_delay: float = 0.5,
+        max_delay: float = 30.0,
+        multiplier: float = 2.0,
+        max_retry_after: float = 60.0,
+        retry_on: Callable[[Exception], bool] | tuple[type[Exception], ...] = default_retry_condition,
+        budget: RetryBudget | None = None,
+    ):
+        """Initialize a retrying model instance.
+
+        Args:
+            wrapped: The name or instance of the model whose requests should be retried.
+            max_retries: The maximum number of retries for a single request.
+            initial_delay: The upper bound in seconds of the random delay before the first retry.
+            max_delay: The largest upper bound in seconds of the random delay between retries.
+            multiplier: How much the upper bound of the delay grows with each retry.
+            max_retry_after: The longest `Retry-After` delay in seconds that will be waited for, if the provider asks
+                for longer the error is raised instead.
+            retry_on: A callable or tuple of exceptions deciding which errors are retried, defaults to
+                [`default_retry_condition`][pydantic_ai.models.retrying.default_retry_condition].
+            budget: An optional [`RetryBudget`][pydantic_ai.models.retrying.RetryBudget] limiting retries across
+                requests.
+        """
+        super().__init__(wrapped)
+        self.max_retries = max_retries
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.max_retry_after = max_retry_after
+        self.budget = budget
+        self.retries = 0
+
+        if isinstance(retry_on, tuple):
+            exception_types = retry_on
+            self._retry_on = lambda exc: isinstance(exc, exception_types)
+        else:
+            self._retry_on = retry_on
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        if self.budget is not None:
+            self.budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return await self.wrapped.request(messages, model_settings, model_request_parameters)
+            except Exception as exc:
+                await self._wait_before_retry(exc, attempt)
+                attempt += 1
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        if self.budget is not None:
+            self.budget.deposit()
+        attempt = 0
+        while True:
+            async with AsyncExitStack() as stack:
+                try:
+                    response = await stack.enter_async_context(
+                        self.wrapped.request_stream(messages, model_settings, model_request_parameters)
+                    )
+                except Exception as exc:
+                    await self._wait_before_retry(exc, attempt)
+                    attempt += 1
+                    continue
+                yield response
+                return
+
+    def retry_delay(self, exc: Exception, attempt: int) -> float | None:
+        """Calculate how long to wait before retrying after an error.
+
+        Args:
+            exc: The error raised by the wrapped model.
+            attempt: The number of retries already made for this request.
+
+        Returns:
+            The delay in seconds, or `None` if the request shouldn't be retried.
+        """
+        if attempt >= self.max_retries or not self._retry_on(exc):
+            return None
+        if isinstance(exc, ModelHTTPError) and exc.headers is not None:
+            retry_after = parse_retry_after(exc.headers)
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+        # "full jitter", spreading retries from many clients evenly over the backoff window
+        return random.uniform(0, min(self.max_delay, self.initial_delay * self.multiplier**attempt))
+
+    async def _wait_before_retry(self, exc: Exception, attempt: int) -> None:
+        """Sleep before the next attempt, or re-raise `exc` if it shouldn't be retried."""
+        delay = self.retry_delay(exc, attempt)
+        if delay is None or (self.budget is not None and not self.budget.withdraw()):
+            raise exc
+        self.retries += 1
+        await asyncio.sleep(delay)
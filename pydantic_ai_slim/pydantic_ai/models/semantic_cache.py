@@ -0,0 +1,486 @@
+"""Embedding-similarity response caching for models.
+
+[`SemanticCachedModel`][pydantic_ai.models.semantic_cache.SemanticCachedModel] answers a request from the cache when
+its latest user prompt is similar enough to one that has been answered before, with the same system prompts, tools
+and settings. This suits FAQ style agents which get many near-duplicate questions; for exact matches see
+[`CachedModel`][pydantic_ai.models.cached.CachedModel].
+"""
+
+from __future__ import annotations as _annotations
+
+import copy
+import hashlib
+import inspect
+import json
+import re
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field, replace
+from typing import Callable, Union
+
+import pydantic_core
+
+from .. import _utils
+from ..messages import (
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    UserPromptPart,
+)
+from ..settings import ModelSettings
+from ..usage import Usage
+from . import KnownModelName, Model, ModelRequestParameters, StreamedResponse
+from .cached import _IGNORED_SETTINGS, CachedStreamedResponse, _canonical  # pyright: ignore[reportPrivateUsage]
+from .wrapper import WrapperModel
+
+try:
+    import numpy as np
+    import numpy.typing as npt
+except ImportError as _import_error:
+    raise ImportError(
+        'Please install `numpy` to use the semantic cache, '
+        "you can use the `semantic-cache` optional group — `pip install 'pydantic-ai-slim[semantic-cache]'`"
+    ) from _import_error
+
+EmbeddingFunction = Callable[[str], Union['npt.ArrayLike', Awaitable['npt.ArrayLike']]]
+"""A function which embeds a prompt into a vector, either synchronously or asynchronously."""
+
+_SEARCH_CANDIDATES = 8
+"""How many of the most similar responses are considered per search, in case the best ones have expired."""
+
+
+@dataclass(init=False)
+class HashingEmbedder:
+    """A local, dependency free embedding function based on feature hashing.
+
+    Words and character trigrams are hashed into a fixed size vector, so prompts which share most of their words, or
+    only differ by typos, end up close together. It has no notion of meaning, so it's a stand-in for offline use and
+    tests rather than a replacement for a real embedding model.
+    """
+
+    dimensions: int
+
+    def __init__(self, dimensions: int = 512):
+        """Initialize a hashing embedder.
+
+        Args:
+            dimensions: The size of the vectors produced.
+        """
+        self.dimensions = dimensions
+
+    def __call__(self, text: str) -> npt.NDArray[np.float32]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in _word_re.findall(text.lower()):
+            self._add(vector, word, 1.0)
+            padded = f'<{word}>'
+            for i in range(len(padded) - 2):
+                self._add(vector, padded[i : i + 3], 0.5)
+        return vector
+
+    def _add(self, vector: npt.NDArray[np.float32], feature: str, weight: float) -> None:
+        h = zlib.crc32(feature.encode())
+        vector[h % self.dimensions] += weight if h & 0x80000000 else -weight
+
+
+_word_re = re.compile(r'\w+')
+
+
+class VectorIndex(ABC):
+    """An in-process index of unit vectors searched by cosine similarity."""
+
+    @abstractmethod
+    def add(self, key: int, vector: npt.NDArray[np.float32]) -> None:
+        """Add a normalized vector to the index under `key`."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def remove(self, key: int) -> None:
+        """Remove the vector stored under `key`, if any."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def search(self, vector: npt.NDArray[np.float32], k: int = 1) -> list[tuple[int, float]]:
+        """Return up to `k` `(key, similarity)` pairs for the vectors most similar to `vector`, best first."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError()
+
+
+class BruteForceIndex(VectorIndex):
+    """Exact search over every stored vector with a single matrix product."""
+
+    def __init__(self) -> None:
+        self._keys: list[int] = []
+        self._positions: dict[int, int] = {}
+        self._matrix: npt.NDArray[np.float32] | None = None
+
+    def add(self, key: int, vector: npt.NDArray[np.float32]) -> None:
+        if key in self._positions:
+            self.remove(key)
+        n = len(self._keys)
+        if self._matrix is None:
+            self._matrix = np.empty((8, vector.shape[0]), dtype=np.float32)
+        elif n == self._matrix.shape[0]:
+            # grow geometrically so adding is amortized O(1)
+            self._matrix = np.concatenate([self._matrix, np.empty_like(self._matrix)])
+        self._matrix[n] = vector
+        self._keys.append(key)
+        self._positions[key] = n
+
+    def remove(self, key: int) -> None:
+        position = self._positions.pop(key, None)
+        if position is None:
+            return
+        assert self._matrix is not None
+        last = len(self._keys) - 1
+        if position != last:
+            # move the last vector into the gap to keep the matrix dense
+            last_key = self._keys[last]
+            self._matrix[position] = self._matrix[last]
+            self._keys[position] = last_key
+            self._positions[last_key] = position
+        self._keys.pop()
+
+    def search(self, vector: npt.NDArray[np.float32], k: int = 1) -> list[tuple[int, float]]:
+        n = len(self._keys)
+        if n == 0 or self._matrix is None:
+            return []
+        scores = self._matrix[:n] @ vector
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._keys[i], float(scores[i])) for i in top]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class IVFIndex(VectorIndex):
+    """An approximate inverted-file index for larger caches.
+
+    Vectors are searched exactly until `train_size` have been added, then they are clustered with k-means into
+    `n_lists` lists and only the `n_probe` lists with the closest centroids are searched.
+    """
+
+    def __init__(self, n_lists: int = 16, n_probe: int = 4, train_size: int | None = None, seed: int = 0):
+        """Initialize an IVF index.
+
+        Args:
+            n_lists: The number of clusters the vectors are partitioned into.
+            n_probe: The number of clusters searched for each query.
+            train_size: The number of vectors to collect before clustering, defaults to `n_lists * 16`.
+            seed: Seed for choosing the initial centroids, so clustering is reproducible.
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_size = train_size or n_lists * 16
+        self._seed = seed
+        self._flat = BruteForceIndex()
+        self._vectors: dict[int, npt.NDArray[np.float32]] = {}
+        self._centroids: npt.NDArray[np.float32] | None = None
+        self._lists: list[BruteForceIndex] = []
+        self._assignments: dict[int, int] = {}
+
+    @property
+    def trained(self) -> bool:
+        """Whether the vectors have been clustered."""
+        return self._centroids is not None
+
+    def add(self, key: int, vector: npt.NDArray[np.float32]) -> None:
+        if self._centroids is None:
+            self._flat.add(key, vector)
+            self._vectors[key] = vector
+            if len(self._vectors) >= self.train_size:
+                self._train()
+        else:
+            self.remove(key)
+            list_index = int(np.argmax(self._centroids @ vector))
+            self._lists[list_index].add(key, vector)
+            self._assignments[key] = list_index
+
+    def remove(self, key: int) -> None:
+        if self._centroids is None:
+            self._flat.remove(key)
+            self._vectors.pop(key, None)
+        elif (list_index := self._assignments.pop(key, None)) is not None:
+            self._lists[list_index].remove(key)
+
+    def search(self, vector: npt.NDArray[np.float32], k: int = 1) -> list[tuple[int, float]]:
+        if self._centroids is None:
+            return self._flat.search(vector, k)
+        centroid_scores = self._centroids @ vector
+        n_probe = min(self.n_probe, len(self._lists))
+        probes = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        results: list[tuple[int, float]] = [result for i in probes for result in self._lists[int(i)].search(vector, k)]
+        results.sort(key=lambda result: result[1], reverse=True)
+        return results[:k]
+
+    def __len__(self) -> int:
+        if self._centroids is None:
+            return len(self._flat)
+        return len(self._assignments)
+
+    def _train(self, iterations: int = 10) -> None:
+        keys = list(self._vectors)
+        data = np.stack([self._vectors[key] for key in keys])
+        rng = np.random.default_rng(self._seed)
+        n_lists = min(self.n_lists, len(keys))
+        centroids = data[rng.choice(len(keys), n_lists, replace=False)]
+        assignments = np.zeros(len(keys), dtype=np.intp)
+        for _ in range(iterations):
+            assignments = np.argmax(data @ centroids.T, axis=1)
+            for i in range(n_lists):
+                members = data[assignments == i]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[i] = _normalize(centroid)
+
+        self._centroids = centroids
+        self._lists = [BruteForceIndex() for _ in range(n_lists)]
+        for key, vector, list_index in zip(keys, data, assignments):
+            self._lists[list_index].add(key, vector)
+            self._assignments[key] = int(list_index)
+        self._flat = BruteForceIndex()
+        self._vectors = {}
+
+
+@dataclass
+class _SemanticEntry:
+    namespace: str
+    prompt: str
+    response: ModelResponse
+    usage: Usage
+    created_at: float
+
+
+@dataclass(init=False)
+class SemanticCachedModel(WrapperModel):
+    """A model which answers requests from a cache when a similar prompt has been answered before.
+
+    The cache is keyed on the text of the latest user prompt, compared by the cosine similarity of its embedding, and
+    on a fingerprint of everything else that shapes the answer: the model, system prompts, tools and model settings.
+    With `match_history=False` (the default) earlier conversation turns are not part of the fingerprint, so a
+    question is answered from the cache whatever was said before it.
+
+    Only requests whose latest message is a plain text user prompt are looked up, and only responses which don't
+    call function tools are stored, since tool arguments usually depend on details a similar question may not share.
+    """
+
+    embedder: EmbeddingFunction
+    threshold: float
+    max_entries: int | None
+    ttl: float | None
+    match_history: bool
+    hits: int
+    misses: int
+    _index_factory: Callable[[], VectorIndex] = field(repr=False)
+    _indexes: dict[str, VectorIndex] = field(repr=False)
+    _entries: OrderedDict[int, _SemanticEntry] = field(repr=False)
+    _next_key: int = field(repr=False)
+
+    def __init__(
+        self,
+        wrapped: Model | KnownModelName,
+        embedder: EmbeddingFunction,
+        *,
+        threshold: float = 0.9,
+        index_factory: Callable[[], VectorIndex] = BruteForceIndex,
+        max_entries: int | None = 1024,
+        ttl: float | None = None,
+        match_history: bool = False,
+    ):
+        """Initialize a semantic cached model instance.
+
+        Args:
+            wrapped: The name or instance of the model whose responses should be cached.
+            embedder: A function which embeds a prompt into a vector, usually by calling an embedding model.
+                [`HashingEmbedder`][pydantic_ai.models.semantic_cache.HashingEmbedder] can be used offline and in
+                tests, but it only compares the words of prompts rather than their meaning.
+            threshold: The minimum cosine similarity between prompts for a cached response to be used.
+            index_factory: Creates the vector index used for each fingerprint, e.g.
+                [`IVFIndex`][pydantic_ai.models.semantic_cache.IVFIndex] for large caches.
+            max_entries: The maximum number of responses to keep, the least recently used is evicted first.
+                `None` means no limit.
+            ttl: Time in seconds after which a response expires, `None` means responses never expire.
+            match_history: Whether earlier conversation turns must also match exactly for a response to be reused.
+        """
+        super().__init__(wrapped)
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.match_history = match_history
+        self.hits = 0
+        self.misses = 0
+        self._index_factory = index_factory
+        self._indexes = {}
+        self._entries = OrderedDict()
+        self._next_key = 0
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> tuple[ModelResponse, Usage]:
+        prompt = _latest_user_prompt(messages)
+        if prompt is None:
+            return await self.wrapped.request(messages, model_settings, model_request_parameters)
+
+        namespace = self._fingerprint(messages, model_settings, model_request_parameters)
+        vector = await self._embed(prompt)
+        if cached := self._lookup(namespace, vector):
+            return cached
+
+        response, usage = await self.wrapped.request(messages, model_settings, model_request_parameters)
+        self._store(namespace, prompt, vector, response, usage, model_request_parameters)
+        return response, usage
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> AsyncIterator[StreamedResponse]:
+        prompt = _latest_user_prompt(messages)
+        if prompt is None:
+            async with self.wrapped.request_stream(messages, model_settings, model_request_parameters) as stream:
+                yield stream
+            return
+
+        namespace = self._fingerprint(messages, model_settings, model_request_parameters)
+        vector = await self._embed(prompt)
+        if cached := self._lookup(namespace, vector):
+            response, usage = cached
+            yield CachedStreamedResponse(
+                _model_name=response.model_name or self.model_name, _response=response, _cached_usage=usage
+            )
+            return
+
+        async with self.wrapped.request_stream(messages, model_settings, model_request_parameters) as stream:
+            yield stream
+            async for _ in stream:
+                pass
+            self._store(namespace, prompt, vector, stream.get(), stream.usage(), model_request_parameters)
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        self._indexes.clear()
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def _embed(self, prompt: str) -> npt.NDArray[np.float32]:
+        result = self.embedder(prompt)
+        if inspect.isawaitable(result):
+            result = await result
+        return _normalize(np.asarray(result, dtype=np.float32))
+
+    def _fingerprint(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> str:
+        system_prompts = [
+            part.content
+            for message in messages
+            if isinstance(message, ModelRequest)
+            for part in message.parts
+            if isinstance(part, SystemPromptPart)
+        ]
+        settings = {k: v for k, v in (model_settings or {}).items() if k not in _IGNORED_SETTINGS}
+        payload = {
+            'system': self.wrapped.system,
+            'model_name': self.wrapped.model_name,
+            'system_prompts': system_prompts,
+            'settings': pydantic_core.to_jsonable_python(settings),
+            'parameters': asdict(model_request_parameters),
+        }
+        if self.match_history:
+            payload['history'] = _canonical(ModelMessagesTypeAdapter.dump_python(messages[:-1], mode='json'))
+        serialized = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    def _lookup(self, namespace: str, vector: npt.NDArray[np.float32]) -> tuple[ModelResponse, Usage] | None:
+        now = time.monotonic()
+        while (index := self._indexes.get(namespace)) is not None:
+            evicted = False
+            for key, similarity in index.search(vector, k=_SEARCH_CANDIDATES):
+                if similarity < self.threshold:
+                    break
+                entry = self._entries[key]
+                if self.ttl is not None and entry.created_at + self.ttl <= now:
+                    # a less similar response which hasn't expired can still be used
+                    self._evict(key)
+                    evicted = True
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                response, usage = copy.deepcopy((entry.response, entry.usage))
+                return replace(response, timestamp=_utils.now_utc()), usage
+            if not evicted:
+                break
+            # more candidates above the threshold may have been hidden behind the expired ones
+        self.misses += 1
+        return None
+
+    def _store(
+        self,
+        namespace: str,
+        prompt: str,
+        vector: npt.NDArray[np.float32],
+        response: ModelResponse,
+        usage: Usage,
+        model_request_parameters: ModelRequestParameters,
+    ) -> None:
+        result_tool_names = {tool.name for tool in model_request_parameters.result_tools}
+        if not all(isinstance(part, TextPart) or part.tool_name in result_tool_names for part in response.parts):
+            return
+
+        key = self._next_key
+        self._next_key += 1
+        self._entries[key] = _SemanticEntry(namespace, prompt, response, usage, time.monotonic())
+        index = self._indexes.get(namespace)
+        if index is None:
+            index = self._indexes[namespace] = self._index_factory()
+        index.add(key, vector)
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: int) -> None:
+        entry = self._entries.pop(key)
+        index = self._indexes[entry.namespace]
+        index.remove(key)
+        if not len(index):
+            del self._indexes[entry.namespace]
+
+
+def _latest_user_prompt(messages: list[ModelMessage]) -> str | None:
+    """Return the text of the latest user prompt, or `None` if the last message isn't a plain text user prompt."""
+    if not messages or not isinstance(request := messages[-1], ModelRequest):
+        return None
+    prompts: list[str] = []
+    for part in request.parts:
+        if isinstance(part, UserPromptPart) and isinstance(part.content, str):
+            prompts.append(part.content)
+        elif not isinstance(part, SystemPromptPart):
+            return None
+    return '\n'.join(prompts) if prompts else None
+
+
+def _normalize(vector: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    norm = np.float32(np.linalg.norm(vector))
+    return vector / norm if norm else vector
@@ -12,12 +12,13 @@ from httpx import AsyncClient as AsyncHTTPClient
 from typing_extensions import deprecated
 
 from .. import usage
-from .._utils import run_in_executor
+from .._utils import MessageMappingCache, run_in_executor
 from ..exceptions import UserError
 from ..messages import ModelMessage, ModelResponse
 from ..settings import ModelSettings
 from . import ModelRequestParameters, StreamedResponse, cached_async_http_client
 from .gemini import GeminiModel, GeminiModelName
+from .media import get_media_store
 
 try:
     import google.auth
@@ -106,7 +107,7 @@ class VertexAIModel(GeminiModel):
         self.project_id = project_id
         self.region = region
         self.model_publisher = model_publisher
-        self.client = http_client or cached_async_http_client()
+        self.client = http_client or cached_async_http_client(base_url=f'https://{region}-aiplatform.googleapis.com')
         self.url_template = url_template
 
         self._auth = None
@@ -116,6 +117,9 @@ class VertexAIModel(GeminiModel):
             DeprecationWarning,
         )
         self._provider = None
+        self._message_cache = MessageMappingCache()
+        self._media_store = get_media_store()
+        self._file_upload_threshold = None
 
     async def ainit(self) -> None:
         """Initialize the model, setting the URL and auth.
@@ -65,4 +65,6 @@ class DeepSeekProvider(Provider[AsyncOpenAI]):
         elif http_client is not None:
             self._client = AsyncOpenAI(base_url=self.base_url, api_key=api_key, http_client=http_client)
         else:
-            self._client = AsyncOpenAI(base_url=self.base_url, api_key=api_key, http_client=cached_async_http_client())
+            self._client = AsyncOpenAI(
+                base_url=self.base_url, api_key=api_key, http_client=cached_async_http_client(base_url=self.base_url)
+            )
@@ -1,14 +1,19 @@
 from __future__ import annotations as _annotations
 
+import asyncio
+import contextlib
 import functools
+import weakref
 from collections.abc import AsyncGenerator, Mapping
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Literal, overload
+from typing import Literal, cast, overload
 
+import anyio
 import anyio.to_thread
 import httpx
 
+from pydantic_ai._utils import now_utc
 from pydantic_ai.exceptions import UserError
 
 from ..models import cached_async_http_client
@@ -28,8 +33,14 @@ except ImportError as _import_error:
 
 __all__ = ('GoogleVertexProvider',)
 
-# default expiry is 3600 seconds
-MAX_TOKEN_AGE = timedelta(seconds=3000)
+# default expiry is 3600 seconds, used if the credentials don't say when their token expires
+DEFAULT_TOKEN_LIFETIME = timedelta(seconds=3600)
+# tokens are refreshed in the background this long before they expire, so requests don't wait for a refresh
+REFRESH_AHEAD = timedelta(seconds=600)
+# requests refresh the token themselves if it expires within this margin, e.g. because the background refresh failed
+MIN_TOKEN_VALIDITY = timedelta(seconds=60)
+# the minimum delay in seconds between background refreshes, in case a refresh doesn't extend the expiry
+_MIN_REFRESH_INTERVAL = 1.0
 
 
 class GoogleVertexProvider(Provider[httpx.AsyncClient]):
@@ -102,22 +113,44 @@ class GoogleVertexProvider(Provider[httpx.AsyncClient]):
         if service_account_file and service_account_info:
             raise ValueError('Only one of `service_account_file` or `service_account_info` can be provided.')
 
-        self._client = http_client or cached_async_http_client()
+        self._client = http_client or cached_async_http_client(base_url=f'https://{region}-aiplatform.googleapis.com')
         self.service_account_file = service_account_file
         self.service_account_info = service_account_info
         self.project_id = project_id
         self.region = region
         self.model_publisher = model_publisher
 
-        self._client.auth = _VertexAIAuth(service_account_file, service_account_info, project_id, region)
+        self._auth = _VertexAIAuth(service_account_file, service_account_info, project_id, region)
+        self._client.auth = self._auth
         self._client.base_url = self.base_url
 
+    async def ainit(self) -> None:
+        """Load the credentials and get a token ahead of the first request, so it doesn't wait for them.
+
+        This isn't required, the first request does it otherwise. Either way the token is then refreshed in the
+        background before it expires, until [`aclose`][pydantic_ai.providers.google_vertex.GoogleVertexProvider.aclose]
+        is called.
+
+        Raises:
+            UserError: If no project ID was provided and none was found in the credentials.
+        """
+        await self._auth.refresh()
+        if self.project_id is None:
+            self.project_id = self._auth.project_id
+            self._client.base_url = self.base_url
+
+    async def aclose(self) -> None:
+        """Stop refreshing the token in the background.
+
+        The refresh continues while other providers use the same credentials. The HTTP client isn't closed, since it's
+        usually shared, and the provider can still be used afterwards, refreshing its token when needed.
+        """
+        await self._auth.aclose()
+
 
 class _VertexAIAuth(httpx.Auth):
     """Auth class for Vertex AI API."""
 
-    credentials: BaseCredentials | ServiceAccountCredentials | None
-
     def __init__(
         self,
         service_account_file: Path | str | None = None,
@@ -130,16 +163,27 @@ class _VertexAIAuth(httpx.Auth):
         self.project_id = project_id
         self.region = region
 
-        self.credentials = None
-        self.token_created: datetime | None = None
+        self._token: _CredentialsToken | None = None
+        self._lock = anyio.Lock()
+
+    @property
+    def credentials(self) -> BaseCredentials | ServiceAccountCredentials | None:
+        return self._token.credentials if self._token is not None else None
+
+    @property
+    def token_created(self) -> datetime | None:
+        return self._token.created if self._token is not None else None
+
+    @property
+    def token_expiry(self) -> datetime | None:
+        """When the current token expires, `None` if there is no token yet."""
+        return self._token.expiry if self._token is not None else None
 
     async def async_auth_flow(self, request: httpx.Request) -> AsyncGenerator[httpx.Request, httpx.Response]:
-        if self.credentials is None:
-            self.credentials = await self._get_credentials()
-        if self.credentials.token is None or self._token_expired():  # type: ignore[reportUnknownMemberType]
-            await anyio.to_thread.run_sync(self._refresh_token)
-            self.token_created = datetime.now()
-        request.headers['Authorization'] = f'Bearer {self.credentials.token}'  # type: ignore[reportUnknownMemberType]
+        if self._token is None or self._token.expires_within(MIN_TOKEN_VALIDITY):
+            await self.refresh(MIN_TOKEN_VALIDITY)
+        assert self._token is not None
+        request.headers['Authorization'] = f'Bearer {self._token.credentials.token}'  # type: ignore[reportUnknownMemberType]
 
         # NOTE: This workaround is in place because we might get the project_id from the credentials.
         request.url = httpx.URL(str(request.url).replace('projects/None', f'projects/{self.project_id}'))
@@ -166,21 +210,143 @@ class _VertexAIAuth(httpx.Auth):
             self.project_id = creds_project_id
         return creds
 
-    def _token_expired(self) -> bool:
-        if self.token_created is None:
+    async def refresh(self, min_validity: timedelta = REFRESH_AHEAD) -> None:
+        """Load the credentials if needed, and refresh the token unless it's valid for at least `min_validity`."""
+        if self._token is None:
+            async with self._lock:
+                if self._token is None:
+                    self._token = _CredentialsToken.for_credentials(await self._get_credentials())
+        self._token.add_user(self)
+        await self._token.refresh(min_validity)
+
+    async def aclose(self) -> None:
+        """Stop refreshing the token in the background, unless other auths use the same credentials."""
+        if self._token is not None:
+            await self._token.release(self)
+
+
+class _CredentialsToken:
+    """The token of one credentials object, refreshed in the background for the auths using it.
+
+    Credentials discovered with `google.auth.default()` are shared by every provider in the process, so the lock which
+    makes concurrent refreshes wait for each other, and the background refresh, belong to the credentials rather than
+    to each auth.
+    """
+
+    def __init__(self, credentials: BaseCredentials | ServiceAccountCredentials) -> None:
+        self.credentials = credentials
+        self.created: datetime | None = None
+        self._lock = anyio.Lock()
+        self._users: weakref.WeakSet[_VertexAIAuth] = weakref.WeakSet()
+        self._refresher: asyncio.Task[None] | None = None
+
+    @classmethod
+    def for_credentials(cls, credentials: BaseCredentials | ServiceAccountCredentials) -> _CredentialsToken:
+        """Get the token shared by everything using `credentials`, creating it if needed."""
+        token = _tokens.get(id(credentials))
+        if token is None or token.credentials is not credentials:
+            token = _tokens[id(credentials)] = cls(credentials)
+        return token
+
+    @property
+    def expiry(self) -> datetime | None:
+        """When the current token expires, `None` if there is no token yet."""
+        if self.created is None:
+            return None
+        expiry: datetime | None = getattr(self.credentials, 'expiry', None)
+        if isinstance(expiry, datetime):
+            # google-auth uses naive datetimes in UTC
+            return expiry.replace(tzinfo=timezone.utc) if expiry.tzinfo is None else expiry
+        return self.created + DEFAULT_TOKEN_LIFETIME
+
+    @property
+    def in_use(self) -> bool:
+        """Whether any auth uses the token, otherwise it isn't refreshed in the background."""
+        return bool(self._users)
+
+    def expires_within(self, margin: timedelta) -> bool:
+        if self.credentials.token is None:  # type: ignore[reportUnknownMemberType]
             return True
-        else:
-            return (datetime.now() - self.token_created) > MAX_TOKEN_AGE
+        expiry = self.expiry
+        return expiry is None or expiry - margin <= now_utc()
+
+    def add_user(self, user: _VertexAIAuth) -> None:
+        """Keep refreshing the token in the background while `user` exists."""
+        self._users.add(user)
+
+    async def refresh(self, min_validity: timedelta = REFRESH_AHEAD) -> None:
+        """Refresh the token unless it's valid for at least `min_validity`.
+
+        Concurrent calls share a single refresh: callers waiting for the lock find the token already refreshed.
+        """
+        async with self._lock:
+            if self.expires_within(min_validity):
+                await anyio.to_thread.run_sync(self._refresh_token)
+                self.created = now_utc()
+            if self.in_use and (self._refresher is None or self._refresher.done()):
+                self._refresher = asyncio.create_task(_refresh_ahead(weakref.ref(self)))
+
+    async def release(self, user: _VertexAIAuth) -> None:
+        """Stop refreshing the token for `user`, and stop the background refresh once no auth uses it."""
+        self._users.discard(user)
+        if not self._users and self._refresher is not None:
+            self._refresher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresher
+            self._refresher = None
 
     def _refresh_token(self) -> str:  # pragma: no cover
-        assert self.credentials is not None
         self.credentials.refresh(Request())  # type: ignore[reportUnknownMemberType]
         assert isinstance(self.credentials.token, str), f'Expected token to be a string, got {self.credentials.token}'  # type: ignore[reportUnknownMemberType]
         return self.credentials.token
 
 
+# keyed by `id()` since credentials needn't be hashable, the token holds the credentials so the id isn't reused
+_tokens: weakref.WeakValueDictionary[int, _CredentialsToken] = weakref.WeakValueDictionary()
+
+
+async def _refresh_ahead(token_ref: weakref.ref[_CredentialsToken]) -> None:
+    """Refresh a token shortly before it expires, for as long as an auth uses it.
+
+    Only a weak reference is held while sleeping, so the task ends once no provider uses the credentials.
+    """
+    while (token := token_ref()) is not None and token.in_use:
+        expiry = token.expiry
+        if expiry is None:
+            return
+        delay = (expiry - REFRESH_AHEAD - now_utc()).total_seconds()
+        del token
+        await asyncio.sleep(max(delay, _MIN_REFRESH_INTERVAL))
+
+        if (token := token_ref()) is None or not token.in_use:
+            return
+        try:
+            await token.refresh()
+        except Exception:
+            # the next request refreshes the token itself, and raises the error if it persists
+            return
+        finally:
+            del token
+
+
+_default_credentials: tuple[BaseCredentials, str | None] | None = None
+_default_credentials_lock = anyio.Lock()
+
+
 async def _async_google_auth() -> tuple[BaseCredentials, str | None]:
-    return await anyio.to_thread.run_sync(google.auth.default, ['https://www.googleapis.com/auth/cloud-platform'])  # type: ignore
+    """Get the default credentials and project, discovering them once per process since it can be slow."""
+    global _default_credentials
+    async with _default_credentials_lock:
+        credentials = _default_credentials
+        if credentials is None:
+            credentials = _default_credentials = cast(
+                'tuple[BaseCredentials, str | None]',
+                await anyio.to_thread.run_sync(
+                    google.auth.default,  # type: ignore
+                    ['https://www.googleapis.com/auth/cloud-platform'],
+                ),
+            )
+        return credentials
 
 
 async def _creds_from_file(service_account_file: str | Path) -> ServiceAccountCredentials:
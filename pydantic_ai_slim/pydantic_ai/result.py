@@ -1,18 +1,24 @@
 from __future__ import annotations as _annotations
 
+import time
 from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
 from copy import copy
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Generic, Union, cast
+from typing import TYPE_CHECKING, Generic, Union, cast
 
 from typing_extensions import TypeVar, assert_type
 
-from . import _result, _utils, exceptions, messages as _messages, models
+from . import _utils, exceptions, messages as _messages, models
 from .messages import AgentStreamEvent, FinalResultEvent
+from .timings import RunTimings
 from .tools import AgentDepsT, RunContext
 from .usage import Usage, UsageLimits
 
+if TYPE_CHECKING:
+    # `_result` imports the type variables from this module, so importing it here at runtime would be circular
+    from . import _result
+
 __all__ = 'ResultDataT', 'ResultDataT_inv', 'ResultValidatorFunc'
 
 
@@ -184,6 +190,7 @@ class StreamedRunResult(Generic[AgentDepsT, ResultDataT]):
     _result_validators: list[_result.ResultValidator[AgentDepsT, ResultDataT]]
     _result_tool_name: str | None
     _on_complete: Callable[[], Awaitable[None]]
+    _timings: RunTimings
 
     _initial_run_ctx_usage: Usage = field(init=False)
     is_complete: bool = field(default=False, init=False)
@@ -264,6 +271,51 @@ class StreamedRunResult(Generic[AgentDepsT, ResultDataT]):
             self.new_messages(result_tool_return_content=result_tool_return_content)
         )
 
+    def all_messages_bytes(
+        self, *, result_tool_return_content: str | None = None, compress: bool | int = False
+    ) -> bytes:
+        """Return all messages from [`all_messages`][pydantic_ai.result.StreamedRunResult.all_messages] in the compact binary format.
+
+        See [`message_codec`][pydantic_ai.message_codec] — this requires the `msgpack` package, load the messages
+        again with [`load_messages_bytes`][pydantic_ai.message_codec.load_messages_bytes].
+
+        Args:
+            result_tool_return_content: The return content of the tool call to set in the last message.
+                This provides a convenient way to modify the content of the result tool call if you want to continue
+                the conversation and want to set the response to the result tool call. If `None`, the last message will
+                not be modified.
+            compress: Whether to compress the data with Zstandard, or the compression level to use.
+
+        Returns:
+            Bytes representing the messages.
+        """
+        from .message_codec import dump_messages_bytes
+
+        return dump_messages_bytes(
+            self.all_messages(result_tool_return_content=result_tool_return_content), compress=compress
+        )
+
+    def new_messages_bytes(
+        self, *, result_tool_return_content: str | None = None, compress: bool | int = False
+    ) -> bytes:
+        """Return new messages from [`new_messages`][pydantic_ai.result.StreamedRunResult.new_messages] in the compact binary format.
+
+        Args:
+            result_tool_return_content: The return content of the tool call to set in the last message.
+                This provides a convenient way to modify the content of the result tool call if you want to continue
+                the conversation and want to set the response to the result tool call. If `None`, the last message will
+                not be modified.
+            compress: Whether to compress the data with Zstandard, or the compression level to use.
+
+        Returns:
+            Bytes representing the new messages.
+        """
+        from .message_codec import dump_messages_bytes
+
+        return dump_messages_bytes(
+            self.new_messages(result_tool_return_content=result_tool_return_content), compress=compress
+        )
+
     async def stream(self, *, debounce_by: float | None = 0.1) -> AsyncIterator[ResultDataT]:
         """Stream the response as an async iterable.
 
@@ -356,6 +408,14 @@ class StreamedRunResult(Generic[AgentDepsT, ResultDataT]):
         """
         return self._initial_run_ctx_usage + self._stream_response.usage()
 
+    def timings(self) -> RunTimings:
+        """Return the timings of the phases of the run, see [`RunTimings`][pydantic_ai.timings.RunTimings].
+
+        !!! note
+            The timings of the streamed request are only complete once the `run_stream` context has exited.
+        """
+        return self._timings
+
     def timestamp(self) -> datetime:
         """Get the timestamp of the response."""
         return self._stream_response.timestamp
@@ -364,6 +424,15 @@ class StreamedRunResult(Generic[AgentDepsT, ResultDataT]):
         self, message: _messages.ModelResponse, *, allow_partial: bool = False
     ) -> ResultDataT:
         """Validate a structured result message."""
+        started = time.perf_counter()
+        try:
+            return await self._validate_structured_result(message, allow_partial=allow_partial)
+        finally:
+            self._timings.result_validation += time.perf_counter() - started
+
+    async def _validate_structured_result(
+        self, message: _messages.ModelResponse, *, allow_partial: bool = False
+    ) -> ResultDataT:
         if self._result_schema is not None and self._result_tool_name is not None:
             match = self._result_schema.find_named_tool(message.parts, self._result_tool_name)
             if match is None:
@@ -389,12 +458,14 @@ class StreamedRunResult(Generic[AgentDepsT, ResultDataT]):
             return cast(ResultDataT, text)
 
     async def _validate_text_result(self, text: str) -> str:
+        started = time.perf_counter()
         for validator in self._result_validators:
             text = await validator.validate(
                 text,
                 None,
                 self._run_ctx,
             )
+        self._timings.result_validation += time.perf_counter() - started
         return text
 
     async def _marked_completed(self, message: _messages.ModelResponse) -> None:
@@ -2,11 +2,10 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from httpx import Timeout
 from typing_extensions import TypedDict
 
 if TYPE_CHECKING:
-    pass
+    from httpx import Timeout
 
 
 class ModelSettings(TypedDict, total=False):
@@ -0,0 +1,134 @@
+"""Timings of the phases of an agent run, for finding where the time of a run goes."""
+
+from __future__ import annotations as _annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+__all__ = 'RunTimings', 'ModelRequestTimings', 'ToolCallTimings'
+
+
+@dataclass
+class ModelRequestTimings:
+    """Timings of one request to the model, in seconds."""
+
+    run_step: int
+    """The step of the run the request was made in."""
+    streamed: bool = False
+    """Whether the response was streamed."""
+    retry: bool = False
+    """Whether the request asked the model to retry, i.e. it included a [`RetryPromptPart`][pydantic_ai.messages.RetryPromptPart]."""
+    prepare: float = 0.0
+    """Time spent preparing the request parameters, mostly the tool definitions."""
+    message_mapping: float = 0.0
+    """Time the model spent converting messages to the provider's format.
+
+    This is only reported by models which memoize their mapped messages, like
+    [`OpenAIModel`][pydantic_ai.models.openai.OpenAIModel] and [`AnthropicModel`][pydantic_ai.models.anthropic.AnthropicModel],
+    for other models it's `0` and included in `duration`.
+    """
+    time_to_first_token: float | None = None
+    """For streamed responses, the time from making the request to receiving the first event of the response."""
+    duration: float | None = None
+    """The time from making the request to receiving the whole response, `None` until the response is complete."""
+
+    @property
+    def streaming(self) -> float | None:
+        """For streamed responses, the time from the first event of the response to its end."""
+        if self.duration is None or self.time_to_first_token is None:
+            return None
+        return self.duration - self.time_to_first_token
+
+
+@dataclass
+class ToolCallTimings:
+    """Timings of one call of a function tool, in seconds."""
+
+    tool_name: str
+    tool_call_id: str | None
+    run_step: int
+    """The step of the run the tool was called in."""
+    duration: float
+    """The time from starting the tool to it returning, including validating its arguments."""
+    retry: bool = False
+    """Whether the tool asked the model to retry, e.g. by raising [`ModelRetry`][pydantic_ai.exceptions.ModelRetry]."""
+
+
+@dataclass
+class RunTimings:
+    """Where the time of an agent run went, in seconds.
+
+    The timings are collected as the run progresses, use
+    [`AgentRunResult.timings()`][pydantic_ai.agent.AgentRunResult.timings] to get them.
+    When the agent is instrumented, they're also set as attributes of the run's span, see
+    [`opentelemetry_attributes`][pydantic_ai.timings.RunTimings.opentelemetry_attributes].
+    """
+
+    system_prompts: float = 0.0
+    """Time spent evaluating system prompt functions, including reevaluating dynamic system prompts."""
+    history: float = 0.0
+    """Time spent preparing the message history for the run, apart from evaluating system prompts."""
+    result_validation: float = 0.0
+    """Time spent validating results, including result validators and partial validation of streamed results."""
+    model_requests: list[ModelRequestTimings] = field(default_factory=list)
+    """Timings of each request to the model."""
+    tool_calls: list[ToolCallTimings] = field(default_factory=list)
+    """Timings of each function tool call."""
+
+    @property
+    def retries(self) -> int:
+        """The number of requests made to ask the model to retry."""
+        return sum(r.retry for r in self.model_requests)
+
+    def tool_durations(self) -> dict[str, float]:
+        """The total time spent in each tool, by tool name.
+
+        Tools called in the same step run concurrently, so these can add up to more than the duration of the run.
+        """
+        durations: dict[str, float] = {}
+        for call in self.tool_calls:
+            durations[call.tool_name] = durations.get(call.tool_name, 0.0) + call.duration
+        return durations
+
+    def opentelemetry_attributes(self) -> dict[str, float | int]:
+        """Get the timings as OpenTelemetry attributes, summed across requests and tool calls."""
+        requests = self.model_requests
+        first_token = [r.time_to_first_token for r in requests if r.time_to_first_token is not None]
+        result: dict[str, float | int] = {
+            'pydantic_ai.timings.system_prompts': self.system_prompts,
+            'pydantic_ai.timings.history': self.history,
+            'pydantic_ai.timings.request_preparation': sum(r.prepare for r in requests),
+            'pydantic_ai.timings.message_mapping': sum(r.message_mapping for r in requests),
+            'pydantic_ai.timings.model_requests': sum(r.duration or 0.0 for r in requests),
+            'pydantic_ai.timings.streaming': sum(r.streaming or 0.0 for r in requests),
+            'pydantic_ai.timings.result_validation': self.result_validation,
+            'pydantic_ai.timings.retries': self.retries,
+            'pydantic_ai.timings.retry_requests': sum(r.duration or 0.0 for r in requests if r.retry),
+        }
+        if first_token:
+            result['pydantic_ai.timings.time_to_first_token'] = first_token[0]
+        for tool_name, duration in self.tool_durations().items():
+            result[f'pydantic_ai.timings.tools.{tool_name}'] = duration
+        return result
+
+
+_current_request: ContextVar[ModelRequestTimings | None] = ContextVar('_current_request', default=None)
+
+
+@contextmanager
+def recording_request(timings: ModelRequestTimings) -> Iterator[None]:
+    """Attribute the time models spend mapping messages within this context to `timings`."""
+    token = _current_request.set(timings)
+    try:
+        yield
+    finally:
+        _current_request.reset(token)
+
+
+def record_message_mapping(started: float) -> None:
+    """Add the time since `started`, from `time.perf_counter()`, to the message mapping of the current request."""
+    if (timings := _current_request.get()) is not None:
+        timings.message_mapping += time.perf_counter() - started
@@ -2,12 +2,15 @@ from __future__ import annotations as _annotations
 
 import dataclasses
 import inspect
+import json
+import os
+import tempfile
 from collections.abc import Awaitable, Sequence
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable, Generic, Literal, Union, cast
 
 from pydantic import ValidationError
-from pydantic_core import SchemaValidator
 from typing_extensions import Concatenate, ParamSpec, TypeAlias, TypeVar
 
 from . import _pydantic, _utils, messages as _messages, models
@@ -29,6 +32,9 @@ __all__ = (
     'Tool',
     'ObjectJsonSchema',
     'ToolDefinition',
+    'ToolSchemaCache',
+    'get_tool_schema_cache',
+    'set_tool_schema_cache',
 )
 
 AgentDepsT = TypeVar('AgentDepsT', default=None, contravariant=True)
@@ -150,16 +156,14 @@ class Tool(Generic[AgentDepsT]):
     takes_ctx: bool
     max_retries: int | None
     name: str
-    description: str
     prepare: ToolPrepareFunc[AgentDepsT] | None
     docstring_format: DocstringFormat
     require_parameter_descriptions: bool
     _is_async: bool = field(init=False)
-    _single_arg_name: str | None = field(init=False)
-    _positional_fields: list[str] = field(init=False)
-    _var_positional_field: str | None = field(init=False)
-    _validator: SchemaValidator = field(init=False, repr=False)
-    _parameters_json_schema: ObjectJsonSchema = field(init=False)
+    # the schema is built when the tool is first used, rather than when it's defined
+    _description: str | None = field(init=False, repr=False, compare=False)
+    _parameters_json_schema: ObjectJsonSchema | None = field(init=False, repr=False, compare=False)
+    _function_schema: _pydantic.FunctionSchema | None = field(init=False, repr=False, compare=False)
 
     # TODO: Move this state off the Tool class, which is otherwise stateless.
     #   This should be tracked inside a specific agent run, not the tool.
@@ -229,21 +233,33 @@ class Tool(Generic[AgentDepsT]):
         if takes_ctx is None:
             takes_ctx = _pydantic.takes_ctx(function)
 
-        f = _pydantic.function_schema(function, takes_ctx, docstring_format, require_parameter_descriptions)
         self.function = function
         self.takes_ctx = takes_ctx
         self.max_retries = max_retries
         self.name = name or function.__name__
-        self.description = description or f['description']
         self.prepare = prepare
         self.docstring_format = docstring_format
         self.require_parameter_descriptions = require_parameter_descriptions
         self._is_async = inspect.iscoroutinefunction(self.function)
-        self._single_arg_name = f['single_arg_name']
-        self._positional_fields = f['positional_fields']
-        self._var_positional_field = f['var_positional_field']
-        self._validator = f['validator']
-        self._parameters_json_schema = f['json_schema']
+        self._description = description or None
+        self._parameters_json_schema = None
+        self._function_schema = None
+        if require_parameter_descriptions:
+            # missing descriptions are only found by parsing the docstring, which building the schema does anyway
+            self._get_function_schema()
+        else:
+            _pydantic.check_signature(function, takes_ctx)
+
+    @property
+    def description(self) -> str:
+        """Description of the tool, inferred from the function's docstring if it wasn't given."""
+        if self._description is None:
+            self._load_tool_schema()
+        return cast(str, self._description)
+
+    @description.setter
+    def description(self, description: str) -> None:
+        self._description = description
 
     async def prepare_tool_def(self, ctx: RunContext[AgentDepsT]) -> ToolDefinition | None:
         """Get the tool definition.
@@ -254,10 +270,12 @@ class Tool(Generic[AgentDepsT]):
         Returns:
             return a `ToolDefinition` or `None` if the tools should not be registered for this run.
         """
+        if self._parameters_json_schema is None:
+            self._load_tool_schema()
         tool_def = ToolDefinition(
             name=self.name,
             description=self.description,
-            parameters_json_schema=self._parameters_json_schema,
+            parameters_json_schema=cast(ObjectJsonSchema, self._parameters_json_schema),
         )
         if self.prepare is not None:
             return await self.prepare(ctx, tool_def)
@@ -268,11 +286,12 @@ class Tool(Generic[AgentDepsT]):
         self, message: _messages.ToolCallPart, run_context: RunContext[AgentDepsT]
     ) -> _messages.ToolReturnPart | _messages.RetryPromptPart:
         """Run the tool function asynchronously."""
+        validator = self._get_function_schema()['validator']
         try:
             if isinstance(message.args, str):
-                args_dict = self._validator.validate_json(message.args)
+                args_dict = validator.validate_json(message.args)
             else:
-                args_dict = self._validator.validate_python(message.args)
+                args_dict = validator.validate_python(message.args)
         except ValidationError as e:
             return self._on_error(e, message)
 
@@ -300,8 +319,9 @@ class Tool(Generic[AgentDepsT]):
         message: _messages.ToolCallPart,
         run_context: RunContext[AgentDepsT],
     ) -> tuple[list[Any], dict[str, Any]]:
-        if self._single_arg_name:
-            args_dict = {self._single_arg_name: args_dict}
+        f = self._get_function_schema()
+        if f['single_arg_name']:
+            args_dict = {f['single_arg_name']: args_dict}
 
         ctx = dataclasses.replace(
             run_context,
@@ -310,13 +330,40 @@ class Tool(Generic[AgentDepsT]):
             tool_call_id=message.tool_call_id,
         )
         args = [ctx] if self.takes_ctx else []
-        for positional_field in self._positional_fields:
+        for positional_field in f['positional_fields']:
             args.append(args_dict.pop(positional_field))
-        if self._var_positional_field:
-            args.extend(args_dict.pop(self._var_positional_field))
+        if f['var_positional_field']:
+            args.extend(args_dict.pop(f['var_positional_field']))
 
         return args, args_dict
 
+    def _get_function_schema(self) -> _pydantic.FunctionSchema:
+        if self._function_schema is None:
+            self._function_schema = _pydantic.function_schema(
+                self.function, self.takes_ctx, self.docstring_format, self.require_parameter_descriptions
+            )
+        return self._function_schema
+
+    def _load_tool_schema(self) -> None:
+        """Set the description and parameters JSON schema, from the schema cache if there is one."""
+        cache = get_tool_schema_cache()
+        key = None
+        if cache is not None and self._function_schema is None:
+            key = _pydantic.schema_cache_key(self.function, self.takes_ctx, self.docstring_format)
+
+        cached = cache.get(key) if cache is not None and key is not None else None
+        if cached is not None:
+            description, json_schema = cached
+        else:
+            f = self._get_function_schema()
+            description, json_schema = f['description'], f['json_schema']
+            if cache is not None and key is not None:
+                cache.set(key, description, json_schema)
+
+        if self._description is None:
+            self._description = description
+        self._parameters_json_schema = json_schema
+
     def _on_error(
         self, exc: ValidationError | ModelRetry, call_message: _messages.ToolCallPart
     ) -> _messages.RetryPromptPart:
@@ -365,3 +412,69 @@ class ToolDefinition:
 
     This will only be set for result tools which don't have an `object` JSON schema.
     """
+
+
+class ToolSchemaCache:
+    """Caches the descriptions and parameter JSON schemas of tool functions in a directory.
+
+    Building a tool's schema means inspecting its signature and type hints, parsing its docstring, and generating
+    a Pydantic core schema and JSON schema. With a cache installed with
+    [`set_tool_schema_cache`][pydantic_ai.tools.set_tool_schema_cache], later processes read the JSON schema from
+    disk instead, and only build the validator when the tool is first called.
+
+    Entries are keyed by a hash of the function's compiled code, docstring and defaults, and of the fields of the
+    classes its parameters are annotated with. Classes referred to by those classes aren't part of the key, call
+    [`clear`][pydantic_ai.tools.ToolSchemaCache.clear] after changing them.
+    """
+
+    def __init__(self, directory: Path | str):
+        """Create a tool schema cache.
+
+        Args:
+            directory: The directory to store the schemas in, created if it doesn't exist.
+        """
+        self.directory = Path(directory)
+
+    def get(self, key: str) -> tuple[str, ObjectJsonSchema] | None:
+        """Get the description and parameters JSON schema stored under `key`, if any."""
+        try:
+            entry = json.loads((self.directory / f'{key}.json').read_text())
+            return entry['description'], entry['json_schema']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def set(self, key: str, description: str, json_schema: ObjectJsonSchema) -> None:
+        """Store the description and parameters JSON schema of a tool under `key`."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file and rename it, so concurrent processes never read a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'description': description, 'json_schema': json_schema}, f)
+            os.replace(tmp_path, self.directory / f'{key}.json')
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def clear(self) -> None:
+        """Delete every cached schema."""
+        for path in self.directory.glob('*.json'):
+            path.unlink(missing_ok=True)
+
+
+_tool_schema_cache: ToolSchemaCache | None = None
+
+
+def get_tool_schema_cache() -> ToolSchemaCache | None:
+    """Get the cache installed with [`set_tool_schema_cache`][pydantic_ai.tools.set_tool_schema_cache]."""
+    return _tool_schema_cache
+
+
+def set_tool_schema_cache(cache: ToolSchemaCache | Path | str | None) -> None:
+    """Install a cache for the JSON schemas of tool functions, shared by all tools.
+
+    Args:
+        cache: The cache, or the directory to create one in, `None` to stop caching.
+    """
+    global _tool_schema_cache
+    _tool_schema_cache = cache if cache is None or isinstance(cache, ToolSchemaCache) else ToolSchemaCache(cache)
@@ -0,0 +1,346 @@
+"""Running agents across several processes.
+
+Model requests are I/O bound, so one event loop can keep many agent runs in flight, but validating large structured
+results and running CPU-heavy tools happens on the event loop's thread, which limits a process to one core. An
+[`AgentWorkerPool`][pydantic_ai.worker_pool.AgentWorkerPool] starts worker processes which each import the agent and
+run it on their own event loop, and spreads runs across them, so a single service can use every core.
+
+Everything passed to a run and returned from it crosses a process boundary: dependencies, result data and errors are
+pickled, and messages are serialized with [`ModelMessagesTypeAdapter`][pydantic_ai.messages.ModelMessagesTypeAdapter].
+Errors which can't be pickled and loaded again are raised as an [`AgentRunError`][pydantic_ai.exceptions.AgentRunError]
+including the original traceback.
+"""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+import importlib
+import itertools
+import multiprocessing
+import os
+import pickle
+import threading
+import traceback
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from typing import TYPE_CHECKING, Any, Callable, Generic, Union, cast
+
+from typing_extensions import TypeAlias
+
+from . import messages as _messages
+from .exceptions import AgentRunError, UserError
+from .result import ResultDataT
+from .settings import ModelSettings
+from .usage import Usage, UsageLimits
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext, ForkContext, ForkServerContext, SpawnContext
+    from multiprocessing.process import BaseProcess
+
+    from .agent import Agent
+
+__all__ = 'AgentWorkerPool', 'AgentSource', 'WorkerRunResult'
+
+
+AgentSource: TypeAlias = Union[str, Callable[[], 'Agent[Any, Any]']]
+"""Where worker processes get the agent from.
+
+Either an import path of the form `'package.module:attribute'`, or a picklable function returning the agent, such as
+a function defined at the top level of a module.
+"""
+
+
+@dataclass
+class WorkerRunResult(Generic[ResultDataT]):
+    """The result of an agent run in a worker process."""
+
+    data: ResultDataT
+    """The result data of the run."""
+    _messages: list[_messages.ModelMessage] = field(repr=False)
+    _new_message_index: int = field(repr=False)
+    _usage: Usage = field(repr=False)
+
+    def all_messages(self) -> list[_messages.ModelMessage]:
+        """Return the history of messages, including those passed in `message_history`."""
+        return self._messages
+
+    def all_messages_json(self) -> bytes:
+        """Return all messages from [`all_messages`][pydantic_ai.worker_pool.WorkerRunResult.all_messages] as JSON."""
+        return _messages.ModelMessagesTypeAdapter.dump_json(self._messages)
+
+    def new_messages(self) -> list[_messages.ModelMessage]:
+        """Return the messages from this run, excluding those passed in `message_history`."""
+        return self._messages[self._new_message_index :]
+
+    def usage(self) -> Usage:
+        """Return the usage of the whole run."""
+        return self._usage
+
+
+@dataclass
+class _Worker:
+    process: BaseProcess
+    connection: Connection
+    send_lock: threading.Lock = field(default_factory=threading.Lock)
+    pending: dict[int, asyncio.Future[Any]] = field(default_factory=dict)
+    alive: bool = True
+
+
+class AgentWorkerPool:
+    """Runs an agent in a pool of worker processes, each with its own event loop running many runs concurrently.
+
+    ```python {test="skip" lint="skip"}
+    from pydantic_ai.worker_pool import AgentWorkerPool
+
+    async def main():
+        async with AgentWorkerPool('my_app.agents:support_agent', processes=8) as pool:
+            result = await pool.run('What is my balance?', deps=SupportDependencies(customer_id=123))
+            print(result.data)
+    ```
+
+    Each run goes to the worker with the fewest runs in flight. If a worker process dies, its runs fail with an
+    [`AgentRunError`][pydantic_ai.exceptions.AgentRunError] and later runs go to the remaining workers.
+    """
+
+    def __init__(
+        self,
+        agent: AgentSource,
+        *,
+        processes: int | None = None,
+        mp_context: BaseContext | str = 'spawn',
+    ):
+        """Create a worker pool, which starts its processes when it's entered or [`start`][pydantic_ai.worker_pool.AgentWorkerPool.start]ed.
+
+        Args:
+            agent: Where the worker processes get the agent from, see [`AgentSource`][pydantic_ai.worker_pool.AgentSource].
+            processes: The number of worker processes, defaults to the number of CPUs.
+            mp_context: The multiprocessing context or start method to start workers with. `'spawn'` is the default
+                since forking a process with running threads or event loops isn't safe.
+        """
+        self.agent = agent
+        self.processes = processes or os.cpu_count() or 1
+        self._mp_context = _get_context(mp_context)
+        self._workers: list[_Worker] = []
+        self._request_ids = itertools.count()
+        self._round_robin = itertools.count()
+        # one thread per worker waits for its responses, and sends block until the worker reads them
+        self._threads: ThreadPoolExecutor | None = None
+        self._readers: list[asyncio.Future[None]] = []
+
+    async def __aenter__(self) -> AgentWorkerPool:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def start(self) -> None:
+        """Start the worker processes."""
+        if self._workers:
+            return
+        loop = asyncio.get_running_loop()
+        self._threads = ThreadPoolExecutor(max_workers=self.processes * 2, thread_name_prefix='agent-worker-pool')
+        for _ in range(self.processes):
+            parent_connection, child_connection = self._mp_context.Pipe()
+            process = self._mp_context.Process(target=_worker_main, args=(self.agent, child_connection), daemon=True)
+            process.start()
+            child_connection.close()
+            worker = _Worker(process, parent_connection)
+            self._workers.append(worker)
+            self._readers.append(loop.run_in_executor(self._threads, self._read_responses, worker, loop))
+
+    async def aclose(self) -> None:
+        """Stop the worker processes once their runs in flight have finished."""
+        if not self._workers:
+            return
+        loop = asyncio.get_running_loop()
+        for worker in self._workers:
+            if worker.alive:
+                await loop.run_in_executor(self._threads, self._send, worker, None)
+        await asyncio.gather(*self._readers, return_exceptions=True)
+        for worker in self._workers:
+            await loop.run_in_executor(self._threads, worker.process.join)
+            worker.connection.close()
+        assert self._threads is not None
+        self._threads.shutdown()
+        self._workers = []
+        self._readers = []
+
+    async def run(
+        self,
+        user_prompt: str | Sequence[_messages.UserContent],
+        *,
+        message_history: list[_messages.ModelMessage] | None = None,
+        deps: Any = None,
+        model_settings: ModelSettings | None = None,
+        usage_limits: UsageLimits | None = None,
+    ) -> WorkerRunResult[Any]:
+        """Run the agent in a worker process.
+
+        Args:
+            user_prompt: User input to start/continue the conversation.
+            message_history: History of the conversation so far.
+            deps: Optional dependencies to use for this run, which must be picklable.
+            model_settings: Optional settings to use for this model's request.
+            usage_limits: Optional limits on model request count or token usage.
+
+        Returns:
+            The result of the run.
+        """
+        worker = self._choose_worker()
+        loop = asyncio.get_running_loop()
+        request_id = next(self._request_ids)
+        future: asyncio.Future[Any] = loop.create_future()
+        worker.pending[request_id] = future
+        history = _messages.ModelMessagesTypeAdapter.dump_json(message_history) if message_history else None
+        request = request_id, (user_prompt, history, deps, model_settings, usage_limits)
+        try:
+            try:
+                await loop.run_in_executor(self._threads, self._send, worker, request)
+            except OSError as exc:
+                _worker_exited(worker)
+                raise AgentRunError(f'Worker process {worker.process.pid} exited before the run: {exc!r}') from exc
+            data, messages_json, new_message_index, usage = await future
+        finally:
+            worker.pending.pop(request_id, None)
+        messages = _messages.ModelMessagesTypeAdapter.validate_json(messages_json)
+        return WorkerRunResult(data, messages, new_message_index, usage)
+
+    @property
+    def pids(self) -> list[int | None]:
+        """The process IDs of the workers."""
+        return [worker.process.pid for worker in self._workers]
+
+    def _choose_worker(self) -> _Worker:
+        if not self._workers:
+            raise UserError('The worker pool has not been started, use `async with pool:` or `await pool.start()`')
+        alive = [worker for worker in self._workers if worker.alive]
+        if not alive:
+            raise AgentRunError('All worker processes have exited')
+        least_pending = min(len(worker.pending) for worker in alive)
+        candidates = [worker for worker in alive if len(worker.pending) == least_pending]
+        return candidates[next(self._round_robin) % len(candidates)]
+
+    @staticmethod
+    def _send(worker: _Worker, message: Any) -> None:
+        with worker.send_lock:
+            worker.connection.send(message)
+
+    @staticmethod
+    def _read_responses(worker: _Worker, loop: asyncio.AbstractEventLoop) -> None:
+        """Wait for the worker's responses in a thread, resolving the futures of their runs on the event loop."""
+        while True:
+            try:
+                message = worker.connection.recv()
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+            # the result is pickled separately, so a result which can't be loaded only fails its own run
+            request_id, ok, payload = message
+            try:
+                value = pickle.loads(payload)
+            except Exception as exc:
+                ok, value = (
+                    False,
+                    AgentRunError(f'Failed to load the result of the run from the worker process: {exc!r}'),
+                )
+            loop.call_soon_threadsafe(_resolve, worker, request_id, ok, value)
+        loop.call_soon_threadsafe(_worker_exited, worker)
+
+
+def _get_context(mp_context: BaseContext | str) -> SpawnContext | ForkServerContext | ForkContext:
+    """Get the multiprocessing context for a start method, typed as one which can start processes."""
+    context = multiprocessing.get_context(mp_context) if isinstance(mp_context, str) else mp_context
+    return cast('SpawnContext | ForkServerContext | ForkContext', context)
+
+
+def _resolve(worker: _Worker, request_id: int, ok: bool, value: Any) -> None:
+    future = worker.pending.get(request_id)
+    if future is None or future.done():
+        return
+    if ok:
+        future.set_result(value)
+    else:
+        future.set_exception(value)
+
+
+def _worker_exited(worker: _Worker) -> None:
+    worker.alive = False
+    for future in worker.pending.values():
+        if not future.done():
+            future.set_exception(AgentRunError(f'Worker process {worker.process.pid} exited during the run'))
+
+
+def _picklable_error(exc: Exception) -> Exception:
+    """Return `exc` if it can be pickled and loaded again, otherwise an `AgentRunError` with its traceback."""
+    try:
+        pickle.loads(pickle.dumps(exc))
+    except Exception:
+        details = ''.join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+        return AgentRunError(f'The run failed in the worker process with an error which cannot be pickled:\n{details}')
+    return exc
+
+
+def _load_agent(source: AgentSource) -> Agent[Any, Any]:
+    if not isinstance(source, str):
+        return source()
+    module_name, _, attribute = source.partition(':')
+    if not attribute:
+        raise UserError(f'Agent import path {source!r} must be of the form "package.module:attribute"')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _worker_main(source: AgentSource, connection: Connection) -> None:
+    asyncio.run(_serve(_load_agent(source), connection))
+
+
+async def _serve(agent: Agent[Any, Any], connection: Connection) -> None:
+    """Run the agent for each request received from the parent, until it sends `None`."""
+    loop = asyncio.get_running_loop()
+    send_lock = threading.Lock()
+    runs: set[asyncio.Task[None]] = set()
+
+    def send(message: Any) -> None:
+        with send_lock:
+            connection.send(message)
+
+    async def run(request_id: int, user_prompt: Any, history: bytes | None, deps: Any, *options: Any) -> None:
+        model_settings, usage_limits = options
+        try:
+            result = await agent.run(
+                user_prompt,
+                message_history=_messages.ModelMessagesTypeAdapter.validate_json(history) if history else None,
+                deps=deps,
+                model_settings=model_settings,
+                usage_limits=usage_limits,
+            )
+            response: Any = (result.data, result.all_messages_json(), result._new_message_index, result.usage())  # pyright: ignore[reportPrivateUsage]
+            ok = True
+        except Exception as exc:
+            response = _picklable_error(exc)
+            ok = False
+        try:
+            payload = pickle.dumps(response)
+        except Exception as exc:
+            # e.g. the result data can't be pickled
+            error = AgentRunError(f'Failed to send the result of the run to the parent process: {exc!r}')
+            payload, ok = pickle.dumps(error), False
+        await loop.run_in_executor(None, send, (request_id, ok, payload))
+
+    while True:
+        try:
+            request = await loop.run_in_executor(None, connection.recv)
+        except EOFError:
+            break
+        if request is None:
+            break
+        request_id, (user_prompt, history, deps, model_settings, usage_limits) = request
+        task = asyncio.create_task(run(request_id, user_prompt, history, deps, model_settings, usage_limits))
+        runs.add(task)
+        task.add_done_callback(runs.discard)
+
+    await asyncio.gather(*runs)
+    await loop.run_in_executor(None, send, None)
@@ -5,34 +5,45 @@ import types
 from collections.abc import AsyncIterator, Sequence
 from contextlib import AbstractContextManager, ExitStack, asynccontextmanager
 from dataclasses import dataclass, field
-from functools import cached_property
+from functools import cache, cached_property
+from pathlib import Path
 from time import perf_counter
 from typing import TYPE_CHECKING, Annotated, Any, Callable, Generic, TypeVar
 
-import logfire_api
 import pydantic
 import typing_extensions
-from logfire_api import LogfireSpan
 from typing_inspection import typing_objects
 
 from . import _utils, exceptions, mermaid
 from .nodes import BaseNode, DepsT, End, GraphRunContext, NodeDef, RunEndT
 from .state import EndStep, HistoryStep, NodeStep, StateT, deep_copy_state, nodes_schema_var
 
-# while waiting for https://github.com/pydantic/logfire/issues/745
-try:
-    import logfire._internal.stack_info
-except ImportError:
-    pass
-else:
-    from pathlib import Path
-
-    logfire._internal.stack_info.NON_USER_CODE_PREFIXES += (str(Path(__file__).parent.absolute()),)
+if TYPE_CHECKING:
+    from logfire_api import Logfire, LogfireSpan
 
 
 __all__ = ('Graph', 'GraphRun', 'GraphRunResult')
 
-_logfire = logfire_api.Logfire(otel_scope='pydantic-graph')
+
+@cache
+def _logfire_api() -> types.ModuleType:
+    """Import `logfire_api` when it's first needed, it imports `logfire` if that's installed, which is slow."""
+    import logfire_api
+
+    # while waiting for https://github.com/pydantic/logfire/issues/745
+    try:
+        import logfire._internal.stack_info
+    except ImportError:
+        pass
+    else:
+        logfire._internal.stack_info.NON_USER_CODE_PREFIXES += (str(Path(__file__).parent.absolute()),)
+    return logfire_api
+
+
+@cache
+def _logfire() -> Logfire:
+    return _logfire_api().Logfire(otel_scope='pydantic-graph')
+
 
 T = TypeVar('T')
 """An invariant typevar."""
@@ -222,7 +233,7 @@ class Graph(Generic[StateT, DepsT, RunEndT]):
             self._infer_name(inspect.currentframe())
 
         if self._auto_instrument and span is None:
-            span = logfire_api.span('run graph {graph.name}', graph=self)
+            span = _logfire_api().span('run graph {graph.name}', graph=self)
 
         with ExitStack() as stack:
             if span is not None:
@@ -300,7 +311,7 @@ class Graph(Generic[StateT, DepsT, RunEndT]):
 
         with ExitStack() as stack:
             if self._auto_instrument:
-                stack.enter_context(_logfire.span('run node {node_id}', node_id=node_id, node=node))
+                stack.enter_context(_logfire().span('run node {node_id}', node_id=node_id, node=node))
             ctx = GraphRunContext(state, deps)
             start_ts = _utils.now_utc()
             start = perf_counter()
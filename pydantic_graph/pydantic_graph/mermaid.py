@@ -7,13 +7,14 @@ from pathlib import Path
 from textwrap import indent
 from typing import TYPE_CHECKING, Annotated, Any, Literal
 
-import httpx
 from annotated_types import Ge, Le
 from typing_extensions import TypeAlias, TypedDict, Unpack
 
 from .nodes import BaseNode
 
 if TYPE_CHECKING:
+    import httpx
+
     from .graph import Graph
 
 __all__ = (
@@ -184,6 +185,8 @@ def request_image(
     if scale := kwargs.get('scale'):
         params['scale'] = scale
 
+    import httpx
+
     httpx_client = kwargs.get('httpx_client') or httpx.Client()
     response = httpx_client.get(url, params=params)
     if not response.is_success:
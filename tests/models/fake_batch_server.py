@@ -0,0 +1,184 @@
+"""Fake OpenAI and Anthropic batch API servers, to test batch models against with `httpx.MockTransport`.
+
+The servers process each batch as it's submitted, echoing the last user message of each request, and report it as
+finished once it has been polled `polls_until_done` times. A request whose last user message is `'fail'` fails.
+"""
+
+from __future__ import annotations as _annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+
+def _last_user_text(messages: list[dict[str, Any]]) -> str:
+    content = [m for m in messages if m['role'] == 'user'][-1]['content']
+    if isinstance(content, str):
+        return content
+    return ''.join(block['text'] for block in content if block.get('type') == 'text')
+
+
+@dataclass
+class FakeBatchServer:
+    polls_until_done: int = 1
+    fail_batches: bool = False
+    submitted: list[list[dict[str, Any]]] = field(default_factory=list)
+    """The requests of each batch submitted."""
+    _polls: dict[str, int] = field(default_factory=dict)
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        raise NotImplementedError
+
+    def _poll(self, batch_id: str) -> bool:
+        """Count a poll of the batch, returning whether it has finished."""
+        self._polls[batch_id] = self._polls.get(batch_id, 0) + 1
+        return self._polls[batch_id] >= self.polls_until_done
+
+
+@dataclass
+class FakeOpenAIBatchServer(FakeBatchServer):
+    files: dict[str, bytes] = field(default_factory=dict)
+    batches: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == 'POST' and path == '/v1/files':
+            # the multipart body contains the JSONL lines as they are
+            lines = re.findall(rb'^\{"custom_id".*$', request.content, flags=re.MULTILINE)
+            file_id = self._store_file(b'\n'.join(lines))
+            return httpx.Response(200, json=self._file(file_id))
+        elif request.method == 'POST' and path == '/v1/batches':
+            body = json.loads(request.content)
+            return httpx.Response(200, json=self._create_batch(body['input_file_id']))
+        elif request.method == 'GET' and (match := re.fullmatch(r'/v1/batches/(\w+)', path)):
+            batch = self.batches[match.group(1)]
+            if self._poll(batch['id']):
+                batch['status'] = 'failed' if self.fail_batches else 'completed'
+            return httpx.Response(200, json=batch)
+        elif request.method == 'GET' and (match := re.fullmatch(r'/v1/files/(\w+)/content', path)):
+            return httpx.Response(200, content=self.files[match.group(1)])
+        return httpx.Response(404, json={'error': {'message': f'Unexpected request: {request.method} {path}'}})
+
+    def _store_file(self, content: bytes) -> str:
+        file_id = f'file_{len(self.files)}'
+        self.files[file_id] = content
+        return file_id
+
+    def _file(self, file_id: str) -> dict[str, Any]:
+        return {
+            'id': file_id,
+            'object': 'file',
+            'bytes': len(self.files[file_id]),
+            'created_at': 1704067200,
+            'filename': 'batch.jsonl',
+            'purpose': 'batch',
+            'status': 'processed',
+        }
+
+    def _create_batch(self, input_file_id: str) -> dict[str, Any]:
+        requests = [json.loads(line) for line in self.files[input_file_id].splitlines()]
+        self.submitted.append(requests)
+        output: list[str] = []
+        errors: list[str] = []
+        for r in requests:
+            text = _last_user_text(r['body']['messages'])
+            if text == 'fail':
+                response = {'status_code': 500, 'body': {'error': {'message': 'Internal error'}}}
+                errors.append(json.dumps({'custom_id': r['custom_id'], 'response': response, 'error': None}))
+            else:
+                response = {'status_code': 200, 'body': self._completion(r['body']['model'], f'echo: {text}')}
+                output.append(json.dumps({'custom_id': r['custom_id'], 'response': response, 'error': None}))
+
+        batch_id = f'batch_{len(self.batches)}'
+        self.batches[batch_id] = batch = {
+            'id': batch_id,
+            'object': 'batch',
+            'endpoint': '/v1/chat/completions',
+            'input_file_id': input_file_id,
+            'completion_window': '24h',
+            'status': 'in_progress',
+            'created_at': 1704067200,
+            'output_file_id': self._store_file('\n'.join(output).encode()) if output else None,
+            'error_file_id': self._store_file('\n'.join(errors).encode()) if errors else None,
+            'errors': {'data': [{'code': 'invalid_file', 'message': 'Bad batch'}]} if self.fail_batches else None,
+        }
+        return batch
+
+    @staticmethod
+    def _completion(model: str, content: str) -> dict[str, Any]:
+        return {
+            'id': 'chatcmpl-1',
+            'object': 'chat.completion',
+            'created': 1704067200,
+            'model': model,
+            'choices': [
+                {'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}},
+            ],
+            'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15},
+        }
+
+
+@dataclass
+class FakeAnthropicBatchServer(FakeBatchServer):
+    results: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == 'POST' and path == '/v1/messages/batches':
+            requests = json.loads(request.content)['requests']
+            self.submitted.append(requests)
+            batch_id = f'msgbatch_{len(self.results)}'
+            self.results[batch_id] = [self._result(r) for r in requests]
+            return httpx.Response(200, json=self._batch(batch_id, ended=False))
+        elif request.method == 'GET' and (match := re.fullmatch(r'/v1/messages/batches/(\w+)', path)):
+            batch_id = match.group(1)
+            return httpx.Response(200, json=self._batch(batch_id, ended=self._poll(batch_id)))
+        elif request.method == 'GET' and (match := re.fullmatch(r'/v1/messages/batches/(\w+)/results', path)):
+            lines = [json.dumps(result) for result in self.results[match.group(1)]]
+            return httpx.Response(200, content='\n'.join(lines).encode())
+        return httpx.Response(404, json={'type': 'error', 'error': {'type': 'not_found_error', 'message': path}})
+
+    def _batch(self, batch_id: str, *, ended: bool) -> dict[str, Any]:
+        count = len(self.results[batch_id])
+        return {
+            'id': batch_id,
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': {
+                'processing': 0 if ended else count,
+                'succeeded': count if ended else 0,
+                'errored': 0,
+                'canceled': 0,
+                'expired': 0,
+            },
+            'created_at': '2024-01-01T00:00:00Z',
+            'expires_at': '2024-01-02T00:00:00Z',
+            'ended_at': '2024-01-01T01:00:00Z' if ended else None,
+            'cancel_initiated_at': None,
+            'archived_at': None,
+            'results_url': f'https://api.anthropic.com/v1/messages/batches/{batch_id}/results' if ended else None,
+        }
+
+    @staticmethod
+    def _result(request: dict[str, Any]) -> dict[str, Any]:
+        text = _last_user_text(request['params']['messages'])
+        if text == 'fail':
+            error = {'type': 'error', 'error': {'type': 'api_error', 'message': 'Internal error'}}
+            return {'custom_id': request['custom_id'], 'result': {'type': 'errored', 'error': error}}
+        message = {
+            'id': 'msg_1',
+            'type': 'message',
+            'role': 'assistant',
+            'model': request['params']['model'],
+            'content': [{'type': 'text', 'text': f'echo: {text}'}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': 10, 'output_tokens': 5},
+        }
+        return {'custom_id': request['custom_id'], 'result': {'type': 'succeeded', 'message': message}}
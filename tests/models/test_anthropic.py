@@ -16,6 +16,7 @@ from pydantic_ai import Agent, ModelHTTPError, ModelRetry
 from pydantic_ai.messages import (
     BinaryContent,
     ImageUrl,
+    ModelMessage,
     ModelRequest,
     ModelResponse,
     RetryPromptPart,
@@ -601,6 +602,19 @@ async def test_audio_as_binary_content_input(allow_model_requests: None, media_t
         await agent.run(['hello', BinaryContent(data=base64_content, media_type=media_type)])
 
 
+async def test_image_as_binary_content_mapped_repeatedly(allow_model_requests: None):
+    m = AnthropicModel('claude-3-5-haiku-latest', api_key='foobar')
+    messages: list[ModelMessage] = [
+        ModelRequest(parts=[UserPromptPart(['hello', BinaryContent(data=b'\x89PNG', media_type='image/png')])])
+    ]
+
+    # the mapped payload is memoized, so it must still hold the image when it's sent a second time
+    for _ in range(2):
+        _, (message_param,) = await m._map_message(messages)  # pyright: ignore[reportPrivateUsage]
+        image_block = cast(list[dict[str, Any]], message_param['content'])[1]
+        assert image_block['source'] == {'data': 'iVBORw==', 'media_type': 'image/png', 'type': 'base64'}
+
+
 def test_model_status_error(allow_model_requests: None) -> None:
     mock_client = MockAnthropic.create_mock(
         APIStatusError(
@@ -0,0 +1,190 @@
+from __future__ import annotations as _annotations
+
+import asyncio
+from typing import Any, Callable
+
+import pytest
+from inline_snapshot import snapshot
+
+from pydantic_ai import Agent, ModelHTTPError, UnexpectedModelBehavior
+from pydantic_ai.messages import ModelMessage
+from pydantic_ai.models import ModelRequestParameters
+from pydantic_ai.models.batch import BatchModel, BatchRequest, BatchResult
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import Usage
+
+from ..conftest import try_import
+from .fake_batch_server import FakeAnthropicBatchServer, FakeBatchServer, FakeOpenAIBatchServer
+
+with try_import() as openai_imports_successful:
+    from openai import AsyncOpenAI
+
+    from pydantic_ai.models.openai import OpenAIBatchModel, OpenAIModel
+    from pydantic_ai.providers.openai import OpenAIProvider
+
+with try_import() as anthropic_imports_successful:
+    from anthropic import AsyncAnthropic
+
+    from pydantic_ai.models.anthropic import AnthropicBatchModel, AnthropicModel
+
+pytestmark = pytest.mark.anyio
+
+
+def openai_batch_model(
+    server: FakeBatchServer, *, max_batch_size: int = 1000, max_wait: float = 5.0, poll_interval: float = 30.0
+) -> BatchModel:
+    client = AsyncOpenAI(api_key='test', http_client=server.client())
+    return OpenAIBatchModel(
+        OpenAIModel('gpt-4o', provider=OpenAIProvider(openai_client=client)),
+        max_batch_size=max_batch_size,
+        max_wait=max_wait,
+        poll_interval=poll_interval,
+    )
+
+
+def anthropic_batch_model(
+    server: FakeBatchServer, *, max_batch_size: int = 1000, max_wait: float = 5.0, poll_interval: float = 30.0
+) -> BatchModel:
+    client = AsyncAnthropic(api_key='test', http_client=server.client())
+    return AnthropicBatchModel(
+        AnthropicModel('claude-3-5-haiku-latest', anthropic_client=client),
+        max_batch_size=max_batch_size,
+        max_wait=max_wait,
+        poll_interval=poll_interval,
+    )
+
+
+BatchModelFactory = Callable[..., BatchModel]
+
+
+@pytest.fixture(
+    params=[
+        pytest.param(
+            (FakeOpenAIBatchServer, openai_batch_model),
+            id='openai',
+            marks=pytest.mark.skipif(not openai_imports_successful(), reason='openai not installed'),
+        ),
+        pytest.param(
+            (FakeAnthropicBatchServer, anthropic_batch_model),
+            id='anthropic',
+            marks=pytest.mark.skipif(not anthropic_imports_successful(), reason='anthropic not installed'),
+        ),
+    ]
+)
+def provider(request: pytest.FixtureRequest) -> tuple[type[FakeBatchServer], BatchModelFactory]:
+    return request.param
+
+
+async def test_agent_runs_batched(
+    provider: tuple[type[FakeBatchServer], BatchModelFactory], allow_model_requests: None
+):
+    server_cls, create_model = provider
+    server = server_cls(polls_until_done=2)
+    agent = Agent(create_model(server, max_wait=0.01, poll_interval=0))
+
+    batch = agent.run_many(['one', 'two', 'fail'], concurrency=3, ordered=True, on_error='collect')
+    items = [item async for item in batch]
+
+    assert [item.result and item.result.data for item in items] == ['echo: one', 'echo: two', None]
+    assert isinstance(items[2].error, (ModelHTTPError, UnexpectedModelBehavior))
+    # all three runs' requests were sent in one batch
+    assert len(server.submitted) == 1
+    assert len(server.submitted[0]) == 3
+    assert batch.usage == snapshot(Usage(requests=2, request_tokens=20, response_tokens=10, total_tokens=30))
+
+
+async def test_max_batch_size(provider: tuple[type[FakeBatchServer], BatchModelFactory], allow_model_requests: None):
+    server_cls, create_model = provider
+    server = server_cls()
+    agent = Agent(create_model(server, max_batch_size=2, max_wait=60, poll_interval=0))
+
+    results = await asyncio.wait_for(asyncio.gather(agent.run('one'), agent.run('two')), timeout=5)
+    assert [r.data for r in results] == ['echo: one', 'echo: two']
+    assert [len(requests) for requests in server.submitted] == [2]
+
+
+@pytest.mark.skipif(not openai_imports_successful(), reason='openai not installed')
+async def test_failed_batch(allow_model_requests: None):
+    server = FakeOpenAIBatchServer(fail_batches=True)
+    agent = Agent(openai_batch_model(server, max_wait=0, poll_interval=0))
+
+    with pytest.raises(UnexpectedModelBehavior, match='Batch batch_0 failed') as exc_info:
+        await agent.run('one')
+    assert 'Bad batch' in str(exc_info.value.body)
+
+
+@pytest.mark.skipif(not openai_imports_successful(), reason='openai not installed')
+async def test_cancel_pending_request(allow_model_requests: None):
+    server = FakeOpenAIBatchServer()
+    model = openai_batch_model(server, max_wait=60)
+    task = asyncio.create_task(Agent(model).run('one'))
+    await asyncio.sleep(0.01)
+    assert len(model._pending) == 1  # pyright: ignore[reportPrivateUsage]
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert model._pending == []  # pyright: ignore[reportPrivateUsage]
+    model.flush()
+    assert server.submitted == []
+
+
+@pytest.mark.skipif(not openai_imports_successful(), reason='openai not installed')
+async def test_streaming_not_supported(allow_model_requests: None):
+    model = openai_batch_model(FakeOpenAIBatchServer())
+    assert model.model_name == 'gpt-4o'
+    assert model.system == 'openai'
+    params = ModelRequestParameters(function_tools=[], allow_text_result=True, result_tools=[])
+    with pytest.raises(NotImplementedError, match='Streamed requests are not supported by OpenAIBatchModel'):
+        async with model.request_stream([], None, params):
+            pass
+
+
+class EmptyBatchModel(BatchModel):
+    """A batch model whose batches finish once `finished` is set, without any results."""
+
+    def __init__(self, *, max_wait: float) -> None:
+        super().__init__(max_wait=max_wait, poll_interval=0)
+        self.finished = True
+
+    @property
+    def model_name(self) -> str:
+        return 'empty'
+
+    @property
+    def system(self) -> str:
+        return 'test'
+
+    async def build_request_body(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> dict[str, Any]:
+        return {}
+
+    async def submit_batch(self, requests: list[BatchRequest]) -> str:
+        return 'batch'
+
+    async def batch_finished(self, batch_id: str) -> bool:
+        return self.finished
+
+    async def batch_results(self, batch_id: str) -> dict[str, BatchResult]:
+        return {}
+
+
+async def test_missing_result(allow_model_requests: None):
+    with pytest.raises(UnexpectedModelBehavior, match='Batch finished without a result for request'):
+        await Agent(EmptyBatchModel(max_wait=0)).run('one')
+
+
+async def test_cancelled_batch(allow_model_requests: None):
+    model = EmptyBatchModel(max_wait=0)
+    model.finished = False
+    task = asyncio.create_task(Agent(model).run('one'))
+    await asyncio.sleep(0.01)
+    for batch in model._batches:  # pyright: ignore[reportPrivateUsage]
+        batch.cancel()
+
+    with pytest.raises(UnexpectedModelBehavior, match='Batch was cancelled before it finished'):
+        await asyncio.wait_for(task, timeout=5)
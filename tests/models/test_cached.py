@@ -0,0 +1,295 @@
+from __future__ import annotations as _annotations
+
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from inline_snapshot import snapshot
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    PartDeltaEvent,
+    PartStartEvent,
+    TextPart,
+    TextPartDelta,
+    ToolCallPart,
+    ToolCallPartDelta,
+    ToolReturnPart,
+    UserPromptPart,
+)
+from pydantic_ai.models import ModelRequestParameters
+from pydantic_ai.models.cached import (
+    CachedModel,
+    CachedStreamedResponse,
+    InMemoryResponseCache,
+    SQLiteResponseCache,
+    request_cache_key,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.usage import Usage
+
+pytestmark = pytest.mark.anyio
+
+
+class CountingFunctions:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.stream_calls = 0
+
+    def respond(self, messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        self.calls += 1
+        return ModelResponse(parts=[TextPart(f'answer {self.calls}')])
+
+    async def stream(self, messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        self.stream_calls += 1
+        for word in ['hello ', 'streamed ', 'world']:
+            yield word
+
+
+def make_model(
+    cache: InMemoryResponseCache | SQLiteResponseCache | None = None,
+) -> tuple[CachedModel, CountingFunctions]:
+    functions = CountingFunctions()
+    model = CachedModel(FunctionModel(functions.respond, stream_function=functions.stream), cache)
+    return model, functions
+
+
+def test_init():
+    model, _ = make_model()
+    assert model.model_name == snapshot('function:respond:stream')
+    assert model.system is None
+    assert isinstance(model.cache, InMemoryResponseCache)
+
+
+def test_repeated_request_is_cached():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    result1 = agent.run_sync('hello')
+    result2 = agent.run_sync('hello')
+    result3 = agent.run_sync('goodbye')
+
+    assert result1.data == snapshot('answer 1')
+    assert result2.data == snapshot('answer 1')
+    assert result3.data == snapshot('answer 2')
+    assert functions.calls == 2
+    assert (model.hits, model.misses) == (1, 2)
+    assert result2.usage() == result1.usage()
+
+
+def test_settings_affect_key():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    agent.run_sync('hello', model_settings={'temperature': 0.0})
+    agent.run_sync('hello', model_settings={'temperature': 0.0, 'timeout': 5})
+    agent.run_sync('hello', model_settings={'temperature': 1.0})
+    assert functions.calls == 2
+
+
+def test_cache_key_ignores_timestamps_and_args_format():
+    model = FunctionModel(lambda m, i: ModelResponse(parts=[]))
+    params = ModelRequestParameters(function_tools=[], allow_text_result=True, result_tools=[])
+
+    def messages(timestamp: datetime, args: str | dict[str, int]) -> list[ModelMessage]:
+        return [
+            ModelRequest(parts=[UserPromptPart('hello', timestamp=timestamp)]),
+            ModelResponse(parts=[ToolCallPart('foo', args, 'call_1')], timestamp=timestamp),
+        ]
+
+    key = request_cache_key(model, messages(datetime(2024, 1, 1, tzinfo=timezone.utc), {'a': 1}), None, params)
+    assert key == request_cache_key(
+        model, messages(datetime(2025, 1, 1, tzinfo=timezone.utc), '{"a": 1}'), None, params
+    )
+    assert key != request_cache_key(
+        model, messages(datetime(2025, 1, 1, tzinfo=timezone.utc), '{"a": 2}'), None, params
+    )
+    assert key != request_cache_key(
+        model, messages(datetime(2025, 1, 1, tzinfo=timezone.utc), {'a': 1}), {'temperature': 0.5}, params
+    )
+
+
+def test_cache_key_keeps_timestamps_in_content():
+    model = FunctionModel(lambda m, i: ModelResponse(parts=[]))
+    params = ModelRequestParameters(function_tools=[], allow_text_result=True, result_tools=[])
+
+    def messages(timestamp: str) -> list[ModelMessage]:
+        return [
+            ModelRequest(parts=[UserPromptPart('hello')]),
+            ModelResponse(parts=[ToolCallPart('book', {'timestamp': timestamp}, 'call_1')]),
+            ModelRequest(parts=[ToolReturnPart('book', {'timestamp': timestamp}, 'call_1')]),
+        ]
+
+    # only the timestamps pydantic-ai adds to messages are ignored, not those in tool arguments or return values
+    assert request_cache_key(model, messages('09:00'), None, params) != request_cache_key(
+        model, messages('10:00'), None, params
+    )
+
+
+async def test_stream_cached():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    async with agent.run_stream('hello') as result:
+        assert [c async for c in result.stream_text(debounce_by=None)] == snapshot(
+            ['hello ', 'hello streamed ', 'hello streamed world']
+        )
+    first_usage = result.usage()
+
+    async with agent.run_stream('hello') as result:
+        assert [c async for c in result.stream_text(debounce_by=None)] == snapshot(
+            ['hello ', 'hello streamed ', 'hello streamed world']
+        )
+    assert result.usage() == first_usage
+    assert functions.stream_calls == 1
+    assert (model.hits, model.misses) == (1, 1)
+
+
+async def test_stream_hit_from_request():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    result = await agent.run('hello')
+    assert result.data == snapshot('answer 1')
+
+    async with agent.run_stream('hello') as stream_result:
+        assert await stream_result.get_data() == snapshot('answer 1')
+    assert functions.stream_calls == 0
+
+
+async def test_replay_tool_call_deltas():
+    response = ModelResponse(
+        parts=[
+            TextPart('calling a tool'),
+            ToolCallPart('get_weather', '{"city": "London", "units": "metric"}', 'call_1'),
+            ToolCallPart('get_time', {'zone': 'UTC'}, 'call_2'),
+        ],
+        model_name='cached-model',
+    )
+    stream = CachedStreamedResponse(_model_name='cached-model', _response=response, _cached_usage=Usage(requests=1))
+    events = [event async for event in stream]
+    assert events == snapshot(
+        [
+            PartStartEvent(index=0, part=TextPart(content='calling ')),
+            PartDeltaEvent(index=0, delta=TextPartDelta(content_delta='a ')),
+            PartDeltaEvent(index=0, delta=TextPartDelta(content_delta='tool')),
+            PartStartEvent(
+                index=1, part=ToolCallPart(tool_name='get_weather', args='{"city": "London', tool_call_id='call_1')
+            ),
+            PartDeltaEvent(index=1, delta=ToolCallPartDelta(args_delta='", "units": "met')),
+            PartDeltaEvent(index=1, delta=ToolCallPartDelta(args_delta='ric"}')),
+            PartStartEvent(
+                index=2, part=ToolCallPart(tool_name='get_time', args={'zone': 'UTC'}, tool_call_id='call_2')
+            ),
+        ]
+    )
+    assert stream.get().parts == response.parts
+    assert stream.usage() == Usage(requests=1)
+
+
+async def test_in_memory_lru():
+    cache = InMemoryResponseCache(max_size=2)
+    for key in 'abc':
+        await cache.set(key, ModelResponse(parts=[TextPart(key)]), Usage())
+    assert len(cache) == 2
+    assert await cache.get('a') is None
+
+    await cache.get('b')
+    await cache.set('d', ModelResponse(parts=[TextPart('d')]), Usage())
+    assert await cache.get('c') is None
+    assert await cache.get('b') is not None
+
+    await cache.clear()
+    assert len(cache) == 0
+
+
+async def test_in_memory_ttl(monkeypatch: pytest.MonkeyPatch):
+    now = 100.0
+    monkeypatch.setattr('pydantic_ai.models.cached.time.monotonic', lambda: now)
+    cache = InMemoryResponseCache(ttl=10)
+    await cache.set('a', ModelResponse(parts=[TextPart('a')]), Usage())
+    assert await cache.get('a') is not None
+    now = 111.0
+    assert await cache.get('a') is None
+
+
+async def test_in_memory_returns_copies():
+    cache = InMemoryResponseCache()
+    await cache.set('a', ModelResponse(parts=[TextPart('a')]), Usage(requests=1))
+    cached = await cache.get('a')
+    assert cached is not None
+    cached[0].parts.append(TextPart('b'))
+    cached[1].requests += 1
+    assert await cache.get('a') == (
+        ModelResponse(parts=[TextPart('a')], timestamp=cached[0].timestamp),
+        Usage(requests=1),
+    )
+
+
+async def test_sqlite_cache(tmp_path: Path):
+    path = tmp_path / 'cache.db'
+    response = ModelResponse(parts=[TextPart('hello'), ToolCallPart('foo', {'a': 1}, 'call_1')], model_name='test')
+    usage = Usage(requests=1, request_tokens=10, response_tokens=5, total_tokens=15, details={'cached': 3})
+
+    cache = SQLiteResponseCache(path)
+    await cache.set('a', response, usage)
+    cache.close()
+
+    cache = SQLiteResponseCache(path)
+    assert await cache.get('a') == (response, usage)
+    assert await cache.get('b') is None
+    await cache.clear()
+    assert await cache.get('a') is None
+    cache.close()
+
+
+async def test_sqlite_lru_and_ttl(monkeypatch: pytest.MonkeyPatch):
+    now = 1000.0
+
+    def fake_time() -> float:
+        return now
+
+    monkeypatch.setattr('pydantic_ai.models.cached.time.time', fake_time)
+    cache = SQLiteResponseCache(':memory:', max_size=2, ttl=60)
+    for key in 'abc':
+        now += 1
+        await cache.set(key, ModelResponse(parts=[TextPart(key)]), Usage())
+    assert await cache.get('a') is None
+
+    now += 1
+    assert await cache.get('b') is not None
+    now += 1
+    await cache.set('d', ModelResponse(parts=[TextPart('d')]), Usage())
+    assert await cache.get('c') is None
+    assert await cache.get('b') is not None
+
+    now += 60
+    assert await cache.get('b') is None
+    cache.close()
+
+
+def test_sqlite_backed_agent(tmp_path: Path):
+    cache = SQLiteResponseCache(tmp_path / 'cache.db')
+    model, functions = make_model(cache)
+    agent = Agent(model)
+    assert agent.run_sync('hello').data == agent.run_sync('hello').data
+    assert functions.calls == 1
+    cache.close()
+
+
+def test_tools_affect_key():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    @agent.tool_plain
+    def foo(x: int) -> str:  # pragma: no cover
+        return json.dumps(x)
+
+    agent.run_sync('hello')
+    Agent(model).run_sync('hello')
+    assert functions.calls == 2
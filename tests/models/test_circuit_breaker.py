@@ -0,0 +1,73 @@
+from __future__ import annotations as _annotations
+
+import pytest
+
+from pydantic_ai.models.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [0.0]
+    monkeypatch.setattr('pydantic_ai.models.circuit_breaker.time.monotonic', lambda: now[0])
+    return now
+
+
+def test_opens_on_failure_rate(clock: list[float]):
+    breaker = CircuitBreaker(failure_rate=0.5, min_requests=4, window=10, reset_timeout=30)
+    for _ in range(3):
+        assert breaker.acquire()
+        breaker.record_failure()
+    # not enough requests recorded yet
+    assert breaker.state == 'closed'
+
+    assert breaker.acquire()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.opened == 1
+    assert not breaker.available
+    assert not breaker.acquire()
+    assert breaker.retry_at == 30
+
+
+def test_successes_keep_circuit_closed():
+    breaker = CircuitBreaker(failure_rate=0.6, min_requests=2, window=4)
+    for _ in range(10):
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+    assert breaker.state == 'closed'
+    assert breaker.retry_at is None
+
+
+def test_half_open_probe(clock: list[float]):
+    breaker = CircuitBreaker(min_requests=1, reset_timeout=10, half_open_requests=1)
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+    clock[0] = 10
+    assert breaker.state == 'half-open'
+    assert breaker.acquire()
+    # only one probe at a time
+    assert not breaker.acquire()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.opened == 2
+
+    clock[0] = 20
+    assert breaker.acquire()
+    breaker.release()
+    assert breaker.acquire()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.available
+
+
+def test_reset():
+    breaker = CircuitBreaker(min_requests=1)
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    breaker.reset()
+    assert breaker.state == 'closed'
+    assert breaker.acquire()
@@ -0,0 +1,247 @@
+from __future__ import annotations as _annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+from inline_snapshot import snapshot
+
+from pydantic_ai import Agent, ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, ToolCallPart, UserPromptPart
+from pydantic_ai.models import ModelRequestParameters
+from pydantic_ai.models.coalescing import CoalescingModel
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, DeltaToolCalls, FunctionModel
+
+pytestmark = pytest.mark.anyio
+
+
+class GatedFunctions:
+    """Model functions which block until `release` is set, so requests overlap."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.fail = False
+
+    async def respond(self, messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise ModelHTTPError(status_code=500, model_name='gated', body='boom')
+        return ModelResponse(parts=[TextPart(f'answer {self.calls}')])
+
+    async def stream(self, messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        self.calls += 1
+        yield 'hello '
+        await self.release.wait()
+        if self.fail:
+            raise ModelHTTPError(status_code=500, model_name='gated', body='boom')
+        yield 'world'
+
+
+def make_model() -> tuple[CoalescingModel, GatedFunctions]:
+    functions = GatedFunctions()
+    return CoalescingModel(FunctionModel(functions.respond, stream_function=functions.stream)), functions
+
+
+async def test_identical_requests_coalesced():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    tasks = [asyncio.create_task(agent.run(prompt)) for prompt in ['hello', 'hello', 'hello', 'goodbye']]
+    await asyncio.sleep(0)
+    assert model.in_flight == 2
+    functions.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert [r.data for r in results] == snapshot(['answer 1', 'answer 1', 'answer 1', 'answer 2'])
+    assert functions.calls == 2
+    assert model.coalesced == 2
+    assert model.in_flight == 0
+    assert results[0].usage() == results[1].usage()
+    assert results[0].all_messages()[-1] is not results[1].all_messages()[-1]
+
+    # completed requests aren't reused
+    await agent.run('hello')
+    assert functions.calls == 3
+
+
+async def test_errors_shared():
+    model, functions = make_model()
+    agent = Agent(model)
+    functions.fail = True
+
+    tasks = [asyncio.create_task(agent.run('hello')) for _ in range(3)]
+    await asyncio.sleep(0)
+    functions.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, ModelHTTPError) for r in results)
+    assert functions.calls == 1
+
+
+async def test_cancelled_caller_doesnt_cancel_others():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    first = asyncio.create_task(agent.run('hello'))
+    second = asyncio.create_task(agent.run('hello'))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    await asyncio.sleep(0)
+    functions.release.set()
+
+    assert (await second).data == snapshot('answer 1')
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert functions.calls == 1
+
+
+async def test_all_callers_cancelled_cancels_request():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    tasks = [asyncio.create_task(agent.run('hello')) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    assert model.in_flight == 1
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert model.in_flight == 0
+
+
+async def test_request_after_cancellation_starts_afresh():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    first = asyncio.create_task(agent.run('hello'))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    functions.release.set()
+    # the same request made straight away, before the cancelled request has finished, mustn't join it
+    second = asyncio.create_task(agent.run('hello'))
+
+    assert (await second).data == snapshot('answer 2')
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert model.coalesced == 0
+    assert model.in_flight == 0
+
+
+async def test_stream_after_cancellation_starts_afresh():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    async def stream_text() -> list[str]:
+        async with agent.run_stream('hello') as result:
+            return [c async for c in result.stream_text(debounce_by=None)]
+
+    first = asyncio.create_task(stream_text())
+    await asyncio.sleep(0.01)
+    first.cancel()
+    functions.release.set()
+    second = asyncio.create_task(stream_text())
+
+    assert await second == snapshot(['hello ', 'hello world'])
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert functions.calls == 2
+    assert model.in_flight == 0
+
+
+async def test_streams_coalesced():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    async def stream_text() -> list[str]:
+        async with agent.run_stream('hello') as result:
+            return [c async for c in result.stream_text(debounce_by=None)]
+
+    tasks = [asyncio.create_task(stream_text()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    assert model.in_flight == 1
+    functions.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert results == snapshot([['hello ', 'hello world']] * 3)
+    assert functions.calls == 1
+    assert model.coalesced == 2
+    assert model.in_flight == 0
+
+
+async def test_late_stream_subscriber_replays_from_start():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    async with agent.run_stream('hello') as leader:
+        leader_iter = leader.stream_text(delta=True, debounce_by=None)
+        assert await leader_iter.__anext__() == 'hello '
+
+        async def follow() -> str:
+            async with agent.run_stream('hello') as follower:
+                return await follower.get_data()
+
+        follower_task = asyncio.create_task(follow())
+        await asyncio.sleep(0.01)
+        functions.release.set()
+        assert [c async for c in leader_iter] == ['world']
+
+    assert await follower_task == 'hello world'
+    assert functions.calls == 1
+
+
+async def test_stream_parts_rebuilt_from_events():
+    async def stream(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[DeltaToolCalls]:
+        yield {0: DeltaToolCall(json_args='{"a": ')}
+        yield {0: DeltaToolCall(name='foo', json_args='1')}
+        yield {1: DeltaToolCall(name='bar', json_args='{}', tool_call_id='call_2')}
+        yield {0: DeltaToolCall(json_args=', "b": 2}')}
+
+    wrapped = FunctionModel(stream_function=stream)
+    messages: list[ModelMessage] = [ModelRequest(parts=[UserPromptPart('hello')])]
+    params = ModelRequestParameters(function_tools=[], allow_text_result=True, result_tools=[])
+
+    async with wrapped.request_stream(messages, None, params) as direct:
+        expected = [direct.get().parts async for _ in direct]
+    async with CoalescingModel(wrapped).request_stream(messages, None, params) as coalesced:
+        parts = [coalesced.get().parts async for _ in coalesced]
+        final = coalesced.get().parts
+
+    assert parts == expected
+    assert final == snapshot(
+        [
+            ToolCallPart(tool_name='foo', args='{"a": 1, "b": 2}'),
+            ToolCallPart(tool_name='bar', args='{}', tool_call_id='call_2'),
+        ]
+    )
+
+
+async def test_stream_error_shared():
+    model, functions = make_model()
+    agent = Agent(model)
+    functions.fail = True
+
+    async def stream_text() -> str:
+        async with agent.run_stream('hello') as result:
+            return await result.get_data()
+
+    tasks = [asyncio.create_task(stream_text()) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    functions.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, ModelHTTPError) for r in results)
+    assert functions.calls == 1
+
+
+async def test_stream_open_error():
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:  # pragma: no cover
+        raise AssertionError
+
+    async def stream(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        raise ModelHTTPError(status_code=429, model_name='gated')
+        yield  # pragma: no cover
+
+    agent = Agent(CoalescingModel(FunctionModel(respond, stream_function=stream)))
+    with pytest.raises(ModelHTTPError):
+        async with agent.run_stream('hello'):
+            pass  # pragma: no cover
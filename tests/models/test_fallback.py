@@ -1,3 +1,4 @@
+import asyncio
 import sys
 from collections.abc import AsyncIterator
 from datetime import timezone
@@ -7,6 +8,7 @@ from inline_snapshot import snapshot
 
 from pydantic_ai import Agent, ModelHTTPError
 from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, UserPromptPart
+from pydantic_ai.models.circuit_breaker import CircuitBreaker
 from pydantic_ai.models.fallback import FallbackModel
 from pydantic_ai.models.function import AgentInfo, FunctionModel
 
@@ -206,3 +208,148 @@ async def test_fallback_condition_tuple() -> None:
 
     response = await agent.run('hello')
     assert response.data == 'success'
+
+
+class Toggle:
+    def __init__(self) -> None:
+        self.failing = True
+        self.calls = 0
+
+    def respond(self, _model_messages: list[ModelMessage], _agent_info: AgentInfo) -> ModelResponse:
+        self.calls += 1
+        if self.failing:
+            raise ModelHTTPError(status_code=503, model_name='toggle')
+        return ModelResponse(parts=[TextPart('toggle')])
+
+
+async def test_circuit_breaker_skips_failing_model(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 0.0
+    monkeypatch.setattr('pydantic_ai.models.circuit_breaker.time.monotonic', lambda: now)
+    toggle = Toggle()
+    fallback_model = FallbackModel(
+        FunctionModel(toggle.respond),
+        success_model,
+        circuit_breaker_factory=lambda: CircuitBreaker(min_requests=2, reset_timeout=30),
+    )
+    assert fallback_model.circuit_breakers is not None
+    breaker = fallback_model.circuit_breakers[0]
+    agent = Agent(model=fallback_model)
+
+    for _ in range(2):
+        assert (await agent.run('hello')).data == 'success'
+    assert toggle.calls == 2
+    assert breaker.state == 'open'
+
+    # the open circuit means the default model isn't tried at all
+    for _ in range(3):
+        assert (await agent.run('hello')).data == 'success'
+    assert toggle.calls == 2
+
+    # once half-open, the default model is probed in the background while the request uses the fallback
+    toggle.failing = False
+    now = 30.0
+    assert breaker.state == 'half-open'
+    assert (await agent.run('hello')).data == 'success'
+    await asyncio.gather(*fallback_model._probes)  # pyright: ignore[reportPrivateUsage]
+    assert toggle.calls == 3
+    assert breaker.state == 'closed'
+
+    assert (await agent.run('hello')).data == 'toggle'
+
+
+async def test_circuit_breaker_failed_probe(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 0.0
+    monkeypatch.setattr('pydantic_ai.models.circuit_breaker.time.monotonic', lambda: now)
+    toggle = Toggle()
+    fallback_model = FallbackModel(
+        FunctionModel(toggle.respond),
+        success_model,
+        circuit_breaker_factory=lambda: CircuitBreaker(min_requests=1, reset_timeout=30),
+    )
+    assert fallback_model.circuit_breakers is not None
+    breaker = fallback_model.circuit_breakers[0]
+    agent = Agent(model=fallback_model)
+
+    await agent.run('hello')
+    now = 30.0
+    await agent.run('hello')
+    await asyncio.gather(*fallback_model._probes)  # pyright: ignore[reportPrivateUsage]
+    assert toggle.calls == 2
+    assert breaker.state == 'open'
+    assert breaker.opened == 2
+
+
+async def test_circuit_breaker_all_open() -> None:
+    toggle = Toggle()
+    fallback_model = FallbackModel(
+        FunctionModel(toggle.respond),
+        failure_model,
+        circuit_breaker_factory=lambda: CircuitBreaker(min_requests=1, reset_timeout=30),
+    )
+    agent = Agent(model=fallback_model)
+    with pytest.raises(ExceptionGroup):
+        await agent.run('hello')
+    assert fallback_model.circuit_breakers is not None
+    assert [b.state for b in fallback_model.circuit_breakers] == ['open', 'open']
+
+    # with every circuit open, the model which will be probed soonest is still tried
+    toggle.failing = False
+    assert (await agent.run('hello')).data == 'toggle'
+
+
+async def test_circuit_breaker_half_open_without_closed(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 0.0
+    monkeypatch.setattr('pydantic_ai.models.circuit_breaker.time.monotonic', lambda: now)
+    toggle = Toggle()
+    failing = Toggle()
+    fallback_model = FallbackModel(
+        FunctionModel(toggle.respond),
+        FunctionModel(failing.respond),
+        circuit_breaker_factory=lambda: CircuitBreaker(min_requests=1, reset_timeout=30),
+    )
+    assert fallback_model.circuit_breakers is not None
+    agent = Agent(model=fallback_model)
+    with pytest.raises(ExceptionGroup):
+        await agent.run('hello')
+
+    # with no circuit closed, the half-open model is tried directly rather than probed and then tried again
+    toggle.failing = False
+    now = 30.0
+    assert (await agent.run('hello')).data == 'toggle'
+    assert not fallback_model._probes  # pyright: ignore[reportPrivateUsage]
+    assert (toggle.calls, failing.calls) == (2, 1)
+    assert [b.state for b in fallback_model.circuit_breakers] == ['closed', 'half-open']
+
+
+async def test_circuit_breaker_open_model_after_closed_fails() -> None:
+    toggle = Toggle()
+    fallback = Toggle()
+    fallback.failing = False
+    fallback_model = FallbackModel(
+        FunctionModel(toggle.respond),
+        FunctionModel(fallback.respond),
+        circuit_breaker_factory=lambda: CircuitBreaker(min_requests=1, reset_timeout=30),
+    )
+    assert fallback_model.circuit_breakers is not None
+    agent = Agent(model=fallback_model)
+    assert (await agent.run('hello')).data == 'toggle'
+    assert [b.state for b in fallback_model.circuit_breakers] == ['open', 'closed']
+
+    # once the model with a closed circuit fails, the one with an open circuit is tried rather than giving up
+    toggle.failing = False
+    fallback.failing = True
+    assert (await agent.run('hello')).data == 'toggle'
+    assert (toggle.calls, fallback.calls) == (2, 2)
+
+
+async def test_circuit_breaker_streaming() -> None:
+    fallback_model = FallbackModel(
+        failure_model_stream,
+        success_model_stream,
+        circuit_breaker_factory=lambda: CircuitBreaker(min_requests=1, reset_timeout=30),
+    )
+    agent = Agent(model=fallback_model)
+    async with agent.run_stream('hello') as result:
+        await result.get_data()
+    assert fallback_model.circuit_breakers is not None
+    assert [b.state for b in fallback_model.circuit_breakers] == ['open', 'closed']
@@ -45,6 +45,7 @@ from pydantic_ai.models.gemini import (
     _GeminiTools,
     _GeminiUsageMetaData,
 )
+from pydantic_ai.models.media import MediaStore
 from pydantic_ai.providers.google_gla import GoogleGLAProvider
 from pydantic_ai.result import Usage
 from pydantic_ai.tools import ToolDefinition
@@ -1011,3 +1012,97 @@ async def test_image_url_input(allow_model_requests: None, gemini_api_key: str)
 
     result = await agent.run(['What is the name of this fruit?', image_url])
     assert result.data == snapshot("This is not a fruit; it's a pipe organ console.")
+
+
+async def test_binary_content_uploaded_once(client_with_handler: ClientWithHandler, allow_model_requests: None):
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == '/upload/v1beta/files':
+            assert request.headers['X-Goog-Upload-Command'] == 'start'
+            assert request.headers['X-Goog-Upload-Header-Content-Type'] == 'image/png'
+            return httpx.Response(200, headers={'X-Goog-Upload-URL': 'https://upload.example.com/session/1'})
+        elif request.url.host == 'upload.example.com':
+            assert request.content == b'large image'
+            file = {'name': 'files/abc', 'uri': 'https://files.example.com/abc', 'mimeType': 'image/png'}
+            return httpx.Response(200, json={'file': {**file, 'state': 'PROCESSING'}})
+        elif request.url.path == '/v1beta/files/abc':
+            file = {'name': 'files/abc', 'uri': 'https://files.example.com/abc', 'mimeType': 'image/png'}
+            return httpx.Response(200, json={**file, 'state': 'ACTIVE', 'expirationTime': '2099-01-01T00:00:00Z'})
+        else:
+            response = gemini_response(_content_model_response(ModelResponse(parts=[TextPart('a cat')])))
+            return httpx.Response(200, content=_gemini_response_ta.dump_json(response, by_alias=True))
+
+    store = MediaStore()
+    m = GeminiModel(
+        'gemini-1.5-flash',
+        provider=GoogleGLAProvider(http_client=client_with_handler(handler), api_key='mock'),
+        media_store=store,
+        file_upload_threshold=5,
+    )
+    agent = Agent(m)
+    image = BinaryContent(data=b'large image', media_type='image/png')
+    small = BinaryContent(data=b'tiny', media_type='image/png')
+
+    result = await agent.run(['What is this?', image, small])
+    await agent.run(['And this?', BinaryContent(data=b'large image', media_type='image/png')])
+    await agent.run('Still there?', message_history=result.all_messages())
+
+    generate_requests = [r for r in requests if r.url.path.endswith(':generateContent')]
+    assert [r.url.path for r in requests if r not in generate_requests] == snapshot(
+        ['/upload/v1beta/files', '/session/1', '/v1beta/files/abc']
+    )
+    assert json.loads(generate_requests[0].content)['contents'][0]['parts'] == snapshot(
+        [
+            {'text': 'What is this?'},
+            {'fileData': {'fileUri': 'https://files.example.com/abc', 'mimeType': 'image/png'}},
+            {'inlineData': {'data': 'dGlueQ==', 'mimeType': 'image/png'}},
+        ]
+    )
+    assert (
+        json.loads(generate_requests[2].content)['contents'][0]
+        == json.loads(generate_requests[0].content)['contents'][0]
+    )
+
+
+async def test_binary_content_expired_upload(client_with_handler: ClientWithHandler, allow_model_requests: None):
+    uploads = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal uploads
+        if request.url.path == '/upload/v1beta/files':
+            return httpx.Response(200, headers={'X-Goog-Upload-URL': 'https://upload.example.com/session'})
+        elif request.url.host == 'upload.example.com':
+            uploads += 1
+            file = {'name': f'files/{uploads}', 'uri': f'https://files.example.com/{uploads}', 'mimeType': 'image/png'}
+            expiration_time = '2000-01-01T00:00:00Z' if uploads == 1 else '2099-01-01T00:00:00Z'
+            return httpx.Response(200, json={'file': {**file, 'expirationTime': expiration_time}})
+        else:
+            response = gemini_response(_content_model_response(ModelResponse(parts=[TextPart('a cat')])))
+            return httpx.Response(200, content=_gemini_response_ta.dump_json(response, by_alias=True))
+
+    m = GeminiModel(
+        'gemini-1.5-flash',
+        provider=GoogleGLAProvider(http_client=client_with_handler(handler), api_key='mock'),
+        media_store=MediaStore(),
+        file_upload_threshold=0,
+    )
+    agent = Agent(m)
+    result = await agent.run(['What is this?', BinaryContent(data=b'image', media_type='image/png')])
+    await agent.run('Still there?', message_history=result.all_messages())
+    # the first upload had already expired, so the image is uploaded again rather than referenced
+    assert uploads == 2
+
+
+async def test_binary_content_upload_error(client_with_handler: ClientWithHandler, allow_model_requests: None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(403, json={'error': 'forbidden'})
+
+    m = GeminiModel(
+        'gemini-1.5-flash',
+        provider=GoogleGLAProvider(http_client=client_with_handler(handler), api_key='mock'),
+        file_upload_threshold=0,
+    )
+    with pytest.raises(ModelHTTPError, match='status_code: 403'):
+        await Agent(m).run(['What is this?', BinaryContent(data=b'image', media_type='image/png')])
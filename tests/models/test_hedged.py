@@ -0,0 +1,173 @@
+from __future__ import annotations as _annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+from inline_snapshot import snapshot
+
+from pydantic_ai import Agent, ModelHTTPError
+from pydantic_ai.exceptions import FallbackExceptionGroup
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.models.hedged import HedgedModel
+
+pytestmark = pytest.mark.anyio
+
+
+class SlowFunctions:
+    def __init__(self, name: str, delay: float = 0, error: Exception | None = None) -> None:
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.started = 0
+        self.cancelled = 0
+
+    async def respond(self, messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return ModelResponse(parts=[TextPart(self.name)])
+
+    async def stream(self, messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        yield self.name
+        yield ' done'
+
+    def model(self) -> FunctionModel:
+        return FunctionModel(self.respond, stream_function=self.stream, model_name=self.name)
+
+
+async def test_fast_primary_not_hedged():
+    primary = SlowFunctions('primary')
+    secondary = SlowFunctions('secondary')
+    model = HedgedModel(primary.model(), secondary.model(), delay=0.5)
+    result = await Agent(model).run('hello')
+    assert result.data == 'primary'
+    assert (primary.started, secondary.started) == (1, 0)
+    assert model.hedged == 0
+    assert model.wins == {'primary': 1}
+    assert result.usage().requests == 1
+
+
+async def test_slow_primary_hedged():
+    primary = SlowFunctions('primary', delay=10)
+    secondary = SlowFunctions('secondary')
+    model = HedgedModel(primary.model(), secondary.model(), delay=0.01)
+    result = await Agent(model).run('hello')
+    assert result.data == 'secondary'
+    assert (primary.started, primary.cancelled, secondary.started) == (1, 1, 1)
+    assert model.hedged == 1
+    assert model.wins == {'secondary': 1}
+    assert result.all_messages()[-1].model_name == 'secondary'  # type: ignore[union-attr]
+    # the cancelled request to the primary is counted too
+    assert result.usage().requests == 2
+
+
+async def test_primary_wins_after_hedging():
+    primary = SlowFunctions('primary', delay=0.05)
+    secondary = SlowFunctions('secondary', delay=10)
+    model = HedgedModel(primary.model(), secondary.model(), delay=0.01)
+    result = await Agent(model).run('hello')
+    assert result.data == 'primary'
+    assert secondary.cancelled == 1
+    assert model.hedged == 1
+    assert result.usage().requests == 2
+
+
+async def test_error_starts_next_model_immediately():
+    primary = SlowFunctions('primary', error=ModelHTTPError(503, 'primary'))
+    secondary = SlowFunctions('secondary')
+    model = HedgedModel(primary.model(), secondary.model(), delay=10)
+    result = await asyncio.wait_for(Agent(model).run('hello'), timeout=1)
+    assert result.data == 'secondary'
+    assert model.hedged == 0
+
+
+async def test_hedge_error_starts_next_model_while_others_run():
+    primary = SlowFunctions('primary', delay=10)
+    secondary = SlowFunctions('secondary', error=ModelHTTPError(503, 'secondary'))
+    tertiary = SlowFunctions('tertiary')
+    model = HedgedModel(primary.model(), secondary.model(), tertiary.model(), delay=0.2)
+    # after the first delay the secondary is started and fails, the tertiary mustn't wait for another delay
+    result = await asyncio.wait_for(Agent(model).run('hello'), timeout=0.35)
+    assert result.data == 'tertiary'
+    assert (primary.started, primary.cancelled, secondary.started, tertiary.started) == (1, 1, 1, 1)
+    assert model.hedged == 1
+
+
+async def test_all_fail():
+    primary = SlowFunctions('primary', error=ModelHTTPError(503, 'primary'))
+    secondary = SlowFunctions('secondary', error=ModelHTTPError(500, 'secondary'))
+    model = HedgedModel(primary.model(), secondary.model(), delay=10)
+    with pytest.raises(FallbackExceptionGroup) as exc_info:
+        await Agent(model).run('hello')
+    assert [e.model_name for e in exc_info.value.exceptions] == snapshot(['primary', 'secondary'])  # type: ignore[attr-defined]
+
+
+async def test_other_errors_raised():
+    primary = SlowFunctions('primary', delay=0.05, error=ValueError('bad request'))
+    secondary = SlowFunctions('secondary', delay=10)
+    model = HedgedModel(primary.model(), secondary.model(), delay=0.01)
+    with pytest.raises(ValueError, match='bad request'):
+        await Agent(model).run('hello')
+    assert secondary.cancelled == 1
+
+
+async def test_adaptive_delay():
+    primary = SlowFunctions('primary')
+    model = HedgedModel(primary.model(), SlowFunctions('secondary').model(), delay=5, min_samples=3, quantile=1.0)
+    agent = Agent(model)
+    assert model.current_delay == 5
+    for _ in range(3):
+        await agent.run('hello')
+    assert model.current_delay < 0.5
+
+    model.quantile = None
+    assert model.current_delay == 5
+
+
+async def test_stream_first_to_start_wins():
+    primary = SlowFunctions('primary', delay=10)
+    secondary = SlowFunctions('secondary')
+    model = HedgedModel(primary.model(), secondary.model(), delay=0.01)
+    async with Agent(model).run_stream('hello') as result:
+        assert await result.get_data() == 'secondary done'
+    assert primary.cancelled == 1
+    assert model.wins == {'secondary': 1}
+    assert result.usage().requests == 2
+
+
+async def test_stream_primary():
+    primary = SlowFunctions('primary')
+    secondary = SlowFunctions('secondary')
+    model = HedgedModel(primary.model(), secondary.model(), delay=0.5)
+    async with Agent(model).run_stream('hello') as result:
+        assert [c async for c in result.stream_text(debounce_by=None)] == snapshot(['primary', 'primary done'])
+    assert secondary.started == 0
+    assert result.usage().requests == 1
+
+
+async def test_stream_error_falls_through():
+    primary = SlowFunctions('primary', error=ModelHTTPError(503, 'primary'))
+    secondary = SlowFunctions('secondary')
+    model = HedgedModel(primary.model(), secondary.model(), delay=10)
+    async with Agent(model).run_stream('hello') as result:
+        assert await result.get_data() == 'secondary done'
+
+
+def test_requires_hedge_model():
+    with pytest.raises(ValueError, match='At least one hedge model is required.'):
+        HedgedModel(FunctionModel(lambda m, i: ModelResponse(parts=[])))
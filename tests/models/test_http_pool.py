@@ -0,0 +1,184 @@
+from __future__ import annotations as _annotations
+
+from collections.abc import AsyncIterator, Iterator
+
+import httpx
+import pytest
+
+from pydantic_ai.models import cached_async_http_client
+from pydantic_ai.models.http_pool import (
+    DNSCache,
+    HTTPClientPool,
+    HTTPPoolSettings,
+    get_http_client_pool,
+    set_http_client_pool,
+)
+
+from ..conftest import try_import
+
+with try_import() as imports_successful:
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+pytestmark = pytest.mark.anyio
+
+
+class ChunkStream(httpx.AsyncByteStream):
+    """A response body which is only read when iterated, like a real network response."""
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield b'ok'
+
+
+@pytest.fixture
+def sent(monkeypatch: pytest.MonkeyPatch) -> list[httpx.Request]:
+    """Replace the network transport of pooled clients with one that records requests."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, stream=ChunkStream())
+
+    monkeypatch.setattr(
+        'pydantic_ai.models.http_pool.httpx.AsyncHTTPTransport', lambda **kwargs: httpx.MockTransport(handler)
+    )
+    return requests
+
+
+@pytest.fixture
+def installed_pool() -> Iterator[HTTPClientPool]:
+    pool = HTTPClientPool()
+    set_http_client_pool(pool)
+    try:
+        yield pool
+    finally:
+        set_http_client_pool(None)
+
+
+async def test_client_per_origin():
+    async with HTTPClientPool(
+        HTTPPoolSettings(read_timeout=30),
+        overrides={'https://api.openai.com/v1': HTTPPoolSettings(max_connections=500, connect_timeout=1)},
+    ) as pool:
+        openai = pool.get_client('https://api.openai.com/v1')
+        assert pool.get_client('https://api.openai.com/other') is openai
+        proxy = pool.get_client('https://proxy.example.com:8443/v1')
+        assert proxy is not openai
+        assert pool.get_client() is not openai
+
+        assert openai.timeout.connect == 1
+        assert proxy.timeout.read == 30
+        assert set(pool.stats) == {'https://api.openai.com', 'https://proxy.example.com:8443', 'default'}
+        assert pool.stats['https://api.openai.com'].max_connections == 500
+
+    assert openai.is_closed and proxy.is_closed
+    # a closed client is replaced
+    assert not pool.get_client('https://api.openai.com/v1').is_closed
+    await pool.aclose()
+
+
+def test_settings():
+    settings = HTTPPoolSettings(max_connections=10, max_keepalive_connections=5, connect_timeout=2, read_timeout=60)
+    assert settings.limits == httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=5.0)
+    assert settings.timeout == httpx.Timeout(connect=2, read=60, write=60, pool=600)
+
+
+async def test_stats(sent: list[httpx.Request]):
+    async with HTTPClientPool(HTTPPoolSettings(max_connections=1)) as pool:
+        client = pool.get_client('https://api.openai.com/v1')
+        stats = pool.stats['https://api.openai.com']
+
+        async with client.stream('GET', 'https://api.openai.com/v1/models') as first:
+            assert stats.in_flight == 1
+            assert stats.saturation == 1.0
+            async with client.stream('GET', 'https://api.openai.com/v1/models') as second:
+                assert stats.in_flight == 2
+                await second.aread()
+            await first.aread()
+
+        assert stats.in_flight == 0
+        assert stats.peak_in_flight == 2
+        assert stats.requests == 2
+        assert stats.saturated_requests == 1
+        assert len(sent) == 2
+
+
+async def test_failed_request_not_in_flight(monkeypatch: pytest.MonkeyPatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError('refused')
+
+    monkeypatch.setattr(
+        'pydantic_ai.models.http_pool.httpx.AsyncHTTPTransport', lambda **kwargs: httpx.MockTransport(handler)
+    )
+    async with HTTPClientPool() as pool:
+        with pytest.raises(httpx.ConnectError):
+            await pool.get_client('https://example.com').get('https://example.com')
+        assert pool.stats['https://example.com'].in_flight == 0
+
+
+@pytest.mark.skipif(not imports_successful(), reason='opentelemetry-sdk not installed')
+async def test_metrics(sent: list[httpx.Request]):
+    reader = InMemoryMetricReader()
+    async with HTTPClientPool(HTTPPoolSettings(max_connections=0), meter_provider=MeterProvider([reader])) as pool:
+        await pool.get_client('https://example.com').get('https://example.com/a')
+
+    metrics_data = reader.get_metrics_data()
+    assert metrics_data is not None
+    points = {
+        metric.name: [(dict(point.attributes or {}), point.value) for point in metric.data.data_points]  # type: ignore[attr-defined]
+        for resource_metrics in metrics_data.resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    }
+    assert points == {
+        'http.client.active_requests': [({'server.address': 'https://example.com'}, 0)],
+        'pydantic_ai.http_pool.saturated_requests': [({'server.address': 'https://example.com'}, 1)],
+    }
+
+
+async def test_dns_cache(sent: list[httpx.Request], monkeypatch: pytest.MonkeyPatch):
+    lookups: list[str] = []
+
+    async def resolve(self: DNSCache, host: str, port: int) -> str:
+        lookups.append(host)
+        return '10.0.0.1'
+
+    async with HTTPClientPool(HTTPPoolSettings(dns_cache_ttl=60)) as pool:
+        client = pool.get_client('https://api.openai.com')
+        monkeypatch.setattr(DNSCache, 'resolve', resolve)
+        await client.get('https://api.openai.com/v1/models')
+        await client.get('http://10.0.0.2/v1/models')
+
+    assert lookups == ['api.openai.com']
+    request = sent[0]
+    assert request.url == 'https://10.0.0.1/v1/models'
+    assert request.headers['host'] == 'api.openai.com'
+    assert request.extensions['sni_hostname'] == 'api.openai.com'
+    assert sent[1].url == 'http://10.0.0.2/v1/models'
+
+
+async def test_dns_cache_ttl(monkeypatch: pytest.MonkeyPatch):
+    now = 0.0
+    monkeypatch.setattr('pydantic_ai.models.http_pool.time.monotonic', lambda: now)
+    cache = DNSCache(ttl=10)
+    address = await cache.resolve('localhost', 80)
+    assert address in {'127.0.0.1', '::1'}
+    cache._entries[('localhost', 80)] = ('192.0.2.1', 10.0)  # pyright: ignore[reportPrivateUsage]
+    assert await cache.resolve('localhost', 80) == '192.0.2.1'
+
+    now = 10.0
+    assert await cache.resolve('localhost', 80) == address
+    cache.clear()
+
+
+async def test_cached_async_http_client_uses_pool(installed_pool: HTTPClientPool):
+    assert get_http_client_pool() is installed_pool
+    client = cached_async_http_client(base_url='https://api.anthropic.com')
+    assert client is installed_pool.get_client('https://api.anthropic.com/v1/messages')
+    assert cached_async_http_client() is installed_pool.get_client()
+    await installed_pool.aclose()
+
+
+def test_cached_async_http_client_without_pool():
+    assert get_http_client_pool() is None
+    assert cached_async_http_client(base_url='https://api.anthropic.com') is cached_async_http_client()
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+import json
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Any
 
 import pytest
-from dirty_equals import IsJson
+from dirty_equals import IsFloat, IsJson
 from inline_snapshot import snapshot
 from logfire_api import DEFAULT_LOGFIRE_INSTANCE
 from opentelemetry._events import NoOpEventLoggerProvider
 from opentelemetry.trace import NoOpTracerProvider
+from pydantic import BaseModel
 
+from pydantic_ai import Agent
 from pydantic_ai.messages import (
+    BinaryContent,
     ModelMessage,
     ModelRequest,
     ModelResponse,
@@ -27,7 +32,13 @@ from pydantic_ai.messages import (
     UserPromptPart,
 )
 from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
-from pydantic_ai.models.instrumented import InstrumentationSettings, InstrumentedModel
+from pydantic_ai.models.instrumented import (
+    InstrumentationSettings,
+    InstrumentedModel,
+    _background_worker,  # pyright: ignore[reportPrivateUsage]
+    flush_background_serialization,
+)
+from pydantic_ai.models.test import TestModel
 from pydantic_ai.settings import ModelSettings
 from pydantic_ai.usage import Usage
 
@@ -380,6 +391,7 @@ async def test_instrumented_model_stream(capfire: CaptureLogfire):
                     'gen_ai.response.model': 'my_model_123',
                     'gen_ai.usage.input_tokens': 300,
                     'gen_ai.usage.output_tokens': 400,
+                    'pydantic_ai.timings.time_to_first_token': IsFloat(ge=0),
                 },
             },
         ]
@@ -463,6 +475,7 @@ async def test_instrumented_model_stream_break(capfire: CaptureLogfire):
                     'gen_ai.response.model': 'my_model_123',
                     'gen_ai.usage.input_tokens': 300,
                     'gen_ai.usage.output_tokens': 400,
+                    'pydantic_ai.timings.time_to_first_token': IsFloat(ge=0),
                     'logfire.level_num': 17,
                 },
                 'events': [
@@ -689,3 +702,161 @@ def test_messages_to_otel_events_serialization_errors():
             },
         ]
     )
+
+
+def test_messages_to_otel_events_truncate_before_serializing():
+    class Document(BaseModel):
+        title: str
+        text: str
+
+    messages: list[ModelMessage] = [
+        ModelRequest(parts=[ToolReturnPart('image', BinaryContent(b'\x89PNG' * 1000, media_type='image/png'))]),
+        ModelRequest(parts=[ToolReturnPart('search', [Document(title='Weather', text='sunny ' * 100), b'raw'])]),
+    ]
+
+    assert [
+        InstrumentedModel.event_to_dict(e)
+        for e in InstrumentedModel.messages_to_otel_events(messages, max_content_length=10)
+    ] == snapshot(
+        [
+            {
+                'content': '(4000 bytes of image/png omitted)',
+                'role': 'tool',
+                'id': None,
+                'name': 'image',
+                'gen_ai.message.index': 0,
+                'event.name': 'gen_ai.tool.message',
+            },
+            {
+                'content': [
+                    {'title': 'Weather', 'text': 'sunny sunn... (590 characters truncated)'},
+                    '(3 bytes omitted)',
+                ],
+                'role': 'tool',
+                'id': None,
+                'name': 'search',
+                'gen_ai.message.index': 1,
+                'event.name': 'gen_ai.tool.message',
+            },
+        ]
+    )
+
+
+def events_of(span: dict[str, Any]) -> list[dict[str, Any]]:
+    return json.loads(span['attributes']['events'])
+
+
+conversation: list[ModelMessage] = [
+    ModelRequest(parts=[UserPromptPart('What is the weather like?')]),
+    ModelResponse(parts=[ToolCallPart('weather', {'city': 'London'}, 'call_1')]),
+    ModelRequest(parts=[ToolReturnPart('weather', 'sunny ' * 100, 'call_1')]),
+]
+request_parameters = ModelRequestParameters(function_tools=[], allow_text_result=True, result_tools=[])
+
+
+async def test_instrumented_model_new_messages(capfire: CaptureLogfire):
+    model = InstrumentedModel(MyModel(), InstrumentationSettings(messages='new'))
+    await model.request(conversation, None, request_parameters)
+
+    (span,) = capfire.exporter.exported_spans_as_dict()
+    assert span['attributes']['pydantic_ai.full_payload'] is False
+    events = events_of(span)
+    assert [(e['event.name'], e.get('gen_ai.message.index')) for e in events] == [
+        ('gen_ai.tool.message', 2),
+        ('gen_ai.choice', None),
+        ('gen_ai.choice', None),
+    ]
+
+
+async def test_instrumented_model_truncate(capfire: CaptureLogfire):
+    model = InstrumentedModel(MyModel(), InstrumentationSettings(max_content_length=20))
+    await model.request(conversation, None, request_parameters)
+
+    (span,) = capfire.exporter.exported_spans_as_dict()
+    events = events_of(span)
+    assert len(events) == 5
+    assert events[0]['content'] == 'What is the weather ... (5 characters truncated)'
+    assert events[2]['content'] == 'sunny sunny sunny su... (580 characters truncated)'
+    assert events[3]['message']['content'] == 'text1'
+
+
+async def test_instrumented_model_sample_full_payload(capfire: CaptureLogfire):
+    model = InstrumentedModel(
+        MyModel(), InstrumentationSettings(messages='new', max_content_length=10, full_payload_sample_rate=1)
+    )
+    await model.request(conversation, None, request_parameters)
+
+    (span,) = capfire.exporter.exported_spans_as_dict()
+    assert span['attributes']['pydantic_ai.full_payload'] is True
+    events = events_of(span)
+    assert len(events) == 5
+    assert events[2]['content'] == 'sunny ' * 100
+
+
+async def test_instrumented_model_background_serialization(capfire: CaptureLogfire):
+    model = InstrumentedModel(MyModel(), InstrumentationSettings(background_serialization=True))
+    messages = conversation.copy()
+    await model.request(messages, None, request_parameters)
+    async with model.request_stream(messages, None, request_parameters) as response_stream:
+        async for _ in response_stream:
+            pass
+    # the history is appended to before the events are emitted
+    messages.append(ModelResponse(parts=[TextPart('later')]))
+    flush_background_serialization()
+
+    spans = capfire.exporter.exported_spans_as_dict()
+    assert len(spans) == 2
+    for span in spans:
+        assert span['end_time'] > span['start_time']
+        events = events_of(span)
+        assert [e['event.name'] for e in events[:4]] == [
+            'gen_ai.user.message',
+            'gen_ai.assistant.message',
+            'gen_ai.tool.message',
+            'gen_ai.choice',
+        ]
+    assert spans[1]['attributes']['pydantic_ai.timings.time_to_first_token'] == IsFloat(ge=0)
+
+
+def test_background_serialization_error_logged(caplog: pytest.LogCaptureFixture):
+    def fail() -> None:
+        raise RuntimeError('boom')
+
+    _background_worker.submit(fail)
+    flush_background_serialization()
+
+    (record,) = [r for r in caplog.records if r.name == 'pydantic_ai.models.instrumented']
+    assert record.getMessage() == 'Error emitting the events of a model request in the background'
+    assert record.exc_info is not None and str(record.exc_info[1]) == 'boom'
+
+
+@requires_logfire_events
+async def test_instrumented_model_background_serialization_logs(capfire: CaptureLogfire):
+    model = InstrumentedModel(
+        MyModel(), InstrumentationSettings(event_mode='logs', messages='new', background_serialization=True)
+    )
+    await model.request(conversation, None, request_parameters)
+    flush_background_serialization()
+
+    (span,) = capfire.exporter.exported_spans_as_dict()
+    logs = capfire.log_exporter.exported_logs_as_dicts()
+    assert [log['attributes']['event.name'] for log in logs] == [
+        'gen_ai.tool.message',
+        'gen_ai.choice',
+        'gen_ai.choice',
+    ]
+    # the logs are still linked to the request's span
+    assert {log['span_id'] for log in logs} == {span['context']['span_id']}
+
+
+async def test_agent_new_messages(capfire: CaptureLogfire):
+    agent = Agent(TestModel(), instrument=InstrumentationSettings(messages='new'))
+
+    @agent.tool_plain
+    def double(x: int) -> int:
+        return x * 2
+
+    await agent.run('Hello')
+
+    chat_spans = [span for span in capfire.exporter.exported_spans_as_dict() if span['name'] == 'chat test']
+    assert [[e.get('gen_ai.message.index') for e in events_of(span)] for span in chat_spans] == [[0, None], [2, None]]
@@ -0,0 +1,130 @@
+from __future__ import annotations as _annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from pydantic_ai import Agent, ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart
+from pydantic_ai.models.circuit_breaker import CircuitBreaker
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.models.load_balanced import LoadBalancedModel
+
+pytestmark = pytest.mark.anyio
+
+
+class EndpointFunctions:
+    def __init__(self, name: str, delay: float = 0, status_code: int | None = None) -> None:
+        self.name = name
+        self.delay = delay
+        self.status_code = status_code
+        self.calls = 0
+
+    async def respond(self, messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.status_code is not None:
+            raise ModelHTTPError(self.status_code, self.name)
+        return ModelResponse(parts=[TextPart(self.name)])
+
+    async def stream(self, messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.status_code is not None:
+            raise ModelHTTPError(self.status_code, self.name)
+        yield self.name
+
+    def model(self) -> FunctionModel:
+        return FunctionModel(self.respond, stream_function=self.stream, model_name=self.name)
+
+
+async def test_spreads_requests():
+    a, b = EndpointFunctions('a'), EndpointFunctions('b')
+    model = LoadBalancedModel(a.model(), b.model())
+    agent = Agent(model)
+    await asyncio.gather(*(agent.run('hello') for _ in range(20)))
+    assert a.calls + b.calls == 20
+    assert a.calls > 0 and b.calls > 0
+    assert [e.stats.requests for e in model.endpoints] == [a.calls, b.calls]
+    assert all(e.stats.in_flight == 0 for e in model.endpoints)
+    assert all(e.stats.ewma_latency is not None for e in model.endpoints)
+
+
+def test_prefers_fast_idle_endpoint():
+    a, b = EndpointFunctions('a'), EndpointFunctions('b')
+    model = LoadBalancedModel(a.model(), b.model())
+    fast, slow = model.endpoints
+    fast.stats.ewma_latency = 0.1
+    slow.stats.ewma_latency = 10.0
+    picks = [model.select_endpoint() for _ in range(200)]
+    assert picks.count(fast) > 180
+
+    # a busy endpoint becomes less attractive than an idle one
+    slow.stats.ewma_latency = 0.1
+    fast.stats.in_flight = 50
+    picks = [model.select_endpoint() for _ in range(200)]
+    assert picks.count(slow) > 180
+
+
+def test_weights():
+    model = LoadBalancedModel(EndpointFunctions('a').model(), EndpointFunctions('b').model(), weights=[1, 0])
+    assert all(model.select_endpoint() is model.endpoints[0] for _ in range(50))
+
+    with pytest.raises(ValueError, match='`weights` must have one weight per model.'):
+        LoadBalancedModel(EndpointFunctions('a').model(), weights=[1, 2])
+    with pytest.raises(ValueError, match='At least one model is required.'):
+        LoadBalancedModel()
+
+
+async def test_circuit_breaker_avoids_failing_endpoint():
+    broken, healthy = EndpointFunctions('broken', status_code=503), EndpointFunctions('healthy')
+    model = LoadBalancedModel(
+        broken.model(),
+        healthy.model(),
+        weights=[1000, 1],
+        circuit_breaker_factory=lambda: CircuitBreaker(min_requests=2, reset_timeout=60),
+    )
+    agent = Agent(model)
+    for _ in range(2):
+        with pytest.raises(ModelHTTPError):
+            await agent.run('hello')
+    assert model.endpoints[0].circuit_breaker.state == 'open'
+    assert model.endpoints[0].stats.failures == 2
+
+    for _ in range(5):
+        assert (await agent.run('hello')).data == 'healthy'
+    assert broken.calls == 2
+
+
+async def test_client_errors_not_counted():
+    bad_request = EndpointFunctions('a', status_code=400)
+    model = LoadBalancedModel(bad_request.model(), circuit_breaker_factory=lambda: CircuitBreaker(min_requests=1))
+    with pytest.raises(ModelHTTPError):
+        await Agent(model).run('hello')
+    assert model.endpoints[0].stats.failures == 0
+    assert model.endpoints[0].circuit_breaker.state == 'closed'
+
+
+async def test_all_circuits_open():
+    a = EndpointFunctions('a')
+    model = LoadBalancedModel(a.model(), circuit_breaker_factory=lambda: CircuitBreaker(min_requests=1))
+    model.endpoints[0].circuit_breaker.record_failure()
+    assert (await Agent(model).run('hello')).data == 'a'
+
+
+async def test_stream():
+    a, b = EndpointFunctions('a'), EndpointFunctions('b')
+    model = LoadBalancedModel(a.model(), b.model(), weights=[0, 1])
+    async with Agent(model).run_stream('hello') as result:
+        assert model.endpoints[1].stats.in_flight == 1
+        assert await result.get_data() == 'b'
+    stats = model.endpoints[1].stats
+    assert (stats.requests, stats.in_flight) == (1, 0)
+    assert stats.ewma_latency is not None
+
+
+def test_names():
+    model = LoadBalancedModel(EndpointFunctions('a').model(), EndpointFunctions('b').model())
+    assert model.model_name == 'LoadBalancedModel[a, b]'
+    assert model.system is None
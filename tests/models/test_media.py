@@ -0,0 +1,231 @@
+from __future__ import annotations as _annotations
+
+import asyncio
+import base64
+import gc
+import hashlib
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+import httpx
+import pytest
+
+from pydantic_ai._utils import now_utc
+from pydantic_ai.messages import BinaryContent
+from pydantic_ai.models.media import (
+    MediaStore,
+    UploadedFile,
+    URLCache,
+    _digests,  # pyright: ignore[reportPrivateUsage]
+    get_media_store,
+    get_url_cache,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def test_base64():
+    store = MediaStore(max_encoded_bytes=12)
+    image = BinaryContent(data=b'image', media_type='image/png')
+    assert store.base64(image) == base64.b64encode(b'image').decode()
+    assert store.base64(BinaryContent(data=b'image', media_type='image/png')) is store.base64(image)
+
+    # 'audio' and 'image' take 8 bytes each encoded, so the least recently used one is evicted
+    audio = BinaryContent(data=b'audio', media_type='audio/wav')
+    assert store.base64(audio) == base64.b64encode(b'audio').decode()
+    assert list(store._encoded) == [store.digest(audio)]  # pyright: ignore[reportPrivateUsage]
+
+    # too large to cache at all
+    assert store.base64(BinaryContent(data=b'a' * 20, media_type='image/png')) == base64.b64encode(b'a' * 20).decode()
+    assert list(store._encoded) == [store.digest(audio)]  # pyright: ignore[reportPrivateUsage]
+
+    store.clear()
+    assert not store._encoded  # pyright: ignore[reportPrivateUsage]
+
+
+def test_digest_memoized(monkeypatch: pytest.MonkeyPatch):
+    hashed: list[bytes] = []
+    sha256 = hashlib.sha256
+
+    def counting_sha256(data: bytes) -> hashlib._Hash:  # pyright: ignore[reportPrivateUsage]
+        hashed.append(data)
+        return sha256(data)
+
+    monkeypatch.setattr('pydantic_ai.models.media.hashlib.sha256', counting_sha256)
+    image = BinaryContent(data=b'image', media_type='image/png')
+    digest = MediaStore.digest(image)
+    assert digest == sha256(b'image').hexdigest()
+    assert MediaStore.digest(image) == digest
+    assert hashed == [b'image']
+
+    # replacing the data is noticed
+    image.data = b'other'
+    assert MediaStore.digest(image) == sha256(b'other').hexdigest()
+    assert hashed == [b'image', b'other']
+
+    # the memo doesn't keep the content alive
+    memoized = len(_digests)
+    del image
+    gc.collect()
+    assert len(_digests) == memoized - 1
+
+
+async def test_upload_deduplicated():
+    store = MediaStore()
+    uploads: list[bytes] = []
+
+    async def upload(content: BinaryContent) -> UploadedFile:
+        uploads.append(content.data)
+        await asyncio.sleep(0.01)
+        return UploadedFile(uri=f'files/{len(uploads)}', mime_type=content.media_type)
+
+    image = BinaryContent(data=b'image', media_type='image/png')
+    first, second = await asyncio.gather(store.upload(image, 'a', upload), store.upload(image, 'a', upload))
+    assert first is second
+    assert await store.upload(BinaryContent(data=b'image', media_type='image/png'), 'a', upload) is first
+    # references can't be shared between namespaces
+    assert (await store.upload(image, 'b', upload)).uri == 'files/2'
+    assert uploads == [b'image', b'image']
+
+
+async def test_upload_expiry():
+    store = MediaStore(expiry_margin=timedelta(minutes=1))
+    expires_at = [now_utc() + timedelta(seconds=30), now_utc() + timedelta(hours=1)]
+
+    async def upload(content: BinaryContent) -> UploadedFile:
+        return UploadedFile(uri='files/1', mime_type=content.media_type, expires_at=expires_at.pop(0))
+
+    image = BinaryContent(data=b'image', media_type='image/png')
+    first = await store.upload(image, 'a', upload)
+    assert store.is_expiring(first)
+    second = await store.upload(image, 'a', upload)
+    assert second is not first
+    assert not store.is_expiring(second)
+    assert await store.upload(image, 'a', upload) is second
+
+
+async def test_upload_error():
+    store = MediaStore()
+    attempts = 0
+
+    async def upload(content: BinaryContent) -> UploadedFile:
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError('upload failed')
+
+    image = BinaryContent(data=b'image', media_type='image/png')
+    results = await asyncio.gather(
+        store.upload(image, 'a', upload), store.upload(image, 'a', upload), return_exceptions=True
+    )
+    assert [str(r) for r in results] == ['upload failed', 'upload failed']
+    assert attempts == 1
+
+    with pytest.raises(RuntimeError, match='upload failed'):
+        await store.upload(image, 'a', upload)
+    assert attempts == 2
+
+
+def test_default_store():
+    assert isinstance(get_media_store(), MediaStore)
+    assert get_media_store() is get_media_store()
+
+
+def url_cache_client(requests: list[httpx.Request], etag: str | None = '"v1"') -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == '/missing.png':
+            return httpx.Response(404)
+        if etag is not None and request.headers.get('If-None-Match') == etag:
+            return httpx.Response(304)
+        headers = {'Content-Type': 'image/png; charset=binary'}
+        if etag is not None:
+            headers['ETag'] = etag
+        return httpx.Response(200, content=f'content of {request.url.path}'.encode(), headers=headers)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def test_url_cache(monkeypatch: pytest.MonkeyPatch):
+    now = 0.0
+    monkeypatch.setattr('pydantic_ai.models.media.time.monotonic', lambda: now)
+    requests: list[httpx.Request] = []
+    cache = URLCache(revalidate_after=60, http_client=url_cache_client(requests))
+
+    content = await cache.fetch('https://example.com/a.png')
+    assert content == BinaryContent(data=b'content of /a.png', media_type='image/png')
+    assert await cache.fetch('https://example.com/a.png') is content
+    assert len(requests) == 1
+
+    # stale content is revalidated rather than downloaded again
+    now = 61.0
+    assert await cache.fetch('https://example.com/a.png') is content
+    assert len(requests) == 2
+    assert requests[1].headers['If-None-Match'] == '"v1"'
+    assert await cache.fetch('https://example.com/a.png') is content
+    assert len(requests) == 2
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await cache.fetch('https://example.com/missing.png')
+
+    cache.clear()
+    assert await cache.fetch('https://example.com/a.png') == content
+    assert 'If-None-Match' not in requests[-1].headers
+
+
+async def test_url_cache_without_validators(monkeypatch: pytest.MonkeyPatch):
+    now = 0.0
+    monkeypatch.setattr('pydantic_ai.models.media.time.monotonic', lambda: now)
+    requests: list[httpx.Request] = []
+    cache = URLCache(revalidate_after=60, http_client=url_cache_client(requests, etag=None))
+
+    await cache.fetch('https://example.com/a.png')
+    now = 61.0
+    await cache.fetch('https://example.com/a.png')
+    assert len(requests) == 2
+    assert 'If-None-Match' not in requests[1].headers
+
+
+async def test_url_cache_prefetch():
+    requests: list[httpx.Request] = []
+    cache = URLCache(max_bytes=40, http_client=url_cache_client(requests))
+
+    urls = ['https://example.com/a.png', 'https://example.com/b.png', 'https://example.com/a.png']
+    await asyncio.gather(cache.prefetch(urls), cache.fetch('https://example.com/b.png'))
+    assert sorted(r.url.path for r in requests) == ['/a.png', '/b.png']
+
+    # each entry is 17 bytes, so the least recently used one is evicted to make room for a third
+    await cache.fetch('https://example.com/c.png')
+    assert list(cache._entries) == ['https://example.com/b.png', 'https://example.com/c.png']  # pyright: ignore[reportPrivateUsage]
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await cache.prefetch(['https://example.com/missing.png', 'https://example.com/missing.png'])
+    assert [r.url.path for r in requests].count('/missing.png') == 1
+
+
+async def test_url_cache_download_limit():
+    async def chunks() -> AsyncIterator[bytes]:
+        for _ in range(10):
+            yield b'x' * 10
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == '/sized.png':
+            return httpx.Response(200, content=b'x' * 100)
+        return httpx.Response(200, content=chunks())
+
+    cache = URLCache(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), max_download_bytes=50)
+    with pytest.raises(
+        ValueError, match='Content of https://example.com/sized.png is larger than the limit of 50 bytes'
+    ):
+        await cache.fetch('https://example.com/sized.png')
+    # without a `Content-Length` the download is aborted once the limit is passed
+    with pytest.raises(ValueError, match='larger than the limit of 50 bytes'):
+        await cache.fetch('https://example.com/streamed.png')
+    assert not cache._entries  # pyright: ignore[reportPrivateUsage]
+
+    cache.max_download_bytes = None
+    assert (await cache.fetch('https://example.com/streamed.png')).data == b'x' * 100
+
+
+def test_default_url_cache():
+    assert get_url_cache() is get_url_cache()
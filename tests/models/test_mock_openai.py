@@ -0,0 +1,184 @@
+from __future__ import annotations as _annotations
+
+import time
+from typing import Any
+
+import httpx
+import pytest
+
+from pydantic_ai import Agent, ModelHTTPError
+from pydantic_ai.messages import ToolCallPart
+
+from ..conftest import try_import
+
+with try_import() as imports_successful:
+    from pydantic_ai.models.mock_openai import MockError, MockOpenAI, MockResponse, MockToolCall
+    from pydantic_ai.models.openai import OpenAIModel
+    from pydantic_ai.providers.openai import OpenAIProvider
+
+with try_import() as uvicorn_imports_successful:
+    import uvicorn  # noqa: F401
+
+pytestmark = [
+    pytest.mark.skipif(not imports_successful(), reason='openai not installed'),
+    pytest.mark.anyio,
+]
+
+
+@pytest.fixture
+def mock_openai() -> MockOpenAI:
+    return MockOpenAI()
+
+
+def mock_agent(mock: MockOpenAI, **kwargs: Any) -> Agent[None, Any]:
+    return Agent(OpenAIModel('gpt-4o', provider=mock.provider(max_retries=1)), **kwargs)
+
+
+async def test_echo(allow_model_requests: None, mock_openai: MockOpenAI):
+    result = await mock_agent(mock_openai).run('Hello there')
+    assert result.data == 'echo: Hello there'
+    assert result.usage().request_tokens == 2
+    assert result.usage().response_tokens == 3
+    assert mock_openai.requests[0]['model'] == 'gpt-4o'
+    assert mock_openai.requests[0]['messages'] == [{'role': 'user', 'content': 'Hello there'}]
+
+
+async def test_stream_text(allow_model_requests: None):
+    mock = MockOpenAI([MockResponse('The quick brown fox jumps', chunk_size=4, prompt_tokens=7, completion_tokens=5)])
+    async with mock_agent(mock).run_stream('Hello') as result:
+        deltas = [delta async for delta in result.stream_text(delta=True, debounce_by=None)]
+    assert ''.join(deltas) == 'The quick brown fox jumps'
+    assert deltas[0] == 'The '
+    assert result.usage().request_tokens == 7
+    assert result.usage().response_tokens == 5
+    assert mock.requests[0]['stream'] is True
+
+
+async def test_stream_text_chunks(allow_model_requests: None):
+    mock = MockOpenAI([MockResponse(['Hello', ' world', '!'])])
+    async with mock_agent(mock).run_stream('Hello') as result:
+        deltas = [delta async for delta in result.stream_text(delta=True, debounce_by=None)]
+    assert deltas == ['Hello', ' world', '!']
+
+
+async def test_tool_calls(allow_model_requests: None):
+    mock = MockOpenAI(
+        [
+            MockResponse(tool_calls=[MockToolCall('get_weather', {'city': 'London'}), MockToolCall('get_time')]),
+            MockResponse('Sunny at noon'),
+        ]
+    )
+    agent = mock_agent(mock)
+
+    @agent.tool_plain
+    def get_weather(city: str) -> str:
+        return f'sunny in {city}'
+
+    @agent.tool_plain
+    def get_time() -> str:
+        return 'noon'
+
+    result = await agent.run('Weather?')
+    assert result.data == 'Sunny at noon'
+    assert result.all_messages()[1].parts == [
+        ToolCallPart('get_weather', '{"city": "London"}', 'call_0'),
+        ToolCallPart('get_time', '{}', 'call_1'),
+    ]
+    assert mock.requests[1]['messages'][-2:] == [
+        {'role': 'tool', 'tool_call_id': 'call_0', 'content': 'sunny in London'},
+        {'role': 'tool', 'tool_call_id': 'call_1', 'content': 'noon'},
+    ]
+
+
+async def test_stream_structured(allow_model_requests: None):
+    def respond(request: dict[str, Any]) -> MockResponse:
+        (tool,) = request['tools']
+        arguments = {'response': ['London', 'Paris', 'Tokyo']}
+        # the first chunk is `{"response": [`, partial results can't be validated without the key
+        return MockResponse(tool_calls=[MockToolCall(tool['function']['name'], arguments)], chunk_size=14)
+
+    agent = mock_agent(MockOpenAI(respond), result_type=list[str])
+    async with agent.run_stream('Which cities hosted the last Summer Olympics?') as result:
+        partials = [cities async for cities in result.stream(debounce_by=None)]
+    assert partials[0] == []
+    assert partials[-1] == ['London', 'Paris', 'Tokyo']
+    assert len(partials) == 4
+
+
+async def test_async_responder(allow_model_requests: None):
+    async def respond(request: dict[str, Any]) -> MockResponse:
+        return MockResponse(f'{len(request["messages"])} messages')
+
+    result = await mock_agent(MockOpenAI(respond), system_prompt='Be brief').run('Hello')
+    assert result.data == '2 messages'
+
+
+async def test_error(allow_model_requests: None):
+    mock = MockOpenAI([MockError(400, 'Bad request', 'invalid_request_error')])
+    with pytest.raises(ModelHTTPError) as exc_info:
+        await mock_agent(mock).run('Hello')
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.body == {
+        'message': 'Bad request',
+        'type': 'invalid_request_error',
+        'param': None,
+        'code': None,
+    }
+
+
+async def test_error_retried(allow_model_requests: None):
+    mock = MockOpenAI([MockError(429, 'Slow down', 'rate_limit_error', {'retry-after-ms': '1'}), MockResponse('ok')])
+    result = await mock_agent(mock).run('Hello')
+    assert result.data == 'ok'
+    assert len(mock.requests) == 2
+
+
+async def test_responses_used_up(allow_model_requests: None):
+    mock = MockOpenAI([MockResponse('one')])
+    agent = mock_agent(mock)
+    assert (await agent.run('Hello')).data == 'one'
+    with pytest.raises(ModelHTTPError, match='MockOpenAI has no more responses, it was given 1'):
+        await agent.run('Hello')
+
+
+async def test_fail_mid_stream(allow_model_requests: None):
+    mock = MockOpenAI([MockResponse('The quick brown fox jumps over the lazy dog', chunk_size=4, fail_after=3)])
+    deltas: list[str] = []
+    with pytest.raises(httpx.RemoteProtocolError):
+        async with mock_agent(mock).run_stream('Hello') as result:
+            async for delta in result.stream_text(delta=True, debounce_by=None):
+                deltas.append(delta)
+    assert deltas == ['The ', 'quic']
+
+
+async def test_delays(allow_model_requests: None):
+    mock = MockOpenAI([MockResponse(['a', 'b', 'c', 'd'], delay=0.1, chunk_delay=0.05)])
+    start = time.perf_counter()
+    async with mock_agent(mock).run_stream('Hello') as result:
+        arrivals: list[float] = []
+        async for _ in result.stream_text(delta=True, debounce_by=None):
+            arrivals.append(time.perf_counter() - start)
+    # the chunks are streamed as they're sent, not once the response is complete
+    assert arrivals[0] >= 0.1
+    assert arrivals[-1] - arrivals[0] >= 0.15
+
+
+async def test_unknown_path():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(MockOpenAI())) as client:
+        response = await client.get('http://mock-openai/v1/models')
+    assert response.status_code == 404
+    assert response.json()['error']['message'] == 'Unknown request: GET /v1/models'
+
+
+@pytest.mark.skipif(not uvicorn_imports_successful(), reason='uvicorn not installed')
+async def test_serve(allow_model_requests: None):
+    mock = MockOpenAI([MockResponse(['Hello', ' over', ' HTTP']), MockResponse('again')])
+    async with mock.serve() as base_url:
+        assert base_url.startswith('http://127.0.0.1:')
+        async with httpx.AsyncClient() as http_client:
+            provider = OpenAIProvider(base_url=base_url, api_key='mock', http_client=http_client)
+            agent = Agent(OpenAIModel('gpt-4o', provider=provider))
+            async with agent.run_stream('Hello') as result:
+                deltas = [delta async for delta in result.stream_text(delta=True, debounce_by=None)]
+            assert deltas == ['Hello', ' over', ' HTTP']
+            assert (await agent.run('Hello')).data == 'again'
@@ -684,3 +684,44 @@ def test_model_status_error(allow_model_requests: None) -> None:
     with pytest.raises(ModelHTTPError) as exc_info:
         agent.run_sync('hello')
     assert str(exc_info.value) == snapshot("status_code: 500, model_name: gpt-4o, body: {'error': 'test error'}")
+
+
+async def test_message_mapping_reused(allow_model_requests: None, monkeypatch: pytest.MonkeyPatch):
+    tool_call = completion_message(
+        ChatCompletionMessage(
+            content=None,
+            role='assistant',
+            tool_calls=[
+                chat.ChatCompletionMessageToolCall(
+                    id='1', function=Function(arguments='{}', name='get_location'), type='function'
+                )
+            ],
+        )
+    )
+    final = completion_message(ChatCompletionMessage(content='final response', role='assistant'))
+    mock_client = MockOpenAI.create_mock([tool_call, final, final])
+    m = OpenAIModel('gpt-4o', provider=OpenAIProvider(openai_client=mock_client))
+    agent = Agent(m)
+
+    @agent.tool_plain
+    async def get_location() -> str:
+        return 'London'
+
+    mapped: list[UserPromptPart] = []
+    map_user_prompt = OpenAIModel._map_user_prompt  # pyright: ignore[reportPrivateUsage]
+
+    async def counting_map_user_prompt(part: UserPromptPart) -> chat.ChatCompletionUserMessageParam:
+        mapped.append(part)
+        return await map_user_prompt(part)
+
+    monkeypatch.setattr(OpenAIModel, '_map_user_prompt', staticmethod(counting_map_user_prompt))
+
+    result = await agent.run('Hello')
+    assert result.data == 'final response'
+    result = await agent.run('Again', message_history=result.all_messages())
+    # each user prompt was only mapped once, even though every request sends the whole history
+    assert [part.content for part in mapped] == ['Hello', 'Again']
+
+    kwargs = get_mock_chat_completion_kwargs(mock_client)
+    assert [len(k['messages']) for k in kwargs] == [1, 3, 5]
+    assert kwargs[2]['messages'][0] == {'role': 'user', 'content': 'Hello'}
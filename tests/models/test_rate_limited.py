@@ -0,0 +1,189 @@
+from __future__ import annotations as _annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+from inline_snapshot import snapshot
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.models.rate_limited import (
+    RateLimitedModel,
+    RateLimitedModelSettings,
+    TokenBucket,
+    estimate_request_tokens,
+)
+from pydantic_ai.settings import ModelSettings
+
+pytestmark = pytest.mark.anyio
+
+
+def last_prompt(messages: list[ModelMessage]) -> str:
+    part = messages[-1].parts[-1]
+    assert isinstance(part, UserPromptPart)
+    assert isinstance(part.content, str)
+    return part.content
+
+
+class RecordingFunctions:
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+
+    def respond(self, messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        self.prompts.append(last_prompt(messages))
+        return ModelResponse(parts=[TextPart('ok')])
+
+    async def stream(self, messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        self.prompts.append(last_prompt(messages))
+        yield 'ok'
+
+
+def make_model(**kwargs: float) -> tuple[RateLimitedModel, RecordingFunctions]:
+    functions = RecordingFunctions()
+    model = RateLimitedModel(
+        FunctionModel(functions.respond, stream_function=functions.stream),
+        estimate_tokens=lambda messages, settings: 10,
+        **kwargs,
+    )
+    return model, functions
+
+
+def test_token_bucket(monkeypatch: pytest.MonkeyPatch):
+    now = 0.0
+    monkeypatch.setattr('pydantic_ai.models.rate_limited.time.monotonic', lambda: now)
+    bucket = TokenBucket.per_minute(60)
+    assert (bucket.capacity, bucket.refill_rate) == (60, 1.0)
+    assert bucket.level == 60
+
+    assert bucket.delay(60) == 0
+    bucket.take(60)
+    assert bucket.delay(1) == 1.0
+    assert bucket.delay(1_000) == 60.0
+
+    now = 0.5
+    assert bucket.delay(1) == 0.5
+    bucket.take(-10)
+    assert bucket.level == 10.5
+
+    bucket.take(20)
+    now = 10.0
+    assert bucket.level == -9.5
+    assert bucket.delay(1) == 1.0
+
+    now = 1_000.0
+    assert bucket.delay(1) == 0
+    assert bucket.level == 60
+
+
+def test_unlimited():
+    model, functions = make_model()
+    agent = Agent(model)
+    agent.run_sync('hello')
+    assert functions.prompts == ['hello']
+    assert model.stats.requests == 1
+    assert model.queue_depth == 0
+
+
+async def test_requests_per_minute_wait():
+    model, functions = make_model(requests_per_minute=600)
+    agent = Agent(model)
+    assert model._request_bucket is not None  # pyright: ignore[reportPrivateUsage]
+    model._request_bucket.level = 1  # pyright: ignore[reportPrivateUsage]
+
+    tasks = [asyncio.create_task(agent.run(f'hello {i}')) for i in range(3)]
+    await asyncio.sleep(0)
+    assert functions.prompts == ['hello 0']
+    assert model.queue_depth == 2
+
+    await asyncio.gather(*tasks)
+    assert functions.prompts == ['hello 0', 'hello 1', 'hello 2']
+    assert model.queue_depth == 0
+    assert model.stats.requests == 3
+    assert model.stats.delayed_requests == 2
+    assert 0.05 < model.stats.max_wait < 0.5
+    assert model.stats.mean_wait > 0
+
+
+async def test_priority_ordering():
+    model, functions = make_model(requests_per_minute=600)
+    agent = Agent(model)
+    assert model._request_bucket is not None  # pyright: ignore[reportPrivateUsage]
+    model._request_bucket.level = 0  # pyright: ignore[reportPrivateUsage]
+
+    batch: RateLimitedModelSettings = {'rate_limit_priority': 10}
+    interactive: RateLimitedModelSettings = {'rate_limit_priority': 0}
+    tasks = [
+        asyncio.create_task(agent.run('batch 1', model_settings=batch)),
+        asyncio.create_task(agent.run('batch 2', model_settings=batch)),
+        asyncio.create_task(agent.run('interactive', model_settings=interactive)),
+    ]
+    await asyncio.gather(*tasks)
+    assert functions.prompts == snapshot(['interactive', 'batch 1', 'batch 2'])
+
+
+async def test_tokens_per_minute_reconciled():
+    model, functions = make_model(tokens_per_minute=6000)
+    agent = Agent(model)
+    bucket = model._token_bucket  # pyright: ignore[reportPrivateUsage]
+    assert bucket is not None
+
+    result = await agent.run('hello')
+    # the estimate of 10 tokens is replaced by the actual usage reported by the model
+    assert bucket.level == pytest.approx(6000 - result.usage().total_tokens, abs=1)
+    assert model.stats.estimated_tokens == 10
+    assert model.stats.actual_tokens == result.usage().total_tokens
+
+    bucket.level = 0
+    task = asyncio.create_task(agent.run('again'))
+    await asyncio.sleep(0)
+    assert model.queue_depth == 1
+    await task
+    assert model.stats.delayed_requests == 1
+
+
+async def test_stream_rate_limited():
+    model, functions = make_model(requests_per_minute=600, tokens_per_minute=6000)
+    agent = Agent(model)
+    async with agent.run_stream('hello') as result:
+        assert await result.get_data() == 'ok'
+    assert functions.prompts == ['hello']
+    assert model.stats.actual_tokens == result.usage().total_tokens
+
+
+async def test_cancelled_waiter_removed():
+    model, functions = make_model(requests_per_minute=600)
+    agent = Agent(model)
+    assert model._request_bucket is not None  # pyright: ignore[reportPrivateUsage]
+    model._request_bucket.level = 0  # pyright: ignore[reportPrivateUsage]
+
+    cancelled = asyncio.create_task(agent.run('cancelled'))
+    kept = asyncio.create_task(agent.run('kept'))
+    await asyncio.sleep(0)
+    assert model.queue_depth == 2
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    assert model.queue_depth == 1
+
+    await kept
+    assert functions.prompts == ['kept']
+
+
+def test_estimate_request_tokens():
+    messages: list[ModelMessage] = [
+        ModelRequest(parts=[UserPromptPart('a' * 400)]),
+        ModelResponse(parts=[ToolCallPart('tool', {'x': 'b' * 100})]),
+        ModelRequest(parts=[ToolReturnPart('tool', 'c' * 200)]),
+    ]
+    settings: ModelSettings = {'max_tokens': 50}
+    assert estimate_request_tokens(messages, None) == snapshot(188)
+    assert estimate_request_tokens(messages, settings) == snapshot(238)
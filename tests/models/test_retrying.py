@@ -0,0 +1,249 @@
+from __future__ import annotations as _annotations
+
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+from inline_snapshot import snapshot
+
+from pydantic_ai import Agent, ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.models.retrying import RetryBudget, RetryingModel, default_retry_condition, parse_retry_after
+
+from ..conftest import try_import
+
+with try_import() as imports_successful:
+    from openai import AsyncOpenAI
+
+    from pydantic_ai.models.openai import OpenAIModel
+    from pydantic_ai.providers.openai import OpenAIProvider
+
+pytestmark = pytest.mark.anyio
+
+
+class FlakyFunctions:
+    def __init__(self, failures: int, status_code: int = 503) -> None:
+        self.failures = failures
+        self.status_code = status_code
+        self.calls = 0
+
+    def respond(self, messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ModelHTTPError(self.status_code, 'flaky', headers={'Retry-After': '0'})
+        return ModelResponse(parts=[TextPart('success')])
+
+    async def stream(self, messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ModelHTTPError(self.status_code, 'flaky', headers={'Retry-After': '0'})
+        yield 'success'
+
+
+def make_model(
+    failures: int, status_code: int = 503, **kwargs: int | RetryBudget
+) -> tuple[RetryingModel, FlakyFunctions]:
+    functions = FlakyFunctions(failures, status_code)
+    model = RetryingModel(FunctionModel(functions.respond, stream_function=functions.stream), **kwargs)  # type: ignore[arg-type]
+    return model, functions
+
+
+def test_retries_transient_errors():
+    model, functions = make_model(2)
+    agent = Agent(model)
+    assert agent.run_sync('hello').data == 'success'
+    assert functions.calls == 3
+    assert model.retries == 2
+
+
+def test_gives_up_after_max_retries():
+    model, functions = make_model(5, max_retries=2)
+    agent = Agent(model)
+    with pytest.raises(ModelHTTPError) as exc_info:
+        agent.run_sync('hello')
+    assert exc_info.value.status_code == 503
+    assert functions.calls == 3
+
+
+def test_non_retryable_status():
+    model, functions = make_model(1, status_code=400)
+    with pytest.raises(ModelHTTPError):
+        Agent(model).run_sync('hello')
+    assert functions.calls == 1
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, max_balance=1)
+    model, functions = make_model(10, budget=budget)
+    agent = Agent(model)
+    with pytest.raises(ModelHTTPError):
+        agent.run_sync('hello')
+    # the budget only had room for a single retry
+    assert functions.calls == 2
+    assert budget.balance == 0
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+
+def test_retry_on_tuple():
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError('try again')
+        return ModelResponse(parts=[TextPart('success')])
+
+    calls = 0
+    model = RetryingModel(FunctionModel(respond), retry_on=(RuntimeError,), initial_delay=0)
+    assert Agent(model).run_sync('hello').data == 'success'
+    assert calls == 2
+
+
+def test_retry_delay():
+    model = RetryingModel(
+        FunctionModel(lambda m, i: ModelResponse(parts=[])), initial_delay=1, max_delay=5, max_retry_after=30
+    )
+    error = ModelHTTPError(429, 'test')
+    for attempt, upper in [(0, 1), (1, 2), (2, 4)]:
+        delay = model.retry_delay(error, attempt)
+        assert delay is not None and 0 <= delay <= upper
+    assert model.retry_delay(error, 3) is None
+
+    model.max_retries = 10
+    delay = model.retry_delay(error, 8)
+    assert delay is not None and delay <= 5
+
+    assert model.retry_delay(ModelHTTPError(429, 'test', headers={'retry-after': '12'}), 0) == 12
+    assert model.retry_delay(ModelHTTPError(429, 'test', headers={'retry-after': '120'}), 0) is None
+    assert model.retry_delay(ModelHTTPError(404, 'test'), 0) is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({'Retry-After': '3'}) == 3
+    assert parse_retry_after({'retry-after-ms': '1500', 'retry-after': '3'}) == 1.5
+    assert parse_retry_after({'retry-after-ms': 'soon', 'retry-after': '3'}) == 3
+    assert parse_retry_after({'Retry-After': '-1'}) == 0
+    assert parse_retry_after({'Retry-After': 'not a date'}) is None
+    assert parse_retry_after({}) is None
+
+    retry_at = datetime.now(tz=timezone.utc) + timedelta(seconds=30)
+    delay = parse_retry_after({'Retry-After': format_datetime(retry_at, usegmt=True)})
+    assert delay is not None and 25 < delay <= 30
+
+
+def test_default_retry_condition():
+    assert default_retry_condition(ModelHTTPError(429, 'test'))
+    assert default_retry_condition(ModelHTTPError(529, 'test'))
+    assert not default_retry_condition(ModelHTTPError(401, 'test'))
+    assert default_retry_condition(httpx.ReadTimeout('timeout'))
+
+    try:
+        try:
+            raise httpx.ConnectError('refused')
+        except httpx.ConnectError as e:
+            raise RuntimeError('wrapped by an SDK') from e
+    except RuntimeError as e:
+        assert default_retry_condition(e)
+    assert not default_retry_condition(ValueError('nope'))
+
+
+async def test_stream_retried_before_first_token():
+    model, functions = make_model(2)
+    agent = Agent(model)
+    async with agent.run_stream('hello') as result:
+        assert await result.get_data() == 'success'
+    assert functions.calls == 3
+
+
+async def test_stream_error_after_first_token_not_retried():
+    calls = 0
+
+    async def stream(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        nonlocal calls
+        calls += 1
+        yield 'partial '
+        raise ModelHTTPError(503, 'flaky')
+
+    model = RetryingModel(FunctionModel(stream_function=stream), initial_delay=0)
+    with pytest.raises(ModelHTTPError):
+        async with Agent(model).run_stream('hello') as result:
+            await result.get_data()
+    assert calls == 1
+
+
+def completion_json(content: str) -> dict[str, object]:
+    return {
+        'id': 'chatcmpl-123',
+        'object': 'chat.completion',
+        'created': 1704067200,
+        'model': 'gpt-4o',
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': 5, 'completion_tokens': 1, 'total_tokens': 6},
+    }
+
+
+def chunk_sse(content: str) -> bytes:
+    chunk = {
+        'id': 'chatcmpl-123',
+        'object': 'chat.completion.chunk',
+        'created': 1704067200,
+        'model': 'gpt-4o',
+        'choices': [{'index': 0, 'delta': {'role': 'assistant', 'content': content}, 'finish_reason': None}],
+    }
+    return f'data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n'.encode()
+
+
+def openai_stub(failures: int) -> tuple[OpenAIModel, list[httpx.Request]]:
+    """An OpenAI model talking to an in-process stub which returns `429`s before succeeding."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) <= failures:
+            return httpx.Response(
+                429,
+                json={'error': {'message': 'Rate limit reached', 'type': 'requests'}},
+                headers={'retry-after-ms': '1'},
+            )
+        if json.loads(request.content).get('stream'):
+            return httpx.Response(200, content=chunk_sse('hello'), headers={'content-type': 'text/event-stream'})
+        return httpx.Response(200, json=completion_json('hello'))
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = AsyncOpenAI(api_key='test', base_url='http://stub/v1', http_client=http_client, max_retries=0)
+    return OpenAIModel('gpt-4o', provider=OpenAIProvider(openai_client=client)), requests
+
+
+@pytest.mark.skipif(not imports_successful(), reason='openai not installed')
+async def test_openai_429_retry_after(allow_model_requests: None):
+    openai_model, requests = openai_stub(failures=2)
+
+    with pytest.raises(ModelHTTPError) as exc_info:
+        await Agent(openai_model).run('hello')
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers is not None
+    assert parse_retry_after(exc_info.value.headers) == 0.001
+
+    requests.clear()
+    model = RetryingModel(openai_model, initial_delay=60)
+    result = await Agent(model).run('hello')
+    assert result.data == snapshot('hello')
+    # the stub's `retry-after-ms` was used instead of the long backoff
+    assert len(requests) == 3
+    assert model.retries == 2
+
+
+@pytest.mark.skipif(not imports_successful(), reason='openai not installed')
+async def test_openai_429_stream(allow_model_requests: None):
+    openai_model, requests = openai_stub(failures=1)
+    model = RetryingModel(openai_model, initial_delay=60)
+    async with Agent(model).run_stream('hello') as result:
+        assert await result.get_data() == snapshot('hello')
+    assert len(requests) == 2
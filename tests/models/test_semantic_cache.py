@@ -0,0 +1,269 @@
+from __future__ import annotations as _annotations
+
+from collections.abc import AsyncIterator
+
+import pytest
+from inline_snapshot import snapshot
+from pydantic import BaseModel
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from ..conftest import try_import
+
+with try_import() as imports_successful:
+    import numpy as np
+
+    from pydantic_ai.models.semantic_cache import BruteForceIndex, HashingEmbedder, IVFIndex, SemanticCachedModel
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(not imports_successful(), reason='numpy not installed'),
+]
+
+
+class CountingFunctions:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def respond(self, messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        self.calls += 1
+        return ModelResponse(parts=[TextPart(f'answer {self.calls}')])
+
+    async def stream(self, messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        self.calls += 1
+        yield f'streamed answer {self.calls}'
+
+
+def make_model(**kwargs: float | bool | None) -> tuple[SemanticCachedModel, CountingFunctions]:
+    functions = CountingFunctions()
+    model = SemanticCachedModel(
+        FunctionModel(functions.respond, stream_function=functions.stream), HashingEmbedder(), **kwargs
+    )  # type: ignore[arg-type]
+    return model, functions
+
+
+def test_hashing_embedder_similarity():
+    embed = HashingEmbedder()
+
+    def similarity(a: str, b: str) -> float:
+        va, vb = embed(a), embed(b)
+        return float(va @ vb / (np.linalg.norm(va) * np.linalg.norm(vb)))
+
+    assert similarity('How do I reset my password?', 'how do i reset my password') == pytest.approx(1)
+    assert similarity('How do I reset my password?', 'How can I reset my pasword?') > 0.7
+    assert similarity('How do I reset my password?', 'What are your opening hours?') < 0.3
+
+
+def test_near_duplicate_prompt_is_cached():
+    model, functions = make_model(threshold=0.8)
+    agent = Agent(model, system_prompt='You are a customer service agent.')
+
+    assert agent.run_sync('How do I reset my password?').data == snapshot('answer 1')
+    assert agent.run_sync('how do I reset my password').data == snapshot('answer 1')
+    assert agent.run_sync('What are your opening hours?').data == snapshot('answer 2')
+    assert functions.calls == 2
+    assert (model.hits, model.misses) == (1, 2)
+    assert len(model) == 2
+
+
+def test_system_prompt_fingerprint():
+    model, functions = make_model()
+    Agent(model, system_prompt='You are a customer service agent.').run_sync('How do I reset my password?')
+    Agent(model, system_prompt='You are a technical support agent.').run_sync('How do I reset my password?')
+    assert functions.calls == 2
+
+
+def test_history_ignored_by_default():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    result = agent.run_sync('hello')
+    agent.run_sync('How do I reset my password?', message_history=result.all_messages())
+    agent.run_sync('How do I reset my password?')
+    assert functions.calls == 2
+
+    model, functions = make_model(match_history=True)
+    agent = Agent(model)
+    result = agent.run_sync('hello')
+    agent.run_sync('How do I reset my password?', message_history=result.all_messages())
+    agent.run_sync('How do I reset my password?')
+    assert functions.calls == 3
+
+
+def test_function_tool_calls_not_cached():
+    calls = 0
+
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        nonlocal calls
+        calls += 1
+        if len(messages) == 1:
+            return ModelResponse(parts=[ToolCallPart('get_order', {'order_id': 1})])
+        return ModelResponse(parts=[TextPart('shipped')])
+
+    model = SemanticCachedModel(FunctionModel(respond), HashingEmbedder())
+    agent = Agent(model)
+
+    @agent.tool_plain
+    def get_order(order_id: int) -> str:
+        return 'shipped'
+
+    assert agent.run_sync('Where is my order?').data == 'shipped'
+    assert agent.run_sync('Where is my order?').data == 'shipped'
+    assert calls == 4
+    assert len(model) == 0
+
+
+def test_result_tool_cached():
+    class Answer(BaseModel):
+        text: str
+
+    calls = 0
+
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        nonlocal calls
+        calls += 1
+        return ModelResponse(parts=[ToolCallPart(info.result_tools[0].name, {'text': 'yes'})])
+
+    agent = Agent(SemanticCachedModel(FunctionModel(respond), HashingEmbedder()), result_type=Answer)
+    assert agent.run_sync('Are you open on Sundays?').data == Answer(text='yes')
+    assert agent.run_sync('Are you open on sundays').data == Answer(text='yes')
+    assert calls == 1
+
+
+def test_max_entries_and_ttl(monkeypatch: pytest.MonkeyPatch):
+    now = 100.0
+    monkeypatch.setattr('pydantic_ai.models.semantic_cache.time.monotonic', lambda: now)
+    model, functions = make_model(max_entries=2, ttl=60)
+    agent = Agent(model)
+
+    for prompt in ['apples and pears', 'dogs and cats', 'trains and planes']:
+        agent.run_sync(prompt)
+    assert len(model) == 2
+    agent.run_sync('apples and pears')
+    assert functions.calls == 4
+
+    agent.run_sync('trains and planes')
+    assert functions.calls == 4
+    now = 200.0
+    agent.run_sync('trains and planes')
+    assert functions.calls == 5
+
+    model.clear()
+    assert len(model) == 0
+
+
+def test_expired_best_match_skipped(monkeypatch: pytest.MonkeyPatch):
+    now = 100.0
+    monkeypatch.setattr('pydantic_ai.models.semantic_cache.time.monotonic', lambda: now)
+    vectors = {'first': [1.0, 0.0], 'second': [0.8, 0.6], 'query': [0.966, 0.259]}
+    functions = CountingFunctions()
+    model = SemanticCachedModel(FunctionModel(functions.respond), vectors.__getitem__, threshold=0.9, ttl=60)
+    agent = Agent(model)
+
+    assert agent.run_sync('first').data == snapshot('answer 1')
+    now = 130.0
+    assert agent.run_sync('second').data == snapshot('answer 2')
+
+    # the closest response has expired, the next one above the threshold is still used
+    now = 170.0
+    assert agent.run_sync('query').data == snapshot('answer 2')
+    assert (model.hits, model.misses) == (1, 2)
+    assert len(model) == 1
+
+
+async def test_async_embedder():
+    embed = HashingEmbedder(64)
+
+    async def async_embed(text: str) -> list[float]:
+        return embed(text).tolist()
+
+    model = SemanticCachedModel(FunctionModel(lambda m, i: ModelResponse(parts=[TextPart('hi')])), async_embed)
+    agent = Agent(model)
+    await agent.run('hello there')
+    await agent.run('Hello there!')
+    assert model.hits == 1
+
+
+async def test_stream_cached():
+    model, functions = make_model()
+    agent = Agent(model)
+
+    async with agent.run_stream('How do I reset my password?') as result:
+        assert await result.get_data() == snapshot('streamed answer 1')
+    async with agent.run_stream('how do I reset my password') as result:
+        assert [c async for c in result.stream_text(debounce_by=None)] == snapshot(
+            ['streamed ', 'streamed answer ', 'streamed answer 1']
+        )
+    assert functions.calls == 1
+    assert (await agent.run('How do I reset my password?')).data == snapshot('streamed answer 1')
+
+
+def test_brute_force_index():
+    index = BruteForceIndex()
+    vectors = np.eye(20, dtype=np.float32)
+    for key in range(20):
+        index.add(key, vectors[key])
+    assert len(index) == 20
+    assert index.search(vectors[3], k=2)[0] == (3, 1.0)
+
+    index.remove(3)
+    index.remove(3)
+    assert len(index) == 19
+    assert index.search(vectors[3], k=1)[0][1] == 0.0
+    assert index.search(vectors[19], k=1) == [(19, 1.0)]
+
+    index.add(19, vectors[0])
+    assert len(index) == 19
+    assert [key for key, _ in index.search(vectors[0], k=2)] == snapshot([0, 19])
+    assert BruteForceIndex().search(vectors[0]) == []
+
+
+def test_ivf_index():
+    rng = np.random.default_rng(1)
+    data = rng.normal(size=(200, 32)).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+
+    index = IVFIndex(n_lists=8, n_probe=8, train_size=100)
+    for key in range(100):
+        index.add(key, data[key])
+    assert index.trained
+    for key in range(100, 200):
+        index.add(key, data[key])
+    assert len(index) == 200
+
+    # probing every list makes the search exact
+    exact = BruteForceIndex()
+    for key in range(200):
+        exact.add(key, data[key])
+    for key in range(0, 200, 17):
+        assert index.search(data[key], k=3) == pytest.approx(exact.search(data[key], k=3))
+
+    index.remove(0)
+    assert len(index) == 199
+    assert index.search(data[0], k=1)[0][0] != 0
+
+
+def test_ivf_index_untrained():
+    index = IVFIndex(n_lists=4)
+    index.add(1, np.array([1.0, 0.0], dtype=np.float32))
+    index.add(2, np.array([0.0, 1.0], dtype=np.float32))
+    assert not index.trained
+    assert index.search(np.array([0.0, 1.0], dtype=np.float32)) == [(2, 1.0)]
+    index.remove(2)
+    assert len(index) == 1
+
+
+def test_ivf_backed_model():
+    model = SemanticCachedModel(
+        FunctionModel(lambda m, i: ModelResponse(parts=[TextPart(m[-1].parts[-1].content)])),  # type: ignore
+        HashingEmbedder(),
+        index_factory=lambda: IVFIndex(n_lists=2, n_probe=2, train_size=4),
+    )
+    agent = Agent(model)
+    prompts = [f'question number {word}' for word in ['one', 'two', 'three', 'four', 'five', 'six']]
+    for prompt in prompts:
+        assert agent.run_sync(prompt).data == prompt
+    assert agent.run_sync('question number five').data == 'question number five'
+    assert model.hits == 1
@@ -1,7 +1,11 @@
+# pyright: reportPrivateUsage=false, reportUnknownMemberType=false
 from __future__ import annotations as _annotations
 
+import asyncio
+import datetime
 import json
 from dataclasses import dataclass
+from datetime import timedelta
 from pathlib import Path
 from unittest.mock import patch
 
@@ -44,6 +48,11 @@ def test_google_vertex_provider(allow_model_requests: None) -> None:
     assert isinstance(provider.client, httpx.AsyncClient)
 
 
+@pytest.fixture
+def reset_default_credentials(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr('pydantic_ai.providers.google_vertex._default_credentials', None)
+
+
 @dataclass
 class NoOpCredentials:
     token = 'my-token'
@@ -52,7 +61,9 @@ class NoOpCredentials:
 
 
 @patch('pydantic_ai.providers.google_vertex.google.auth.default', return_value=(NoOpCredentials(), 'my-project-id'))
-async def test_google_vertex_provider_auth(allow_model_requests: None, http_client: httpx.AsyncClient):
+async def test_google_vertex_provider_auth(
+    allow_model_requests: None, http_client: httpx.AsyncClient, reset_default_credentials: None
+):
     provider = GoogleVertexProvider(http_client=http_client)
     await provider.client.post('/gemini-1.0-pro:generateContent')
     assert provider.region == 'us-central1'
@@ -67,7 +78,7 @@ async def test_google_vertex_provider_service_account_file(
     save_service_account(service_account_path, 'my-project-id')
 
     provider = GoogleVertexProvider(service_account_file=service_account_path)
-    monkeypatch.setattr(provider.client.auth, '_refresh_token', lambda: 'my-token')
+    monkeypatch.setattr('pydantic_ai.providers.google_vertex._CredentialsToken._refresh_token', lambda self: 'my-token')
     await provider.client.post('/gemini-1.0-pro:generateContent')
     assert provider.region == 'us-central1'
     assert getattr(provider.client.auth, 'project_id') == 'my-project-id'
@@ -80,7 +91,7 @@ async def test_google_vertex_provider_service_account_file_info(
     account_info = prepare_service_account_contents('my-project-id')
 
     provider = GoogleVertexProvider(service_account_info=account_info)
-    monkeypatch.setattr(provider.client.auth, '_refresh_token', lambda: 'my-token')
+    monkeypatch.setattr('pydantic_ai.providers.google_vertex._CredentialsToken._refresh_token', lambda self: 'my-token')
     await provider.client.post('/gemini-1.0-pro:generateContent')
     assert provider.region == 'us-central1'
     assert getattr(provider.client.auth, 'project_id') == 'my-project-id'
@@ -135,3 +146,98 @@ def save_service_account(service_account_path: Path, project_id: str) -> None:
     service_account = prepare_service_account_contents(project_id)
 
     service_account_path.write_text(json.dumps(service_account, indent=2))
+
+
+class ExpiringCredentials:
+    """Credentials whose token is valid for `lifetime`, counting refreshes."""
+
+    def __init__(self, lifetime: timedelta):
+        self.lifetime = lifetime
+        self.token: str | None = None
+        self.expiry: datetime.datetime | None = None
+        self.refreshes = 0
+
+    def refresh(self, request: Request):
+        self.refreshes += 1
+        self.token = f'token-{self.refreshes}'
+        # google-auth uses naive datetimes in UTC
+        self.expiry = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) + self.lifetime
+
+
+async def test_google_vertex_provider_single_refresh(
+    allow_model_requests: None, http_client: httpx.AsyncClient, reset_default_credentials: None
+):
+    credentials = ExpiringCredentials(timedelta(hours=1))
+    with patch('pydantic_ai.providers.google_vertex.google.auth.default', return_value=(credentials, 'my-project-id')):
+        provider = GoogleVertexProvider(http_client=http_client)
+        responses = await asyncio.gather(*(provider.client.post('/gemini-1.0-pro:generateContent') for _ in range(5)))
+    assert credentials.refreshes == 1
+    assert {r.request.headers['Authorization'] for r in responses} == {'Bearer token-1'}
+
+    auth = getattr(provider.client, 'auth')
+    expiry = auth.token_expiry
+    assert expiry is not None and expiry.tzinfo is not None
+    refresher = auth._token._refresher
+    assert refresher is not None and not refresher.done()
+    await provider.aclose()
+    assert refresher.cancelled()
+
+
+async def test_google_vertex_provider_refresh_ahead(
+    allow_model_requests: None,
+    http_client: httpx.AsyncClient,
+    reset_default_credentials: None,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr('pydantic_ai.providers.google_vertex._MIN_REFRESH_INTERVAL', 0.01)
+    # the token is always due for a background refresh, but still valid for requests
+    credentials = ExpiringCredentials(timedelta(minutes=5))
+    with patch('pydantic_ai.providers.google_vertex.google.auth.default', return_value=(credentials, 'my-project-id')):
+        provider = GoogleVertexProvider(http_client=http_client)
+        await provider.ainit()
+        assert provider.project_id == 'my-project-id'
+        assert provider.base_url.startswith('https://us-central1-aiplatform.googleapis.com/v1/projects/my-project-id/')
+        assert credentials.refreshes == 1
+
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if credentials.refreshes >= 2:
+                break
+        assert credentials.refreshes >= 2
+
+        refreshes = credentials.refreshes
+        response = await provider.client.post('/gemini-1.0-pro:generateContent')
+        # the request used the token refreshed in the background
+        assert response.request.headers['Authorization'].startswith('Bearer token-')
+        assert credentials.refreshes - refreshes <= 1
+    await provider.aclose()
+
+
+async def test_google_vertex_default_credentials_cached(allow_model_requests: None, reset_default_credentials: None):
+    with patch(
+        'pydantic_ai.providers.google_vertex.google.auth.default', return_value=(NoOpCredentials(), 'my-project-id')
+    ) as default:
+        await GoogleVertexProvider().ainit()
+        await GoogleVertexProvider().ainit()
+    assert default.call_count == 1
+
+
+async def test_google_vertex_providers_share_default_credentials(
+    allow_model_requests: None, http_client: httpx.AsyncClient, reset_default_credentials: None
+):
+    credentials = ExpiringCredentials(timedelta(hours=1))
+    with patch('pydantic_ai.providers.google_vertex.google.auth.default', return_value=(credentials, 'my-project-id')):
+        providers = [GoogleVertexProvider(http_client=http_client) for _ in range(3)]
+        await asyncio.gather(*(p.client.post('/gemini-1.0-pro:generateContent') for p in providers for _ in range(3)))
+    # the credentials are shared, so are the lock and the background refresh
+    assert credentials.refreshes == 1
+    tokens = {id(getattr(p.client, 'auth')._token) for p in providers}
+    assert len(tokens) == 1
+    refresher = getattr(providers[0].client, 'auth')._token._refresher
+    assert refresher is not None
+
+    await providers[0].aclose()
+    await providers[1].aclose()
+    assert not refresher.done()
+    await providers[2].aclose()
+    assert refresher.cancelled()
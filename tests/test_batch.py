@@ -0,0 +1,201 @@
+from __future__ import annotations as _annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+import pytest
+from inline_snapshot import snapshot
+
+from pydantic_ai import Agent, ModelHTTPError, RunContext, UserError
+from pydantic_ai.batch import BatchItem
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, SystemPromptPart, TextPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from pydantic_ai.usage import Usage
+
+pytestmark = pytest.mark.anyio
+
+
+@dataclass
+class EchoModel:
+    """Echoes the prompt after a delay given by its number, failing for prompts in `fail`."""
+
+    fail: dict[str, int]
+    in_flight: int = 0
+    peak_in_flight: int = 0
+
+    async def respond(self, messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        request = messages[-1]
+        assert isinstance(request, ModelRequest)
+        part = request.parts[-1]
+        assert isinstance(part, UserPromptPart) and isinstance(part.content, str)
+        prompt = part.content
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(int(prompt) / 1000)
+            if self.fail.get(prompt, 0) > 0:
+                self.fail[prompt] -= 1
+                raise ModelHTTPError(503, 'test', body='overloaded')
+            return ModelResponse(parts=[TextPart(f'echo {prompt}')])
+        finally:
+            self.in_flight -= 1
+
+
+def indices(items: list[BatchItem[str]]) -> list[int]:
+    return [item.index for item in items]
+
+
+async def test_run_many():
+    echo = EchoModel(fail={})
+    agent = Agent(FunctionModel(echo.respond))
+    prompts = ['100', '10', '0', '20']
+    async with agent.run_many(prompts, concurrency=2) as batch:
+        items = [item async for item in batch]
+
+    # the later prompts run one after the other alongside the first, and finish before it
+    assert indices(items) == [1, 2, 3, 0]
+    assert [item.data for item in items] == ['echo 10', 'echo 0', 'echo 20', 'echo 100']
+    assert echo.peak_in_flight == 2
+    assert batch.completed == 4
+    assert batch.failed == 0
+    assert batch.usage == snapshot(Usage(requests=4, request_tokens=204, response_tokens=8, total_tokens=212))
+
+
+async def test_run_many_ordered():
+    agent = Agent(FunctionModel(EchoModel(fail={}).respond))
+
+    async def prompts() -> AsyncIterator[str]:
+        for prompt in ['30', '10', '20', '0']:
+            yield prompt
+
+    items = [item async for item in agent.run_many(prompts(), concurrency=3, ordered=True)]
+    assert indices(items) == [0, 1, 2, 3]
+    assert [item.data for item in items] == ['echo 30', 'echo 10', 'echo 20', 'echo 0']
+
+
+async def test_run_many_ordered_window():
+    started: list[int] = []
+    first_done = asyncio.Event()
+
+    async def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        request = messages[-1]
+        assert isinstance(request, ModelRequest)
+        part = request.parts[-1]
+        assert isinstance(part, UserPromptPart) and isinstance(part.content, str)
+        started.append(int(part.content))
+        if part.content == '0':
+            await first_done.wait()
+        return ModelResponse(parts=[TextPart('ok')])
+
+    agent = Agent(FunctionModel(respond))
+    yielded: list[int] = []
+
+    async def consume() -> None:
+        async for item in agent.run_many([str(i) for i in range(20)], concurrency=2, ordered=True):
+            yielded.append(item.index)
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.01)
+    # while the first run is stuck, only the inputs within the window after it are started
+    assert sorted(started) == [0, 1, 2, 3]
+    assert yielded == []
+    first_done.set()
+    await task
+    assert yielded == list(range(20))
+
+
+async def test_per_item_deps():
+    agent = Agent(FunctionModel(EchoModel(fail={}).respond), deps_type=str)
+
+    @agent.system_prompt
+    def system_prompt(ctx: RunContext[str]) -> str:
+        return ctx.deps
+
+    # the per item dependencies take the place of the shared ones
+    batch = agent.run_many(
+        ['1', '2'], deps='shared', per_item_deps=lambda index, prompt: f'item {index}: {prompt}', ordered=True
+    )
+    system_prompts: list[str] = []
+    async for item in batch:
+        assert item.result is not None
+        part = item.result.all_messages()[0].parts[0]
+        assert isinstance(part, SystemPromptPart)
+        system_prompts.append(part.content)
+    assert system_prompts == ['item 0: 1', 'item 1: 2']
+
+
+async def test_retries():
+    echo = EchoModel(fail={'1': 1, '2': 5})
+    agent = Agent(FunctionModel(echo.respond))
+    batch = agent.run_many(['1', '2', '3'], retries=2, retry_delay=0, on_error='collect', ordered=True)
+    items = [item async for item in batch]
+
+    assert [(item.index, item.attempts, item.error is None) for item in items] == [
+        (0, 2, True),
+        (1, 3, False),
+        (2, 1, True),
+    ]
+    assert isinstance(items[1].error, ModelHTTPError)
+    with pytest.raises(ModelHTTPError):
+        items[1].data
+    assert (batch.completed, batch.failed, batch.retried) == (2, 1, 3)
+    assert batch.usage.requests == 2
+
+
+async def test_retry_on():
+    echo = EchoModel(fail={'1': 1})
+    agent = Agent(FunctionModel(echo.respond))
+    batch = agent.run_many(['1'], retries=2, retry_on=(ValueError,), on_error='collect')
+    items = [item async for item in batch]
+    assert items[0].attempts == 1
+    assert isinstance(items[0].error, ModelHTTPError)
+
+
+async def test_fail_fast():
+    echo = EchoModel(fail={'1': 1})
+    agent = Agent(FunctionModel(echo.respond))
+    seen: list[int] = []
+    with pytest.raises(ModelHTTPError):
+        async with agent.run_many(['0', '1', '500', '500'], concurrency=4) as batch:
+            async for item in batch:
+                seen.append(item.index)
+
+    assert seen == [0]
+    # the runs in flight were cancelled
+    await asyncio.sleep(0)
+    assert echo.in_flight == 0
+
+
+async def test_stop_early():
+    echo = EchoModel(fail={})
+    agent = Agent(FunctionModel(echo.respond))
+    async with agent.run_many(['0', '500', '500'], concurrency=3) as batch:
+        async for item in batch:
+            assert item.index == 0
+            break
+    assert echo.in_flight == 0
+    assert batch.completed == 1
+
+    with pytest.raises(UserError, match='A batch run can only be iterated once'):
+        batch.__aiter__()
+
+
+async def test_inputs_error():
+    agent = Agent(FunctionModel(EchoModel(fail={}).respond))
+
+    def prompts():
+        yield '0'
+        raise RuntimeError('no more prompts')
+
+    with pytest.raises(RuntimeError, match='no more prompts'):
+        async for _ in agent.run_many(prompts(), concurrency=1):
+            pass
+
+
+def test_invalid_arguments():
+    agent = Agent('test')
+    with pytest.raises(UserError, match='`inputs` must be an iterable of prompts, not a single prompt'):
+        agent.run_many('hello')
+    with pytest.raises(UserError, match='`concurrency` must be at least 1'):
+        agent.run_many(['hello'], concurrency=0)
@@ -0,0 +1,139 @@
+from __future__ import annotations as _annotations
+
+import importlib
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from benchmarks import MODULES, _runner
+from benchmarks.__main__ import main
+
+pytestmark = pytest.mark.anyio
+
+
+def result(time_per_op_us: float, stdev_pct: float = 1.0) -> dict[str, Any]:
+    return {
+        'time_per_op_us': time_per_op_us,
+        'units_per_second': 1e6 / time_per_op_us,
+        'unit': 'op',
+        'stdev_pct': stdev_pct,
+        'rounds': 15,
+    }
+
+
+@pytest.fixture(scope='module', autouse=True)
+def register_benchmarks():
+    for module in MODULES:
+        importlib.import_module(f'benchmarks.{module}')
+
+
+@pytest.mark.parametrize(
+    'name',
+    ['agent.run', 'agent.iter', 'streaming.text_deltas[1000]', 'tools.fan_out[10]', 'history.run[100]'],
+)
+async def test_benchmark_runs(name: str):
+    (bench,) = [b for b in _runner.registered(name) if b.name == name]
+    result = await _runner.measure(bench, _runner.Timing.quick())
+    assert result.time_per_op > 0
+    assert result.unit == bench.unit
+    assert result.units_per_second == pytest.approx(result.units_per_op / result.time_per_op)
+
+
+async def test_units():
+    (bench,) = _runner.registered('tools.fan_out[100]')
+    result = await _runner.measure(bench, _runner.Timing.quick())
+    assert result.units_per_op == 100
+    assert result.unit == 'call'
+
+
+async def test_graph_steps():
+    (bench,) = _runner.registered('graph.run')
+    result = await _runner.measure(bench, _runner.Timing.quick())
+    # every step of the graph is in its history, plus the end
+    assert result.units_per_op == 1001
+
+
+def test_duplicate_name():
+    with pytest.raises(ValueError, match="Benchmark 'agent.run' is already registered"):
+        _runner.benchmark('agent.run')(lambda: None)  # type: ignore
+
+
+async def test_run_results():
+    results = await _runner.run(_runner.registered('agent.run'), _runner.Timing.quick())
+    assert set(results['benchmarks']) == {'agent.run', 'agent.run[structured]'}
+    assert set(results['benchmarks']['agent.run']) == {
+        'time_per_op_us',
+        'units_per_second',
+        'unit',
+        'stdev_pct',
+        'rounds',
+    }
+    assert results['benchmarks']['agent.run']['rounds'] == 2
+    assert results['meta'] == _runner.environment()
+
+
+def test_compare():
+    baseline = {'meta': {}, 'benchmarks': {'a': result(100), 'b': result(100), 'c': result(100), 'gone': result(1)}}
+    results = {'meta': {}, 'benchmarks': {'a': result(110), 'b': result(150), 'c': result(70), 'added': result(1)}}
+    comparisons = _runner.compare(results, baseline, threshold=0.25)
+    assert [(c.name, c.status, c.ratio) for c in comparisons] == [
+        ('a', 'ok', 1.1),
+        ('added', 'new', None),
+        ('b', 'regression', 1.5),
+        ('c', 'improvement', 0.7),
+        ('gone', 'missing', None),
+    ]
+    assert comparisons[0].threshold == 0.25
+    table = _runner.format_comparisons(comparisons)
+    assert 'regression' in table.splitlines()[3]
+
+
+def test_compare_noisy():
+    baseline = {'meta': {}, 'benchmarks': {'noisy': result(100, 40), 'old': result(100, 40)}}
+    del baseline['benchmarks']['old']['rounds']
+    results = {'meta': {}, 'benchmarks': {'noisy': result(130, 40), 'old': result(130, 40)}}
+    comparisons = _runner.compare(results, baseline, threshold=0.25)
+    # the threshold is widened to twice the standard error of the difference of the medians
+    assert [(c.name, c.status, c.threshold) for c in comparisons] == [('noisy', 'ok', 0.365), ('old', 'ok', 0.458)]
+    assert (
+        _runner.compare(
+            {'meta': {}, 'benchmarks': {'noisy': result(140, 10)}},
+            {'meta': {}, 'benchmarks': {'noisy': result(100, 10)}},
+            threshold=0.25,
+        )[0].status
+        == 'regression'
+    )
+
+
+def test_dump_is_stable(tmp_path: Path):
+    results = {'meta': {'python': '3.12'}, 'benchmarks': {'b': result(2), 'a': result(1)}}
+    _runner.dump(results, tmp_path / 'first.json')
+    _runner.dump(json.loads(json.dumps(results)), tmp_path / 'second.json')
+    assert (tmp_path / 'first.json').read_text() == (tmp_path / 'second.json').read_text()
+    assert _runner.load(tmp_path / 'first.json') == results
+
+
+def test_main_baseline(tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+    baseline = tmp_path / 'baseline.json'
+    assert main(['-k', 'agent.iter', '--quick', '--baseline', str(baseline), '--save-baseline']) == 0
+    assert set(_runner.load(baseline)['benchmarks']) == {'agent.iter'}
+
+    # make the baseline impossibly fast, so the next run is a regression
+    stored = _runner.load(baseline)
+    stored['benchmarks']['agent.iter']['time_per_op_us'] = 0.001
+    stored['benchmarks']['agent.run'] = result(1)
+    _runner.dump(stored, baseline)
+    capsys.readouterr()
+    assert main(['-k', 'agent.iter', '--quick', '--baseline', str(baseline)]) == 1
+    output = capsys.readouterr().out
+    assert '1 regression(s): agent.iter' in output
+    # benchmarks filtered out aren't reported as missing
+    assert 'missing' not in output
+
+
+def test_main_output(tmp_path: Path):
+    output = tmp_path / 'results.json'
+    assert main(['-k', 'graph', '--quick', '--baseline', str(tmp_path / 'none.json'), '--output', str(output)]) == 0
+    assert set(_runner.load(output)['benchmarks']) == {'graph.run[1000]'}
@@ -32,6 +32,7 @@ from pydantic_ai.models import KnownModelName, Model, infer_model
 from pydantic_ai.models.fallback import FallbackModel
 from pydantic_ai.models.function import AgentInfo, DeltaToolCall, DeltaToolCalls, FunctionModel
 from pydantic_ai.models.test import TestModel
+from pydantic_ai.models.wrapper import WrapperModel
 
 from .conftest import ClientWithHandler, TestEnv
 
@@ -437,6 +438,9 @@ def mock_infer_model(model: Model | KnownModelName) -> Model:
             else:
                 mock_fallback_models.append(mock_infer_model(m))
         return FallbackModel(*mock_fallback_models)
+    if isinstance(model, WrapperModel):
+        model.wrapped = mock_infer_model(model.wrapped)
+        return model
     if isinstance(model, (FunctionModel, TestModel)):
         return model
     else:
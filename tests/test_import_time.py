@@ -0,0 +1,68 @@
+"""Guard against regressions in how long `import pydantic_ai` takes, which every serverless cold start and CLI call pays."""
+
+from __future__ import annotations as _annotations
+
+import subprocess
+import sys
+
+import pytest
+
+# budgets for the cumulative import time in microseconds, generous enough for slow CI machines while still catching
+# an eager import of e.g. logfire, which alone takes over a second
+PACKAGE_IMPORT_BUDGET = 100_000
+AGENT_IMPORT_BUDGET = 1_000_000
+
+# modules which are only needed once a model is used, or when instrumenting
+DEFERRED_MODULES = 'logfire', 'opentelemetry.trace', 'opentelemetry._events', 'griffe', 'httpx', 'openai', 'anthropic'
+
+
+def import_times(statement: str) -> dict[str, int]:
+    """Run `statement` in a fresh interpreter, returning the cumulative import time of each module imported."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True, check=True
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        _, cumulative, module = line.split('|')
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_import_package():
+    times = import_times('import pydantic_ai')
+    assert 'pydantic_ai.agent' not in times
+    assert [m for m in DEFERRED_MODULES if m in times] == []
+    assert times['pydantic_ai'] < PACKAGE_IMPORT_BUDGET
+
+
+@pytest.mark.parametrize('statement', ['from pydantic_ai import Agent', 'import pydantic_ai.models'])
+def test_import_agent(statement: str):
+    times = import_times(statement)
+    assert [m for m in DEFERRED_MODULES if m in times] == []
+    assert times['pydantic_ai'] < AGENT_IMPORT_BUDGET
+
+
+def test_http_client_without_opentelemetry():
+    """Getting the shared HTTP client, as every model does, doesn't load OpenTelemetry metrics for the pool."""
+    times = import_times('from pydantic_ai.models import cached_async_http_client; cached_async_http_client()')
+    assert 'opentelemetry.metrics' not in times
+
+
+def test_lazy_attributes():
+    import pydantic_ai
+    from pydantic_ai.agent import Agent, InstrumentationSettings
+    from pydantic_ai.models.instrumented import InstrumentationSettings as InstrumentationSettings_
+
+    assert pydantic_ai.Agent is Agent
+    assert InstrumentationSettings is InstrumentationSettings_
+    assert isinstance(pydantic_ai.__version__, str)
+    assert 'Agent' in dir(pydantic_ai)
+    with pytest.raises(AttributeError, match="module 'pydantic_ai' has no attribute 'Missing'"):
+        pydantic_ai.Missing  # type: ignore[reportAttributeAccessIssue]
+
+
+@pytest.mark.parametrize('module', ['pydantic_ai.result', 'pydantic_ai.models.test', 'pydantic_ai.tools'])
+def test_import_submodule_first(module: str):
+    """Submodules can be imported before anything else, now that the package no longer imports the agent first."""
+    subprocess.run([sys.executable, '-c', f'import {module}'], check=True)
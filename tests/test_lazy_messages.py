@@ -0,0 +1,154 @@
+from __future__ import annotations as _annotations
+
+import json
+
+import pytest
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    LazyModelMessages,
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+TRICKY_STRINGS = [
+    'plain',
+    'brackets ] } [ { inside',
+    'an "escaped" quote',
+    'ends with a backslash \\',
+    'backslash before a quote \\"',
+    '\\\\"{"',
+    'unicode ✓ and   and \x00',
+    '',
+]
+
+
+def conversation(turns: int = 5) -> list[ModelMessage]:
+    messages: list[ModelMessage] = []
+    for turn in range(turns):
+        text = TRICKY_STRINGS[turn % len(TRICKY_STRINGS)]
+        messages.append(ModelRequest(parts=[UserPromptPart(f'{turn}: {text}')]))
+        messages.append(ModelResponse(parts=[ToolCallPart('lookup', {'query': text, 'nested': [[{'a': [text]}]]})]))
+        messages.append(ModelRequest(parts=[ToolReturnPart('lookup', {'result': text, 'items': [1, {'b': text}]})]))
+        messages.append(ModelResponse(parts=[TextPart(text)]))
+    return messages
+
+
+def serializations(messages: list[ModelMessage]) -> list[bytes]:
+    compact = ModelMessagesTypeAdapter.dump_json(messages)
+    return [
+        compact,
+        ModelMessagesTypeAdapter.dump_json(messages, indent=2),
+        json.dumps(json.loads(compact), indent='\t', ensure_ascii=True).encode(),
+    ]
+
+
+@pytest.mark.parametrize('data', serializations(conversation()))
+def test_indexing(data: bytes):
+    messages = ModelMessagesTypeAdapter.validate_json(data)
+    history = LazyModelMessages(data)
+    assert history[0] == messages[0]
+    assert history[-1] == messages[-1]
+    assert history[-6:] == messages[-6:]
+    assert history[:3] == messages[:3]
+    assert history[2:-2:3] == messages[2:-2:3]
+    assert history[-100:] == messages
+    assert history[:100] == messages
+    assert len(history) == len(messages)
+    assert list(history) == messages
+    for index in range(-len(messages), len(messages)):
+        assert history[index] == messages[index]
+        message_json = ModelMessagesTypeAdapter.dump_json([messages[index]])
+        assert json.loads(history.message_json(index)) == json.loads(message_json)[0]
+    with pytest.raises(IndexError):
+        history[len(messages)]
+    with pytest.raises(IndexError):
+        history[-len(messages) - 1]
+
+
+@pytest.mark.parametrize('data', serializations(conversation()))
+def test_scan_from_both_ends(data: bytes):
+    messages = ModelMessagesTypeAdapter.validate_json(data)
+    history = LazyModelMessages(data)
+    # find some messages from the start and some from the end, then fill in the middle
+    assert history[2] == messages[2]
+    assert history[-3] == messages[-3]
+    assert history[len(messages) // 2] == messages[len(messages) // 2]
+    assert len(history) == len(messages)
+    assert list(history) == messages
+
+    history = LazyModelMessages(data)
+    assert history[-len(messages)] == messages[0]
+    assert history[len(messages) - 1] == messages[-1]
+
+
+def test_only_accessed_messages_are_validated():
+    messages = conversation(50)
+    data = bytearray(ModelMessagesTypeAdapter.dump_json(messages))
+    # corrupt the first message, which isn't valid any more but is still well-formed JSON
+    data[data.index(b'"request"')] = ord('X')
+    history = LazyModelMessages(data)
+    assert history[-2:] == messages[-2:]
+    assert repr(history) == f'LazyModelMessages({len(data)} bytes, 2 validated)'
+    with pytest.raises(ValueError):
+        history[0]
+
+
+def test_deeply_nested():
+    content: object = 'deep ]}'
+    for _ in range(30):
+        content = {'nested': [content]}
+    messages: list[ModelMessage] = [
+        ModelRequest(parts=[UserPromptPart('hello')]),
+        ModelRequest(parts=[ToolReturnPart('tool', content)]),
+        ModelResponse(parts=[TextPart('bye')]),
+    ]
+    for data in serializations(messages):
+        assert LazyModelMessages(data)[1] == messages[1]
+        assert LazyModelMessages(data)[-2] == messages[1]
+        assert list(LazyModelMessages(data)) == ModelMessagesTypeAdapter.validate_json(data)
+
+
+def test_long_message_from_end():
+    messages: list[ModelMessage] = [
+        ModelRequest(parts=[UserPromptPart('x' * 100_000 + '\\')]),
+        ModelResponse(parts=[TextPart('"' * 50_000)]),
+    ]
+    data = ModelMessagesTypeAdapter.dump_json(messages)
+    assert LazyModelMessages(data)[-2:] == messages
+
+
+def test_empty_and_str():
+    assert len(LazyModelMessages(b'[]')) == 0
+    assert LazyModelMessages(' [ \n ] ')[-3:] == []
+    messages = conversation(1)
+    assert list(LazyModelMessages(ModelMessagesTypeAdapter.dump_json(messages).decode())) == messages
+
+
+@pytest.mark.parametrize(
+    'data,message',
+    [
+        (b'', 'Expected a JSON array'),
+        (b'{"parts": []}', 'Expected a JSON array'),
+        (b'[1, 2]', 'Expected a JSON object or array'),
+        (b'[{"parts": "]', 'Invalid JSON'),
+        (b'[{"parts": []} {"parts": []}]', 'Expected ","'),
+    ],
+)
+def test_invalid(data: bytes, message: str):
+    with pytest.raises(ValueError, match=message):
+        list(LazyModelMessages(data))
+
+
+def test_message_history():
+    agent = Agent('test')
+    result = agent.run_sync('Hello')
+    history = LazyModelMessages(result.all_messages_json())
+    result = agent.run_sync('Again', message_history=history[-2:])
+    assert result.all_messages()[:2] == history[:]
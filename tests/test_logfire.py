@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import Any, Callable
 
 import pytest
-from dirty_equals import IsJson
+from dirty_equals import IsFloat, IsJson
 from inline_snapshot import snapshot
 from typing_extensions import NotRequired, TypedDict
 
@@ -91,9 +91,13 @@ def test_logfire(get_logfire_summary: Callable[[], LogfireSummary], instrument:
                 'children': [
                     {'id': 1, 'message': 'preparing model request params'},
                     {'id': 2, 'message': 'chat test'},
-                    {'id': 3, 'message': 'running tools: my_ret'},
-                    {'id': 4, 'message': 'preparing model request params'},
-                    {'id': 5, 'message': 'chat test'},
+                    {
+                        'id': 3,
+                        'message': 'running tools: my_ret',
+                        'children': [{'id': 4, 'message': 'running tool: my_ret'}],
+                    },
+                    {'id': 5, 'message': 'preparing model request params'},
+                    {'id': 6, 'message': 'chat test'},
                 ],
             }
         ]
@@ -156,6 +160,16 @@ def test_logfire(get_logfire_summary: Callable[[], LogfireSummary], instrument:
                     }
                 )
             ),
+            'pydantic_ai.timings.system_prompts': IsFloat(ge=0),
+            'pydantic_ai.timings.history': IsFloat(ge=0),
+            'pydantic_ai.timings.request_preparation': IsFloat(ge=0),
+            'pydantic_ai.timings.message_mapping': 0.0,
+            'pydantic_ai.timings.model_requests': IsFloat(gt=0),
+            'pydantic_ai.timings.streaming': 0.0,
+            'pydantic_ai.timings.result_validation': IsFloat(gt=0),
+            'pydantic_ai.timings.retries': 0,
+            'pydantic_ai.timings.retry_requests': 0.0,
+            'pydantic_ai.timings.tools.my_ret': IsFloat(gt=0),
         }
     )
     assert summary.attributes[1] == snapshot(
@@ -165,6 +179,15 @@ def test_logfire(get_logfire_summary: Callable[[], LogfireSummary], instrument:
             'logfire.msg': 'preparing model request params',
         }
     )
+    assert summary.attributes[4] == snapshot(
+        {
+            'tool_name': 'my_ret',
+            'tool_call_id': '',
+            'logfire.msg': 'running tool: my_ret',
+            'logfire.span_type': 'span',
+            'retry': False,
+        }
+    )
     chat_span_attributes = summary.attributes[2]
     if instrument is True or instrument.event_mode == 'attributes':
         attribute_mode_attributes = {k: chat_span_attributes.pop(k) for k in ['events', 'logfire.json_schema']}
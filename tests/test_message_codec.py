@@ -0,0 +1,158 @@
+from __future__ import annotations as _annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import BaseModel
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    BinaryContent,
+    ImageUrl,
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    ModelResponse,
+    RetryPromptPart,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from .conftest import try_import
+
+with try_import() as imports_successful:
+    from pydantic_ai.message_codec import FORMAT_VERSION, dump_messages_bytes, load_messages_bytes
+
+with try_import() as zstandard_imports_successful:
+    import zstandard  # noqa: F401
+
+pytestmark = pytest.mark.skipif(not imports_successful(), reason='msgpack not installed')
+
+IMAGE = bytes(range(256)) * 40
+TIMESTAMP = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+
+
+class Weather(BaseModel):
+    city: str
+    temperature: float
+
+
+@dataclass
+class Forecast:
+    days: list[str]
+
+
+def history() -> list[ModelMessage]:
+    return [
+        ModelRequest(
+            parts=[
+                SystemPromptPart('Be helpful.'),
+                UserPromptPart(['What is this?', BinaryContent(IMAGE, media_type='image/png')], timestamp=TIMESTAMP),
+            ]
+        ),
+        ModelResponse(parts=[TextPart('A pattern.'), ToolCallPart('weather', {'city': 'London'}, 'call-1')]),
+        ModelRequest(
+            parts=[
+                ToolReturnPart('weather', {'rows': [1, 2.5, None, 'x'], 'raw': b'\x00\xff'}, 'call-1'),
+                RetryPromptPart('try again', tool_name='weather', tool_call_id='call-2'),
+                UserPromptPart([ImageUrl('https://example.com/cat.png'), 'and this?']),
+            ]
+        ),
+        ModelResponse(parts=[ToolCallPart('weather', '{"city": "Paris"}', 'call-3')], model_name='test'),
+        ModelRequest(parts=[UserPromptPart('Thanks')]),
+    ]
+
+
+def test_round_trip():
+    messages = history()
+    data = dump_messages_bytes(messages)
+    assert data[:4] == b'PAIM'
+    assert data[4] == FORMAT_VERSION
+    assert load_messages_bytes(data) == messages
+
+
+def test_smaller_than_json():
+    messages = history()
+    assert len(dump_messages_bytes(messages)) < len(ModelMessagesTypeAdapter.dump_json(messages)) * 0.8
+
+
+def test_tool_return_content_converted_like_json():
+    request = ModelRequest(
+        parts=[
+            ToolReturnPart('weather', Weather(city='London', temperature=12.5), timestamp=TIMESTAMP),
+            ToolReturnPart('forecast', Forecast(days=['sun', 'rain']), timestamp=TIMESTAMP),
+            ToolReturnPart('id', uuid.UUID(int=1), timestamp=TIMESTAMP),
+        ]
+    )
+    from_json = ModelMessagesTypeAdapter.validate_json(ModelMessagesTypeAdapter.dump_json([request]))
+    assert load_messages_bytes(dump_messages_bytes([request])) == from_json
+
+
+def test_big_integers():
+    messages: list[ModelMessage] = [
+        ModelResponse(parts=[ToolCallPart('factorial', {'n': 30, 'expected': 2**107}, 'call-1')]),
+        ModelRequest(
+            parts=[ToolReturnPart('factorial', {'result': [2**64, -(2**63) - 1], 'max': 2**64 - 1}, 'call-1')]
+        ),
+    ]
+    assert load_messages_bytes(dump_messages_bytes(messages)) == messages
+
+
+@dataclass
+class Counter:
+    count: int
+
+
+def test_big_integer_in_tool_return_model():
+    request = ModelRequest(parts=[ToolReturnPart('count', Counter(count=10**20), timestamp=TIMESTAMP)])
+    loaded = load_messages_bytes(dump_messages_bytes([request]))
+    assert loaded == ModelMessagesTypeAdapter.validate_json(ModelMessagesTypeAdapter.dump_json([request]))
+    assert loaded[0].parts[0].content == {'count': 10**20}  # pyright: ignore[reportUnknownMemberType]
+
+
+def test_naive_timestamp():
+    messages: list[ModelMessage] = [ModelRequest(parts=[UserPromptPart('Hello', timestamp=datetime(2024, 1, 1, 12))])]
+    assert load_messages_bytes(dump_messages_bytes(messages)) == messages
+
+
+@pytest.mark.skipif(not zstandard_imports_successful(), reason='zstandard not installed')
+@pytest.mark.parametrize('compress', [True, 19])
+def test_compressed(compress: bool | int):
+    messages = history() + [ModelRequest(parts=[UserPromptPart('hello ' * 10_000)])]
+    data = dump_messages_bytes(messages, compress=compress)
+    assert data[5] == 1
+    assert len(data) < len(dump_messages_bytes(messages)) / 2
+    assert load_messages_bytes(data) == messages
+
+
+def test_invalid_data():
+    with pytest.raises(ValueError, match='not a binary message history'):
+        load_messages_bytes(b'[{"parts": []}]')
+    with pytest.raises(ValueError, match='not a binary message history'):
+        load_messages_bytes(b'PAIM')
+    with pytest.raises(ValueError, match='format version 2, newer than 1'):
+        load_messages_bytes(b'PAIM\x02\x00')
+
+
+def test_run_result_helpers():
+    agent = Agent('test')
+    result = agent.run_sync('Hello')
+    assert load_messages_bytes(result.all_messages_bytes()) == result.all_messages()
+
+    result2 = agent.run_sync('Again', message_history=load_messages_bytes(result.all_messages_bytes()))
+    assert load_messages_bytes(result2.new_messages_bytes()) == result2.new_messages()
+    assert len(result2.all_messages()) == 4
+
+
+@pytest.mark.anyio
+async def test_streamed_run_result_helpers():
+    agent = Agent('test')
+    async with agent.run_stream('Hello') as result:
+        await result.get_data()
+    assert load_messages_bytes(result.all_messages_bytes()) == result.all_messages()
+    assert load_messages_bytes(result.new_messages_bytes()) == result.new_messages()
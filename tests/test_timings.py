@@ -0,0 +1,159 @@
+from __future__ import annotations as _annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+
+import pytest
+
+from pydantic_ai import Agent, ModelRetry
+from pydantic_ai.messages import ModelMessage, ModelResponse, RetryPromptPart, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, DeltaToolCalls, FunctionModel
+from pydantic_ai.timings import ModelRequestTimings, RunTimings, ToolCallTimings
+
+from .conftest import try_import
+
+with try_import() as imports_successful:
+    from pydantic_ai.models.mock_openai import MockOpenAI, MockResponse
+    from pydantic_ai.models.openai import OpenAIModel
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_run_timings():
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        if len(messages) == 1:
+            return ModelResponse(parts=[ToolCallPart('lookup', {'retry': True})])
+        elif len(messages) == 3:
+            return ModelResponse(parts=[ToolCallPart('lookup', {'retry': False})])
+        return ModelResponse(parts=[TextPart('done')])
+
+    agent = Agent(FunctionModel(respond))
+
+    @agent.system_prompt
+    def slow_prompt() -> str:
+        time.sleep(0.02)
+        return 'Be helpful'
+
+    @agent.tool_plain
+    async def lookup(retry: bool) -> str:
+        await asyncio.sleep(0.03)
+        if retry:
+            raise ModelRetry('try again')
+        return 'found'
+
+    result = await agent.run('Hello')
+    assert result.data == 'done'
+
+    timings = result.timings()
+    assert timings.system_prompts >= 0.02
+    assert timings.history < timings.system_prompts
+    assert [(r.run_step, r.streamed, r.retry) for r in timings.model_requests] == [
+        (1, False, False),
+        (2, False, True),
+        (3, False, False),
+    ]
+    assert all(r.duration is not None and r.time_to_first_token is None for r in timings.model_requests)
+    assert [(c.tool_name, c.run_step, c.retry) for c in timings.tool_calls] == [
+        ('lookup', 1, True),
+        ('lookup', 2, False),
+    ]
+    assert all(c.duration >= 0.03 for c in timings.tool_calls)
+    assert timings.tool_durations()['lookup'] >= 0.06
+    assert timings.retries == 1
+    assert timings.result_validation > 0
+
+
+async def test_stream_timings():
+    async def stream(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        await asyncio.sleep(0.05)
+        for word in ['the', ' quick', ' brown', ' fox']:
+            yield word
+            await asyncio.sleep(0.01)
+
+    agent = Agent(FunctionModel(stream_function=stream))
+    async with agent.run_stream('Hello') as result:
+        assert await result.get_data() == 'the quick brown fox'
+
+    (request,) = result.timings().model_requests
+    assert request.streamed
+    assert request.time_to_first_token is not None and request.time_to_first_token >= 0.05
+    assert request.streaming is not None and request.streaming >= 0.03
+    assert request.duration == pytest.approx(request.time_to_first_token + request.streaming)
+    assert result.timings().result_validation > 0
+
+
+async def test_iter_stream_timings():
+    async def stream(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[DeltaToolCalls]:
+        await asyncio.sleep(0.02)
+        yield {0: DeltaToolCall(name=info.result_tools[0].name, json_args='{"response": ')}
+        yield {0: DeltaToolCall(json_args='[1, 2]}')}
+
+    agent = Agent(FunctionModel(stream_function=stream), result_type=list[int])
+    async with agent.iter('Hello') as agent_run:
+        async for node in agent_run:
+            if agent.is_model_request_node(node):
+                async with node.stream(agent_run.ctx) as request_stream:
+                    async for _ in request_stream:
+                        pass
+        assert agent_run.result is not None
+        assert agent_run.result.data == [1, 2]
+
+    timings = agent_run.timings()
+    (request,) = timings.model_requests
+    assert request.time_to_first_token is not None and request.time_to_first_token >= 0.02
+    assert timings.result_validation > 0
+
+
+def test_opentelemetry_attributes():
+    timings = RunTimings(
+        system_prompts=0.1,
+        history=0.01,
+        result_validation=0.02,
+        model_requests=[
+            ModelRequestTimings(1, streamed=True, prepare=0.01, time_to_first_token=0.5, duration=2.0),
+            ModelRequestTimings(2, retry=True, prepare=0.01, message_mapping=0.05, duration=1.0),
+        ],
+        tool_calls=[
+            ToolCallTimings('search', 'call_1', 1, 0.25),
+            ToolCallTimings('search', 'call_2', 1, 0.5, retry=True),
+            ToolCallTimings('fetch', 'call_3', 1, 0.75),
+        ],
+    )
+    assert timings.opentelemetry_attributes() == {
+        'pydantic_ai.timings.system_prompts': 0.1,
+        'pydantic_ai.timings.history': 0.01,
+        'pydantic_ai.timings.request_preparation': 0.02,
+        'pydantic_ai.timings.message_mapping': 0.05,
+        'pydantic_ai.timings.model_requests': 3.0,
+        'pydantic_ai.timings.streaming': 1.5,
+        'pydantic_ai.timings.result_validation': 0.02,
+        'pydantic_ai.timings.retries': 1,
+        'pydantic_ai.timings.retry_requests': 1.0,
+        'pydantic_ai.timings.time_to_first_token': 0.5,
+        'pydantic_ai.timings.tools.search': 0.75,
+        'pydantic_ai.timings.tools.fetch': 0.75,
+    }
+
+
+@pytest.mark.skipif(not imports_successful(), reason='openai not installed')
+async def test_message_mapping(allow_model_requests: None):
+    mock = MockOpenAI([MockResponse('Hi')])
+    agent = Agent(OpenAIModel('gpt-4o', provider=mock.provider()))
+
+    result = await agent.run('Hello')
+    (request,) = result.timings().model_requests
+    assert request.message_mapping > 0
+    assert request.duration is not None and request.duration > request.message_mapping
+
+
+def test_retry_prompt_counted():
+    def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        if len(messages) == 1:
+            return ModelResponse(parts=[ToolCallPart('missing', {})])
+        return ModelResponse(parts=[TextPart('done')])
+
+    result = Agent(FunctionModel(respond)).run_sync('Hello')
+    assert isinstance(result.all_messages()[2].parts[0], RetryPromptPart)
+    assert result.timings().retries == 1
+    assert result.timings().tool_calls == []
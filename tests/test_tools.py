@@ -1,5 +1,7 @@
+import functools
 import json
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Annotated, Any, Callable, Literal, Union
 
 import pydantic_core
@@ -9,7 +11,7 @@ from inline_snapshot import snapshot
 from pydantic import BaseModel, Field
 from pydantic_core import PydanticSerializationError
 
-from pydantic_ai import Agent, RunContext, Tool, UserError
+from pydantic_ai import Agent, RunContext, Tool, UserError, _pydantic
 from pydantic_ai.messages import (
     ModelMessage,
     ModelRequest,
@@ -20,7 +22,7 @@ from pydantic_ai.messages import (
 )
 from pydantic_ai.models.function import AgentInfo, FunctionModel
 from pydantic_ai.models.test import TestModel
-from pydantic_ai.tools import ToolDefinition
+from pydantic_ai.tools import ToolDefinition, ToolSchemaCache, get_tool_schema_cache, set_tool_schema_cache
 
 
 def test_tool_no_ctx():
@@ -706,3 +708,95 @@ def test_call_tool_without_unrequired_parameters(set_event_loop: None):
         ]
     )
     assert tool_returns == snapshot([15, 17, 51, 68])
+
+
+@pytest.fixture
+def schema_builds(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record the names of functions whose schema is built."""
+    built: list[str] = []
+    function_schema = _pydantic.function_schema
+
+    def recording_function_schema(function: Callable[..., Any], *args: Any) -> _pydantic.FunctionSchema:
+        built.append(function.__name__)
+        return function_schema(function, *args)
+
+    monkeypatch.setattr(_pydantic, 'function_schema', recording_function_schema)
+    return built
+
+
+def test_schema_built_on_first_use(schema_builds: list[str]):
+    agent = Agent('test', tools=[Tool(google_style_docstring)])
+
+    @agent.tool_plain
+    def plain_tool(x: int) -> int:
+        return x
+
+    assert schema_builds == []
+
+    result = agent.run_sync('Hello')
+    assert result.data == snapshot('{"google_style_docstring":"0 a","plain_tool":0}')
+    assert sorted(schema_builds) == ['google_style_docstring', 'plain_tool']
+
+    agent.run_sync('Hello')
+    assert len(schema_builds) == 2
+
+
+def test_description_built_on_first_use(schema_builds: list[str]):
+    tool = Tool(google_style_docstring)
+    assert schema_builds == []
+    assert tool.description == 'Do foobar stuff, a lot.'
+    assert schema_builds == ['google_style_docstring']
+
+    tool = Tool(google_style_docstring, description='Custom')
+    assert tool.description == 'Custom'
+    assert len(schema_builds) == 1
+
+
+def test_tool_schema_cache(tmp_path: Path, schema_builds: list[str]):
+    set_tool_schema_cache(tmp_path)
+    try:
+        agent = Agent(FunctionModel(get_json_schema), tools=[Tool(google_style_docstring)])
+        first = json.loads(agent.run_sync('Hello').data)
+        assert schema_builds == ['google_style_docstring']
+        assert len(list(tmp_path.glob('*.json'))) == 1
+
+        # a new process with the same tool reads its schema from the cache, and builds the validator when it's called
+        agent = Agent(FunctionModel(get_json_schema), tools=[Tool(google_style_docstring)])
+        assert json.loads(agent.run_sync('Hello').data) == first
+        assert len(schema_builds) == 1
+        result = Agent('test', tools=[Tool(google_style_docstring)]).run_sync('Hello')
+        assert result.data == snapshot('{"google_style_docstring":"0 a"}')
+        assert len(schema_builds) == 2
+
+        cache = get_tool_schema_cache()
+        assert cache is not None
+        cache.clear()
+        assert list(tmp_path.glob('*.json')) == []
+    finally:
+        set_tool_schema_cache(None)
+
+
+def test_tool_schema_cache_key(tmp_path: Path):
+    key = _pydantic.schema_cache_key(google_style_docstring, False, 'auto')
+    assert key is not None
+    assert _pydantic.schema_cache_key(google_style_docstring, False, 'google') != key
+
+    # the key depends on the compiled code rather than the source, so it's the same for the same code in another process
+    def compiled_key(source: str) -> str | None:
+        namespace: dict[str, Any] = {}
+        exec(source, namespace)
+        return _pydantic.schema_cache_key(namespace['no_source'], False, 'auto')
+
+    no_source_key = compiled_key('def no_source(x: int) -> int:\n    return x')
+    assert no_source_key is not None
+    assert compiled_key('def no_source(x: int) -> int:\n    return x') == no_source_key
+    assert compiled_key('def no_source(x: str) -> int:\n    return 1') != no_source_key
+    assert compiled_key('def no_source(x: int = 1) -> int:\n    return x') != no_source_key
+    assert _pydantic.schema_cache_key(functools.partial(google_style_docstring, 1), False, 'auto') is None
+
+    cache = ToolSchemaCache(tmp_path / 'schemas')
+    assert cache.get(key) is None
+    cache.set(key, 'description', {'type': 'object'})
+    assert cache.get(key) == ('description', {'type': 'object'})
+    (tmp_path / 'schemas' / f'{key}.json').write_text('{')
+    assert cache.get(key) is None
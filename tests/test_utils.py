@@ -1,6 +1,7 @@
 from __future__ import annotations as _annotations
 
 import asyncio
+import gc
 import os
 from collections.abc import AsyncIterator
 from importlib.metadata import distributions
@@ -9,7 +10,14 @@ import pytest
 from inline_snapshot import snapshot
 
 from pydantic_ai import UserError
-from pydantic_ai._utils import UNSET, PeekableAsyncStream, check_object_json_schema, group_by_temporal
+from pydantic_ai._utils import (
+    UNSET,
+    MessageMappingCache,
+    PeekableAsyncStream,
+    check_object_json_schema,
+    group_by_temporal,
+)
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, UserPromptPart
 
 from .models.mock_async_stream import MockAsyncStream
 
@@ -104,3 +112,41 @@ def test_package_versions(capsys: pytest.CaptureFixture[str]):
             packages = sorted((package.metadata['Name'], package.version) for package in distributions())
             for name, version in packages:
                 print(f'{name:30} {version}')
+
+
+def test_message_mapping_cache():
+    cache = MessageMappingCache[str]()
+    calls: list[ModelMessage] = []
+
+    def map_message(message: ModelMessage) -> str:
+        calls.append(message)
+        return f'mapped {len(calls)}'
+
+    message = ModelRequest(parts=[UserPromptPart('hello')])
+    assert cache.get(message, map_message) == 'mapped 1'
+    assert cache.get(message, map_message) == 'mapped 1'
+    # an equal but distinct message is mapped separately
+    assert cache.get(ModelRequest(parts=[UserPromptPart('hello')]), map_message) == 'mapped 2'
+
+    # replacing a part invalidates the entry
+    message.parts[0] = UserPromptPart('changed')
+    assert cache.get(message, map_message) == 'mapped 3'
+
+    del message, calls[:]
+    gc.collect()
+    assert len(cache) == 0
+
+
+async def test_message_mapping_cache_async():
+    cache = MessageMappingCache[str]()
+    calls = 0
+
+    async def map_message(message: ModelMessage) -> str:
+        nonlocal calls
+        calls += 1
+        return 'mapped'
+
+    message = ModelResponse(parts=[TextPart('hi')])
+    assert await cache.aget(message, map_message) == 'mapped'
+    assert await cache.aget(message, map_message) == 'mapped'
+    assert calls == 1
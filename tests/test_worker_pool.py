@@ -0,0 +1,133 @@
+from __future__ import annotations as _annotations
+
+import asyncio
+import os
+import pickle
+import signal
+
+import pytest
+
+from pydantic_ai import AgentRunError, ModelHTTPError, UserError
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+from pydantic_ai.usage import Usage
+from pydantic_ai.worker_pool import AgentWorkerPool
+
+from .worker_pool_agent import Greeting, make_agent
+
+pytestmark = pytest.mark.anyio
+
+AGENT_PATH = 'tests.worker_pool_agent:agent'
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+async def test_runs_in_worker_processes():
+    async with AgentWorkerPool(AGENT_PATH, processes=2) as pool:
+        assert len(pool.pids) == 2
+        assert os.getpid() not in pool.pids
+        results = await asyncio.gather(*(pool.run(f'run {i}', deps=Greeting('hello')) for i in range(6)))
+
+    pids: set[int] = set()
+    for i, result in enumerate(results):
+        prompt, greeting, _, pid = result.data.rsplit(' ', 3)
+        assert prompt == f'run {i}'
+        assert greeting == 'hello'
+        pids.add(int(pid))
+        assert isinstance(result.usage(), Usage)
+        assert result.usage().requests == 2
+    # runs are spread over both workers
+    assert len(pids) == 2
+
+
+async def test_messages_round_trip():
+    async with AgentWorkerPool(make_agent, processes=1) as pool:
+        first = await pool.run('first', deps=Greeting('hi'))
+        assert len(first.all_messages()) == 4
+        assert first.new_messages() == first.all_messages()
+        request = first.all_messages()[0]
+        assert isinstance(request, ModelRequest) and isinstance(request.parts[0], UserPromptPart)
+        assert request.parts[0].content == 'first'
+
+        second = await pool.run('second', deps=Greeting('hi'), message_history=first.all_messages())
+
+    assert second.all_messages()[:4] == first.all_messages()
+    new_messages = second.new_messages()
+    assert len(new_messages) == 4
+    assert isinstance(new_messages[0], ModelRequest)
+    assert new_messages[0].parts[0].content == 'second'
+    last = new_messages[-1]
+    assert isinstance(last, ModelResponse) and isinstance(last.parts[0], TextPart)
+    assert last.parts[0].content.startswith('second hi from ')
+    assert b'"second"' in second.all_messages_json()
+
+
+async def test_error_propagates():
+    async with AgentWorkerPool(AGENT_PATH, processes=1) as pool:
+        with pytest.raises(ValueError, match='model failed'):
+            await pool.run('fail', deps=Greeting('hi'))
+        # the worker carries on after a failed run
+        result = await pool.run('ok', deps=Greeting('hi'))
+        assert result.data.startswith('ok hi from ')
+
+
+async def test_http_error_propagates():
+    async with AgentWorkerPool(AGENT_PATH, processes=1) as pool:
+        with pytest.raises(ModelHTTPError) as exc_info:
+            await asyncio.wait_for(pool.run('http error', deps=Greeting('hi')), timeout=10)
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.body == {'error': 'rate limited'}
+        assert exc_info.value.headers == {'retry-after': '1'}
+        result = await asyncio.wait_for(pool.run('ok', deps=Greeting('hi')), timeout=10)
+        assert result.data.startswith('ok hi from ')
+
+
+async def test_unloadable_errors():
+    async with AgentWorkerPool(AGENT_PATH, processes=1) as pool:
+        # an error which can't be loaded again is replaced in the worker, with its traceback
+        with pytest.raises(AgentRunError, match=r'(?s)cannot be pickled.*StrictError: strict'):
+            await asyncio.wait_for(pool.run('strict error', deps=Greeting('hi')), timeout=10)
+        # one which only fails to load in the parent fails its run, and the worker's later results still arrive
+        with pytest.raises(AgentRunError, match='Failed to load the result of the run'):
+            await asyncio.wait_for(pool.run('worker only error', deps=Greeting('hi')), timeout=10)
+        result = await asyncio.wait_for(pool.run('ok', deps=Greeting('hi')), timeout=10)
+        assert result.data.startswith('ok hi from ')
+
+
+def test_model_http_error_pickles():
+    error = ModelHTTPError(503, 'gpt-4o', body='unavailable', headers={'retry-after': '5'})
+    loaded = pickle.loads(pickle.dumps(error))
+    assert (loaded.status_code, loaded.model_name, loaded.body, loaded.headers) == (
+        503,
+        'gpt-4o',
+        'unavailable',
+        {'retry-after': '5'},
+    )
+    assert str(loaded) == str(error)
+
+
+async def test_worker_exit_fails_runs():
+    async with AgentWorkerPool(AGENT_PATH, processes=1) as pool:
+        [worker] = pool._workers  # pyright: ignore[reportPrivateUsage]
+        assert worker.process.pid is not None
+        os.kill(worker.process.pid, signal.SIGKILL)
+        await asyncio.get_running_loop().run_in_executor(None, worker.process.join)
+        with pytest.raises(AgentRunError, match='exited'):
+            await pool.run('ok', deps=Greeting('hi'))
+        with pytest.raises(AgentRunError, match='All worker processes have exited'):
+            await pool.run('ok', deps=Greeting('hi'))
+
+
+async def test_not_started():
+    pool = AgentWorkerPool(AGENT_PATH, processes=1)
+    with pytest.raises(UserError, match='has not been started'):
+        await pool.run('hello')
+    await pool.aclose()
+
+
+async def test_bad_agent_path():
+    async with AgentWorkerPool('tests.worker_pool_agent', processes=1) as pool:
+        with pytest.raises(AgentRunError):
+            await pool.run('hello')
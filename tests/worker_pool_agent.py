@@ -0,0 +1,69 @@
+"""An agent imported by the worker processes of `test_worker_pool.py`."""
+
+from __future__ import annotations as _annotations
+
+import os
+from dataclasses import dataclass
+
+from pydantic_ai import Agent, ModelHTTPError, RunContext
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+
+@dataclass
+class Greeting:
+    greeting: str
+
+
+class StrictError(Exception):
+    """An error which pickles but can't be loaded again, since `args` doesn't hold all of `__init__`'s arguments."""
+
+    def __init__(self, code: int, detail: str):
+        self.code = code
+        super().__init__(detail)
+
+
+def _load_in_worker(pid: int) -> ValueError:
+    if os.getpid() != pid:
+        raise RuntimeError('can only be loaded in the worker process')
+    return ValueError('loaded')
+
+
+class WorkerOnlyError(Exception):
+    """An error which can be loaded in the worker process which raised it, but not in the parent."""
+
+    def __reduce__(self) -> tuple[object, ...]:
+        return _load_in_worker, (os.getpid(),)
+
+
+ERRORS: dict[str, Exception] = {
+    'fail': ValueError('model failed'),
+    'http error': ModelHTTPError(429, 'function', body={'error': 'rate limited'}, headers={'retry-after': '1'}),
+    'strict error': StrictError(1, 'strict'),
+    'worker only error': WorkerOnlyError(),
+}
+
+
+def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+    """Call the `pid` tool, then reply with the user prompt, the deps and the pid."""
+    last_part = messages[-1].parts[-1]
+    if isinstance(last_part, ToolReturnPart):
+        prompt = messages[-3].parts[-1]
+        assert isinstance(prompt, UserPromptPart)
+        return ModelResponse(parts=[TextPart(f'{prompt.content} {last_part.content}')])
+    assert isinstance(last_part, UserPromptPart) and isinstance(last_part.content, str)
+    if last_part.content in ERRORS:
+        raise ERRORS[last_part.content]
+    return ModelResponse(parts=[ToolCallPart('pid', {})])
+
+
+agent = Agent(FunctionModel(respond), deps_type=Greeting)
+
+
+@agent.tool
+def pid(ctx: RunContext[Greeting]) -> str:
+    return f'{ctx.deps.greeting} from {os.getpid()}'
+
+
+def make_agent() -> Agent[Greeting, str]:
+    return agent
@@ -1,10 +1,14 @@
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import TYPE_CHECKING, List, Dict, Optional
+from pydantic_ai.models import Model
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers.openai import OpenAIProvider
 from pydantic_ai import Agent
 from pydantic_ai.messages import ModelMessage
 
+if TYPE_CHECKING:
+    from pydantic_ai.models.semantic_cache import EmbeddingFunction
+
 @dataclass
 class AgentResponse:
     """Agent响应模型"""
@@ -14,7 +18,7 @@ class AgentResponse:
 
 class BaseAgent:
     """基础Agent类"""
-    def __init__(self, model: OpenAIModel, system_prompt: str):
+    def __init__(self, model: Model, system_prompt: str):
         self.model = model
         self.system_prompt = system_prompt
         self.agent = Agent(model, instrument=True)
@@ -37,8 +41,19 @@ class CustomerServiceAgent(BaseAgent):
     You are patient, friendly, and always try to help customers solve their problems.
     You communicate clearly and professionally."""
 
-    def __init__(self, model: OpenAIModel):
-        super().__init__(model=model, system_prompt=self.SYSTEM_PROMPT)
+    def __init__(self, model: Model, semantic_cache_embedder: Optional['EmbeddingFunction'] = None):
+        """semantic_cache_embedder: 语义嵌入函数，传入后复用相似问题的回答（需要 numpy）
+
+        HashingEmbedder 只比较字面，"能退款吗" 和 "不能退款吗" 会被当成同一个问题，所以必须显式传入
+        真正的嵌入模型；同时要求之前的对话完全一致，避免把一个对话里的回答用到另一个对话的追问上。
+        """
+        if semantic_cache_embedder is not None:
+            from pydantic_ai.models.semantic_cache import SemanticCachedModel
+
+            cached_model = SemanticCachedModel(model, embedder=semantic_cache_embedder, match_history=True)
+            super().__init__(model=cached_model, system_prompt=self.SYSTEM_PROMPT)
+        else:
+            super().__init__(model=model, system_prompt=self.SYSTEM_PROMPT)
 
 class TechnicalSupportAgent(BaseAgent):
     """技术支持Agent"""
@@ -46,15 +61,31 @@ class TechnicalSupportAgent(BaseAgent):
     You have deep knowledge of our products and can help users solve technical issues.
     You explain technical concepts clearly and provide step-by-step solutions."""
 
-    def __init__(self, model: OpenAIModel):
+    def __init__(self, model: Model):
         super().__init__(model=model, system_prompt=self.SYSTEM_PROMPT)
 
 class AgentFactory:
     """Agent工厂类"""
-    def __init__(self, openai_model: OpenAIModel, dmx_model: OpenAIModel):
+    def __init__(
+        self,
+        openai_model: OpenAIModel,
+        dmx_model: OpenAIModel,
+        semantic_cache_embedder: Optional['EmbeddingFunction'] = None,
+        load_balance: bool = False,
+    ):
+        """load_balance: 两个等价的 gpt-4o-mini 端点之间按延迟和健康状况分配请求，而不是每个角色固定一个端点"""
+        customer_model: Model = openai_model
+        technical_model: Model = dmx_model
+        if load_balance:
+            from pydantic_ai.models.load_balanced import LoadBalancedModel
+
+            # 共享同一个实例，两个角色的请求统计和熔断状态是一致的
+            customer_model = technical_model = LoadBalancedModel(openai_model, dmx_model)
         self.agents: Dict[str, BaseAgent] = {
-            'customer_service': CustomerServiceAgent(openai_model),
-            'technical_support': TechnicalSupportAgent(dmx_model)
+            'customer_service': CustomerServiceAgent(
+                customer_model, semantic_cache_embedder=semantic_cache_embedder
+            ),
+            'technical_support': TechnicalSupportAgent(technical_model)
         }
 
     def get_agent(self, role_type: str) -> BaseAgent:
@@ -25,6 +25,7 @@ import logfire
 from fastapi import Depends, Request
 from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic_ai.models.instrumented import InstrumentationSettings
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers.openai import OpenAIProvider
 from typing_extensions import LiteralString, ParamSpec, TypedDict
@@ -62,11 +63,19 @@ modelDmx = OpenAIModel(
         'gpt-4o-mini',
         provider=OpenAIProvider(
             api_key=dmxKey,
-            base_url='https://vip.dmxapi.com/v1'
+            base_url=os.getenv('DMX_BASE_URL', 'https://vip.dmxapi.com/v1')
         )
     )
 
-agent = Agent(modelDmx, instrument=True)
+# conversations are replayed in full on every message, so only trace each request's new
+# messages, with a sample of full payloads, and serialize them off the event loop
+instrumentation = InstrumentationSettings(
+    messages='new',
+    max_content_length=4000,
+    full_payload_sample_rate=0.05,
+    background_serialization=True,
+)
+agent = Agent(modelDmx, instrument=instrumentation)
 THIS_DIR = Path(__file__).parent
 
 
@@ -286,7 +295,7 @@ class Database:
     @classmethod
     @asynccontextmanager
     async def connect(
-        cls, file: Path = THIS_DIR / '.chat_app_messages.sqlite'
+        cls, file: Path = Path(os.getenv('CHAT_APP_DB', THIS_DIR / '.chat_app_messages.sqlite'))
     ) -> AsyncIterator[Database]:
         with logfire.span('connect to DB'):
             loop = asyncio.get_event_loop()
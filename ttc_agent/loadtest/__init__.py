@@ -0,0 +1,13 @@
+"""Load testing the chat app against a local fake LLM.
+
+Run with:
+
+    uv run -m ttc_agent.loadtest --users 10 50 100
+
+See `python -m ttc_agent.loadtest --help` for the options.
+"""
+
+from .fake_llm import FakeLLMSettings
+from .harness import LoadTestConfig, LoadTestReport, run_load_test
+
+__all__ = 'FakeLLMSettings', 'LoadTestConfig', 'LoadTestReport', 'run_load_test'
@@ -0,0 +1,59 @@
+from __future__ import annotations as _annotations
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+from .fake_llm import FakeLLMSettings
+from .harness import LoadTestConfig, format_reports, run_load_test
+
+
+def main() -> None:
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(
+        prog='python -m ttc_agent.loadtest',
+        description='Load test the chat app against a local fake LLM.',
+    )
+    parser.add_argument(
+        '--users',
+        type=int,
+        nargs='+',
+        default=[10],
+        help='concurrent virtual users, give several to run each load in turn',
+    )
+    parser.add_argument('--turns', type=int, default=3, help='messages each user sends')
+    parser.add_argument(
+        '--ramp-up', type=float, default=1.0, help='seconds over which users start'
+    )
+    parser.add_argument(
+        '--think-time', type=float, default=0.0, help='seconds between messages'
+    )
+    parser.add_argument(
+        '--latency', type=float, default=0.2, help="fake LLM's time to first token"
+    )
+    parser.add_argument(
+        '--tokens-per-second', type=float, default=50, help="fake LLM's token rate"
+    )
+    parser.add_argument(
+        '--tokens', type=int, default=100, help='tokens in each fake LLM response'
+    )
+    parser.add_argument(
+        '--json', type=Path, help='also write the summaries to this file'
+    )
+    args = parser.parse_args()
+
+    configs = [
+        LoadTestConfig(users, args.turns, args.ramp_up, args.think_time)
+        for users in args.users
+    ]
+    llm = FakeLLMSettings(args.latency, args.tokens_per_second, args.tokens)
+    reports = asyncio.run(run_load_test(configs, llm))
+    print(format_reports(reports))
+    if args.json:
+        summaries = [report.summary() for report in reports]
+        args.json.write_text(json.dumps(summaries, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""A fake OpenAI-compatible chat completions server, so load tests need no network.
+
+Responses are `tokens` words long. Streamed responses wait `latency` seconds before
+the first chunk, then send `tokens_per_second` tokens a second; non-streamed
+responses wait for as long as the whole stream would take.
+
+Run with:
+
+    uv run -m ttc_agent.loadtest.fake_llm --port 8100 --tokens-per-second 50
+"""
+
+from __future__ import annotations as _annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+import fastapi
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class FakeLLMSettings:
+    """How the fake server responds."""
+
+    latency: float = 0.2
+    """Seconds before the first token."""
+    tokens_per_second: float = 50
+    """How fast tokens are streamed, 0 sends them all at once."""
+    tokens: int = 100
+    """The number of tokens in each response."""
+
+    def response_time(self) -> float:
+        stream_time = (
+            self.tokens / self.tokens_per_second if self.tokens_per_second else 0
+        )
+        return self.latency + stream_time
+
+
+def create_app(settings: FakeLLMSettings) -> fastapi.FastAPI:
+    """Create the fake server's app."""
+    app = fastapi.FastAPI()
+
+    @app.post('/v1/chat/completions')
+    async def chat_completions(request: Request) -> Any:
+        body = await request.json()
+        model = body.get('model', 'fake')
+        words = [f'token{i} ' for i in range(settings.tokens)]
+        if body.get('stream'):
+            include_usage = (body.get('stream_options') or {}).get(
+                'include_usage', False
+            )
+            return StreamingResponse(
+                _stream(settings, model, words, include_usage),
+                media_type='text/event-stream',
+            )
+        await asyncio.sleep(settings.response_time())
+        return JSONResponse(
+            {
+                'id': 'chatcmpl-fake',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [
+                    {
+                        'index': 0,
+                        'finish_reason': 'stop',
+                        'message': {'role': 'assistant', 'content': ''.join(words)},
+                    }
+                ],
+                'usage': _usage(settings),
+            }
+        )
+
+    return app
+
+
+async def _stream(
+    settings: FakeLLMSettings, model: str, words: list[str], include_usage: bool
+) -> AsyncIterator[bytes]:
+    created = int(time.time())
+
+    def chunk(
+        delta: dict[str, Any], finish_reason: str | None = None, **extra: Any
+    ) -> bytes:
+        data = {
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion.chunk',
+            'created': created,
+            'model': model,
+            'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            **extra,
+        }
+        return b'data: ' + json.dumps(data).encode() + b'\n\n'
+
+    await asyncio.sleep(settings.latency)
+    start = time.perf_counter()
+    yield chunk({'role': 'assistant', 'content': ''})
+    for i, word in enumerate(words):
+        if settings.tokens_per_second:
+            # sleep until the token is due, so slow consumers don't slow the token rate
+            delay = start + i / settings.tokens_per_second - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        yield chunk({'content': word})
+    yield chunk({}, 'stop')
+    if include_usage:
+        data = {
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion.chunk',
+            'created': created,
+            'model': model,
+            'choices': [],
+            'usage': _usage(settings),
+        }
+        yield b'data: ' + json.dumps(data).encode() + b'\n\n'
+    yield b'data: [DONE]\n\n'
+
+
+def _usage(settings: FakeLLMSettings) -> dict[str, int]:
+    return {
+        'prompt_tokens': 10,
+        'completion_tokens': settings.tokens,
+        'total_tokens': 10 + settings.tokens,
+    }
+
+
+def main() -> None:
+    """Run the fake server from the command line."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Fake OpenAI-compatible LLM server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--latency', type=float, default=FakeLLMSettings.latency)
+    parser.add_argument(
+        '--tokens-per-second', type=float, default=FakeLLMSettings.tokens_per_second
+    )
+    parser.add_argument('--tokens', type=int, default=FakeLLMSettings.tokens)
+    args = parser.parse_args()
+    settings = FakeLLMSettings(args.latency, args.tokens_per_second, args.tokens)
+    uvicorn.run(
+        create_app(settings),
+        host=args.host,
+        port=args.port,
+        log_level='warning',
+    )
+
+
+if __name__ == '__main__':
+    main()
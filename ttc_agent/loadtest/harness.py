@@ -0,0 +1,294 @@
+"""Drives virtual users through the chat app and reports how it copes.
+
+Each virtual user creates a conversation with `POST /api/new_conversation`, then
+sends `turns` messages to `POST /api/chat/{conversation_id}`, reading each streamed
+response to the end before sending the next.
+"""
+
+from __future__ import annotations as _annotations
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from .fake_llm import FakeLLMSettings
+from .stats import Summary, summarize
+
+
+@dataclass
+class LoadTestConfig:
+    """What load to put on the chat app."""
+
+    users: int = 10
+    """The number of concurrent virtual users."""
+    turns: int = 3
+    """The number of messages each user sends."""
+    ramp_up: float = 1.0
+    """Seconds over which the users start, so they don't all start at once."""
+    think_time: float = 0.0
+    """Seconds each user waits between messages."""
+
+
+@dataclass
+class TurnResult:
+    """The timings of one message sent to the chat app, in seconds."""
+
+    ttfb: float | None = None
+    """Time to the first byte of the response."""
+    first_token: float | None = None
+    """Time to the first text from the model."""
+    latency: float | None = None
+    """Time to the end of the response."""
+    tokens: int = 0
+    """Tokens in the model's response, counted as words."""
+    error: str | None = None
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        if self.latency is None or self.first_token is None:
+            return None
+        streaming = self.latency - self.first_token
+        return self.tokens / streaming if streaming > 0 else None
+
+
+@dataclass
+class LoadTestReport:
+    """The results of one load."""
+
+    config: LoadTestConfig
+    duration: float
+    turns: list[TurnResult]
+    server: dict[str, Any] = field(default_factory=dict)
+    """The measurements of the server's probes, see `ttc_agent.loadtest.server`."""
+
+    def summary(self) -> dict[str, Any]:
+        ok = [t for t in self.turns if t.error is None]
+        return {
+            'users': self.config.users,
+            'requests': len(self.turns),
+            'errors': len(self.turns) - len(ok),
+            'requests_per_second': len(ok) / self.duration,
+            'tokens_per_second': sum(t.tokens for t in ok) / self.duration,
+            'ttfb': summarize([t.ttfb for t in ok if t.ttfb is not None]),
+            'first_token': summarize(
+                [t.first_token for t in ok if t.first_token is not None]
+            ),
+            'latency': summarize([t.latency for t in ok if t.latency is not None]),
+            'stream_tokens_per_second': summarize(
+                [rate for t in ok if (rate := t.tokens_per_second) is not None]
+            ),
+            **self.server,
+        }
+
+
+async def run_virtual_user(
+    client: httpx.AsyncClient, user: int, config: LoadTestConfig
+) -> list[TurnResult]:
+    """Create a conversation, then send `config.turns` messages to it."""
+    results: list[TurnResult] = []
+    try:
+        response = await client.post(
+            '/api/new_conversation', json={'role_type': 'default'}
+        )
+        response.raise_for_status()
+        conversation_id = response.json()['id']
+    except httpx.HTTPError as e:
+        return [TurnResult(error=f'new conversation: {e!r}')]
+
+    for turn in range(config.turns):
+        if turn and config.think_time:
+            await asyncio.sleep(config.think_time)
+        results.append(
+            await _send_message(client, conversation_id, f'User {user} question {turn}')
+        )
+    return results
+
+
+async def _send_message(
+    client: httpx.AsyncClient, conversation_id: str, prompt: str
+) -> TurnResult:
+    result = TurnResult()
+    start = time.perf_counter()
+    text = ''
+    buffer = b''
+    try:
+        async with client.stream(
+            'POST', f'/api/chat/{conversation_id}', json={'content': prompt}
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                now = time.perf_counter() - start
+                if result.ttfb is None:
+                    result.ttfb = now
+                buffer += chunk
+                *lines, buffer = buffer.split(b'\n')
+                for line in lines:
+                    message = json.loads(line)
+                    if message['role'] == 'model':
+                        if result.first_token is None:
+                            result.first_token = now
+                        text = message['content']
+    except httpx.HTTPError as e:
+        result.error = repr(e)
+        return result
+    result.latency = time.perf_counter() - start
+    result.tokens = len(text.split())
+    return result
+
+
+async def run_load(client: httpx.AsyncClient, config: LoadTestConfig) -> LoadTestReport:
+    """Run the virtual users against an already running chat app."""
+
+    async def user(i: int) -> list[TurnResult]:
+        await asyncio.sleep(config.ramp_up * i / config.users)
+        return await run_virtual_user(client, i, config)
+
+    await client.post('/_loadtest/reset')
+    start = time.perf_counter()
+    per_user = await asyncio.gather(*(user(i) for i in range(config.users)))
+    duration = time.perf_counter() - start
+    server = (await client.get('/_loadtest/stats')).json()
+    return LoadTestReport(
+        config, duration, [t for turns in per_user for t in turns], server
+    )
+
+
+async def run_load_test(
+    configs: Sequence[LoadTestConfig], llm: FakeLLMSettings
+) -> list[LoadTestReport]:
+    """Start the fake LLM and the chat app, then run each load in turn."""
+    async with serve_fake_llm(llm) as llm_url, serve_chat_app(llm_url) as app_url:
+        async with httpx.AsyncClient(
+            base_url=app_url,
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=None),
+            timeout=httpx.Timeout(300, connect=30),
+        ) as client:
+            # the first run builds schemas and opens connections, keep it out of the results
+            await run_virtual_user(client, -1, LoadTestConfig(users=1, turns=1))
+            return [await run_load(client, config) for config in configs]
+
+
+@asynccontextmanager
+async def serve_fake_llm(settings: FakeLLMSettings) -> AsyncIterator[str]:
+    """Run the fake LLM in a subprocess, yielding its OpenAI base URL."""
+    port = _free_port()
+    args = [
+        f'--port={port}',
+        f'--latency={settings.latency}',
+        f'--tokens-per-second={settings.tokens_per_second}',
+        f'--tokens={settings.tokens}',
+    ]
+    async with _serve(
+        'ttc_agent.loadtest.fake_llm', args, port, '/docs', os.environ.copy()
+    ):
+        yield f'http://127.0.0.1:{port}/v1'
+
+
+@asynccontextmanager
+async def serve_chat_app(llm_url: str) -> AsyncIterator[str]:
+    """Run the chat app with probes in a subprocess, pointing it at `llm_url`."""
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = os.environ.copy()
+        env.update(
+            OPENAI_API_KEY='fake',
+            DMX_API_KEY='fake',
+            DMX_BASE_URL=llm_url,
+            CHAT_APP_DB=str(Path(tmp) / 'chat_app_messages.sqlite'),
+        )
+        # don't send the load test's traces anywhere, or print them
+        env.pop('LOGFIRE_TOKEN', None)
+        env['LOGFIRE_CONSOLE'] = 'false'
+        args = [f'--port={port}']
+        async with _serve(
+            'ttc_agent.loadtest.server', args, port, '/_loadtest/stats', env
+        ):
+            yield f'http://127.0.0.1:{port}'
+
+
+@asynccontextmanager
+async def _serve(
+    module: str, args: list[str], port: int, ready_path: str, env: dict[str, str]
+) -> AsyncIterator[None]:
+    # output goes to a file rather than a pipe, which would block the server once full
+    with tempfile.TemporaryFile() as output:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            '-m',
+            module,
+            *args,
+            env=env,
+            stdout=output,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        try:
+            url = f'http://127.0.0.1:{port}{ready_path}'
+            if not await _wait_until_ready(process, url):
+                output.seek(0)
+                log = output.read().decode(errors='replace')
+                raise RuntimeError(f'{module} failed to start:\n{log}')
+            yield
+        finally:
+            if process.returncode is None:
+                process.terminate()
+                await process.wait()
+
+
+async def _wait_until_ready(
+    process: asyncio.subprocess.Process, url: str, timeout: float = 30
+) -> bool:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline and process.returncode is None:
+            try:
+                await client.get(url)
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+            else:
+                return True
+    return False
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def format_reports(reports: Sequence[LoadTestReport]) -> str:
+    """Format reports as a table, with one row for each load."""
+    header = (
+        f'{"users":>6} {"reqs":>6} {"errs":>5} {"req/s":>7} {"tok/s":>8}'
+        f' {"ttfb p50/p95 ms":>16} {"1st token p50/p95/p99 ms":>25}'
+        f' {"latency p50/p95/p99 ms":>24} {"stream tok/s p50":>17}'
+        f' {"sqlite wait p95/max ms":>23} {"loop lag p95/max ms":>20}'
+    )
+    lines = [header]
+    for report in reports:
+        s = report.summary()
+        ttfb, first, latency = s['ttfb'], s['first_token'], s['latency']
+        db, lag = s['sqlite_wait'], s['event_loop_lag']
+        lines.append(
+            f'{s["users"]:>6} {s["requests"]:>6} {s["errors"]:>5}'
+            f' {s["requests_per_second"]:>7.1f} {s["tokens_per_second"]:>8.0f}'
+            f' {_ms(ttfb, "p50", "p95"):>16} {_ms(first, "p50", "p95", "p99"):>25}'
+            f' {_ms(latency, "p50", "p95", "p99"):>24}'
+            f' {s["stream_tokens_per_second"]["p50"]:>17.0f}'
+            f' {_ms(db, "p95", "max"):>23} {_ms(lag, "p95", "max"):>20}'
+        )
+    return '\n'.join(lines)
+
+
+def _ms(summary: Summary, *keys: str) -> str:
+    return '/'.join(f'{summary[key] * 1000:.0f}' for key in keys)  # type: ignore[literal-required]
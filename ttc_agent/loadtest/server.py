@@ -0,0 +1,136 @@
+"""Runs `ttc_agent.chat_app:app` with probes measuring what limits its concurrency.
+
+The probes measure:
+
+* event loop lag: how late a task sleeping for `LAG_INTERVAL` wakes up, which grows
+  when CPU work, like validating message histories, blocks the event loop
+* SQLite waits: how long each database call queues for the database's single
+  thread, and how long it then holds it
+
+The measurements are served from `GET /_loadtest/stats`, and cleared with
+`POST /_loadtest/reset`. The app reads its configuration from the environment when
+it's imported, so set `DMX_BASE_URL` and `CHAT_APP_DB` before starting this, e.g.:
+
+    DMX_BASE_URL=http://127.0.0.1:8100/v1 uv run -m ttc_agent.loadtest.server
+"""
+
+from __future__ import annotations as _annotations
+
+import argparse
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import fastapi
+
+from .. import chat_app
+from .stats import summarize
+
+LAG_INTERVAL = 0.01
+
+
+@dataclass
+class Probes:
+    """Measurements collected since the last reset, in seconds."""
+
+    loop_lag: list[float] = field(default_factory=list)
+    db_wait: list[float] = field(default_factory=list)
+    db_hold: list[float] = field(default_factory=list)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'event_loop_lag': summarize(self.loop_lag),
+            'sqlite_wait': summarize(self.db_wait),
+            'sqlite_hold': summarize(self.db_hold),
+        }
+
+    def reset(self) -> None:
+        self.loop_lag.clear()
+        self.db_wait.clear()
+        self.db_hold.clear()
+
+
+probes = Probes()
+
+
+async def _monitor_loop_lag() -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        probes.loop_lag.append(max(time.perf_counter() - start - LAG_INTERVAL, 0))
+
+
+_asyncify = chat_app.Database._asyncify
+
+
+async def _timed_asyncify(
+    self: chat_app.Database, func: Callable[..., Any], *args: Any, **kwargs: Any
+) -> Any:
+    submitted = time.perf_counter()
+
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        # runs on the database's thread; appending to a list is thread safe
+        started = time.perf_counter()
+        probes.db_wait.append(started - submitted)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            probes.db_hold.append(time.perf_counter() - started)
+
+    return await _asyncify(self, timed, *args, **kwargs)
+
+
+_lifespan = chat_app.app.router.lifespan_context
+
+
+@asynccontextmanager
+async def _lifespan_with_probes(app: fastapi.FastAPI) -> AsyncIterator[Any]:
+    monitor = asyncio.create_task(_monitor_loop_lag())
+    try:
+        async with _lifespan(app) as state:
+            yield state
+    finally:
+        monitor.cancel()
+
+
+def instrument(app: fastapi.FastAPI) -> fastapi.FastAPI:
+    """Add the probes and their endpoints to the chat app."""
+    chat_app.Database._asyncify = _timed_asyncify  # type: ignore[method-assign]
+    app.router.lifespan_context = _lifespan_with_probes
+
+    router = fastapi.APIRouter(prefix='/_loadtest')
+
+    @router.get('/stats')
+    async def get_stats() -> dict[str, Any]:
+        return probes.stats()
+
+    @router.post('/reset')
+    async def reset() -> None:
+        probes.reset()
+
+    # ahead of the app's catch-all route for the frontend
+    app.router.routes[:0] = router.routes
+    return app
+
+
+app = instrument(chat_app.app)
+
+
+def main() -> None:
+    """Run the app with probes from the command line."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(
+        description='Run the chat app with load test probes'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
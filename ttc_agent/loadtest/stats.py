@@ -0,0 +1,38 @@
+"""Summaries of the timings collected by the load test."""
+
+from __future__ import annotations as _annotations
+
+import statistics
+from collections.abc import Sequence
+
+from typing_extensions import TypedDict
+
+
+class Summary(TypedDict):
+    """Statistics of a set of timings."""
+
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+def summarize(values: Sequence[float]) -> Summary:
+    """Summarize timings, all zero if there are none."""
+    if not values:
+        return {'count': 0, 'mean': 0, 'p50': 0, 'p95': 0, 'p99': 0, 'max': 0}
+    if len(values) == 1:
+        p50 = p95 = p99 = values[0]
+    else:
+        quantiles = statistics.quantiles(values, n=100, method='inclusive')
+        p50, p95, p99 = quantiles[49], quantiles[94], quantiles[98]
+    return {
+        'count': len(values),
+        'mean': statistics.fmean(values),
+        'p50': p50,
+        'p95': p95,
+        'p99': p99,
+        'max': max(values),
+    }
@@ -0,0 +1,68 @@
+from __future__ import annotations as _annotations
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from pydantic_ai import Agent
+from pydantic_ai.models.openai import OpenAIModel
+from pydantic_ai.providers.openai import OpenAIProvider
+from ttc_agent.loadtest.fake_llm import FakeLLMSettings, create_app
+from ttc_agent.loadtest.harness import LoadTestConfig, LoadTestReport, TurnResult
+from ttc_agent.loadtest.stats import summarize
+
+pytestmark = pytest.mark.anyio
+
+
+def fake_llm_agent(settings: FakeLLMSettings) -> Agent[None, str]:
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(create_app(settings)))
+    client = AsyncOpenAI(
+        api_key='fake', base_url='http://fake-llm/v1', http_client=http_client
+    )
+    return Agent(
+        OpenAIModel('gpt-4o-mini', provider=OpenAIProvider(openai_client=client))
+    )
+
+
+async def test_fake_llm_stream(allow_model_requests: None):
+    agent = fake_llm_agent(FakeLLMSettings(latency=0, tokens_per_second=0, tokens=5))
+    async with agent.run_stream('Hello') as result:
+        chunks = [text async for text in result.stream_text(delta=True)]
+    assert ''.join(chunks) == 'token0 token1 token2 token3 token4 '
+    assert result.usage().response_tokens == 5
+
+
+async def test_fake_llm_request(allow_model_requests: None):
+    agent = fake_llm_agent(FakeLLMSettings(latency=0, tokens_per_second=0, tokens=3))
+    result = await agent.run('Hello')
+    assert result.data == 'token0 token1 token2 '
+    assert result.usage().total_tokens == 13
+
+
+def test_summarize():
+    summary = summarize([float(i) for i in range(1, 101)])
+    assert summary['count'] == 100
+    assert summary['mean'] == 50.5
+    assert summary['p50'] == pytest.approx(50.5)
+    assert summary['p95'] == pytest.approx(95.05)
+    assert summary['p99'] == pytest.approx(99.01)
+    assert summary['max'] == 100
+    assert summarize([2.0])['p99'] == 2.0
+    assert summarize([])['count'] == 0
+
+
+def test_report_summary():
+    turns = [
+        TurnResult(ttfb=0.01, first_token=0.2, latency=1.2, tokens=100),
+        TurnResult(ttfb=0.02, first_token=0.4, latency=2.4, tokens=100),
+        TurnResult(error='ReadTimeout()'),
+    ]
+    report = LoadTestReport(LoadTestConfig(users=2), 4.0, turns, {'sqlite_wait': {}})
+    summary = report.summary()
+    assert summary['requests'] == 3
+    assert summary['errors'] == 1
+    assert summary['requests_per_second'] == 0.5
+    assert summary['tokens_per_second'] == 50
+    assert summary['stream_tokens_per_second']['max'] == 100
+    assert summary['latency']['max'] == 2.4
+    assert 'sqlite_wait' in summary